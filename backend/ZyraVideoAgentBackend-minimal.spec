@@ -36,6 +36,9 @@ a = Analysis(
         'backend.google_drive_service',
         'backend.enhanced_video_processor',
         'backend.massugc_video_job',
+        'backend.processors',  # Loaded by name through LazyLoader
+        'backend.processors.avatar_processor',
+        'backend.processors.splice_processor',
         'backend.font_manager',  # Add font manager for cross-platform font support
         'numpy.core._methods',
         'numpy.lib.format',
@@ -2,29 +2,40 @@ import os
 import logging
 import sys
 import shutil
+import hashlib
 import yaml
 import uuid, queue, json
 import urllib.parse
 import subprocess
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from functools import wraps
+from dataclasses import asdict
 from flask import Flask, request, flash, abort
 from flask import Response, jsonify
 from datetime import datetime
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from dotenv import load_dotenv, set_key
 
-from backend.create_video import create_video_job
-from backend.create_video import create_randomized_video_job
-from backend.create_video import generate_script
-from backend.massugc_video_job import create_massugc_video_job
+from backend.services.lazy_loader import LazyLoader
+# Pipelines pull in torch / cv2 / librosa / the AI SDKs; they import on first use
+generate_script = LazyLoader.function("backend.create_video", "generate_script")
+create_massugc_video_job = LazyLoader.function("backend.massugc_video_job", "create_massugc_video_job")
 from backend.google_drive_service import GoogleDriveService
-from openai import OpenAI
+from backend.drive_upload_queue import DriveUploadQueue
+from backend.job_scheduler import JobScheduler, estimate_job_cost
+from backend.job_store import open_job_store
+from backend.render_farm import FarmJobHandle, FarmRelay, FarmWorker, clip_affinity_keys
+from backend.batch_planner import parse_batch_request, plan_batch, run_prep
+from backend.services.tracing import Tracer
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.media_preview import MediaPreviewService
+from backend.services.media_index import MediaMetadataIndex
 from massugc_api_client import (
     MassUGCApiClient, 
     MassUGCApiKeyManager, 
     MassUGCApiError,
+    MassUGCLicenseCache,
     create_massugc_client
 )
 
@@ -84,6 +95,7 @@ CLIPS_DIR.mkdir(parents=True, exist_ok=True)
 
 # ─── MassUGC API Integration ─────────────────────────────────────────
 MASSUGC_API_KEY_MANAGER = MassUGCApiKeyManager(CONFIG_DIR)
+MASSUGC_LICENSE_CACHE = MassUGCLicenseCache()
 
 # ─── 4) Load environment variables from user .env ────────────────────────────
 load_dotenv(dotenv_path=str(ENV_PATH))
@@ -207,48 +219,23 @@ def sanitize_filename(filename):
     
     return sanitized
 
-def generate_video_thumbnail(video_path, output_path):
+def with_preview(record):
     """
-    Generate a thumbnail image from the first frame of a video using FFmpeg.
+    Library record plus its preview (thumbnail, hover sprite, status).
 
-    Args:
-        video_path (str): Path to the source video file
-        output_path (str): Path where the thumbnail image should be saved
-
-    Returns:
-        bool: True if thumbnail was generated successfully, False otherwise
+    Never waits on FFmpeg: missing previews are queued and reported as
+    pending. A thumbnail_path stored on older avatar records is kept while
+    that file still exists.
     """
-    try:
-        # Create thumbnail directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        # FFmpeg command to extract first frame as JPG
-        cmd = [
-            'ffmpeg',
-            '-i', str(video_path),
-            '-vf', 'scale=320:320:force_original_aspect_ratio=increase,crop=320:320',  # Zoom to fill square, crop excess
-            '-vframes', '1',         # Extract only 1 frame
-            '-f', 'image2',          # Output as image
-            '-y',                    # Overwrite if exists
-            str(output_path)
-        ]
-
-        # Run FFmpeg command
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-        if result.returncode == 0:
-            app.logger.info(f"Generated thumbnail: {output_path}")
-            return True
-        else:
-            app.logger.error(f"FFmpeg error: {result.stderr}")
-            return False
-
-    except subprocess.TimeoutExpired:
-        app.logger.error(f"Thumbnail generation timed out for {video_path}")
-        return False
-    except Exception as e:
-        app.logger.error(f"Failed to generate thumbnail: {str(e)}")
-        return False
+    preview = MediaPreviewService.request(record.get("file_path") or "")
+    record = dict(record)
+    if preview["status"] == "ready":
+        if not (record.get("thumbnail_path") and os.path.exists(record["thumbnail_path"])):
+            record["thumbnail_path"] = preview["thumbnail_path"]
+        record["sprite_path"] = preview["sprite_path"]
+        record["sprite"] = preview["sprite"]
+    record["preview_status"] = preview["status"]
+    return record
 
 def _build_enhanced_settings_from_flat_properties(job):
     """
@@ -466,6 +453,14 @@ def emit_event(run_id: str, payload: dict):
     payload["run_id"] = run_id
     payload["timestamp"] = datetime.now().isoformat()
     
+    # Farm jobs report to the store; the accepting instance relays them to its clients
+    if FARM_WORKER and run_id in FARM_WORKER.runs():
+        try:
+            JOB_STORE.append_event(run_id, payload)
+        except Exception as e:
+            print(f"[FARM] ERROR: Failed to publish event for job {run_id}: {e}")
+        return
+    
     try:
         # Non-blocking put with timeout to prevent queue from hanging
         broadcast_q.put(payload, timeout=5)
@@ -475,6 +470,11 @@ def emit_event(run_id: str, payload: dict):
     except Exception as e:
         print(f"[QUEUE] ERROR: Failed to emit event for job {run_id}: {e}")
 
+# Drive uploads run off the job workers; pick up any interrupted by a restart
+DRIVE_UPLOAD_QUEUE = DriveUploadQueue(DRIVE_SERVICE, emit_event)
+if DRIVE_SERVICE.is_connected():
+    DRIVE_UPLOAD_QUEUE.resume_pending()
+
 def validate_elevenlabs_api_real_time(api_key: str, voice_id: str = None) -> dict:
     """
     Actually test ElevenLabs API key and get real status information
@@ -1528,10 +1528,43 @@ def get_job_queue_status():
         "jobs": {run_id: info['status'] for run_id, info in active_jobs.items()},
         "blocked_patterns": blocked_patterns,
         "total_failure_patterns": len(failure_patterns),
-        "validation_cache_size": len(validation_cache)
+        "validation_cache_size": len(validation_cache),
+        "timelines": Tracer.get_timelines(),
+        "encode_speed": FFmpegRunner.get_speed_stats(),
+        "scheduler": job_scheduler.status(),
+        "farm": {
+            "worker_id": FARM_WORKER.worker_id if FARM_WORKER else None,
+            "workers": JOB_STORE.workers(),
+            "jobs": JOB_STORE.stats()
+        } if JOB_STORE else None
     }
 
-job_executor = ThreadPoolExecutor(max_workers=2)  # Limit to 2 concurrent jobs to manage resource usage
+# Jobs start when their estimated CPU / RAM / disk fits the node's live load
+job_scheduler = JobScheduler(scratch_dir=WORKING_DIR)
+
+# Render farm mode: MASSUGC_JOB_STORE (e.g. sqlite:////mnt/shared/jobs.db on a
+# volume every render box mounts) makes /run-job enqueue to a shared store.
+# Each instance also works that queue unless MASSUGC_FARM_WORKER=0.
+JOB_STORE_URL = os.getenv("MASSUGC_JOB_STORE")
+JOB_STORE = open_job_store(JOB_STORE_URL) if JOB_STORE_URL else None
+FARM_WORKER = None  # Started once execute_job is defined
+
+def relay_farm_event(run_id: str, payload: dict):
+    """Hand a farm job's event to our SSE clients and mirror its status locally"""
+    event_type = payload.get("type")
+    if event_type in ("done", "error"):
+        active_jobs.pop(run_id, None)
+    elif run_id in active_jobs and active_jobs[run_id]["status"] == "queued":
+        active_jobs[run_id]["status"] = "processing"
+        active_jobs[run_id]["processing_start"] = datetime.now().timestamp()
+    try:
+        broadcast_q.put(payload, timeout=5)
+    except queue.Full:
+        print(f"[QUEUE] WARNING: Event queue full, dropping event for job {run_id}")
+
+FARM_RELAY = FarmRelay(JOB_STORE, relay_farm_event) if JOB_STORE else None
+if FARM_RELAY:
+    FARM_RELAY.start()
 
 # Start a background thread for queue cleanup
 import threading
@@ -1554,69 +1587,37 @@ def require_massugc_api_key(f):
     """
     Decorator to require and validate MassUGC API key for protected endpoints.
     Checks if a valid MassUGC API key is configured and validates the user.
+    
+    Validation results are held in memory and refreshed in the background
+    (see MassUGCLicenseCache), so only the first request after startup waits
+    on the MassUGC API.
     """
     @wraps(f)
     def decorated(*args, **kwargs):
         try:
             # Check if MassUGC API key is configured
-            if not MASSUGC_API_KEY_MANAGER.has_api_key():
-                abort(403, description="No API key configured")
-            
-            # Get the API key
             api_key = MASSUGC_API_KEY_MANAGER.get_api_key()
             if not api_key:
                 abort(403, description="No API key configured")
             
-            # Validate the API key (with caching to avoid excessive API calls)
-            import time
-            cache_key = f"massugc_validation_{hash(api_key)}"
-            current_time = time.time()
-            
-            # Check validation cache (5 minute TTL)
-            if cache_key in validation_cache:
-                cached = validation_cache[cache_key]
-                if current_time - cached.get('cached_at', 0) < 300:  # 5 minutes
-                    if not cached.get('valid', False):
-                        abort(403, description="Wrong API key")
-                    # Cache hit - key is valid, continue
-                    return f(*args, **kwargs)
-            
-            # Validate with MassUGC API
-            try:
-                client = create_massugc_client(api_key)
-                validation_result = client.validate_connection()
-                
-                # Cache successful validation
-                validation_cache[cache_key] = {
-                    'valid': True,
-                    'cached_at': current_time,
-                    'user_info': client.user_info
-                }
-                
-                # API key is valid, continue with request
-                return f(*args, **kwargs)
-                    
-            except MassUGCApiError as e:
-                # Cache failed validation
-                validation_cache[cache_key] = {
-                    'valid': False,
-                    'cached_at': current_time,
-                    'error': e.message
-                }
-                
-                if e.error_code == "invalid_api_key":
-                    abort(403, description="Wrong API key")
-                elif e.error_code == "insufficient_credits":
+            license_state = MASSUGC_LICENSE_CACHE.check(api_key)
+            if not license_state['valid']:
+                error_code = license_state.get('error_code')
+                if error_code == "insufficient_credits":
                     abort(403, description="Insufficient credits")
-                elif e.error_code == "device_mismatch":
+                elif error_code == "device_mismatch":
                     abort(403, description="API key in use on another device")
                 else:
                     abort(403, description="Wrong API key")
             
+        except HTTPException:
+            raise
         except Exception as e:
             # Log the error but don't expose details to client
             print(f"[AUTH] MassUGC API key validation error: {e}")
             abort(403, description="Wrong API key")
+        
+        return f(*args, **kwargs)
     
     return decorated
 
@@ -1628,6 +1629,19 @@ def health():
     return jsonify({"status":"ok"}), 200
 
 
+@app.route("/health/startup", methods=["GET"])
+def startup_report():
+    """Time to ready plus which heavy subsystems are loaded and what they cost"""
+    return jsonify(LazyLoader.report()), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Span aggregates and FFmpeg encode speeds in the Prometheus text format"""
+    body = Tracer.render_prometheus() + FFmpegRunner.render_prometheus()
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # ─── Helpers to load & save data ─────────────────────────────────────────
 def load_jobs():
     with open(CAMPAIGNS_PATH, "r") as f:
@@ -2025,6 +2039,7 @@ def set_massugc_api_key():
             
             # Store the API key if validation succeeds
             MASSUGC_API_KEY_MANAGER.store_api_key(api_key)
+            MASSUGC_LICENSE_CACHE.invalidate()
             
             return jsonify({
                 "success": True,
@@ -2096,6 +2111,7 @@ def remove_massugc_api_key():
     """Remove stored MassUGC API key"""
     try:
         MASSUGC_API_KEY_MANAGER.remove_api_key()
+        MASSUGC_LICENSE_CACHE.invalidate()
         return jsonify({"success": True, "message": "MassUGC API key removed successfully"})
     except Exception as e:
         return jsonify({"error": f"Failed to remove API key: {str(e)}"}), 500
@@ -2211,6 +2227,7 @@ def handle_drive_callback():
     try:
         success = DRIVE_SERVICE.handle_oauth_callback(code)
         if success:
+            DRIVE_UPLOAD_QUEUE.resume_pending()
             # Redirect to success page or close window
             return """
             <html>
@@ -2251,7 +2268,8 @@ def get_drive_status():
         connected = DRIVE_SERVICE.is_connected()
         response = {
             "connected": connected,
-            "upload_enabled": DRIVE_UPLOAD_ENABLED
+            "upload_enabled": DRIVE_UPLOAD_ENABLED,
+            "uploads": DRIVE_UPLOAD_QUEUE.get_status()
         }
         
         if connected:
@@ -2283,486 +2301,244 @@ def toggle_drive_upload():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# ─── Route: Run Campaign ───────────────────────────────────────────
-@app.route("/run-job", methods=["POST"])
-@require_massugc_api_key
-def run_job():
-    # 1) Read the campaign's ID
-    campaign_id = request.form.get("campaign_id") or request.form.get("id")
-    
-    if not campaign_id or campaign_id == 'undefined':
-        app.logger.error(f"[RUN_JOB] Invalid campaign ID: {campaign_id}")
-        return jsonify({"error": "campaign id is required"}), 400
-
-    # 2) Lookup job
-    all_jobs = load_jobs()
-    job = next((j for j in all_jobs if j["id"] == campaign_id), None)
-    if not job:
-        app.logger.error(f"[RUN_JOB] Campaign not found id={campaign_id}")
-        return jsonify({"error": "Campaign not found"}), 404
-    
-    app.logger.info(f"[RUN_JOB] campaign={job.get('job_name', 'UNNAMED')} id={campaign_id}")
-
-    # 3) PRE-VALIDATION: Check if job pattern is blocked by circuit breaker
-    is_blocked, block_reason = is_job_pattern_blocked(job)
-    if is_blocked:
-        print(f"[CIRCUIT BREAKER] Rejecting job {campaign_id}: {block_reason}")
-        return jsonify({"error": f"Job blocked: {block_reason}"}), 429
-
-    # 4) PRE-VALIDATION: Validate all prerequisites before starting
-    is_valid, validation_error = validate_job_prerequisites(job)
-    if not is_valid:
-        print(f"[VALIDATION] Job {campaign_id} failed pre-validation: {validation_error}")
-        # Record this as a configuration failure (but don't count towards circuit breaker)
-        return jsonify({"error": f"Job validation failed: {validation_error}"}), 400
-
-    # 5) Create an SSE queue
-    run_id = str(uuid.uuid4())
-    start_time = datetime.now().timestamp()
-
-    # Track this job in our active jobs registry
-    active_jobs[run_id] = {
-        "status": "queued",
-        "start_time": start_time,
-        "campaign_id": campaign_id,
-        "thread_future": None,
-        "job_config": job  # Store job config for failure pattern tracking
-    }
-
-    emit_event(run_id, {"type": "queued"})
-
-    # 4) Launch background thread
-    def _runner():
-        try:
-            # Update job status to processing
-            if run_id in active_jobs:
-                active_jobs[run_id]["status"] = "processing"
-                active_jobs[run_id]["processing_start"] = datetime.now().timestamp()
-            
-            print(f"[JOB] Starting job {run_id} for campaign {campaign_id}")
-            
-            # progress_callback will re-publish events tagged with run_id
-            def progress_cb(step, total, message):
-                emit_event(run_id, {
-                    "type": "progress",
-                    "step": step,
-                    "total": total,
-                    "message": message
-                })
-
-            # DETAILED SCRIPT FILE VALIDATION AND PATH RESOLUTION
-            # For splice campaigns with voiceover disabled, script is optional
-            random_settings = job.get("random_video_settings")
-            use_voiceover = random_settings.get("use_voiceover", True) if random_settings else True
-            script_required = not (random_settings and not use_voiceover)
-            
-            script_file_path = job.get("example_script_file")
-            
-            if not script_file_path or script_file_path == 'none':
-                if script_required:
-                    raise FileNotFoundError("No script file specified in campaign")
-                else:
-                    # Skip all script processing for splice campaigns without voiceover
-                    tmp_script = None
-                    example_script = ""
-            
-            # Only process script file if provided (required for Avatar, optional for Splice without voiceover)
-            if script_file_path and script_file_path != 'none':
-                original = Path(script_file_path)
-                app.logger.info(f"📁 Path object created: {original}")
-                app.logger.info(f"📁 Path exists check: {original.exists()}")
-                
-                # If the original path doesn't exist, try to find it in the scripts directory
-                if not original.exists():
-                    app.logger.warning(f"⚠️ Script not found at original path: {original}")
-                    script_name = original.name
-                    app.logger.info(f"📝 Script name extracted: {script_name}")
-                    
-                    alt_path = SCRIPTS_DIR / script_name
-                    app.logger.info(f"🔍 Trying alternative path: {alt_path}")
-                    app.logger.info(f"📁 Alternative path exists: {alt_path.exists()}")
-                    
-                    if alt_path.exists():
-                        app.logger.info(f"✅ Found script at alternative path: {alt_path}")
-                        print(f"[JOB] Script not found at {original}, using alternative path: {alt_path}")
-                        original = alt_path
-                    else:
-                        app.logger.warning("⚠️ Alternative path also not found, checking scripts registry")
-                        # Try to find by ID in scripts registry
-                        scripts = load_scripts()
-                        app.logger.info(f"📚 Loaded {len(scripts)} scripts from registry")
-                        
-                        script_record = None
-                        for s in scripts:
-                            app.logger.info(f"🔍 Checking script: {s.get('name', 'NO_NAME')} (ID: {s.get('id', 'NO_ID')})")
-                            if s.get("name") == script_name or s.get("id") == campaign_id:
-                                script_record = s
-                                app.logger.info(f"✅ Found matching script record: {script_record}")
-                                break
-                        
-                        if script_record:
-                            app.logger.info(f"📁 Script record file path: {script_record.get('file_path')}")
-                            file_exists, resolved_path = safe_file_exists(script_record["file_path"])
-                            app.logger.info(f"📁 Safe file exists check: {file_exists}")
-                            app.logger.info(f"📁 Resolved path: {resolved_path}")
-                            
-                            if file_exists:
-                                original = resolved_path
-                                app.logger.info(f"✅ Using resolved path from registry: {original}")
-                                print(f"[JOB] Found script in registry: {original}")
-                            else:
-                                app.logger.error(f"❌ Script record found but file doesn't exist: {script_record['file_path']}")
-                        else:
-                            available_scripts = [s["name"] for s in scripts]
-                            app.logger.error(f"❌ Script not found in registry. Available scripts: {available_scripts}")
-                            raise FileNotFoundError(f"Script file not found: {script_file_path}. Available scripts: {available_scripts}")
-                else:
-                    app.logger.info(f"✅ Script found at original path: {original}")
+# ─── Job Execution ─────────────────────────────────────────────────
+def execute_job(run_id: str, campaign_id: str, job: dict):
+    """Run one campaign job to completion, reporting through emit_event"""
+    trace_status = "failed"
+    try:
+        # Update job status to processing
+        if run_id in active_jobs:
+            active_jobs[run_id]["status"] = "processing"
+            active_jobs[run_id]["processing_start"] = datetime.now().timestamp()
+        
+        print(f"[JOB] Starting job {run_id} for campaign {campaign_id}")
+        
+        # progress_callback will re-publish events tagged with run_id
+        def progress_cb(step, total, message):
+            emit_event(run_id, {
+                "type": "progress",
+                "step": step,
+                "total": total,
+                "message": message
+            })
 
-                # Clone the script into a unique temp file avoiding job collisions
-                app.logger.info("📋 CREATING TEMPORARY SCRIPT FILE:")
-                app.logger.info("-" * 50)
-                
-                temp_dir = WORKING_DIR  # your per-app working dir
-                app.logger.info(f"📁 Working directory: {temp_dir}")
-                app.logger.info(f"📁 Working directory exists: {temp_dir.exists()}")
-                
-                temp_dir.mkdir(parents=True, exist_ok=True)
-                app.logger.info(f"📁 Working directory created/verified")
-                
-                tmp_script = temp_dir / f"script_{run_id}.txt"
-                app.logger.info(f"📝 Temporary script path: {tmp_script}")
-                
-                app.logger.info(f"📋 Copying script from {original} to {tmp_script}")
-                shutil.copy(original, tmp_script)
-                app.logger.info(f"✅ Script copied successfully")
-                print(f"[JOB] Copied script from {original} to {tmp_script}")
-
-                # Now read only from the copy
-                app.logger.info(f"📖 Reading script content from temporary file")
-                example_script = tmp_script.read_text(encoding="utf-8")
-                app.logger.info(f"📖 Script content length: {len(example_script)} characters")
-                app.logger.info(f"📖 Script preview: {example_script[:100]}...")
-
-            # ═══════════════════════════════════════════════════════════════
-            # CAMPAIGN TYPE DISPATCHER (Clean Processor-Based Architecture)
-            # ═══════════════════════════════════════════════════════════════
-            
-            massugc_settings = job.get("massugc_settings")
-            random_settings = job.get("random_video_settings")
-            
-            # Determine campaign type
-            if massugc_settings:
-                campaign_type = 'massugc'
-            elif random_settings:
-                campaign_type = 'splice'
+        # DETAILED SCRIPT FILE VALIDATION AND PATH RESOLUTION
+        # For splice campaigns with voiceover disabled, script is optional
+        random_settings = job.get("random_video_settings")
+        use_voiceover = random_settings.get("use_voiceover", True) if random_settings else True
+        script_required = not (random_settings and not use_voiceover)
+        
+        script_file_path = job.get("example_script_file")
+        
+        if not script_file_path or script_file_path == 'none':
+            if script_required:
+                raise FileNotFoundError("No script file specified in campaign")
             else:
-                campaign_type = 'avatar'
+                # Skip all script processing for splice campaigns without voiceover
+                tmp_script = None
+                example_script = ""
+        
+        # Batch runs sharing one generated script carry its text, so any node can run them
+        if job.get("example_script_content"):
+            WORKING_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_script = WORKING_DIR / f"script_{run_id}.txt"
+            tmp_script.write_text(job["example_script_content"], encoding="utf-8")
+            example_script = job["example_script_content"]
+            print(f"[JOB] Using batch-shared script ({len(example_script)} chars)")
+
+        # Only process script file if provided (required for Avatar, optional for Splice without voiceover)
+        elif script_file_path and script_file_path != 'none':
+            original = Path(script_file_path)
+            app.logger.info(f"📁 Path object created: {original}")
+            app.logger.info(f"📁 Path exists check: {original.exists()}")
             
-            # Handle MassUGC separately (uses async API)
-            if massugc_settings:
-                # MassUGC API-based video generation
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    app.logger.info("📋 MassUGC job parameters:")
-                    app.logger.info(f"   📝 Job name: {job['job_name']}")
-                    app.logger.info(f"   🎯 Product: {job['product']}")
-                    app.logger.info(f"   🎭 Persona: {job['persona']}")
-                    app.logger.info(f"   🏢 Setting: {job['setting']}")
-                    app.logger.info(f"   😊 Emotion: {job['emotion']}")
-                    app.logger.info(f"   🎣 Hook: {job['hook']}")
-                    app.logger.info(f"   🗣️ Voice ID: {job['elevenlabs_voice_id']}")
-                    app.logger.info(f"   📖 Script length: {len(example_script)} chars")
-                    app.logger.info(f"   🌍 Language: {job.get('language', 'English')}")
-                    app.logger.info(f"   🔧 Enhance for ElevenLabs: {job.get('enhance_for_elevenlabs', False)}")
-                    app.logger.info(f"   🏷️ Brand name: {job.get('brand_name', '')}")
-                    app.logger.info(f"   🔇 Remove silence: {job.get('remove_silence', True)}")
-                    app.logger.info(f"   📤 Output path: {os.getenv('OUTPUT_PATH')}")
-                    
-                    success, output_path = loop.run_until_complete(create_massugc_video_job(
-                    job_name               = job["job_name"],
-                    product                = job["product"],
-                    persona                = job["persona"],
-                    setting                = job["setting"],
-                    emotion                = job["emotion"],
-                    hook                   = job["hook"],
-                    elevenlabs_voice_id    = job["elevenlabs_voice_id"],
-                    example_script_content = example_script,
-                    language               = job.get("language", "English"),
-                    enhance_for_elevenlabs = job.get("enhance_for_elevenlabs", False),
-                    brand_name             = job.get("brand_name", ""),
-                    remove_silence         = job.get("remove_silence", True),
-                    massugc_settings       = massugc_settings,
-                        openai_api_key         = os.getenv("OPENAI_API_KEY"),
-                        elevenlabs_api_key     = os.getenv("ELEVENLABS_API_KEY"),
-                        output_path            = os.getenv("OUTPUT_PATH"),
-                        progress_callback      = progress_cb
-                    ))
-                    app.logger.info(f"✅ MassUGC job completed: success={success}, output={output_path}")
-                finally:
-                    loop.close()
-            
-            # Handle Avatar and Splice using processor architecture
-            else:
-                
-                try:
-                    # Get appropriate processor for campaign type
-                    from backend.processors import get_processor
-                    processor = get_processor(campaign_type)
-                    
-                    # Prepare job configuration with API keys and environment
-                    job_with_env = {
-                        **job,
-                        'openai_api_key': os.getenv("OPENAI_API_KEY"),
-                        'elevenlabs_api_key': os.getenv("ELEVENLABS_API_KEY"),
-                        'dreamface_api_key': os.getenv("DREAMFACE_API_KEY"),
-                        'gcs_bucket_name': os.getenv("GCS_BUCKET_NAME"),
-                        'output_path': os.getenv("OUTPUT_PATH"),
-                    }
-                    
-                    # Log campaign details
-                    # Validate configuration
-                    is_valid, validation_error = processor.validate_config(job_with_env)
-                    if not is_valid:
-                        app.logger.error(f"❌ Configuration validation failed: {validation_error}")
-                        emit_event(run_id, {
-                            "type": "error",
-                            "message": f"Configuration validation failed: {validation_error}"
-                        })
-                        return
-                    
-                    
-                    # Process campaign
-                    success, output_path = processor.process(job_with_env, progress_cb)
-                    app.logger.info(f"✅ {campaign_type.upper()} campaign completed: success={success}")
-                    
-                except Exception as processor_error:
-                    app.logger.error(f"❌ Processor error: {processor_error}")
-                    import traceback
-                    traceback.print_exc()
-                    success = False
-                    output_path = f"Processor error: {str(processor_error)}"
-
-            # c) If the function returned failure without exception
-            if not success:
-                # In case of error using the same string to path the error message
-                error_message = output_path
-                print(f"[JOB] Job {run_id} failed without exception: {error_message}")
-
-                # Record failure for circuit breaker
-                job_info = active_jobs.get(run_id, {})
-                job_config = job_info.get("job_config", {})
-                record_job_failure(job_config, error_message)
-
-                emit_event(run_id, {
-                    "type": "error",
-                    "message": f"Job failed without exception. Last error message: {error_message}"
-                })
+            # If the original path doesn't exist, try to find it in the scripts directory
+            if not original.exists():
+                app.logger.warning(f"⚠️ Script not found at original path: {original}")
+                script_name = original.name
+                app.logger.info(f"📝 Script name extracted: {script_name}")
                 
-                # Send failed job data to MassUGC Cloud API for debugging and user support
-                try:
-                    if MASSUGC_API_KEY_MANAGER.has_api_key():
-                        api_key = MASSUGC_API_KEY_MANAGER.get_api_key()
-                        if api_key:
-                            from massugc_api_client import create_massugc_client
-                            client = create_massugc_client(api_key)
-                            client.initialize()  # Initialize device fingerprint
-                            
-                            # Create detailed error message for customer support
-                            detailed_error = create_detailed_error_message(error_message, job, run_id)
-                            
-                            # Prepare usage data for failed job
-                            usage_data = {
-                                "event_type": "video_generation",
-                                "job_data": {
-                                    "job_name": job.get("job_name", ""),
-                                    "product": job.get("product", ""),
-                                    "persona": job.get("persona", ""),
-                                    "setting": job.get("setting", ""),
-                                    "emotion": job.get("emotion", ""),
-                                    "hook": job.get("hook", ""),
-                                    "brand_name": job.get("brand_name", ""),
-                                    "language": job.get("language", "English"),
-                                    "useExactScript": job.get("useExactScript", False),
-                                    "script_generation_type": "exact" if job.get("useExactScript", False) else "ai_generated",
-                                    "run_id": run_id,
-                                    "output_path": None,
-                                    "success": False,
-                                    "error_message": detailed_error,
-                                    "failure_time": datetime.now().isoformat(),
-                                    "workflow_type": "avatar" if not massugc_settings and not random_settings else "massugc" if massugc_settings else "randomized"
-                                },
-                                "timestamp": datetime.now().isoformat(),
-                                "source": "massugc-video-service",
-                                "version": "1.0.0"
-                            }
-                            
-                            # Send to MassUGC Cloud API
-                            result = client.log_usage_data(usage_data)
-                            if result.get('skipped'):
-                                print(f"[USAGE] Skipped logging failed job data for job {run_id}: {result.get('reason', 'unknown')}")
-                            else:
-                                print(f"[USAGE] Successfully logged detailed failed job data for job {run_id}")
-                            
-                except Exception as logging_error:
-                    # Don't fail the job if logging fails, just log the error
-                    print(f"[USAGE] Failed to log failed job data for job {run_id}: {logging_error}")
+                alt_path = SCRIPTS_DIR / script_name
+                app.logger.info(f"🔍 Trying alternative path: {alt_path}")
+                app.logger.info(f"📁 Alternative path exists: {alt_path.exists()}")
                 
-                return
-
-            # d) Upload to Google Drive if enabled
-            drive_info = None
-            if DRIVE_UPLOAD_ENABLED and DRIVE_SERVICE.is_connected():
-                try:
-                    # Extract date and product from output path
-                    # Expected format: ~/.zyra-video-agent/output/YYYY-MM-DD/Product_Name/filename.mp4
-                    path_parts = Path(output_path).parts
-                    date_folder = None
-                    product_folder = None
+                if alt_path.exists():
+                    app.logger.info(f"✅ Found script at alternative path: {alt_path}")
+                    print(f"[JOB] Script not found at {original}, using alternative path: {alt_path}")
+                    original = alt_path
+                else:
+                    app.logger.warning("⚠️ Alternative path also not found, checking scripts registry")
+                    # Try to find by ID in scripts registry
+                    scripts = load_scripts()
+                    app.logger.info(f"📚 Loaded {len(scripts)} scripts from registry")
                     
-                    # Find date and product folders in path
-                    for i, part in enumerate(path_parts):
-                        # Look for date pattern YYYY-MM-DD
-                        if len(part) == 10 and part[4] == '-' and part[7] == '-':
-                            date_folder = part
-                            if i + 1 < len(path_parts):
-                                product_folder = path_parts[i + 1]
+                    script_record = None
+                    for s in scripts:
+                        app.logger.info(f"🔍 Checking script: {s.get('name', 'NO_NAME')} (ID: {s.get('id', 'NO_ID')})")
+                        if s.get("name") == script_name or s.get("id") == campaign_id:
+                            script_record = s
+                            app.logger.info(f"✅ Found matching script record: {script_record}")
                             break
                     
-                    if date_folder and product_folder:
-                        print(f"[DRIVE] Uploading to Google Drive: {date_folder}/{product_folder}")
-                        drive_result = DRIVE_SERVICE.upload_video(
-                            file_path=output_path,
-                            date_folder=date_folder,
-                            product_folder=product_folder,
-                            job_name=job.get('name', 'Untitled')
-                        )
+                    if script_record:
+                        app.logger.info(f"📁 Script record file path: {script_record.get('file_path')}")
+                        file_exists, resolved_path = safe_file_exists(script_record["file_path"])
+                        app.logger.info(f"📁 Safe file exists check: {file_exists}")
+                        app.logger.info(f"📁 Resolved path: {resolved_path}")
                         
-                        if drive_result:
-                            drive_info = drive_result
-                            output_path = drive_result['web_link']  # Update output path to Drive link
-                            print(f"[DRIVE] Upload successful: {drive_result['drive_path']}")
+                        if file_exists:
+                            original = resolved_path
+                            app.logger.info(f"✅ Using resolved path from registry: {original}")
+                            print(f"[JOB] Found script in registry: {original}")
                         else:
-                            print(f"[DRIVE] Upload failed, keeping local file")
+                            app.logger.error(f"❌ Script record found but file doesn't exist: {script_record['file_path']}")
                     else:
-                        print(f"[DRIVE] Could not extract folder structure from path: {output_path}")
-                        
-                except Exception as drive_error:
-                    print(f"[DRIVE] Upload error (falling back to local): {drive_error}")
+                        available_scripts = [s["name"] for s in scripts]
+                        app.logger.error(f"❌ Script not found in registry. Available scripts: {available_scripts}")
+                        raise FileNotFoundError(f"Script file not found: {script_file_path}. Available scripts: {available_scripts}")
+            else:
+                app.logger.info(f"✅ Script found at original path: {original}")
+
+            # Clone the script into a unique temp file avoiding job collisions
+            app.logger.info("📋 CREATING TEMPORARY SCRIPT FILE:")
+            app.logger.info("-" * 50)
             
-            # e) Signal success
-            print(f"[JOB] Job {run_id} completed successfully: {output_path}")
-            event_data = {
-                "type": "done",
-                "success": success,
-                "output_path": output_path
-            }
+            temp_dir = WORKING_DIR  # your per-app working dir
+            app.logger.info(f"📁 Working directory: {temp_dir}")
+            app.logger.info(f"📁 Working directory exists: {temp_dir.exists()}")
             
-            # Add Drive info if available
-            if drive_info:
-                event_data["drive_info"] = drive_info
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            app.logger.info(f"📁 Working directory created/verified")
             
-            emit_event(run_id, event_data)
+            tmp_script = temp_dir / f"script_{run_id}.txt"
+            app.logger.info(f"📝 Temporary script path: {tmp_script}")
             
-            # e) Send usage data to MassUGC Cloud API for tracking (if API key configured)
-            # Send to cloud API for both success and failure
+            app.logger.info(f"📋 Copying script from {original} to {tmp_script}")
+            shutil.copy(original, tmp_script)
+            app.logger.info(f"✅ Script copied successfully")
+            print(f"[JOB] Copied script from {original} to {tmp_script}")
+
+            # Now read only from the copy
+            app.logger.info(f"📖 Reading script content from temporary file")
+            example_script = tmp_script.read_text(encoding="utf-8")
+            app.logger.info(f"📖 Script content length: {len(example_script)} characters")
+            app.logger.info(f"📖 Script preview: {example_script[:100]}...")
+
+        # ═══════════════════════════════════════════════════════════════
+        # CAMPAIGN TYPE DISPATCHER (Clean Processor-Based Architecture)
+        # ═══════════════════════════════════════════════════════════════
+        
+        massugc_settings = job.get("massugc_settings")
+        random_settings = job.get("random_video_settings")
+        
+        # Determine campaign type
+        if massugc_settings:
+            campaign_type = 'massugc'
+        elif random_settings:
+            campaign_type = 'splice'
+        else:
+            campaign_type = 'avatar'
+        Tracer.begin_run(run_id, campaign_type, job_name=job.get("job_name"))
+        FFmpegRunner.set_listener(lambda progress: emit_event(run_id, {"type": "encode_progress", **progress}))
+        
+        # Handle MassUGC separately (uses async API)
+        if massugc_settings:
+            # MassUGC API-based video generation
+            import asyncio
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
             try:
-                if MASSUGC_API_KEY_MANAGER.has_api_key():
-                    api_key = MASSUGC_API_KEY_MANAGER.get_api_key()
-                    if api_key:
-                        from massugc_api_client import create_massugc_client
-                        client = create_massugc_client(api_key)
-                        client.initialize()  # Initialize device fingerprint
-                        
-                        # Prepare usage data for successful job
-                        usage_data = {
-                            "event_type": "video_generation",
-                            "job_data": {
-                                "job_name": job.get("job_name", ""),
-                                "product": job.get("product", ""),
-                                "persona": job.get("persona", ""),
-                                "setting": job.get("setting", ""),
-                                "emotion": job.get("emotion", ""),
-                                "hook": job.get("hook", ""),
-                                "brand_name": job.get("brand_name", ""),
-                                "language": job.get("language", "English"),
-                                "useExactScript": job.get("useExactScript", False),
-                                "script_generation_type": "exact" if job.get("useExactScript", False) else "ai_generated",
-                                "run_id": run_id,
-                                "output_path": str(output_path),
-                                "success": True,
-                                "generation_time": datetime.now().isoformat(),
-                                "workflow_type": "avatar" if not massugc_settings and not random_settings else "massugc" if massugc_settings else "randomized"
-                            },
-                            "timestamp": datetime.now().isoformat(),
-                            "source": "massugc-video-service",
-                            "version": "1.0.0"
-                        }
-                        
-                        # Send to MassUGC Cloud API
-                        result = client.log_usage_data(usage_data)
-                        if result.get('skipped'):
-                            print(f"[USAGE] Skipped logging usage data for job {run_id}: {result.get('reason', 'unknown')}")
-                        else:
-                            print(f"[USAGE] Successfully logged usage data for job {run_id}")
-                        
-            except Exception as logging_error:
-                # Don't fail the job if logging fails, just log the error
-                print(f"[USAGE] Failed to log usage data for job {run_id}: {logging_error}")
-
-        except Exception as e:
-            # e) Catch and emit any unexpected exception
-            err = str(e)
-            app.logger.error(f"💥 [JOB] Job {run_id} failed with exception: {err}")
-            app.logger.error(f"💥 [JOB] Exception type: {type(e).__name__}")
-            app.logger.error(f"💥 [JOB] Exception args: {e.args}")
-            
-            # Check if this is the specific stat error we're looking for
-            if "stat: path should be string, bytes, os.PathLike or integer, not NoneType" in err:
-                app.logger.error("🎯 FOUND THE STAT ERROR! This is the error we're debugging.")
-                app.logger.error("🔍 Let's trace where this None path is coming from...")
+                app.logger.info("📋 MassUGC job parameters:")
+                app.logger.info(f"   📝 Job name: {job['job_name']}")
+                app.logger.info(f"   🎯 Product: {job['product']}")
+                app.logger.info(f"   🎭 Persona: {job['persona']}")
+                app.logger.info(f"   🏢 Setting: {job['setting']}")
+                app.logger.info(f"   😊 Emotion: {job['emotion']}")
+                app.logger.info(f"   🎣 Hook: {job['hook']}")
+                app.logger.info(f"   🗣️ Voice ID: {job['elevenlabs_voice_id']}")
+                app.logger.info(f"   📖 Script length: {len(example_script)} chars")
+                app.logger.info(f"   🌍 Language: {job.get('language', 'English')}")
+                app.logger.info(f"   🔧 Enhance for ElevenLabs: {job.get('enhance_for_elevenlabs', False)}")
+                app.logger.info(f"   🏷️ Brand name: {job.get('brand_name', '')}")
+                app.logger.info(f"   🔇 Remove silence: {job.get('remove_silence', True)}")
+                app.logger.info(f"   📤 Output path: {os.getenv('OUTPUT_PATH')}")
                 
-                # Log all the paths we know about
-                app.logger.error("📋 PATH ANALYSIS:")
-                app.logger.error(f"   🎭 Avatar video path: {job.get('avatar_video_path')}")
-                app.logger.error(f"   📝 Script file path: {job.get('example_script_file')}")
-                app.logger.error(f"   📦 Product clip path: {job.get('product_clip_path')}")
-                app.logger.error(f"   📤 Output path: {os.getenv('OUTPUT_PATH')}")
-                app.logger.error(f"   🏗️ Working dir: {WORKING_DIR}")
-                app.logger.error(f"   📁 Scripts dir: {SCRIPTS_DIR}")
-                app.logger.error(f"   🎭 Avatars dir: {AVATARS_DIR}")
-                app.logger.error(f"   📦 Clips dir: {CLIPS_DIR}")
+                success, output_path = loop.run_until_complete(create_massugc_video_job(
+                job_name               = job["job_name"],
+                product                = job["product"],
+                persona                = job["persona"],
+                setting                = job["setting"],
+                emotion                = job["emotion"],
+                hook                   = job["hook"],
+                elevenlabs_voice_id    = job["elevenlabs_voice_id"],
+                example_script_content = example_script,
+                language               = job.get("language", "English"),
+                enhance_for_elevenlabs = job.get("enhance_for_elevenlabs", False),
+                brand_name             = job.get("brand_name", ""),
+                remove_silence         = job.get("remove_silence", True),
+                massugc_settings       = massugc_settings,
+                    openai_api_key         = os.getenv("OPENAI_API_KEY"),
+                    elevenlabs_api_key     = os.getenv("ELEVENLABS_API_KEY"),
+                    output_path            = os.getenv("OUTPUT_PATH"),
+                    progress_callback      = progress_cb
+                ))
+                app.logger.info(f"✅ MassUGC job completed: success={success}, output={output_path}")
+            finally:
+                loop.close()
+        
+        # Handle Avatar and Splice using processor architecture
+        else:
+            
+            try:
+                # Get appropriate processor for campaign type
+                processor = LazyLoader.load("processors").get_processor(campaign_type)
                 
-                # Check if any of these are None
-                paths_to_check = {
-                    "avatar_video_path": job.get('avatar_video_path'),
-                    "example_script_file": job.get('example_script_file'),
-                    "product_clip_path": job.get('product_clip_path'),
-                    "OUTPUT_PATH": os.getenv('OUTPUT_PATH'),
-                    "WORKING_DIR": str(WORKING_DIR),
-                    "SCRIPTS_DIR": str(SCRIPTS_DIR),
-                    "AVATARS_DIR": str(AVATARS_DIR),
-                    "CLIPS_DIR": str(CLIPS_DIR)
+                # Prepare job configuration with API keys and environment
+                job_with_env = {
+                    **job,
+                    'openai_api_key': os.getenv("OPENAI_API_KEY"),
+                    'elevenlabs_api_key': os.getenv("ELEVENLABS_API_KEY"),
+                    'dreamface_api_key': os.getenv("DREAMFACE_API_KEY"),
+                    'gcs_bucket_name': os.getenv("GCS_BUCKET_NAME"),
+                    'output_path': os.getenv("OUTPUT_PATH"),
                 }
                 
-                for path_name, path_value in paths_to_check.items():
-                    if path_value is None:
-                        app.logger.error(f"   ❌ {path_name} is None!")
-                    else:
-                        app.logger.error(f"   ✅ {path_name}: {path_value}")
-            
-            print(f"[JOB] Job {run_id} failed with exception: {err}")
-            
-            # Record failure for circuit breaker
-            job_info = active_jobs.get(run_id, {})
-            job_config = job_info.get("job_config", {})
-            record_job_failure(job_config, err)
+                # Log campaign details
+                # Validate configuration
+                is_valid, validation_error = processor.validate_config(job_with_env)
+                if not is_valid:
+                    app.logger.error(f"❌ Configuration validation failed: {validation_error}")
+                    emit_event(run_id, {
+                        "type": "error",
+                        "message": f"Configuration validation failed: {validation_error}"
+                    })
+                    return
+                
+                
+                # Process campaign
+                success, output_path = processor.process(job_with_env, progress_cb)
+                app.logger.info(f"✅ {campaign_type.upper()} campaign completed: success={success}")
+                
+            except Exception as processor_error:
+                app.logger.error(f"❌ Processor error: {processor_error}")
+                import traceback
+                traceback.print_exc()
+                success = False
+                output_path = f"Processor error: {str(processor_error)}"
+
+        # c) If the function returned failure without exception
+        if not success:
+            # In case of error using the same string to path the error message
+            error_message = output_path
+            print(f"[JOB] Job {run_id} failed without exception: {error_message}")
+
+            # Record failure for circuit breaker (the job config this node
+            # runs: farm workers have no active_jobs entry for claimed jobs)
+            record_job_failure(job, error_message)
 
             emit_event(run_id, {
                 "type": "error",
-                "message": f"Job failed with exception, message {err}"
+                "message": f"Job failed without exception. Last error message: {error_message}"
             })
             
             # Send failed job data to MassUGC Cloud API for debugging and user support
@@ -2775,7 +2551,7 @@ def run_job():
                         client.initialize()  # Initialize device fingerprint
                         
                         # Create detailed error message for customer support
-                        detailed_error = create_detailed_error_message(err, job, run_id)
+                        detailed_error = create_detailed_error_message(error_message, job, run_id)
                         
                         # Prepare usage data for failed job
                         usage_data = {
@@ -2814,31 +2590,381 @@ def run_job():
                 # Don't fail the job if logging fails, just log the error
                 print(f"[USAGE] Failed to log failed job data for job {run_id}: {logging_error}")
             
-            # No re-raise: we want the thread to exit gracefully
+            return
 
-        finally:
-            # Clean up temporary script file
-            if 'tmp_script' in locals() and tmp_script and tmp_script.exists():
-                try:
-                    tmp_script.unlink()
-                    print(f"[JOB] Cleaned up temp script: {tmp_script}")
-                except Exception as e:
-                    print(f"[JOB] Failed to clean up temp script {tmp_script}: {e}")
+        # d) Queue Google Drive upload if enabled (runs in the upload pool,
+        #    progress and the final Drive link arrive as drive_upload events)
+        drive_upload_queued = False
+        if DRIVE_UPLOAD_ENABLED and DRIVE_SERVICE.is_connected():
+            try:
+                # Extract date and product from output path
+                # Expected format: ~/.zyra-video-agent/output/YYYY-MM-DD/Product_Name/filename.mp4
+                path_parts = Path(output_path).parts
+                date_folder = None
+                product_folder = None
+                
+                # Find date and product folders in path
+                for i, part in enumerate(path_parts):
+                    # Look for date pattern YYYY-MM-DD
+                    if len(part) == 10 and part[4] == '-' and part[7] == '-':
+                        date_folder = part
+                        if i + 1 < len(path_parts):
+                            product_folder = path_parts[i + 1]
+                        break
+                
+                if date_folder and product_folder:
+                    print(f"[DRIVE] Queueing Google Drive upload: {date_folder}/{product_folder}")
+                    DRIVE_UPLOAD_QUEUE.enqueue(
+                        run_id=run_id,
+                        file_path=output_path,
+                        date_folder=date_folder,
+                        product_folder=product_folder,
+                        job_name=job.get('name', 'Untitled')
+                    )
+                    drive_upload_queued = True
+                else:
+                    print(f"[DRIVE] Could not extract folder structure from path: {output_path}")
+                    
+            except Exception as drive_error:
+                print(f"[DRIVE] Could not queue upload (keeping local file): {drive_error}")
+        
+        # e) Signal success
+        trace_status = "completed"
+        print(f"[JOB] Job {run_id} completed successfully: {output_path}")
+        event_data = {
+            "type": "done",
+            "success": success,
+            "output_path": output_path
+        }
+        
+        # Drive link follows in a drive_upload event
+        if drive_upload_queued:
+            event_data["drive_upload"] = "queued"
+        
+        emit_event(run_id, event_data)
+        
+        # e) Send usage data to MassUGC Cloud API for tracking (if API key configured)
+        # Send to cloud API for both success and failure
+        try:
+            if MASSUGC_API_KEY_MANAGER.has_api_key():
+                api_key = MASSUGC_API_KEY_MANAGER.get_api_key()
+                if api_key:
+                    from massugc_api_client import create_massugc_client
+                    client = create_massugc_client(api_key)
+                    client.initialize()  # Initialize device fingerprint
+                    
+                    # Prepare usage data for successful job
+                    usage_data = {
+                        "event_type": "video_generation",
+                        "job_data": {
+                            "job_name": job.get("job_name", ""),
+                            "product": job.get("product", ""),
+                            "persona": job.get("persona", ""),
+                            "setting": job.get("setting", ""),
+                            "emotion": job.get("emotion", ""),
+                            "hook": job.get("hook", ""),
+                            "brand_name": job.get("brand_name", ""),
+                            "language": job.get("language", "English"),
+                            "useExactScript": job.get("useExactScript", False),
+                            "script_generation_type": "exact" if job.get("useExactScript", False) else "ai_generated",
+                            "run_id": run_id,
+                            "output_path": str(output_path),
+                            "success": True,
+                            "generation_time": datetime.now().isoformat(),
+                            "workflow_type": "avatar" if not massugc_settings and not random_settings else "massugc" if massugc_settings else "randomized"
+                        },
+                        "timestamp": datetime.now().isoformat(),
+                        "source": "massugc-video-service",
+                        "version": "1.0.0"
+                    }
+                    
+                    # Send to MassUGC Cloud API
+                    result = client.log_usage_data(usage_data)
+                    if result.get('skipped'):
+                        print(f"[USAGE] Skipped logging usage data for job {run_id}: {result.get('reason', 'unknown')}")
+                    else:
+                        print(f"[USAGE] Successfully logged usage data for job {run_id}")
+                    
+        except Exception as logging_error:
+            # Don't fail the job if logging fails, just log the error
+            print(f"[USAGE] Failed to log usage data for job {run_id}: {logging_error}")
+
+    except Exception as e:
+        # e) Catch and emit any unexpected exception
+        err = str(e)
+        app.logger.error(f"💥 [JOB] Job {run_id} failed with exception: {err}")
+        app.logger.error(f"💥 [JOB] Exception type: {type(e).__name__}")
+        app.logger.error(f"💥 [JOB] Exception args: {e.args}")
+        
+        # Check if this is the specific stat error we're looking for
+        if "stat: path should be string, bytes, os.PathLike or integer, not NoneType" in err:
+            app.logger.error("🎯 FOUND THE STAT ERROR! This is the error we're debugging.")
+            app.logger.error("🔍 Let's trace where this None path is coming from...")
+            
+            # Log all the paths we know about
+            app.logger.error("📋 PATH ANALYSIS:")
+            app.logger.error(f"   🎭 Avatar video path: {job.get('avatar_video_path')}")
+            app.logger.error(f"   📝 Script file path: {job.get('example_script_file')}")
+            app.logger.error(f"   📦 Product clip path: {job.get('product_clip_path')}")
+            app.logger.error(f"   📤 Output path: {os.getenv('OUTPUT_PATH')}")
+            app.logger.error(f"   🏗️ Working dir: {WORKING_DIR}")
+            app.logger.error(f"   📁 Scripts dir: {SCRIPTS_DIR}")
+            app.logger.error(f"   🎭 Avatars dir: {AVATARS_DIR}")
+            app.logger.error(f"   📦 Clips dir: {CLIPS_DIR}")
             
-            # Remove job from active tracking
-            if run_id in active_jobs:
-                active_jobs.pop(run_id)
-                print(f"[JOB] Removed job {run_id} from active tracking")
+            # Check if any of these are None
+            paths_to_check = {
+                "avatar_video_path": job.get('avatar_video_path'),
+                "example_script_file": job.get('example_script_file'),
+                "product_clip_path": job.get('product_clip_path'),
+                "OUTPUT_PATH": os.getenv('OUTPUT_PATH'),
+                "WORKING_DIR": str(WORKING_DIR),
+                "SCRIPTS_DIR": str(SCRIPTS_DIR),
+                "AVATARS_DIR": str(AVATARS_DIR),
+                "CLIPS_DIR": str(CLIPS_DIR)
+            }
+            
+            for path_name, path_value in paths_to_check.items():
+                if path_value is None:
+                    app.logger.error(f"   ❌ {path_name} is None!")
+                else:
+                    app.logger.error(f"   ✅ {path_name}: {path_value}")
+        
+        print(f"[JOB] Job {run_id} failed with exception: {err}")
+        
+        # Record failure for circuit breaker
+        record_job_failure(job, err)
 
-    # 4) Submit to the pool and store the future for potential cancellation
-    future = job_executor.submit(_runner)
+        emit_event(run_id, {
+            "type": "error",
+            "message": f"Job failed with exception, message {err}"
+        })
+        
+        # Send failed job data to MassUGC Cloud API for debugging and user support
+        try:
+            if MASSUGC_API_KEY_MANAGER.has_api_key():
+                api_key = MASSUGC_API_KEY_MANAGER.get_api_key()
+                if api_key:
+                    from massugc_api_client import create_massugc_client
+                    client = create_massugc_client(api_key)
+                    client.initialize()  # Initialize device fingerprint
+                    
+                    # Create detailed error message for customer support
+                    detailed_error = create_detailed_error_message(err, job, run_id)
+                    
+                    # Prepare usage data for failed job
+                    usage_data = {
+                        "event_type": "video_generation",
+                        "job_data": {
+                            "job_name": job.get("job_name", ""),
+                            "product": job.get("product", ""),
+                            "persona": job.get("persona", ""),
+                            "setting": job.get("setting", ""),
+                            "emotion": job.get("emotion", ""),
+                            "hook": job.get("hook", ""),
+                            "brand_name": job.get("brand_name", ""),
+                            "language": job.get("language", "English"),
+                            "useExactScript": job.get("useExactScript", False),
+                            "script_generation_type": "exact" if job.get("useExactScript", False) else "ai_generated",
+                            "run_id": run_id,
+                            "output_path": None,
+                            "success": False,
+                            "error_message": detailed_error,
+                            "failure_time": datetime.now().isoformat(),
+                            "workflow_type": "avatar" if not massugc_settings and not random_settings else "massugc" if massugc_settings else "randomized"
+                        },
+                        "timestamp": datetime.now().isoformat(),
+                        "source": "massugc-video-service",
+                        "version": "1.0.0"
+                    }
+                    
+                    # Send to MassUGC Cloud API
+                    result = client.log_usage_data(usage_data)
+                    if result.get('skipped'):
+                        print(f"[USAGE] Skipped logging failed job data for job {run_id}: {result.get('reason', 'unknown')}")
+                    else:
+                        print(f"[USAGE] Successfully logged detailed failed job data for job {run_id}")
+                    
+        except Exception as logging_error:
+            # Don't fail the job if logging fails, just log the error
+            print(f"[USAGE] Failed to log failed job data for job {run_id}: {logging_error}")
+        
+        # No re-raise: we want the thread to exit gracefully
+
+    finally:
+        # Clean up temporary script file
+        if 'tmp_script' in locals() and tmp_script and tmp_script.exists():
+            try:
+                tmp_script.unlink()
+                print(f"[JOB] Cleaned up temp script: {tmp_script}")
+            except Exception as e:
+                print(f"[JOB] Failed to clean up temp script {tmp_script}: {e}")
+        
+        Tracer.end_run(run_id, trace_status)
+        FFmpegRunner.set_listener(None)
+
+        # Remove job from active tracking
+        if run_id in active_jobs:
+            active_jobs.pop(run_id)
+            print(f"[JOB] Removed job {run_id} from active tracking")
+
+
+if JOB_STORE and os.getenv("MASSUGC_FARM_WORKER", "1") != "0":
+    FARM_WORKER = FarmWorker(JOB_STORE, job_scheduler, execute_job)
+    FARM_WORKER.start()
+
+
+# ─── Route: Run Campaign ───────────────────────────────────────────
+@app.route("/run-job", methods=["POST"])
+@require_massugc_api_key
+def run_job():
+    # 1) Read the campaign's ID
+    campaign_id = request.form.get("campaign_id") or request.form.get("id")
+    
+    if not campaign_id or campaign_id == 'undefined':
+        app.logger.error(f"[RUN_JOB] Invalid campaign ID: {campaign_id}")
+        return jsonify({"error": "campaign id is required"}), 400
+
+    # 2) Lookup job
+    all_jobs = load_jobs()
+    job = next((j for j in all_jobs if j["id"] == campaign_id), None)
+    if not job:
+        app.logger.error(f"[RUN_JOB] Campaign not found id={campaign_id}")
+        return jsonify({"error": "Campaign not found"}), 404
+    
+    app.logger.info(f"[RUN_JOB] campaign={job.get('job_name', 'UNNAMED')} id={campaign_id}")
+
+    # 3) PRE-VALIDATION: Check if job pattern is blocked by circuit breaker
+    is_blocked, block_reason = is_job_pattern_blocked(job)
+    if is_blocked:
+        print(f"[CIRCUIT BREAKER] Rejecting job {campaign_id}: {block_reason}")
+        return jsonify({"error": f"Job blocked: {block_reason}"}), 429
+
+    # 4) PRE-VALIDATION: Validate all prerequisites before starting
+    is_valid, validation_error = validate_job_prerequisites(job)
+    if not is_valid:
+        print(f"[VALIDATION] Job {campaign_id} failed pre-validation: {validation_error}")
+        # Record this as a configuration failure (but don't count towards circuit breaker)
+        return jsonify({"error": f"Job validation failed: {validation_error}"}), 400
+
+    # 5) Create an SSE queue
+    run_id = str(uuid.uuid4())
+    start_time = datetime.now().timestamp()
+
+    # Track this job in our active jobs registry
+    active_jobs[run_id] = {
+        "status": "queued",
+        "start_time": start_time,
+        "campaign_id": campaign_id,
+        "thread_future": None,
+        "job_config": job  # Store job config for failure pattern tracking
+    }
+
+    emit_event(run_id, {"type": "queued"})
+
+    # 4) Submit to the scheduler (or the farm queue)
+    submit_job(run_id, campaign_id, job)
+
+    # 5) Return the run ID for the client to open /progress/<run_id>
+    return jsonify({"run_id": run_id}), 200
+
+def submit_job(run_id: str, campaign_id: str, job: dict):
+    """Hand a tracked job to the scheduler (or the farm queue) and keep a handle for cancellation"""
+    if JOB_STORE:
+        FARM_RELAY.watch(run_id)
+        JOB_STORE.enqueue(run_id, campaign_id, job, asdict(estimate_job_cost(job)), clip_affinity_keys(job))
+        future = FarmJobHandle(JOB_STORE, run_id)
+    else:
+        future = job_scheduler.submit(run_id, lambda: execute_job(run_id, campaign_id, job), estimate_job_cost(job))
     
     # Update the job tracking with the thread future
     if run_id in active_jobs:
         active_jobs[run_id]["thread_future"] = future
 
-    # 5) Return the run ID for the client to open /progress/<run_id>
-    return jsonify({"run_id": run_id}), 200
+
+# ─── Route: Run Campaign Batch ─────────────────────────────────────
+@app.route("/run-batch", methods=["POST"])
+@require_massugc_api_key
+def run_batch():
+    """
+    Launch many runs in one request.
+
+    Body: {"campaign_id": "...", "count": 100} or
+          {"campaigns": ["id", {"campaign_id": "id", "count": 3, "share_script": true}]}
+
+    Campaigns are loaded and validated once for the whole batch, then the
+    planner interleaves the runs and schedules shared prep (clip folders,
+    pinned scripts) ahead of them.
+    """
+    data = request.get_json(silent=True) or request.form.to_dict()
+    try:
+        entries = parse_batch_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # 1) Load and validate every campaign once
+    jobs_by_id = {j["id"]: j for j in load_jobs()}
+    errors = {}
+    for campaign_id in dict.fromkeys(campaign_id for campaign_id, _, _ in entries):
+        job = jobs_by_id.get(campaign_id)
+        if not job:
+            errors[campaign_id] = "Campaign not found"
+            continue
+        is_blocked, block_reason = is_job_pattern_blocked(job)
+        if is_blocked:
+            errors[campaign_id] = f"Job blocked: {block_reason}"
+            continue
+        is_valid, validation_error = validate_job_prerequisites(job)
+        if not is_valid:
+            errors[campaign_id] = f"Job validation failed: {validation_error}"
+    if errors:
+        app.logger.error(f"[RUN_BATCH] Rejected batch: {errors}")
+        return jsonify({"error": "Batch validation failed", "campaigns": errors}), 400
+
+    # 2) Plan: interleaved runs plus shared prep
+    plan = plan_batch(entries, jobs_by_id)
+    if JOB_STORE:
+        plan.clip_preps = []  # Farm workers keep their own clip caches; affinity routing reuses them
+    app.logger.info(f"[RUN_BATCH] batch={plan.batch_id} {plan.summary()}")
+
+    # 3) Track every run right away so clients can follow / cancel them
+    start_time = datetime.now().timestamp()
+    for run in plan.runs:
+        active_jobs[run.run_id] = {
+            "status": "queued",
+            "start_time": start_time,
+            "campaign_id": run.campaign_id,
+            "batch_id": plan.batch_id,
+            "thread_future": None,
+            "job_config": run.job
+        }
+        emit_event(run.run_id, {"type": "queued", "batch_id": plan.batch_id, "variant": run.variant})
+
+    threading.Thread(target=dispatch_batch, args=(plan,), name=f"batch-{plan.batch_id[:8]}", daemon=True).start()
+
+    return jsonify({
+        "batch_id": plan.batch_id,
+        "run_ids": [run.run_id for run in plan.runs],
+        "plan": plan.summary()
+    }), 200
+
+def dispatch_batch(plan):
+    """Run a batch's shared prep, then submit its runs in planned order"""
+    try:
+        report = run_prep(plan, job_scheduler.submit, os.getenv("OPENAI_API_KEY"))
+        print(f"[BATCH] {plan.batch_id} prep done: {report}")
+    except Exception as e:
+        # Prep is an optimization; runs still do their own
+        print(f"[BATCH] {plan.batch_id} prep failed: {e}")
+
+    for run in plan.runs:
+        if run.run_id not in active_jobs:
+            continue  # Cancelled while the batch was prepping
+        try:
+            submit_job(run.run_id, run.campaign_id, run.job)
+        except Exception as e:
+            active_jobs.pop(run.run_id, None)
+            emit_event(run.run_id, {"type": "error", "message": f"Failed to schedule batch run: {e}"})
 
 @app.route("/events")
 def events():
@@ -3008,8 +3134,9 @@ def reset_circuit_breaker():
 def clear_validation_cache():
     """Clear the validation cache to force re-validation of job prerequisites"""
     try:
-        cache_size = len(validation_cache)
+        cache_size = len(validation_cache) + MASSUGC_LICENSE_CACHE.size()
         validation_cache.clear()
+        MASSUGC_LICENSE_CACHE.invalidate()
         return jsonify({"message": f"Cleared {cache_size} cached validation results"})
     except Exception as e:
         return jsonify({"error": f"Failed to clear validation cache: {str(e)}"}), 500
@@ -3017,79 +3144,100 @@ def clear_validation_cache():
 # ─── GET /avatars ───────────────────────────────────────────────
 @app.route("/avatars", methods=["GET"])
 def get_avatars():
-    return jsonify({"avatars": load_avatars()})
+    return jsonify({"avatars": [with_preview(av) for av in load_avatars()]})
 
 
-# ─── GET /video-info ────────────────────────────────────────────
-@app.route("/video-info", methods=["GET"])
+# ─── GET /media-preview ─────────────────────────────────────────
+@app.route("/media-preview", methods=["GET"])
+def get_media_preview():
+    """
+    Thumbnail + hover sprite for an avatar or clip file.
+    Returns 202 while the preview is being built; poll again.
+    """
+    media_path = request.args.get("path")
+    if not media_path:
+        return jsonify({"error": "No media path provided"}), 400
+
+    preview = MediaPreviewService.request(media_path)
+    if preview["status"] == "missing":
+        return jsonify({"error": f"Media file not found: {media_path}"}), 404
+    if preview["status"] == "pending":
+        return jsonify(preview), 202
+    return jsonify(preview), 200
+
+
+# ─── GET/POST /video-info ───────────────────────────────────────
+def resolve_media_path(video_path):
+    """Absolute path for a video: as given, or relative to the avatar / clip folders"""
+    if os.path.isabs(video_path):
+        return video_path if os.path.exists(video_path) else None
+    for path in (os.path.join(AVATARS_DIR, video_path), os.path.join(CLIPS_DIR, video_path), video_path):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def video_info_entry(video_path, indexed):
+    """(/video-info payload, HTTP status) for one requested path"""
+    if isinstance(indexed, FileNotFoundError) or indexed is None:
+        return {"error": f"Video file not found: {video_path}"}, 404
+    if isinstance(indexed, ValueError):
+        return {"error": "No video stream found"}, 400
+    if isinstance(indexed, Exception):
+        return {"error": f"Failed to get video info: {str(indexed)}"}, 500
+    return dict(indexed), 200
+
+
+@app.route("/video-info", methods=["GET", "POST"])
 def get_video_info():
-    """Get video dimensions and metadata for a video file"""
-    video_path = request.args.get('path')
-
-    if not video_path:
-        return jsonify({"error": "No video path provided"}), 400
-
-    # Convert relative path to absolute if needed
-    if not os.path.isabs(video_path):
-        # Check common locations
-        possible_paths = [
-            os.path.join(AVATARS_DIR, video_path),
-            os.path.join(CLIPS_DIR, video_path),
-            video_path  # Try as-is
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                video_path = path
-                break
-        else:
-            return jsonify({"error": f"Video file not found: {video_path}"}), 404
-
-    if not os.path.exists(video_path):
-        return jsonify({"error": f"Video file not found: {video_path}"}), 404
-
-    try:
-        # Use ffprobe to get video information
-        import subprocess
-        import json
-
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams',
-            '-select_streams', 'v:0',  # Only video stream
-            video_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            return jsonify({"error": "Failed to read video metadata"}), 500
-
-        probe_data = json.loads(result.stdout)
-
-        if not probe_data.get('streams'):
-            return jsonify({"error": "No video stream found"}), 400
-
-        video_stream = probe_data['streams'][0]
-
-        # Extract key information
-        info = {
-            "width": int(video_stream.get('width', 0)),
-            "height": int(video_stream.get('height', 0)),
-            "duration": float(video_stream.get('duration', 0)),
-            "fps": eval(video_stream.get('r_frame_rate', '0/1')),
-            "codec": video_stream.get('codec_name', 'unknown'),
-            "path": video_path,
-            "aspect_ratio": round(int(video_stream.get('width', 0)) / int(video_stream.get('height', 1)), 3)
-        }
+    """
+    Video dimensions and metadata, served from the media metadata index.
 
-        return jsonify(info)
+    GET ?path=... returns one entry.
+    GET ?path=a&path=b or POST {"paths": [...]} returns
+    {"videos": {path: entry}} where failed entries carry "error" and "status".
+    Responses carry an ETag; GETs with a matching If-None-Match get a 304.
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True)
+        paths = data.get("paths") if isinstance(data, dict) else None
+        if not isinstance(paths, list) or not paths:
+            return jsonify({"error": "paths must be a non-empty list"}), 400
+        if not all(isinstance(path, str) and path for path in paths):
+            return jsonify({"error": "every entry in paths must be a non-empty string"}), 400
+    else:
+        paths = request.args.getlist('path')
+        if not paths or not paths[0]:
+            return jsonify({"error": "No video path provided"}), 400
+
+    resolved = {path: resolve_media_path(path) for path in paths}
+    indexed = MediaMetadataIndex.lookup_many(p for p in resolved.values() if p)
+
+    entries = {}
+    for path, media_path in resolved.items():
+        entry, status = video_info_entry(path, indexed.get(media_path) if media_path else None)
+        if status == 200:
+            entry["path"] = media_path
+        elif request.method == "POST" or len(paths) > 1:
+            entry["status"] = status
+        entries[path] = (entry, status)
+
+    if request.method == "GET" and len(paths) == 1:
+        entry, status = entries[paths[0]]
+        if status != 200:
+            return jsonify(entry), status
+        etag = entry.pop("etag")
+    else:
+        body = {path: entry for path, (entry, _) in entries.items()}
+        etag = hashlib.md5(json.dumps(
+            [[path, entry.pop("etag", entry.get("error"))] for path, entry in body.items()]
+        ).encode()).hexdigest()[:16]
+        entry = {"videos": body}
 
-    except Exception as e:
-        print(f"Error getting video info: {e}")
-        return jsonify({"error": f"Failed to get video info: {str(e)}"}), 500
+    response = jsonify(entry)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"  # Always revalidate; unchanged files answer 304
+    return response.make_conditional(request)
 
 # ─── POST /avatars ──────────────────────────────────────────────
 @app.route("/avatars", methods=["POST"])
@@ -3116,22 +3264,12 @@ def add_avatar():
     avatar_file.save(dest)
     app.logger.info(f"Avatar uploaded - Original: '{avatar_file.filename}' -> Sanitized: '{sanitized_filename}' -> Path: {dest}")
 
-    # Generate thumbnail
-    thumbnail_filename = f"{os.path.splitext(sanitized_filename)[0]}_thumb.jpg"
-    thumbnail_path = AVATARS_DIR / "thumbnails" / thumbnail_filename
-
-    thumbnail_generated = generate_video_thumbnail(dest, thumbnail_path)
-    if thumbnail_generated:
-        app.logger.info(f"Generated thumbnail: {thumbnail_path}")
-    else:
-        app.logger.warning(f"Failed to generate thumbnail for {dest}")
-
     avatar = {
         "id":                  uuid.uuid4().hex,
         "name":                name,
         "gender":              gender,
         "file_path":           str(dest),
-        "thumbnail_path":      str(thumbnail_path) if thumbnail_generated else None,
+        "thumbnail_path":      None,  # Served from the preview cache (with_preview)
         "elevenlabs_voice_id": eleven_id or None,
         "origin_language":     origin_language or None
     }
@@ -3139,7 +3277,8 @@ def add_avatar():
     lst = load_avatars()
     lst.append(avatar)
     save_avatars(lst)
-    return jsonify(avatar), 201
+    # Thumbnail + hover sprite build in the background
+    return jsonify(with_preview(avatar)), 201
 
 # ─── DELETE /avatars/<id> ────────────────────────────────────────
 @app.route("/avatars/<avatar_id>", methods=["DELETE"])
@@ -3189,11 +3328,12 @@ def edit_avatar(avatar_id):
                 dest = AVATARS_DIR / sanitized_filename
                 new_file.save(dest)
                 av["file_path"] = str(dest)
+                av["thumbnail_path"] = None  # Old thumbnail shows the old file
                 app.logger.info(f"Avatar updated - Original: '{new_file.filename}' -> Sanitized: '{sanitized_filename}' -> Path: {dest}")
 
             avatars[i] = av
             save_avatars(avatars)
-            return jsonify(av), 200
+            return jsonify(with_preview(av)), 200
 
     abort(404, description=f"Avatar ID '{avatar_id}' not found")
 
@@ -3374,7 +3514,8 @@ I'm sharing this because I wish someone had told me about [brand name] sooner. C
         if not openai_api_key:
             return jsonify({"error": "OpenAI API key not configured"}), 500
         
-        openai_client = OpenAI(api_key=openai_api_key)
+        from backend.services.api_clients import APIClientRegistry
+        openai_client = APIClientRegistry.get_openai_client(openai_api_key)
         
         # Generate the script
         generated_script = generate_script(
@@ -3451,8 +3592,8 @@ I'm sharing this because I wish someone had told me about [brand name] sooner. C
 # ─── GET /clips ─────────────────────────────────────────────────
 @app.route("/clips", methods=["GET"])
 def get_clips():
-    """Return all product clips as JSON."""
-    return jsonify({"clips": load_clips()})
+    """Return all product clips as JSON (with thumbnail / hover sprite previews)."""
+    return jsonify({"clips": [with_preview(rec) for rec in load_clips()]})
 
 
 # ─── POST /clips ────────────────────────────────────────────────
@@ -3491,7 +3632,7 @@ def add_clip():
     lst.append(record)
     save_clips(lst)
 
-    return jsonify(record), 201
+    return jsonify(with_preview(record)), 201
 
 
 # ─── DELETE /clips/<id> ────────────────────────────────────────
@@ -3569,7 +3710,7 @@ def edit_clip(clip_id):
 
             clips[i] = rec
             save_clips(clips)
-            return jsonify(rec), 200
+            return jsonify(with_preview(rec)), 200
 
     abort(404, description=f"Clip ID '{clip_id}' not found")
 
@@ -4143,9 +4284,9 @@ def test_font_resolution():
 def get_music_library():
     """Get music library tracks and statistics"""
     try:
-        from backend.music_library import MusicLibrary
+        from backend.music_library import get_shared_music_library
         
-        library = MusicLibrary()
+        library = get_shared_music_library()
         stats = library.get_library_stats()
         
         # Get available tracks by category
@@ -4184,7 +4325,7 @@ def get_music_library():
 def upload_music_track():
     """Upload a new music track to the library"""
     try:
-        from backend.music_library import MusicLibrary, MusicCategory, MusicMood
+        from backend.music_library import get_shared_music_library
         
         if 'music_file' not in request.files:
             return jsonify({"error": "No music file provided"}), 400
@@ -4207,7 +4348,7 @@ def upload_music_track():
             music_file.save(temp_file.name)
             
             # Add to library
-            library = MusicLibrary()
+            library = get_shared_music_library()
             track = library.add_track(temp_file.name, metadata)
             
             return jsonify({
@@ -4232,7 +4373,7 @@ def upload_music_track():
 def delete_music_tracks():
     """Delete music tracks from the library"""
     try:
-        from backend.music_library import MusicLibrary
+        from backend.music_library import get_shared_music_library
         
         data = request.get_json()
         if not data:
@@ -4242,7 +4383,7 @@ def delete_music_tracks():
         if not track_ids:
             return jsonify({"error": "No track IDs provided"}), 400
         
-        library = MusicLibrary()
+        library = get_shared_music_library()
         
         # Delete multiple tracks
         if len(track_ids) > 1:
@@ -4421,6 +4562,31 @@ def update_enhancement_settings():
         return jsonify({"error": f"Failed to update settings: {str(e)}"}), 500
 
 
+# ─── Startup report & optional pre-warm ──────────────────────────────────────
+# MASSUGC_PREWARM=all (or e.g. "processors,whisper_timing") loads heavy
+# subsystems in the background once the server is up; default is on first use
+startup_seconds = LazyLoader.mark_ready()
+print(f"[STARTUP] Backend ready in {startup_seconds:.2f}s "
+      f"(heavy subsystems deferred: {', '.join(LazyLoader.SUBSYSTEMS)})")
+PREWARM_SUBSYSTEMS = LazyLoader.parse_prewarm_setting(os.getenv("MASSUGC_PREWARM"))
+if PREWARM_SUBSYSTEMS:
+    LazyLoader.prewarm(PREWARM_SUBSYSTEMS, delay=2.0)
+
+
+def backfill_previews():
+    """Queue thumbnails / hover sprites for library entries that have none yet"""
+    time.sleep(2.0)  # Leave startup to the web server
+    try:
+        paths = [rec.get("file_path") for rec in load_avatars() + load_clips()]
+        queued = MediaPreviewService.backfill(paths)
+        if queued:
+            print(f"[PREVIEW] Backfilling previews for {queued} library files")
+    except Exception as e:
+        print(f"[PREVIEW] Backfill failed: {e}")
+
+threading.Thread(target=backfill_previews, name="preview-backfill", daemon=True).start()
+
+
 # ─── Optional: allow direct `python app.py` for debugging ────────────────────
 if __name__ == "__main__":
     port = int(os.getenv("VIDEO_AGENT_PORT", 2026))
@@ -0,0 +1,239 @@
+"""
+Batch Planner for MassUGC Studio
+Turns one /run-batch request into an interleaved list of runs plus the
+shared prep work (clip normalization, pinned scripts) those runs can reuse.
+"""
+
+import uuid
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.job_scheduler import JobCost
+from backend.render_farm import splice_clip_sources
+from backend.services.clip_preprocessor import ClipPreprocessor
+from backend.services.script_service import ScriptService
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_RUNS = 1000
+
+
+@dataclass
+class BatchRun:
+    """One variant of a campaign in a batch"""
+    run_id: str
+    campaign_id: str
+    variant: int
+    job: Dict[str, Any]
+
+
+@dataclass
+class ClipPrep:
+    """Normalize a Splice source folder once for every run that draws from it"""
+    clips: List[str]
+    canvas_width: int
+    canvas_height: int
+    crop_mode: str
+    audio_mode: str
+    runs: int = 0
+
+    def cost(self) -> JobCost:
+        return JobCost(cpu=2.0, memory_mb=600, disk_mb=400 + 60 * len(self.clips))
+
+    def run(self) -> dict:
+        """Fill ClipCache for the folder; returns ClipPreprocessor stats"""
+        _, stats = ClipPreprocessor.normalize_clips(
+            clips=self.clips,
+            canvas_width=self.canvas_width,
+            canvas_height=self.canvas_height,
+            crop_mode=self.crop_mode,
+            audio_mode=self.audio_mode
+        )
+        return stats
+
+
+@dataclass
+class BatchPlan:
+    batch_id: str
+    runs: List[BatchRun] = field(default_factory=list)
+    clip_preps: List[ClipPrep] = field(default_factory=list)
+    shared_scripts: List[str] = field(default_factory=list)  # Campaign IDs whose variants share one script
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'runs': len(self.runs),
+            'campaigns': len({run.campaign_id for run in self.runs}),
+            'clip_preps': [
+                {'clips': len(prep.clips), 'runs': prep.runs, 'canvas': f"{prep.canvas_width}x{prep.canvas_height}",
+                 'audio_mode': prep.audio_mode}
+                for prep in self.clip_preps
+            ],
+            'shared_scripts': self.shared_scripts
+        }
+
+
+def parse_batch_request(data: Dict[str, Any]) -> List[Tuple[str, int, bool]]:
+    """
+    Read a /run-batch body into (campaign_id, count, share_script) entries.
+
+    Accepts {"campaign_id": "...", "count": 100} or
+    {"campaigns": ["id", {"campaign_id": "id", "count": 3, "share_script": true}]}.
+    A top-level "share_script" is the default for every entry.
+
+    Raises:
+        ValueError: On malformed entries or batches over MAX_BATCH_RUNS
+    """
+    default_share = bool(data.get('share_script', False))
+    raw_entries = data.get('campaigns')
+    if raw_entries is None:
+        raw_entries = [{'campaign_id': data.get('campaign_id'), 'count': data.get('count', 1)}]
+    if not isinstance(raw_entries, list) or not raw_entries:
+        raise ValueError("campaigns must be a non-empty list")
+
+    entries = []
+    for raw in raw_entries:
+        if isinstance(raw, str):
+            raw = {'campaign_id': raw}
+        if not isinstance(raw, dict) or not raw.get('campaign_id') or raw['campaign_id'] == 'undefined':
+            raise ValueError("every entry needs a campaign_id")
+        try:
+            count = int(raw.get('count', 1))
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid count for campaign {raw['campaign_id']}")
+        if count < 1:
+            raise ValueError(f"count must be at least 1 for campaign {raw['campaign_id']}")
+        entries.append((raw['campaign_id'], count, bool(raw.get('share_script', default_share))))
+
+    total = sum(count for _, count, _ in entries)
+    if total > MAX_BATCH_RUNS:
+        raise ValueError(f"batch of {total} runs exceeds the limit of {MAX_BATCH_RUNS}")
+    return entries
+
+
+def interleave(groups: "OrderedDict[str, List[BatchRun]]") -> List[BatchRun]:
+    """Round-robin across campaigns so every campaign's first results arrive early"""
+    queues = [list(runs) for runs in groups.values()]
+    ordered = []
+    while any(queues):
+        for runs in queues:
+            if runs:
+                ordered.append(runs.pop(0))
+    return ordered
+
+
+def uses_generated_script(job: Dict[str, Any]) -> bool:
+    """True when each run of the job would ask OpenAI for a fresh script"""
+    splice = job.get('random_video_settings')
+    if splice and not splice.get('use_voiceover', True):
+        return False
+    if job.get('massugc_settings'):
+        return False
+    return not job.get('useExactScript', False)
+
+
+def plan_batch(entries: List[Tuple[str, int, bool]], jobs_by_id: Dict[str, Dict[str, Any]]) -> BatchPlan:
+    """
+    Plan a validated batch.
+
+    - Runs are interleaved across campaigns.
+    - Splice runs drawing from the same folder with the same canvas share a
+      ClipPrep when together they'd pick at least as many clips as the folder
+      holds; smaller batches normalize on demand as before.
+    - Entries with share_script pin one generated script for all their
+      variants (exact-script campaigns already share their voiceover
+      through TTSCache).
+    """
+    plan = BatchPlan(batch_id=str(uuid.uuid4()))
+    groups: "OrderedDict[str, List[BatchRun]]" = OrderedDict()
+    preps: Dict[tuple, ClipPrep] = {}
+    picks: Dict[tuple, int] = {}
+
+    for campaign_id, count, share_script in entries:
+        job = jobs_by_id[campaign_id]
+        runs = groups.setdefault(campaign_id, [])
+        for _ in range(count):
+            runs.append(BatchRun(run_id=str(uuid.uuid4()), campaign_id=campaign_id,
+                                 variant=len(runs) + 1, job=dict(job)))
+
+        if share_script and uses_generated_script(job) and campaign_id not in plan.shared_scripts:
+            plan.shared_scripts.append(campaign_id)
+
+        sources = splice_clip_sources(job)
+        if sources and sources[0]:
+            clips, canvas_width, canvas_height, crop_mode, audio_mode = sources
+            key = (tuple(clips), canvas_width, canvas_height, crop_mode, audio_mode)
+            prep = preps.setdefault(key, ClipPrep(list(clips), canvas_width, canvas_height, crop_mode, audio_mode))
+            prep.runs += count
+            total_clips = int(job['random_video_settings'].get('total_clips') or len(clips))
+            picks[key] = picks.get(key, 0) + count * min(total_clips, len(clips))
+
+    plan.runs = interleave(groups)
+    plan.clip_preps = [prep for key, prep in preps.items() if prep.runs > 1 and picks[key] >= len(prep.clips)]
+    return plan
+
+
+def pin_shared_script(plan: BatchPlan, campaign_id: str, api_key: str) -> Optional[str]:
+    """
+    Generate one script for all variants of a campaign and switch them to it.
+
+    The script text travels in each run's job (example_script_content), so
+    whichever node executes a run needs no shared file, and example_script_file
+    still names the campaign's script for failure tracking.
+
+    Returns:
+        None on success, or the error message (variants then keep
+        generating their own scripts)
+    """
+    runs = [run for run in plan.runs if run.campaign_id == campaign_id]
+    job = runs[0].job
+    success, example_script = ScriptService.read_script_file(job.get('example_script_file'))
+    if not success:
+        return example_script
+
+    success, script = ScriptService.generate_script(
+        api_key=api_key,
+        product=job.get('product', ''),
+        persona=job.get('persona', ''),
+        setting=job.get('setting', ''),
+        emotion=job.get('emotion', ''),
+        hook_guidance=job.get('hook', ''),
+        example_script=example_script,
+        language=job.get('language', 'English'),
+        enhance_for_elevenlabs=job.get('enhance_for_elevenlabs', False),
+        brand_name=job.get('brand_name', '')
+    )
+    if not success:
+        return script
+
+    for run in runs:
+        run.job.update(useExactScript=True, example_script_content=script)
+    logger.info(f"[BATCH] Pinned one script for {len(runs)} runs of {campaign_id}")
+    return None
+
+
+def run_prep(plan: BatchPlan, submit: Callable[[str, Callable[[], Any], JobCost], Any],
+             api_key: Optional[str]) -> Dict[str, Any]:
+    """
+    Run a plan's shared prep: clip folders through the scheduler (submit),
+    scripts inline while the clips normalize. Returns a report for events.
+    """
+    futures = [
+        submit(f"{plan.batch_id}-clips-{index}", prep.run, prep.cost())
+        for index, prep in enumerate(plan.clip_preps)
+    ]
+
+    report: Dict[str, Any] = {'clip_preps': [], 'shared_scripts': {}}
+    for campaign_id in plan.shared_scripts:
+        error = pin_shared_script(plan, campaign_id, api_key) if api_key else "OpenAI API key not configured"
+        report['shared_scripts'][campaign_id] = error or "pinned"
+
+    for future in futures:
+        try:
+            report['clip_preps'].append(future.result())
+        except Exception as e:
+            # Runs still normalize their own clips
+            logger.warning(f"[BATCH] Clip prep failed: {e}")
+            report['clip_preps'].append({'error': str(e)})
+    return report
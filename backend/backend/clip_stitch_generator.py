@@ -11,6 +11,11 @@ from mutagen import File as MutagenFile
 from backend.merge_audio_video import merge_video_and_audio
 from backend.services.clip_preprocessor import ClipPreprocessor
 from backend.services.clip_analyzer import ClipAnalyzer
+from backend.services.clip_pool import ClipPool
+from backend.services.music_cache import MusicAssetCache
+from backend.services.tts_service import PendingVoiceover
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.timeline import AudioTrack, ClipSegment, Timeline, snap_outpoint
 
 # ─── Global Working Directory Setup ────────────────────────────────
 HOME_DIR       = Path.home() / ".zyra-video-agent"
@@ -67,7 +72,7 @@ def trim_media(input_path: str, output_path: str, duration: float) -> None:
     print(f"<TRIM> DEBUG: FFmpeg command: {' '.join(cmd)}")
     
     try:
-        subprocess.run(cmd, check=True)
+        FFmpegRunner.run(cmd, check=True)
         print(f"<TRIM> DEBUG: FFmpeg trim successful")
         print(f"<TRIM> DEBUG: Output file exists: {os.path.exists(output_path)}")
         if os.path.exists(output_path):
@@ -142,7 +147,7 @@ def normalize_video_timing(input_path: str, output_path: str) -> None:
     audio_duration = 0.0
     
     try:
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10)
+        probe_result = FFmpegRunner.run(probe_cmd, capture_output=True, text=True, timeout=10)
         stderr_lines = probe_result.stderr.split('\n')
         
         # Extract key metadata
@@ -198,7 +203,7 @@ def normalize_video_timing(input_path: str, output_path: str) -> None:
     start_time = time.time()
     
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        result = FFmpegRunner.run(cmd, check=True, capture_output=True, text=True)
         
         encode_time = time.time() - start_time
         
@@ -265,7 +270,8 @@ def concatenate_to_duration(
 ) -> None:
     """
     1) Optionally prepend `hook_video` (exactly once).
-    2) Pick up to `count` unique clips from `source_directory` at random.
+    2) Pick up to `count` unique clips from `source_directory` at random, weighted
+       toward clips the folder's ClipPool hasn't handed out lately.
     3) If their total duration < target_duration, pick extra clips (with repeats)
        until total_duration ≥ target_duration.
     4) Concatenate all selected clips with ffmpeg’s concat-filter, re-encoding to H.264/AAC.
@@ -274,9 +280,9 @@ def concatenate_to_duration(
     if not src_dir.is_dir():
         raise FileNotFoundError(f"Source directory not found: {source_directory}")
 
-    # 1) Build base pool of all candidate clips
-    pool = [p for p in src_dir.iterdir() if p.is_file() and p.suffix.lower() in extensions]
-    if not pool and not hook_video:
+    # 1) Shared pool of candidate clips (listing and durations are cached)
+    pool = ClipPool.for_directory(source_directory, extensions)
+    if not len(pool) and not hook_video:
         raise RuntimeError(f"No video clips found in {source_directory}")
 
     selected: list[Path] = []
@@ -284,9 +290,10 @@ def concatenate_to_duration(
 
     # Helper to probe duration
     def _dur(p: Path) -> float:
-        return get_media_duration(str(p))
+        return pool.duration(str(p), get_media_duration)
 
     # 2) If there's a hook, use it first (once)
+    exclude = []
     if hook_video:
         hook_path = Path(hook_video)
         if not hook_path.is_file():
@@ -294,29 +301,20 @@ def concatenate_to_duration(
         selected.append(hook_path.resolve())
         total_dur += _dur(hook_path)
         # exclude it from the unique pool
-        pool = [p for p in pool if p.resolve() != hook_path.resolve()]
+        exclude.append(str(hook_path))
 
     # 3) Pick up to `count` unique clips
-    unique_pool = pool.copy()
-    random.shuffle(unique_pool)
-    if count and count > 0:
-        to_take = min(count, len(unique_pool))
-    else:
-        to_take = len(unique_pool)
-    for clip in unique_pool[:to_take]:
-        selected.append(clip)
+    for clip in pool.pick(count, exclude=exclude):
+        selected.append(Path(clip))
         total_dur += _dur(clip)
 
     # 4) If still too short, pick arbitrarily (with repeats) until we meet or exceed target
-    if total_dur < target_duration:
-        # allow repeats: choose from the original pool
-        repeat_choices = pool.copy()
-        if not repeat_choices:
+    while total_dur < target_duration:
+        clip = pool.sample(exclude=exclude)
+        if clip is None:
             raise RuntimeError("No clips available to repeat for extension.")
-        while total_dur < target_duration:
-            clip = random.choice(repeat_choices)
-            selected.append(clip)
-            total_dur += _dur(clip)
+        selected.append(Path(clip))
+        total_dur += _dur(clip)
 
     print(f"<STITCH> Randomized video to duration: {total_dur} with {len(selected)} clips.")
     # –––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––
@@ -372,7 +370,7 @@ def concatenate_to_duration(
     print("\n=== Running FFmpeg concat‐filter command ===")
     print(" ".join(cmd))
     try:
-        subprocess.run(cmd, check=True)
+        FFmpegRunner.run(cmd, check=True)
     except subprocess.CalledProcessError as e:
         raise RuntimeError(
             f"FFmpeg concat‐filter failed (exit code {e.returncode}). Check the source videos.\n"
@@ -447,7 +445,7 @@ def concatenate_clips_smart(
         ]
         
         print(f"\n⚡ Concatenating with stream copy + CFR (ultra-fast)...")
-        subprocess.run(cmd, check=True, capture_output=True)
+        FFmpegRunner.run(cmd, check=True, capture_output=True)
         
         # DISABLED: Normalization was cutting video duration (VideoToolbox issue)
         # Instead, just copy the concat output directly
@@ -469,139 +467,103 @@ def concatenate_clips_smart(
             os.remove(filelist_path)
 
 
-def concatenate_clips_with_duration_control(
+def prepare_clip_segments(
     clips_with_durations: List[dict],
-    output_path: str,
     canvas_width: int,
     canvas_height: int,
     crop_mode: str,
     original_volume: float = 1.0
-) -> None:
+) -> List[ClipSegment]:
     """
-    Professional concatenation with per-clip duration control and audio-aware processing.
-    
-    Handles clips that need duration trimming while maintaining performance
-    through GPU acceleration and caching. Audio handling is based on original_volume:
-    - original_volume = 0: Strip all clip audio (voiceover-only mode)
-    - original_volume > 0: Preserve/add audio for mixing with voiceover
+    Normalize a clip selection to the canvas and turn it into timeline segments.
     
     Args:
         clips_with_durations: List of clip info dicts with path, durations, trim flags
-        output_path: Final output path
         canvas_width: Target canvas width
         canvas_height: Target canvas height
         crop_mode: Cropping mode
         original_volume: Volume level for original clip audio (0=strip, >0=keep)
+        
+    Returns:
+        One ClipSegment per clip info, in order
     """
-    # Step 1: Normalize to canvas and trim clips as needed
-    processed_clips = []
     clips_needing_trim = sum(1 for c in clips_with_durations if c['needs_trim'])
     
     print(f"[STITCH] processing clips={len(clips_with_durations)} needs_trim={clips_needing_trim} canvas={canvas_width}x{canvas_height} method=duration_control")
     
-    for i, clip_info in enumerate(clips_with_durations):
-        clip_path = clip_info['path']
-        use_duration = clip_info['use_duration']
-        needs_trim = clip_info['needs_trim']
-        
-        # Determine audio mode based on original_volume setting
-        # If original_volume is 0, user wants voiceover-only (strip clip audio)
-        # Otherwise, preserve/add audio for mixing with voiceover
-        audio_mode = 'strip' if original_volume == 0 else 'keep'
-        
-        # First, normalize to canvas (uses GPU + caching + audio-aware processing)
-        normalized_clips, stats = ClipPreprocessor.normalize_clips(
-            clips=[clip_path],
-            canvas_width=canvas_width,
-            canvas_height=canvas_height,
-            crop_mode=crop_mode,
-            audio_mode=audio_mode
-        )
-        
-        normalized_clip = normalized_clips[0]
-        
-        # Then trim if needed
-        if needs_trim:
-            trimmed_clip = str(WORKING_DIR / f"trimmed_{uuid.uuid4().hex[:8]}.mp4")
-            
-            # Use stream copy trim (fast)
-            ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-            cmd = [
-                ffmpeg_exe, '-y',
-                '-i', normalized_clip,
-                '-t', str(use_duration),
-                '-c', 'copy',  # Stream copy - no re-encoding
-                trimmed_clip
-            ]
-            
-            try:
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-                
-                # Verify trimmed clip is valid
-                if os.path.exists(trimmed_clip) and os.path.getsize(trimmed_clip) > 1000:
-                    processed_clips.append(trimmed_clip)
-                else:
-                    processed_clips.append(normalized_clip)
-                    
-            except subprocess.CalledProcessError as e:
-                processed_clips.append(normalized_clip)
-        else:
-            processed_clips.append(normalized_clip)
+    # Determine audio mode based on original_volume setting
+    # If original_volume is 0, user wants voiceover-only (strip clip audio)
+    # Otherwise, preserve/add audio for mixing with voiceover
+    audio_mode = 'strip' if original_volume == 0 else 'keep'
     
-    # Step 2: Concatenate processed clips (still uses concat demuxer)
-    filelist_path = str(WORKING_DIR / f"filelist_{uuid.uuid4().hex[:8]}.txt")
+    # One batch for the whole selection (uses GPU + caching + audio-aware processing):
+    # repeated picks are normalized once, misses are encoded concurrently
+    normalized_clips, stats = ClipPreprocessor.normalize_clips(
+        clips=[clip_info['path'] for clip_info in clips_with_durations],
+        canvas_width=canvas_width,
+        canvas_height=canvas_height,
+        crop_mode=crop_mode,
+        audio_mode=audio_mode
+    )
     
+    # Trims always keep the head of the clip, so the inpoint is the first
+    # keyframe and only the outpoint is needed (no trimmed copy on disk)
+    return [
+        ClipSegment(normalized_clip, snap_outpoint(clip_info['use_duration']) if clip_info['needs_trim'] else None)
+        for clip_info, normalized_clip in zip(clips_with_durations, normalized_clips)
+    ]
+
+
+def plan_clip_use(
+    clip_path: str,
+    clip_duration_mode: str = 'full',
+    clip_duration_fixed: Optional[float] = None,
+    clip_duration_range: Optional[tuple[float, float]] = None,
+    full_duration: Optional[float] = None
+) -> dict:
+    """
+    Decide how much of a clip to use based on the per-clip duration mode.
+    
+    Args:
+        full_duration: Known clip duration (probed from the file if None)
+    
+    Returns:
+        Clip info dict with path, full/use durations and trim flag
+    """
+    clip_full_duration = full_duration if full_duration is not None else get_media_duration(clip_path)
+    
+    # Calculate how much of this clip to use
+    if clip_duration_mode == 'fixed' and clip_duration_fixed:
+        clip_use_duration = min(clip_duration_fixed, clip_full_duration)
+    elif clip_duration_mode == 'random' and clip_duration_range:
+        min_dur, max_dur = clip_duration_range
+        max_possible = min(max_dur, clip_full_duration)
+        clip_use_duration = random.uniform(min_dur, max_possible)
+    else:  # 'full'
+        clip_use_duration = clip_full_duration
+    
+    return {
+        'path': clip_path,
+        'full_duration': clip_full_duration,
+        'use_duration': clip_use_duration,
+        'needs_trim': clip_use_duration < clip_full_duration - 0.1
+    }
+
+
+def build_music_bed(music_path: str, volume_db: float, duration: float, loop: bool) -> AudioTrack:
+    """
+    Music track for a timeline, from the pre-mixed rendition cache when possible.
+    
+    Cached renditions are already looped to cover the duration (the
+    timeline's -t trims them) and carry the gain, so mixing them is a cheap
+    read; falls back to the source file.
+    """
     try:
-        with open(filelist_path, 'w') as f:
-            for clip in processed_clips:
-                safe_path = str(clip).replace("'", "'\\''")
-                f.write(f"file '{safe_path}'\n")
-        
-        # Concat to temp file first (preserves speed of stream copy)
-        temp_concat = str(WORKING_DIR / f"temp_concat_{uuid.uuid4().hex[:8]}.mp4")
-        
-        ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-        cmd = [
-            ffmpeg_exe, '-y',
-            '-fflags', '+genpts',  # Generate PTS metadata
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', filelist_path,
-            '-c:v', 'copy',        # Stream copy video (fast)
-            '-c:a', 'copy',        # Stream copy audio (fast)
-            '-fps_mode', 'cfr',    # Force constant frame rate
-            '-r', '30',            # Lock output to 30 FPS
-            '-movflags', '+faststart',
-            temp_concat
-        ]
-        
-        subprocess.run(cmd, check=True, capture_output=True)
-        
-        # DISABLED: Normalization was cutting video duration (VideoToolbox issue)
-        # Instead, just copy the concat output directly
-        import shutil
-        shutil.copy2(temp_concat, output_path)
-        
-        # Cleanup temp concat file
-        try:
-            os.remove(temp_concat)
-        except:
-            pass
-        
-        print(f"[CONCAT] complete method=duration_control clips={len(processed_clips)}")
-        
-    finally:
-        # Cleanup temp files
-        if os.path.exists(filelist_path):
-            os.remove(filelist_path)
-        
-        for clip in processed_clips:
-            # Only cleanup trimmed temp files (not the cached normalized ones)
-            if 'trimmed_' in str(clip):
-                try:
-                    os.remove(clip)
-                except:
-                    pass
+        variant = MusicAssetCache.get_variant(music_path, duration=duration, volume_db=volume_db, loop=loop)
+        return AudioTrack(variant)
+    except Exception as e:
+        print(f"   ⚠️ Music rendition cache unavailable, mixing from source: {e}")
+        return AudioTrack(music_path, gain=10 ** (volume_db / 20), loop=loop)
 
 
 def build_clip_stitch_video_smart(
@@ -613,6 +575,7 @@ def build_clip_stitch_video_smart(
     crop_mode: str = 'center',
     target_duration: Optional[float] = None,
     tts_audio_path: Optional[str] = None,
+    pending_voiceover: Optional[PendingVoiceover] = None,
     random_count: Optional[int] = None,
     hook_video: Optional[str] = None,
     original_volume: float = 1.0,
@@ -620,6 +583,10 @@ def build_clip_stitch_video_smart(
     clip_duration_mode: str = 'full',
     clip_duration_fixed: Optional[float] = None,
     clip_duration_range: Optional[tuple[float, float]] = None,
+    music_path: Optional[str] = None,
+    music_volume_db: float = -25.0,
+    extend_music: bool = False,
+    debug_level: Optional[str] = None,
     extensions: tuple[str, ...] = (".mp4", ".mov", ".mkv", ".avi", ".hevc", ".m4v", ".webm")
 ) -> Tuple[bool, Optional[str]]:
     """
@@ -630,6 +597,7 @@ def build_clip_stitch_video_smart(
     - GPU acceleration for encoding
     - Concat demuxer (stream copy, no re-encoding)
     - Caching (instant on repeat runs)
+    - One timeline render: concat, audio mix and length in a single FFmpeg pass
     
     Args:
         random_source_dir: Directory containing source clips
@@ -639,19 +607,27 @@ def build_clip_stitch_video_smart(
         crop_mode: How to fit clips to canvas
         target_duration: Target video duration (if no audio)
         tts_audio_path: Optional voiceover audio (determines duration if provided)
+        pending_voiceover: Voiceover still being synthesized (TTSService.start_audio).
+            Clips are selected and normalized against its duration estimate while
+            the audio finishes; used when tts_audio_path is not given.
         random_count: Max number of clips to use
         hook_video: Optional clip to place first
         original_volume: Original audio volume (if has audio)
         new_audio_volume: Voiceover volume (if provided)
+        music_path: Optional background music, mixed in the same pass
+        music_volume_db: Music gain in dB
+        extend_music: Loop the music to the full video length (music/manual duration)
+        debug_level: Pipeline debug level for this run ('off', 'summary', 'verbose';
+            default MASSUGC_PIPELINE_DEBUG)
         extensions: Supported file extensions
         
     Returns:
         Tuple of (success, output_path_or_error_message)
     """
-    from backend.services.pipeline_debugger import PipelineDebugger, probe_file_details
+    from backend.services.pipeline_debugger import PipelineDebugger
     
-    # Initialize master debugger
-    debugger = PipelineDebugger(f"Video: {Path(output_path).name}")
+    # Initialize master debugger (file probes only run at verbose level)
+    debugger = PipelineDebugger(f"Video: {Path(output_path).name}", level=debug_level)
     tmp_files = []
     
     try:
@@ -679,6 +655,10 @@ def build_clip_stitch_video_smart(
             audio_dur = get_media_duration(tts_audio_path)
             print(f"   Duration: {audio_dur}s (from voiceover)")
             target_dur = audio_dur
+        elif pending_voiceover:
+            # Voiceover still rendering - plan against the estimate, settle up after concat
+            target_dur = pending_voiceover.estimated_duration
+            print(f"   Duration: ~{target_dur:.1f}s (estimated, voiceover still rendering)")
         else:
             return False, "Must provide either tts_audio_path or target_duration"
         
@@ -687,57 +667,49 @@ def build_clip_stitch_video_smart(
         if not src_dir.is_dir():
             return False, f"Source directory not found: {random_source_dir}"
         
-        pool = [p for p in src_dir.iterdir() if p.is_file() and p.suffix.lower() in extensions]
-        if not pool and not hook_video:
+        pool = ClipPool.for_directory(random_source_dir, extensions)
+        if not len(pool) and not hook_video:
             return False, f"No video clips found in {random_source_dir}"
         
         selected: List[Path] = []
         total_dur = 0.0
+        exclude = []
         
         # Add hook video first if provided
         if hook_video:
             hook_path = Path(hook_video)
             if hook_path.is_file():
                 selected.append(hook_path)
-                total_dur += get_media_duration(str(hook_path))
-                pool = [p for p in pool if p.resolve() != hook_path.resolve()]
+                total_dur += pool.duration(str(hook_path), get_media_duration)
+                exclude.append(str(hook_path))
         
-        # Pick clips to reach target duration (REVERTED TO WORKING VERSION)
-        clips_with_durations = []
+        # Pick clips to reach target duration: distinct clips, weighted toward
+        # the ones the pool handed out least lately (spreads a batch evenly)
         total_estimated_dur = 0.0
-        random.shuffle(pool)
-        
-        if not pool:
-            return False, "No clips available in source directory"
+        picks = pool.picks(exclude=exclude)
+        
+        def plan_next_clips(target: float) -> list:
+            nonlocal total_estimated_dur
+            planned = []
+            if total_estimated_dur >= target:
+                return planned
+            for clip in picks:
+                clip_info = plan_clip_use(clip, clip_duration_mode, clip_duration_fixed, clip_duration_range,
+                                          full_duration=pool.duration(clip, get_media_duration))
+                planned.append(clip_info)
+                total_estimated_dur += clip_info['use_duration']
+                
+                # Stop if we've reached target duration
+                if total_estimated_dur >= target:
+                    break
+            return planned
         
         print(f"   Available clips: {len(pool)}")
         
-        # Use each clip once, in random order
-        for clip in pool:
-            clip_full_duration = get_media_duration(str(clip))
-            
-            # Calculate how much of this clip to use
-            if clip_duration_mode == 'fixed' and clip_duration_fixed:
-                clip_use_duration = min(clip_duration_fixed, clip_full_duration)
-            elif clip_duration_mode == 'random' and clip_duration_range:
-                min_dur, max_dur = clip_duration_range
-                max_possible = min(max_dur, clip_full_duration)
-                clip_use_duration = random.uniform(min_dur, max_possible)
-            else:  # 'full'
-                clip_use_duration = clip_full_duration
-            
-            clips_with_durations.append({
-                'path': str(clip),
-                'full_duration': clip_full_duration,
-                'use_duration': clip_use_duration,
-                'needs_trim': clip_use_duration < clip_full_duration - 0.1
-            })
-            
-            total_estimated_dur += clip_use_duration
-            
-            # Stop if we've reached target duration
-            if total_estimated_dur >= target_dur:
-                break
+        # Use each clip at most once
+        clips_with_durations = plan_next_clips(target_dur)
+        if not clips_with_durations:
+            return False, "No clips available in source directory"
         
         print(f"   Selected {len(clips_with_durations)} clips")
         print(f"   Clip duration mode: {clip_duration_mode}")
@@ -753,92 +725,84 @@ def build_clip_stitch_video_smart(
         })
         
         for i, clip_info in enumerate(clips_with_durations, 1):
-            clip_details = probe_file_details(clip_info['path'])
-            debugger.log(f"Clip {i}: {Path(clip_info['path']).name}", {
-                'Full Duration': f"{clip_info['full_duration']:.2f}s",
-                'Will Use': f"{clip_info['use_duration']:.2f}s",
-                'Needs Trim': clip_info['needs_trim'],
-                'Size': f"{clip_details.get('size_mb', 0):.1f}MB",
-                'Resolution': clip_details.get('resolution', '?'),
-                'Streams': clip_details.get('streams', '?')
-            })
-        
-        # Step 2: Smart concatenation with per-clip duration control
-        tmp_video = str(WORKING_DIR / f"temp_stitched_{uuid.uuid4().hex[:8]}.mp4")
-        tmp_files.append(tmp_video)
+            debugger.log_probe(
+                f"Clip {i}: {Path(clip_info['path']).name}", clip_info['path'],
+                full_duration=f"{clip_info['full_duration']:.2f}s",
+                will_use=f"{clip_info['use_duration']:.2f}s",
+                needs_trim=clip_info['needs_trim']
+            )
         
-        debugger.start_stage("CONCATENATION", {
-            'Method': 'Duration control with trimming',
-            'Output': Path(tmp_video).name,
+        # Step 2: Normalize the selection (the voiceover may still be rendering)
+        debugger.start_stage("CLIP PREP", {
             'Canvas': f'{canvas_width}x{canvas_height}',
             'Audio Mode': 'strip' if original_volume == 0 else 'keep'
         })
         
-        concatenate_clips_with_duration_control(
+        segments = prepare_clip_segments(
             clips_with_durations,
-            tmp_video,
             canvas_width,
             canvas_height,
             crop_mode,
             original_volume
         )
         
-        # Log concat result
-        concat_details = probe_file_details(tmp_video)
-        debugger.log("Concat Complete", concat_details)
-        
-        # Step 3: Handle audio
-        if tts_audio_path:
-            print("<STITCH> Merging with voiceover audio...")
-            
-            voiceover_details = probe_file_details(tts_audio_path)
-            debugger.start_stage("AUDIO MERGE", {
-                'Voiceover File': Path(tts_audio_path).name,
-                'Voiceover Duration': f"{voiceover_details.get('duration', 0):.2f}s",
-                'Original Volume': original_volume,
-                'Voiceover Volume': new_audio_volume,
-                'Tool': 'merge_video_and_audio()'
-            })
-            
-            tmp_merged = str(WORKING_DIR / f"temp_merged_{uuid.uuid4().hex[:8]}.mp4")
-            tmp_files.append(tmp_merged)
+        # Settle up with a voiceover that was rendering during clip prep
+        if pending_voiceover and not tts_audio_path:
+            audio_ok, audio_error = pending_voiceover.wait()
+            if not audio_ok:
+                return False, audio_error
+            tts_audio_path = pending_voiceover.output_path
             
-            merge_video_and_audio(
-                video_input=tmp_video,
-                audio_input=tts_audio_path,
-                output_path=tmp_merged,
-                original_volume=original_volume,
-                new_audio_volume=new_audio_volume
-            )
-            
-            merged_details = probe_file_details(tmp_merged)
-            debugger.log("Audio Merge Complete", merged_details)
-            
-            # Trim to target duration (respects music/manual duration settings)
-            final_dur = get_media_duration(tmp_merged)
-            if final_dur > target_dur:
-                debugger.log(f"Trimming to target duration: {target_dur:.2f}s (was {final_dur:.2f}s)")
-                tmp_trimmed = str(WORKING_DIR / f"temp_trimmed_{uuid.uuid4().hex[:8]}.mp4")
-                tmp_files.append(tmp_trimmed)
-                trim_media(tmp_merged, tmp_trimmed, target_dur)
-                os.replace(tmp_trimmed, tmp_merged)
+            if not target_duration:
+                target_dur = get_media_duration(tts_audio_path)
+                debugger.log(f"Voiceover ready: {target_dur:.2f}s (estimated {pending_voiceover.estimated_duration:.2f}s)")
                 
-                trimmed_details = probe_file_details(tmp_merged)
-                debugger.log("Trimmed to target duration", trimmed_details)
-            
-            os.replace(tmp_merged, output_path)
-        else:
-            # No audio, just use the stitched video
-            debugger.log("No voiceover audio - using stitched video directly")
-            os.replace(tmp_video, output_path)
+                # Estimate came up short: add unused clips to the timeline
+                if total_estimated_dur < target_dur:
+                    added = plan_next_clips(target_dur)
+                    if added:
+                        print(f"   Voiceover longer than estimated, adding {len(added)} clips")
+                        clips_with_durations.extend(added)
+                        segments += prepare_clip_segments(added, canvas_width, canvas_height, crop_mode, original_volume)
+        
+        # Step 3: Render the timeline - concat, voiceover/music mix and length in one pass
+        music_bed = None
+        if music_path:
+            music_bed = build_music_bed(music_path, music_volume_db, target_dur, loop=extend_music)
+        
+        timeline = Timeline(
+            clips=segments,
+            duration=target_dur,
+            # Without a voiceover the clip audio was never volume-adjusted
+            clip_audio_gain=0.0 if original_volume == 0 else (original_volume if tts_audio_path else 1.0),
+            voiceover=AudioTrack(tts_audio_path, gain=new_audio_volume) if tts_audio_path else None,
+            music=music_bed,
+            audio_bitrate="192k" if music_bed else "128k"
+        )
+        timeline.resolve_clip_audio()
+        
+        tmp_video = str(WORKING_DIR / f"temp_stitched_{uuid.uuid4().hex[:8]}.mp4")
+        tmp_files.append(tmp_video)
+        
+        debugger.start_stage("TIMELINE RENDER", {
+            'Clips': len(segments),
+            'Duration': f'{target_dur:.2f}s',
+            'Voiceover': Path(tts_audio_path).name if tts_audio_path else 'None',
+            'Music': Path(music_path).name if music_path else 'None',
+            'Mix': ', '.join(f"{label}@{gain:.3g}" for label, gain in timeline.mix_levels()) or 'silent',
+            'Output': Path(tmp_video).name
+        })
+        
+        timeline.render(tmp_video, WORKING_DIR)
+        debugger.log_probe("Render Complete", tmp_video)
+        os.replace(tmp_video, output_path)
         
         # Log final output
         debugger.start_stage("FINAL OUTPUT", {
             'File': Path(output_path).name,
             'Location': str(output_path)
         })
-        final_details = probe_file_details(output_path)
-        debugger.log("Final Video", final_details)
+        debugger.log_probe("Final Video", output_path)
         
         print(f"✅ Clip stitch video complete: {output_path}")
         
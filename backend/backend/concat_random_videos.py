@@ -5,12 +5,13 @@
 # forcing FFmpeg to re-encode so that concatenation works regardless of differing codecs/containers.
 #
 
-import random
 import subprocess
 from pathlib import Path
 
 import imageio_ffmpeg
 
+from backend.services.clip_pool import ClipPool
+
 
 def concatenate_videos_randomly(
         source_directory: str,
@@ -22,7 +23,7 @@ def concatenate_videos_randomly(
     """
     1. Scans `source_directory` for all files ending in one of `extensions`.
     2. If `hook_video` is provided, that clip is forced to be the very first in the output.
-    3. Randomizes the order of the remaining clips.
+    3. Randomizes the order of the remaining clips (ClipPool, weighted toward clips not used lately).
     4. Picks the first `count-1` of them (if `count` is given and >0). If `count` is None or <= 0, uses all.
     5. Uses FFmpeg’s concat filter (via -filter_complex) to re-encode and concatenate into `output_path`.
 
@@ -51,12 +52,10 @@ def concatenate_videos_randomly(
         raise FileNotFoundError(f"Source folder not found or not a directory: {source_directory}")
 
     # –––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––
-    # 1) Gather all video files in `source_directory` matching `extensions`
-    all_videos = [
-        f for f in src_dir.iterdir()
-        if f.is_file() and f.suffix.lower() in extensions
-    ]
-    if not all_videos:
+    # 1) Shared pool of video files in `source_directory` matching `extensions`
+    #    (re-listed only when the folder changes)
+    pool = ClipPool.for_directory(source_directory, extensions)
+    if not len(pool):
         raise RuntimeError(f"No video files with extensions {extensions} found in {source_directory}")
 
     # –––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––
@@ -67,41 +66,24 @@ def concatenate_videos_randomly(
         if not hook_path.exists() or not hook_path.is_file():
             raise FileNotFoundError(f"Hook video not found or not a file: {hook_video}")
 
-        # Remove any duplicate of hook from the "all_videos" list (by absolute path)
-        # so that we don't include it twice.
-        all_videos = [
-            v for v in all_videos
-            if v.resolve() != hook_path
-        ]
-
-    # –––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––
-    # 3) Shuffle the “remaining” list of clips
-    random.shuffle(all_videos)
-
     # –––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––
-    # 4) Select how many clips we actually want to concatenate
+    # 3) + 4) Draw the clips in random order, weighted toward the ones the pool
+    # handed out least lately, never including the hook twice.
     # If hook_video is used and count>0, then we pick (count - 1) from the remaining.
+    exclude = [str(hook_path)] if hook_path else []
     if count and count > 0:
-        if hook_path:
-            # total target = count. We already have hook as first. So pick up to count-1 from shuffled “all_videos”
-            desired_random = count - 1
-            if desired_random <= 0:
-                # They requested count=1 → only hook, no random picks.
-                selected_random = []
-            else:
-                selected_random = all_videos[:min(desired_random, len(all_videos))]
-        else:
-            # Pure random selection of `count` from “all_videos”
-            selected_random = all_videos[:min(count, len(all_videos))]
+        desired_random = count - 1 if hook_path else count
+        # count=1 with a hook → only hook, no random picks.
+        selected_random = pool.pick(desired_random, exclude=exclude) if desired_random > 0 else []
     else:
         # count is None or <=0 → take all (in random order)
-        selected_random = all_videos
+        selected_random = pool.pick(exclude=exclude)
 
     # Build the final list in order: [hook_video (if any)] + selected_random
     final_clips: list[Path] = []
     if hook_path:
         final_clips.append(hook_path)
-    final_clips.extend(selected_random)
+    final_clips.extend(Path(clip) for clip in selected_random)
 
     if not final_clips:
         raise RuntimeError("After applying hook and count logic, no clips remain to concatenate.")
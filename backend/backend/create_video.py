@@ -11,6 +11,8 @@ import re # For parsing ffmpeg output
 import shutil # For copying files
 import random
 import json
+import queue
+import threading
 from datetime import timedelta, datetime # Import datetime
 
 import whisper
@@ -18,7 +20,6 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from elevenlabs.client import ElevenLabs
 from elevenlabs import save
-from google.cloud import storage
 import traceback # For detailed error logging
 import math # For ceiling function later
 from typing import Callable, Optional, Tuple
@@ -28,6 +29,12 @@ from pathlib import Path
 
 from backend.randomizer import randomize_video
 from backend.clip_stitch_generator import build_clip_stitch_video
+from backend.services.api_clients import APIClientRegistry
+from backend.services.tts_cache import TTSCache
+from backend.services.gcs_transfer import GCSTransferService
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.tracing import Tracer
+from backend.whisper_service import warmup_timing_kernels
 
 # ─── Global Working Directory Setup ────────────────────────────────
 HOME_DIR       = Path.home() / ".zyra-video-agent"
@@ -69,19 +76,22 @@ MAX_POLLING_ATTEMPTS = 180  # 20 * 180 = 3600s (1 hour total)
 # Silence removal config
 SILENCE_THRESHOLD_DB = "-35dB"
 SILENCE_MIN_DURATION_S = "0.4"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 # --- Overlay Defaults (Temporary fallback if no config file is used) ---
 DEFAULT_OVERLAY_POSITIONS = [{"x": "10", "y": "10", "w": "-1", "h": "-1"}]
 
 # --- Helper Functions (Copied from User's v1.16) ---
 
-def run_ffmpeg_command(cmd):
-    """Runs an FFmpeg command using subprocess and returns (success, error_message)."""
+def run_ffmpeg_command(cmd, label=None):
+    """Runs an FFmpeg command via FFmpegRunner and returns (success, error_message)."""
     try:
-        subprocess.run(cmd, check=True)
+        FFmpegRunner.run(cmd, label=label or "run_ffmpeg_command", check=True)
         return True, None
     except subprocess.CalledProcessError as e:
         return False, str(e)
+    except subprocess.TimeoutExpired as e:
+        return False, f"FFmpeg timed out after {e.timeout:.0f}s"
 
 def generate_script(client: OpenAI, product: str, persona: str, setting: str, emotion: str, hook_guidance: str, example_script: str, language: str, enhance_for_elevenlabs: bool, brand_name: str) -> str | None:
     """Generates script via OpenAI based on refined prompt structure and length request. Returns script text or None."""
@@ -184,16 +194,17 @@ def generate_script(client: OpenAI, product: str, persona: str, setting: str, em
     print("-------------------------------\n")
 
     try:
-        response = client.chat.completions.create(
-            # ... rest of API call parameters (model, messages, temperature) ...
-            # Make sure messages uses the new system_prompt and user_prompt variables
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7 # Keep temperature for now, can tweak later if needed
-        )
+        with APIClientRegistry.provider_slot('openai'):
+            response = client.chat.completions.create(
+                # ... rest of API call parameters (model, messages, temperature) ...
+                # Make sure messages uses the new system_prompt and user_prompt variables
+                model=OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.7 # Keep temperature for now, can tweak later if needed
+            )
         script_content = response.choices[0].message.content.strip()
 
         # --- IMPORTANT: SSML needs careful cleanup ---
@@ -277,19 +288,29 @@ def generate_audio(client: ElevenLabs, script_text: str, voice_id: str, output_p
             print("Error: Cannot generate audio from empty script.")
             return False
         
-        # Use the new ElevenLabs API structure
-        audio_bytes = client.text_to_speech.convert(
-            text=script_text,
-            voice_id=voice_id,
-            model_id=model,
-            output_format="mp3_44100_128"
-        )
+        def synthesize(target_path: str):
+            # Use the new ElevenLabs API structure
+            audio_bytes = client.text_to_speech.convert(
+                text=script_text,
+                voice_id=voice_id,
+                model_id=model,
+                output_format="mp3_44100_128"
+            )
+            
+            # Save the audio bytes to file
+            with open(target_path, 'wb') as f:
+                for chunk in audio_bytes:
+                    if isinstance(chunk, bytes):
+                        f.write(chunk)
         
-        # Save the audio bytes to file
-        with open(output_path, 'wb') as f:
-            for chunk in audio_bytes:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        # Content-addressed cache: identical script/voice/model skips ElevenLabs.
+        # Misses go through bounded concurrency + jittered retry.
+        _, cache_hit = TTSCache.get_or_generate(
+            script_text, voice_id, model, "mp3_44100_128", output_path,
+            lambda target_path: APIClientRegistry.call_with_retry('elevenlabs', lambda: synthesize(target_path))
+        )
+        if cache_hit:
+            print("Reusing cached voiceover (identical script, voice and model)")
         
         # Verify file creation and size
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -308,44 +329,12 @@ def generate_audio(client: ElevenLabs, script_text: str, voice_id: str, output_p
 
 
 def upload_to_gcs(bucket_name: str, source_file_name: str, destination_blob_name: str) -> bool:
-    """Uploads a file to the GCS bucket."""
-    if not os.path.exists(source_file_name):
-        print(f"Error: Source file for GCS upload not found: {source_file_name}"); return False
-    if os.path.getsize(source_file_name) == 0:
-        print(f"Error: Source file for GCS upload is empty: {source_file_name}"); return False
-    print(f"Uploading {source_file_name} to gs://{bucket_name}/{destination_blob_name}...")
-    try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(destination_blob_name)
-        # Consider adding a timeout? Default might be long.
-        blob.upload_from_filename(source_file_name, timeout=600)
-        print("File uploaded successfully.")
-        return True
-    except Exception as e:
-        print(f"Error uploading to GCS: {e}")
-        traceback.print_exc() # Add traceback
-        return False
+    """Uploads a file to the GCS bucket (chunked, composite for large files)."""
+    return GCSTransferService.upload_file(bucket_name, source_file_name, destination_blob_name)
 
-def generate_signed_url(bucket_name: str, blob_name: str, expiration_minutes: int = 20) -> str | None:
-    """Generates a v4 signed URL for downloading a blob."""
-    print(f"Generating signed URL for gs://{bucket_name}/{blob_name}...")
-    try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        url_expiration = timedelta(minutes=expiration_minutes)
-        # Ensure the blob actually exists before generating URL? Optional, but safer.
-        # if not blob.exists():
-        #     print(f"Error: Blob {blob_name} does not exist in bucket {bucket_name}.")
-        #     return None
-        url = blob.generate_signed_url(version="v4", expiration=url_expiration, method="GET")
-        print(f"Signed URL generated (valid for {url_expiration.total_seconds() / 60.0} mins).")
-        return url
-    except Exception as e:
-        print(f"Error generating signed URL: {e}")
-        traceback.print_exc() # Add traceback
-        return None
+def generate_signed_url(bucket_name: str, blob_name: str, expiration_minutes: int | None = None) -> str | None:
+    """Generates a v4 signed URL for downloading a blob, reusing one that is still valid."""
+    return GCSTransferService.get_signed_url(bucket_name, blob_name, expiration_minutes)
 
 def submit_dreamface_job(api_key: str, video_url: str, audio_url: str) -> str | None:
     """Submits job to DreamFace /talking_face endpoint. Returns taskId or None."""
@@ -362,7 +351,9 @@ def submit_dreamface_job(api_key: str, video_url: str, audio_url: str) -> str |
     print(f"DEBUG: Request headers: {headers}")
     
     try:
-        response = requests.post(DREAMFACE_SUBMIT_URL, headers=headers, json=payload, timeout=30) # Standard 30s timeout
+        session = APIClientRegistry.get_http_session('dreamface', api_key, idempotent=False)  # Paid submit: no resend on 5xx
+        with APIClientRegistry.provider_slot('dreamface'):
+            response = session.post(DREAMFACE_SUBMIT_URL, headers=headers, json=payload, timeout=30) # Standard 30s timeout
         print(f"DEBUG: Response status code: {response.status_code}")
         print(f"DEBUG: Response headers: {dict(response.headers)}")
         
@@ -397,12 +388,14 @@ def poll_dreamface_job(api_key: str, task_id: str) -> str | None:
     print(f"Polling DreamFace job status for Task ID: {task_id}...")
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     payload = {"taskId": task_id}
+    session = APIClientRegistry.get_http_session('dreamface', api_key)  # Keep-alive across polls
     attempts = 0
     while attempts < MAX_POLLING_ATTEMPTS:
         attempts += 1
         print(f"Polling attempt {attempts}/{MAX_POLLING_ATTEMPTS}...")
         try:
-            response = requests.post(DREAMFACE_POLL_URL, headers=headers, json=payload, timeout=30) # Poll timeout
+            with APIClientRegistry.provider_slot('dreamface'):
+                response = session.post(DREAMFACE_POLL_URL, headers=headers, json=payload, timeout=30) # Poll timeout
             print(f"DEBUG: Poll response status: {response.status_code}")
             response.raise_for_status()
             result = response.json()
@@ -471,8 +464,12 @@ def poll_dreamface_job(api_key: str, task_id: str) -> str | None:
     print(f"Total polling time: {MAX_POLLING_ATTEMPTS * POLLING_INTERVAL_SECONDS} seconds")
     return None
 
-def download_video(video_url: str, local_filename: str) -> bool:
-    """Downloads a video from a URL to a local file."""
+def download_video(video_url: str, local_filename: str, on_chunk: Optional[Callable[[bytes], None]] = None) -> bool:
+    """Downloads a video from a URL to a local file.
+
+    on_chunk, if given, receives every chunk as it is written (e.g.
+    StreamingSilenceDetector.feed) so analysis overlaps the download.
+    """
     print(f"Downloading final video from {video_url} to {local_filename}...")
     try:
         # Use stream=True and iterate content to handle potentially large files
@@ -481,8 +478,10 @@ def download_video(video_url: str, local_filename: str) -> bool:
             # Ensure directory exists before opening file
             os.makedirs(os.path.dirname(local_filename) or '.', exist_ok=True)
             with open(local_filename, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     f.write(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
         # Verify download
         if os.path.exists(local_filename) and os.path.getsize(local_filename) > 0:
             print("Video downloaded successfully.")
@@ -509,26 +508,101 @@ def download_video(video_url: str, local_filename: str) -> bool:
         return False
 
 def delete_from_gcs(bucket_name: str, blob_name: str):
-    """Deletes a blob from the GCS bucket."""
-    print(f"Deleting temporary file gs://{bucket_name}/{blob_name} from GCS...")
-    try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        # Check if blob exists before attempting delete to avoid unnecessary warnings on cleanup
-        if blob.exists():
-            blob.delete()
-            print(f"Temporary file gs://{bucket_name}/{blob_name} deleted successfully.")
-        else:
-             print(f"Temporary file gs://{bucket_name}/{blob_name} not found, skipping delete.")
-    except Exception as e:
-        # Log as warning, cleanup failure shouldn't stop the whole process usually
-        print(f"Warning: Failed to delete temporary file {blob_name} from GCS: {e}")
-        # Optionally add traceback here if needed for debugging GCS issues
-        # traceback.print_exc()
+    """Queues a blob for deletion; deletes are sent in batches in the background."""
+    print(f"Scheduling deletion of temporary file gs://{bucket_name}/{blob_name}")
+    GCSTransferService.schedule_delete(bucket_name, blob_name)
+
+class StreamingSilenceDetector:
+    """Runs ffmpeg silencedetect on a video's bytes while they are being downloaded.
+
+    Chunks passed to feed() are piped into an audio-only ffmpeg pass on a
+    background thread, so the silence intervals are ready when the download
+    finishes instead of needing a second full read of the file.
+    """
+
+    QUEUE_CHUNKS = 512  # Backpressure bound (~32MB at DOWNLOAD_CHUNK_SIZE)
+
+    def __init__(self):
+        self.failed = False
+        self._stderr_parts = []
+        self._queue = queue.Queue(maxsize=self.QUEUE_CHUNKS)
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-i', 'pipe:0', '-vn',
+            '-af', f'silencedetect=noise={SILENCE_THRESHOLD_DB}:d={SILENCE_MIN_DURATION_S}',
+            '-f', 'null', '-'
+        ]
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self._writer = threading.Thread(target=self._write_stdin, daemon=True)
+        self._reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._writer.start()
+        self._reader.start()
+
+    def feed(self, chunk: bytes):
+        """Queue downloaded bytes for analysis (blocks only if ffmpeg falls far behind)."""
+        if not self.failed:
+            self._queue.put(chunk)
+
+    def finish(self, timeout: float = 120) -> Optional[str]:
+        """Close the stream and wait for ffmpeg.
+
+        Returns:
+            silencedetect stderr output, or None if streaming analysis failed
+            (e.g. an MP4 whose index is at the end can't be read from a pipe)
+        """
+        self._queue.put(None)
+        self._writer.join(timeout)
+        try:
+            returncode = self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            return None
+        self._reader.join(timeout)
+
+        stderr_output = b''.join(self._stderr_parts).decode('utf-8', errors='ignore')
+        if self.failed or returncode != 0 or "Duration:" not in stderr_output:
+            print(f"DEBUG: Streaming silence analysis unavailable (exit {returncode}), will analyze the file instead.")
+            return None
+        return stderr_output
 
-def remove_silence_from_video(input_path: str, output_path: str) -> bool:
-    """Removes silence from video using ffmpeg silencedetect and applies audio fades."""
+    def abort(self):
+        """Stop analysis (download failed or was abandoned)."""
+        self.failed = True
+        try:
+            self._process.kill()
+        except OSError:
+            pass
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _write_stdin(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self.failed:
+                continue  # Keep draining so feed() never blocks
+            try:
+                self._process.stdin.write(chunk)
+            except (BrokenPipeError, OSError):
+                self.failed = True
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _read_stderr(self):
+        for line in iter(self._process.stderr.readline, b''):
+            self._stderr_parts.append(line)
+
+
+def remove_silence_from_video(input_path: str, output_path: str, silencedetect_output: Optional[str] = None) -> bool:
+    """Removes silence from video using ffmpeg silencedetect and applies audio fades.
+
+    silencedetect_output: stderr from a silencedetect pass that already ran
+    (StreamingSilenceDetector during download); skips re-reading the file.
+    """
     # This is a complex function. Adding detailed comments or breaking it down further
     # might improve maintainability, but using the user's provided code directly for now.
     print(f"\n--- DEBUG: Starting Silence Removal ---")
@@ -546,28 +620,34 @@ def remove_silence_from_video(input_path: str, output_path: str) -> bool:
         print("ERROR: ffmpeg not found. Please install ffmpeg or add it to your PATH.")
         return False
 
-    silence_detect_cmd = [
-        ffmpeg_exe, '-nostdin', '-i', input_path,
-        '-af', f'silencedetect=noise={SILENCE_THRESHOLD_DB}:d={SILENCE_MIN_DURATION_S}',
-        '-f', 'null', '-'
-    ]
-    print(f"DEBUG: Running silencedetect command: {' '.join(silence_detect_cmd)}")
-    try:
-        # Increased timeout for silence detection, might take longer on some videos
-        process = subprocess.run(silence_detect_cmd, capture_output=True, text=True, check=False, encoding='utf-8', errors='ignore', timeout=600)  # 10 minutes
-        print("DEBUG: silencedetect command finished.")
-    except subprocess.TimeoutExpired:
-        print(f"DEBUG: Error - FFmpeg silencedetect command timed out for {input_path}")
-        return False
-    except FileNotFoundError:
-        print("DEBUG: Error - ffmpeg command not found. Make sure FFmpeg is installed and in your system's PATH.")
-        return False
-    except Exception as e:
-        print(f"DEBUG: Error running ffmpeg silencedetect: {e}")
-        traceback.print_exc()
-        return False
-
-    stderr_output = process.stderr
+    if silencedetect_output is not None:
+        print("DEBUG: Using silence intervals detected during download.")
+        stderr_output = silencedetect_output
+        returncode = 0
+    else:
+        # Audio-only pass (-vn): video frames are never decoded
+        silence_detect_cmd = [
+            ffmpeg_exe, '-nostdin', '-i', input_path, '-vn',
+            '-af', f'silencedetect=noise={SILENCE_THRESHOLD_DB}:d={SILENCE_MIN_DURATION_S}',
+            '-f', 'null', '-'
+        ]
+        print(f"DEBUG: Running silencedetect command: {' '.join(silence_detect_cmd)}")
+        try:
+            # Increased timeout for silence detection, might take longer on some videos
+            process = FFmpegRunner.run(silence_detect_cmd, capture_output=True, text=True, check=False, encoding='utf-8', errors='ignore')
+            print("DEBUG: silencedetect command finished.")
+        except subprocess.TimeoutExpired:
+            print(f"DEBUG: Error - FFmpeg silencedetect command timed out for {input_path}")
+            return False
+        except FileNotFoundError:
+            print("DEBUG: Error - ffmpeg command not found. Make sure FFmpeg is installed and in your system's PATH.")
+            return False
+        except Exception as e:
+            print(f"DEBUG: Error running ffmpeg silencedetect: {e}")
+            traceback.print_exc()
+            return False
+        stderr_output = process.stderr
+        returncode = process.returncode
     # print("\n----- DEBUG: FFmpeg silencedetect stderr START -----\n") # Reduce noise
     # print(stderr_output)
     # print("\n----- DEBUG: FFmpeg silencedetect stderr END -----\n")
@@ -586,7 +666,7 @@ def remove_silence_from_video(input_path: str, output_path: str) -> bool:
     print(f"DEBUG: Detected silence ends: {silence_ends}")
 
     if not silence_starts or not silence_ends:
-        if "error" in stderr_output.lower() or "invalid" in stderr_output.lower() or process.returncode != 0:
+        if "error" in stderr_output.lower() or "invalid" in stderr_output.lower() or returncode != 0:
             print("DEBUG: Error detected in FFmpeg silencedetect output. Cannot proceed.")
             print(f"FFmpeg stderr:\n{stderr_output}")
             return False
@@ -779,7 +859,7 @@ def remove_silence_from_video(input_path: str, output_path: str) -> bool:
 
     try:
         # Increased timeout for final encoding
-        process = subprocess.run(final_cmd, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore', timeout=calculate_ffmpeg_timeout(1800, "final_encoding"))  # Dynamic timeout
+        process = FFmpegRunner.run(final_cmd, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')  # Timeout scales with the video duration
         print("DEBUG: Final ffmpeg command finished successfully.")
         if process.stderr: # Log warnings/info even on success
              print("--- FFmpeg Info/Warnings ---")
@@ -958,6 +1038,7 @@ def get_product_mention_times(audio_path: str, trigger_keywords: list[str], lang
                 print(f"[{job_name}] Whisper model loaded.")
 
             print(f"[{job_name}] Transcribing audio file: {audio_path} with word timestamps...")
+            warmup_timing_kernels()
             language_code = {"english": "en", "spanish": "es"}.get(language.lower(), "en")
             result = whisper_model.transcribe(audio_path, word_timestamps=True, fp16=False, language=language_code)
             transcription_cache[audio_path] = result
@@ -1103,13 +1184,12 @@ def overlay_product_video(
     print(f"[{job_name}] Running FFmpeg overlay command (Alpha Attempt 2.3)...")
     # print(f"DEBUG CMD: {' '.join(ffmpeg_cmd)}")
 
-    # --- Execute using Popen + communicate (Keep this robust method) ---
-    # ... (Execution code remains the same as previous attempt) ...
+    # --- Execute via FFmpegRunner (progress + duration-scaled timeout) ---
     process = None
     stderr_output = ""
     try:
-        process = subprocess.Popen(ffmpeg_cmd, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, encoding='utf-8', errors='ignore')
-        stderr_output, _ = process.communicate(timeout=calculate_ffmpeg_timeout(1800, "overlay_processing"))  # Dynamic timeout - was 30 minutes
+        process = FFmpegRunner.run(ffmpeg_cmd, label="product_overlay", capture_output=True, text=True, encoding='utf-8', errors='ignore')
+        stderr_output = process.stderr
 
         if process.returncode == 0:
             print(f"[{job_name}] FFmpeg overlay process (Alpha Attempt 2.3) completed successfully.")
@@ -1124,11 +1204,9 @@ def overlay_product_video(
             # ...(Same error logging)...
             print(f"--- FFmpeg stderr ---\n{stderr_output if stderr_output else 'N/A'}\n---------------------")
             return False
-    except subprocess.TimeoutExpired:
-        print(f"ERROR [{job_name}]: FFmpeg overlay command timed out after 600 seconds.")
-        # ...(Same timeout handling)...
-        if process: process.kill()
-        if stderr_output: print(f"--- FFmpeg stderr before timeout ---\n{stderr_output}\n---------------------")
+    except subprocess.TimeoutExpired as e:
+        print(f"ERROR [{job_name}]: FFmpeg overlay command timed out after {e.timeout:.0f} seconds.")
+        if e.stderr: print(f"--- FFmpeg stderr before timeout ---\n{e.stderr}\n---------------------")
         return False
     except FileNotFoundError:
         print(f"ERROR [{job_name}]: ffmpeg command not found. Ensure FFmpeg is installed and in PATH.")
@@ -1137,7 +1215,6 @@ def overlay_product_video(
         print(f"ERROR [{job_name}]: An unexpected error occurred during FFmpeg overlay execution: {e}")
         # ...(Same exception handling)...
         traceback.print_exc()
-        if process and process.poll() is None: process.kill()
         return False
 
 
@@ -1199,6 +1276,7 @@ def create_video_job(
     print(f"\n--- Starting Job: {job_name} [{datetime.now().isoformat()}] ---")
     job_start_time = time.time()
     # Step 1: Initialization
+    Tracer.stage("initialization", step="1")
     if progress_callback:
         progress_callback(step, total_steps, steps[step])
         step += 1
@@ -1224,7 +1302,7 @@ def create_video_job(
     if not use_exact_script:
         # Only initialize OpenAI client if we're generating scripts
         try:
-            openai_client = OpenAI(api_key=openai_api_key)
+            openai_client = APIClientRegistry.get_openai_client(openai_api_key)
             print(f"[{job_name}] OpenAI client initialized.")
         except Exception as e:
             print(f"ERROR [{job_name}] initializing OpenAI client: {e}")
@@ -1234,7 +1312,7 @@ def create_video_job(
     else:
         print(f"[{job_name}] Exact script mode - skipping OpenAI client initialization")
     try:
-        elevenlabs_client = ElevenLabs(api_key=elevenlabs_api_key)
+        elevenlabs_client = APIClientRegistry.get_elevenlabs_client(elevenlabs_api_key)
         print(f"[{job_name}] ElevenLabs client initialized.")
     except Exception as e:
         print(f"ERROR [{job_name}] Failed initializing ElevenLabs client: {e}")
@@ -1253,7 +1331,7 @@ def create_video_job(
     raw_downloaded_video_path = str(WORKING_DIR / f"temp_video_raw_{timestamp_uuid}.mp4")
     # Define GCS names early for use in finally block, even if upload fails
     gcs_audio_blob_name = f"audio_uploads/{timestamp_uuid}_audio.mp3"
-    gcs_video_blob_name = f"video_uploads/{timestamp_uuid}_avatar.mp4"
+    gcs_video_blob_name = None  # Content-addressed, set by the upload step
 
     # --- Sanitize Names for Filename/Paths ---
     sanitized_product_name = re.sub(r'[^\w\-]+', '_', product).strip('_')
@@ -1364,6 +1442,7 @@ def create_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 2: Generate Script ---")
+        Tracer.stage("generate_script", step="2")
         
         if use_exact_script:
             # Use exact script content instead of generating with AI
@@ -1392,6 +1471,7 @@ def create_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 3: Generate Audio ---")
+        Tracer.stage("generate_audio", step="3")
         audio_success = generate_audio(
             elevenlabs_client, generated_script, elevenlabs_voice_id, temp_audio_filename
         )
@@ -1406,12 +1486,14 @@ def create_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 4: Upload & Get URLs ---")
-        audio_upload_success = upload_to_gcs(gcs_bucket_name, temp_audio_filename, gcs_audio_blob_name)
-        # Only upload avatar video if audio succeeded (save API call if not needed)
-        video_upload_success = False
-        if audio_upload_success:
-            video_upload_success = upload_to_gcs(gcs_bucket_name, avatar_video_path, gcs_video_blob_name)
-        if not (audio_upload_success and video_upload_success): # Cleanup in finally
+        Tracer.stage("upload_get_urls", step="4")
+        # Audio and avatar upload concurrently; the avatar is content-addressed so a
+        # reused avatar is uploaded once and kept for later jobs (not deleted in finally)
+        uploaded_audio_blob, gcs_video_blob_name = GCSTransferService.upload_many(gcs_bucket_name, [
+            (temp_audio_filename, gcs_audio_blob_name),
+            (avatar_video_path, None),
+        ])
+        if not (uploaded_audio_blob and gcs_video_blob_name): # Cleanup in finally
             print(f"ERROR [{job_name}]: GCS upload failed.")
             last_error_message = "GCS upload failed"
             return False, last_error_message
@@ -1434,6 +1516,7 @@ def create_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 5: DreamFace Lip-Sync ---")
+        Tracer.stage("dreamface_lip_sync", step="5")
         task_id = submit_dreamface_job(dreamface_api_key, video_signed_url, audio_signed_url)
         if not task_id:         # Cleanup in finally
             print(f"ERROR [{job_name}]: DreamFace job submission failed.")
@@ -1453,7 +1536,18 @@ def create_video_job(
                 step += 2
         # Ensure download path exists
         os.makedirs(os.path.dirname(raw_downloaded_video_path) or '.', exist_ok=True)
-        download_success = download_video(final_video_url, raw_downloaded_video_path)
+        # Silence detection runs on the bytes as they arrive instead of re-reading the file afterwards
+        silence_detector = StreamingSilenceDetector() if remove_silence else None
+        download_success = download_video(
+            final_video_url, raw_downloaded_video_path,
+            on_chunk=silence_detector.feed if silence_detector else None
+        )
+        silencedetect_output = None
+        if silence_detector:
+            if download_success:
+                silencedetect_output = silence_detector.finish()
+            else:
+                silence_detector.abort()
         if not download_success or not os.path.exists(raw_downloaded_video_path) or os.path.getsize(raw_downloaded_video_path) == 0:
             print(f"ERROR [{job_name}]: Failed to download, verify, or got empty file from DreamFace: {raw_downloaded_video_path}.")
             last_error_message = f"Failed to download, verify, or got empty file from DreamFace: {raw_downloaded_video_path}"
@@ -1463,6 +1557,7 @@ def create_video_job(
 
 
         print(f"\n--- [{job_name}] Step 6: Finalize Base Video (Silence Removal / Rename) ---")
+        Tracer.stage("finalize_base_video", step="6")
         current_video_path = raw_downloaded_video_path # Start with the downloaded path
         intended_final_path = None # Path *before* overlay
 
@@ -1474,7 +1569,7 @@ def create_video_job(
             print(f"[{job_name}] Attempting silence removal from {current_video_path} to {edited_video_path}...")
             # Ensure output dir for edited video exists
             os.makedirs(os.path.dirname(edited_video_path) or '.', exist_ok=True)
-            edit_success = remove_silence_from_video(current_video_path, edited_video_path)
+            edit_success = remove_silence_from_video(current_video_path, edited_video_path, silencedetect_output=silencedetect_output)
             if edit_success and os.path.exists(edited_video_path) and os.path.getsize(edited_video_path) > 0 :
                 print(f"[{job_name}] Silence removal successful. Using edited video.")
                 intended_final_path = edited_video_path
@@ -1530,6 +1625,7 @@ def create_video_job(
 
         # --- Step 7: Randomization (Optional) --- << NEW STEP POSITION
         print(f"\n--- [{job_name}] Step 7: Randomization (Optional) ---")
+        Tracer.stage("randomization", step="7")
         progress_callback(step, total_steps, steps[step])
         if use_randomization:
             step += 1
@@ -1632,6 +1728,7 @@ def create_video_job(
 
         # --- Step 8: Product Overlay (Optional) ---
         print(f"\n--- [{job_name}] Step 8: Product Overlay (Optional) ---")
+        Tracer.stage("product_overlay", step="8")
         progress_callback(step, total_steps, steps[step])
         if use_overlay:
             step += 1
@@ -1903,6 +2000,7 @@ def create_video_job(
             # step += 1
         # --- Step 9: Enhanced Video Processing (TikTok-Style Enhancements) ---
         print(f"\n--- [{job_name}] Step 9: Enhanced Video Processing (TikTok-Style Enhancements) ---")
+        Tracer.stage("enhanced_video_processing", step="9")
         step_start_time = time.time()
         
         # Check if enhanced processing is requested
@@ -1912,7 +2010,7 @@ def create_video_job(
                 from backend.enhanced_video_processor import EnhancedVideoProcessor, TextOverlayConfig, CaptionConfig, MusicConfig
                 from backend.enhanced_video_processor import TextPosition, CaptionStyle
                 from backend.whisper_service import WhisperService, WhisperConfig
-                from backend.music_library import MusicLibrary, MusicSelectionConfig, MusicCategory
+                from backend.music_library import get_shared_music_library, MusicSelectionConfig, MusicCategory
                 
                 print(f"[{job_name}] Applying enhanced video processing...")
                 processor = EnhancedVideoProcessor()
@@ -2123,8 +2221,8 @@ def create_video_job(
                 if enhanced_settings.get('music', {}).get('enabled'):
                     music = enhanced_settings['music']
                     
-                    # Initialize music library
-                    music_library = MusicLibrary()
+                    # Shared music library (loaded once per process)
+                    music_library = get_shared_music_library()
                     
                     # Select track
                     track_id = music.get('track_id')
@@ -2196,7 +2294,7 @@ def create_video_job(
                         print(f"[{job_name}] Source video: {final_output_path}")
                         print(f"[{job_name}] Target audio: {extracted_audio_path}")
                         
-                        extract_result = subprocess.run(extract_cmd, capture_output=True, text=True)
+                        extract_result = FFmpegRunner.run(extract_cmd, capture_output=True, text=True)
                         
                         if extract_result.returncode == 0:
                             # Verify file was created and has content
@@ -2268,6 +2366,7 @@ def create_video_job(
         print(f"[{job_name}] Step 9 completed in {current_step_time:.2f}s")
 
         print(f"\n--- [{job_name}] Step 10: Upload to Google Drive ---")
+        Tracer.stage("upload_to_google_drive", step="10")
         print(f"[{job_name}] (Placeholder) Upload Final Video ({final_output_path}) to Drive.")
 
         job_duration = time.time() - job_start_time
@@ -2296,14 +2395,12 @@ def create_video_job(
              except OSError as e: print(f"Warning [{job_name}]: Failed cleanup {raw_downloaded_video_path}: {e}")
         # Note: Using original TTS audio directly - no temp extraction files to clean up
 
-        # Always attempt to delete GCS files (if names were generated)
-        # Check if variables exist before trying to use them in cleanup
+        # Always attempt to delete the per-job GCS audio (if the name was generated).
+        # The avatar blob is content-addressed and reused across jobs; GCSTransferService
+        # removes it once idle.
         gcs_audio_blob_to_delete = locals().get('gcs_audio_blob_name')
-        gcs_video_blob_to_delete = locals().get('gcs_video_blob_name')
         if gcs_audio_blob_to_delete:
             delete_from_gcs(gcs_bucket_name, gcs_audio_blob_to_delete)
-        if gcs_video_blob_to_delete:
-            delete_from_gcs(gcs_bucket_name, gcs_video_blob_to_delete)
         print(f"--- [{job_name}] Cleanup Complete ---")
 
 
@@ -2373,6 +2470,7 @@ def create_randomized_video_job(
     job_start_time = time.time()
     
     # Step 1: Initialization
+    Tracer.stage("initialization", step="1")
     if progress_callback:
         progress_callback(step, total_steps, steps[step])
         step += 1
@@ -2401,7 +2499,7 @@ def create_randomized_video_job(
     if not use_exact_script:
         # Only initialize OpenAI client if we're generating scripts
         try:
-            openai_client = OpenAI(api_key=openai_api_key)
+            openai_client = APIClientRegistry.get_openai_client(openai_api_key)
             print(f"[{job_name}] OpenAI client initialized.")
         except Exception as e:
             print(f"ERROR [{job_name}] initializing OpenAI client: {e}")
@@ -2412,7 +2510,7 @@ def create_randomized_video_job(
         print(f"[{job_name}] Exact script mode - skipping OpenAI client initialization")
         
     try:
-        elevenlabs_client = ElevenLabs(api_key=elevenlabs_api_key)
+        elevenlabs_client = APIClientRegistry.get_elevenlabs_client(elevenlabs_api_key)
         print(f"[{job_name}] ElevenLabs client initialized.")
     except Exception as e:
         print(f"ERROR [{job_name}] Failed initializing ElevenLabs client: {e}")
@@ -2456,6 +2554,7 @@ def create_randomized_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 2: Generate Script ---")
+        Tracer.stage("generate_script", step="2")
         
         if use_exact_script:
             # Use exact script content instead of generating with AI
@@ -2487,6 +2586,7 @@ def create_randomized_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 3: Generate Audio ---")
+        Tracer.stage("generate_audio", step="3")
         audio_success = generate_audio(
             elevenlabs_client, generated_script, elevenlabs_voice_id, temp_audio_filename
         )
@@ -2502,6 +2602,7 @@ def create_randomized_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 4: Build Randomized Video ---")
+        Tracer.stage("build_randomized_video", step="4")
         
         stitch_success, stitch_result = build_clip_stitch_video(
             random_source_dir=random_source_dir,
@@ -2526,6 +2627,7 @@ def create_randomized_video_job(
         
         # Step 5: Randomization (Optional) - EXACT SAME AS AVATAR CAMPAIGNS
         print(f"\n--- [{job_name}] Step 5: Randomization (Optional) ---")
+        Tracer.stage("randomization", step="5")
         if progress_callback:
             progress_callback(step, total_steps, steps[step])
             step += 1
@@ -2600,6 +2702,7 @@ def create_randomized_video_job(
         
         # --- Step 6: Product Overlay (Optional) ---
         print(f"\n--- [{job_name}] Step 6: Product Overlay (Optional) ---")
+        Tracer.stage("product_overlay", step="6")
         if progress_callback:
             progress_callback(step, total_steps, steps[step])
             if use_overlay:
@@ -2854,6 +2957,7 @@ def create_randomized_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 7: Remove Silence ---")
+        Tracer.stage("remove_silence", step="7")
         
         current_video_path = final_output_path
         if remove_silence:
@@ -2891,6 +2995,7 @@ def create_randomized_video_job(
             progress_callback(step, total_steps, steps[step])
             step += 1
         print(f"\n--- [{job_name}] Step 8: Finalizing ---")
+        Tracer.stage("finalizing", step="8")
         
         if not os.path.exists(final_output_path) or os.path.getsize(final_output_path) == 0:
             print(f"ERROR [{job_name}]: Final output file missing or empty: {final_output_path}")
@@ -0,0 +1,217 @@
+"""
+Google Drive Upload Queue for MassUGC Studio
+Uploads finished videos in a bounded background pool so render slots are
+freed as soon as the MP4 is finalized.
+"""
+
+import os
+import json
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class DriveUploadQueue:
+    """Background queue of Google Drive uploads
+
+    - Uploads run on their own small thread pool, separate from job workers.
+    - Pending uploads and their resumable session URIs are persisted, so an
+      upload interrupted by a restart continues where Drive left off.
+    - Progress is reported through the emit callback as 'drive_upload'
+      events (the same event stream jobs use).
+    """
+
+    MAX_WORKERS = 2
+    STATE_FILE = Path.home() / ".zyra-video-agent" / "drive-uploads.json"
+
+    def __init__(self, drive_service, emit: Callable[[str, dict], None],
+                 max_workers: Optional[int] = None, state_file: Optional[Path] = None):
+        """Initialize upload queue
+
+        Args:
+            drive_service: GoogleDriveService used for uploads
+            emit: Event callback, called as emit(run_id, payload)
+            max_workers: Concurrent uploads (defaults to MAX_WORKERS)
+            state_file: Where pending uploads are persisted
+        """
+        self.drive_service = drive_service
+        self.emit = emit
+        self.state_file = Path(state_file or self.STATE_FILE)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.MAX_WORKERS,
+            thread_name_prefix="drive-upload"
+        )
+        self._lock = threading.Lock()
+        self._uploads: Dict[str, Dict[str, Any]] = {}  # run_id -> upload entry
+        self._active: set = set()  # run_ids queued or running in this process
+
+    def enqueue(self, run_id: str, file_path: str, date_folder: str,
+                product_folder: str, job_name: str = "") -> None:
+        """Queue a finished video for upload
+
+        Args:
+            run_id: Job run ID (used for events and as the upload key)
+            file_path: Local path to video file
+            date_folder: Date folder name (YYYY-MM-DD)
+            product_folder: Product folder name
+            job_name: Job name for the file
+        """
+        entry = {
+            'run_id': run_id,
+            'file_path': file_path,
+            'date_folder': date_folder,
+            'product_folder': product_folder,
+            'job_name': job_name,
+            'session_uri': None,
+            'bytes_uploaded': 0,
+            'total_bytes': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            'queued_at': time.time()
+        }
+
+        with self._lock:
+            self._uploads[run_id] = entry
+            self._active.add(run_id)
+            self._persist_locked()
+
+        self.emit(run_id, {
+            "type": "drive_upload",
+            "state": "queued",
+            "drive_path": f"{date_folder}/{product_folder}"
+        })
+        self._executor.submit(self._run, run_id)
+
+    def resume_pending(self) -> int:
+        """Re-queue uploads persisted by a previous run
+
+        Returns:
+            Number of uploads resumed
+        """
+        try:
+            with open(self.state_file, 'r') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f"Could not read pending Drive uploads: {e}")
+            return 0
+
+        resumed = []
+        with self._lock:
+            for run_id, entry in saved.items():
+                if run_id in self._active:
+                    continue
+                if not os.path.exists(entry.get('file_path', '')):
+                    logger.warning(f"Dropping pending Drive upload, file is gone: {entry.get('file_path')}")
+                    continue
+                self._uploads[run_id] = entry
+                self._active.add(run_id)
+                resumed.append(run_id)
+            self._persist_locked()
+
+        for run_id in resumed:
+            self._executor.submit(self._run, run_id)
+
+        if resumed:
+            logger.info(f"Resuming {len(resumed)} pending Drive uploads")
+        return len(resumed)
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """Snapshot of pending and in-progress uploads"""
+        with self._lock:
+            return [
+                {
+                    'run_id': entry['run_id'],
+                    'file_name': os.path.basename(entry['file_path']),
+                    'bytes_uploaded': entry.get('bytes_uploaded', 0),
+                    'total_bytes': entry.get('total_bytes', 0),
+                    'resumable': bool(entry.get('session_uri'))
+                }
+                for entry in self._uploads.values()
+            ]
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting uploads; in-flight ones stay persisted if interrupted"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, run_id: str):
+        """Upload one queued video and report the result"""
+        with self._lock:
+            entry = dict(self._uploads.get(run_id) or {})
+        if not entry:
+            return
+
+        last_percent = [-1]
+
+        def on_session_created(session_uri: str):
+            with self._lock:
+                if run_id in self._uploads:
+                    self._uploads[run_id]['session_uri'] = session_uri
+                    self._persist_locked()
+
+        def on_progress(bytes_uploaded: int, total_bytes: int):
+            percent = int(bytes_uploaded * 100 / total_bytes) if total_bytes else 100
+            with self._lock:
+                if run_id in self._uploads:
+                    self._uploads[run_id]['bytes_uploaded'] = bytes_uploaded
+                    self._uploads[run_id]['total_bytes'] = total_bytes
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.emit(run_id, {
+                    "type": "drive_upload",
+                    "state": "uploading",
+                    "progress": percent,
+                    "bytes_uploaded": bytes_uploaded,
+                    "total_bytes": total_bytes
+                })
+
+        try:
+            result = self.drive_service.upload_video(
+                file_path=entry['file_path'],
+                date_folder=entry['date_folder'],
+                product_folder=entry['product_folder'],
+                job_name=entry.get('job_name', ''),
+                progress_callback=on_progress,
+                session_uri=entry.get('session_uri'),
+                on_session_created=on_session_created
+            )
+        except Exception as e:
+            logger.error(f"Drive upload crashed for job {run_id}: {e}")
+            result = None
+
+        with self._lock:
+            self._uploads.pop(run_id, None)
+            self._active.discard(run_id)
+            self._persist_locked()
+
+        if result:
+            print(f"[DRIVE] Upload successful: {result['drive_path']}")
+            self.emit(run_id, {
+                "type": "drive_upload",
+                "state": "completed",
+                "progress": 100,
+                "drive_info": result,
+                "output_path": result['web_link']
+            })
+        else:
+            print(f"[DRIVE] Upload failed, keeping local file: {entry['file_path']}")
+            self.emit(run_id, {
+                "type": "drive_upload",
+                "state": "failed",
+                "output_path": entry['file_path']
+            })
+
+    def _persist_locked(self):
+        """Write pending uploads atomically (caller holds self._lock)"""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_file.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self._uploads, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            logger.error(f"Could not persist pending Drive uploads: {e}")
@@ -26,6 +26,8 @@ import cv2
 from utils.design_space_utils import DesignSpaceCalculator, create_calculator_from_config
 from utils.color_utils import ColorConverter, FFmpegColorBuilder, ASSColorBuilder
 from backend.services.gpu_detector import GPUEncoder
+from backend.services.music_cache import MusicAssetCache
+from backend.services.ffmpeg_runner import FFmpegRunner
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -959,18 +961,42 @@ class EnhancedVideoProcessor:
         logger.info(f"Input video has audio: {has_audio}")
         logger.info(f"Video duration: {video_duration:.1f}s")
         
+        # Pre-decoded 44.1 kHz stereo rendition, already looped to cover the
+        # video and gain-adjusted, so mixing is a cheap read instead of a
+        # decode + aloop chain per render. Falls back to the source file.
+        loop_music = has_audio and extend_to_video_duration
+        try:
+            music_input = MusicAssetCache.get_variant(
+                music_path,
+                duration=video_duration,
+                volume_db=config.volume_db,
+                loop=loop_music
+            )
+            prepared = True
+            logger.info(f"Using cached music rendition: {music_input}")
+        except Exception as e:
+            logger.warning(f"Music rendition cache unavailable, mixing from source: {e}")
+            music_input = music_path
+            prepared = False
+        
+        base_volume = 10 ** (config.volume_db / 20)
+        # Gain is already baked into cached renditions
+        music_chain = "anull" if prepared else f"aformat=sample_rates=44100:channel_layouts=stereo,volume={base_volume}"
+        
         if has_audio:
             # Video has audio - mix it with music
-            base_volume = 10 ** (config.volume_db / 20)
-            
             if extend_to_video_duration:
                 # SPLICE MODE: Music continues for full video duration
-                # Loop music, trim to video duration, then mix (prevents FFmpeg hanging)
                 logger.info(f"Using extended music mode (music continues for {video_duration:.1f}s)")
+                if not prepared:
+                    # Loop music, trim to video duration, then mix (prevents FFmpeg hanging)
+                    music_chain += f",aloop=loop=-1:size=2e+09,atrim=duration={video_duration}"
+                else:
+                    # Cached variants run up to a length step past the video
+                    music_chain += f",atrim=duration={video_duration}"
                 audio_filter = (
                     f"[0:a]aformat=sample_rates=44100:channel_layouts=stereo[voice];"
-                    f"[1:a]aformat=sample_rates=44100:channel_layouts=stereo,volume={base_volume},"
-                    f"aloop=loop=-1:size=2e+09,atrim=duration={video_duration}[music];"
+                    f"[1:a]{music_chain}[music];"
                     f"[voice][music]amix=inputs=2:duration=longest:dropout_transition=2[aout]"
                 )
             else:
@@ -978,14 +1004,14 @@ class EnhancedVideoProcessor:
                 logger.info("Using standard music mode (music stops with voiceover)")
                 audio_filter = (
                     f"[0:a]aformat=sample_rates=44100:channel_layouts=stereo[voice];"
-                    f"[1:a]aformat=sample_rates=44100:channel_layouts=stereo,volume={base_volume}[music];"
+                    f"[1:a]{music_chain}[music];"
                     f"[voice][music]amix=inputs=2:duration=first:dropout_transition=2[aout]"
                 )
             
             cmd = [
                 self.ffmpeg_path,
                 '-i', video_path,
-                '-i', music_path,
+                '-i', music_input,
                 '-filter_complex', audio_filter,
                 '-map', '0:v',
                 '-map', '[aout]',
@@ -996,13 +1022,13 @@ class EnhancedVideoProcessor:
             ]
         else:
             # Video has no audio - just add music as the only audio stream
-            base_volume = 10 ** (config.volume_db / 20)
+            audio_filter = '[1:a]anull[aout]' if prepared else f'[1:a]volume={base_volume}[aout]'
             
             cmd = [
                 self.ffmpeg_path,
                 '-i', video_path,
-                '-i', music_path,
-                '-filter_complex', f'[1:a]volume={base_volume}[aout]',
+                '-i', music_input,
+                '-filter_complex', audio_filter,
                 '-map', '0:v',
                 '-map', '[aout]',
                 '-c:v', 'copy',
@@ -1344,7 +1370,7 @@ class EnhancedVideoProcessor:
         print(f"  Output video: {output_path}")
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+            result = FFmpegRunner.run(cmd, label="caption_overlay", capture_output=True, text=True)
             if result.returncode != 0:
                 print(f"[CAPTIONS ASS] ❌ FFmpeg failed with return code: {result.returncode}")
                 print(f"[CAPTIONS ASS] ❌ FFmpeg stderr: {result.stderr}")
@@ -1368,9 +1394,9 @@ class EnhancedVideoProcessor:
                 print(f"[CAPTIONS ASS] ❌ ASS file does not exist at: {ass_subtitle_path}")
             
             return output_path
-        except subprocess.TimeoutExpired:
-            print(f"[CAPTIONS ASS] ❌ FFmpeg timed out after 120 seconds")
-            raise RuntimeError("Caption overlay timed out after 120 seconds")
+        except subprocess.TimeoutExpired as e:
+            print(f"[CAPTIONS ASS] ❌ FFmpeg timed out after {e.timeout:.0f} seconds")
+            raise RuntimeError(f"Caption overlay timed out after {e.timeout:.0f} seconds")
         except Exception as e:
             print(f"[CAPTIONS ASS] ❌ FFmpeg execution error: {e}")
             logger.error(f"FFmpeg caption overlay error: {str(e)}")
@@ -2198,11 +2224,11 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         logger.debug(f"FFmpeg command: {' '.join(cmd)}")
         
         try:
-            result = subprocess.run(
+            result = FFmpegRunner.run(
                 cmd,
+                label=operation.replace(' ', '_'),
                 capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+                text=True
             )
             
             if result.returncode != 0:
@@ -2213,8 +2239,8 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             
             logger.info(f"✅ {operation} complete")
                 
-        except subprocess.TimeoutExpired:
-            raise TimeoutError(f"FFmpeg {operation} timed out after 5 minutes")
+        except subprocess.TimeoutExpired as e:
+            raise TimeoutError(f"FFmpeg {operation} timed out after {e.timeout:.0f} seconds")
         except Exception as e:
             logger.error(f"FFmpeg {operation} error: {str(e)}")
             raise
@@ -2360,42 +2386,30 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
     
     def _select_music_track(self, track_id: Optional[str]) -> Optional[str]:
         """Select music track from library using MusicLibrary service"""
-        from backend.music_library import MusicLibrary, MusicSelectionConfig, MusicCategory
+        from backend.music_library import get_shared_music_library, MusicSelectionConfig, MusicCategory
+        
+        # Random selections map to library categories (15 seconds to 3 minutes)
+        random_categories = {
+            'random_upbeat': MusicCategory.UPBEAT_ENERGY,
+            'random_chill': MusicCategory.CHILL_VIBES,
+            'random_corporate': MusicCategory.CORPORATE_CLEAN,
+            'random_dramatic': MusicCategory.EPIC_DRAMATIC,
+            'random_inspiring': MusicCategory.EMOTIONAL,
+        }
         
         try:
             logger.info(f"Selecting music track: {track_id}")
             
-            # Initialize music library
-            music_library = MusicLibrary()
+            # Shared, indexed library (loaded once per process)
+            music_library = get_shared_music_library()
             
             # Setup selection configuration based on track_id
-            if track_id == 'random_upbeat':
-                # Select random track from upbeat category
-                config = MusicSelectionConfig(
-                    category=MusicCategory.UPBEAT,
-                    random_selection=True,
-                    duration_range=(15, 180)  # 15 seconds to 3 minutes
-                )
-            elif track_id == 'random_chill':
-                # Select random track from chill category
-                config = MusicSelectionConfig(
-                    category=MusicCategory.CHILL,
-                    random_selection=True,
-                    duration_range=(15, 180)
-                )
-            elif track_id == 'random_dramatic':
-                # Select random track from dramatic category
-                config = MusicSelectionConfig(
-                    category=MusicCategory.DRAMATIC,
-                    random_selection=True,
-                    duration_range=(15, 180)
-                )
-            elif track_id == 'random_inspiring':
-                # Select random track from inspiring category
+            if track_id in random_categories:
                 config = MusicSelectionConfig(
-                    category=MusicCategory.INSPIRING,
+                    category=random_categories[track_id],
                     random_selection=True,
-                    duration_range=(15, 180)
+                    min_duration=15,
+                    max_duration=180
                 )
             elif track_id and track_id != 'none':
                 # Use specific track ID - access directly from tracks dict
@@ -2416,11 +2430,10 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             # Get track from library (for random selections)
             track_info = music_library.select_track(config)
             
-            if track_info and track_info.get('path'):
-                track_path = track_info['path']
-                logger.info(f"Music track selected: {track_info.get('name', 'Unknown')} "
-                          f"({track_info.get('category', 'Unknown')} - {track_info.get('duration', 0):.1f}s)")
-                return track_path
+            if track_info and track_info.path:
+                logger.info(f"Music track selected: {track_info.filename} "
+                          f"({track_info.category.value} - {track_info.duration:.1f}s)")
+                return str(track_info.path)
             else:
                 logger.warning(f"No suitable music track found for: {track_id}")
                 return None
@@ -6,16 +6,17 @@ Handles OAuth, file uploads, and folder management
 import os
 import json
 import pickle
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from datetime import datetime
 import logging
 
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,12 @@ class GoogleDriveService:
     SCOPES = ['https://www.googleapis.com/auth/drive.file']
     REDIRECT_URI = 'http://localhost:2026/api/drive/callback'
     MAIN_FOLDER_NAME = 'MassUGC Studio Videos'
+    FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+    
+    # REST endpoint used for folder lookups and resumable uploads
+    API_BASE_URL = 'https://www.googleapis.com'
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Must be a multiple of 256 KiB
+    MAX_CHUNK_RETRIES = 5
     
     # Embedded OAuth credentials (public client - safe to embed)
     OAUTH_CONFIG = {
@@ -57,6 +64,12 @@ class GoogleDriveService:
         self.creds: Optional[Credentials] = None
         self.service = None
         self.main_folder_id = None
+        
+        # (parent_id, name) -> folder ID, so uploads don't re-query Drive
+        self._folder_ids: Dict[Tuple[str, str], str] = {}
+        self._folder_lock = threading.Lock()
+        self._session: Optional[AuthorizedSession] = None
+        
         self._load_credentials()
 
     def _get_user_data_directory(self) -> str:
@@ -204,6 +217,8 @@ class GoogleDriveService:
         self.creds = None
         self.service = None
         self.main_folder_id = None
+        self._session = None
+        self._forget_folders()
     
     def get_user_info(self) -> Optional[Dict[str, Any]]:
         """Get connected user information
@@ -260,6 +275,9 @@ class GoogleDriveService:
     def _get_or_create_folder(self, name: str, parent_id: str) -> str:
         """Get or create a folder in Drive
         
+        Folder IDs are cached per (parent, name). Lookups are serialized so two
+        concurrent uploads can't both create the same date/product folder.
+        
         Args:
             name: Folder name
             parent_id: Parent folder ID
@@ -267,51 +285,84 @@ class GoogleDriveService:
         Returns:
             Folder ID
         """
-        if not self.service:
+        if not self.creds:
             raise RuntimeError("Drive service not initialized")
         
-        # Search for existing folder
-        query = f"name='{name}' and '{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
+        key = (parent_id, name)
         
-        try:
-            results = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id)'
-            ).execute()
-            
-            items = results.get('files', [])
-            
-            if items:
-                return items[0]['id']
-            
-            # Create folder
-            folder_metadata = {
-                'name': name,
-                'mimeType': 'application/vnd.google-apps.folder',
-                'parents': [parent_id]
-            }
-            
-            folder = self.service.files().create(
-                body=folder_metadata,
-                fields='id'
-            ).execute()
+        with self._folder_lock:
+            folder_id = self._folder_ids.get(key)
+            if folder_id:
+                return folder_id
             
-            return folder['id']
+            try:
+                folder_id = self._find_or_create_folder(name, parent_id)
+            except Exception as e:
+                logger.error(f"Error creating folder {name}: {e}")
+                raise
             
-        except Exception as e:
-            logger.error(f"Error creating folder {name}: {e}")
-            raise
+            self._folder_ids[key] = folder_id
+            return folder_id
+    
+    def _find_or_create_folder(self, name: str, parent_id: str) -> str:
+        """Look up a folder by name under parent_id, creating it if missing"""
+        session = self._authorized_session()
+        escaped_name = name.replace('\\', '\\\\').replace("'", "\\'")
+        query = (
+            f"name='{escaped_name}' and '{parent_id}' in parents "
+            f"and mimeType='{self.FOLDER_MIME_TYPE}' and trashed=false"
+        )
+        
+        response = session.get(
+            f"{self.API_BASE_URL}/drive/v3/files",
+            params={'q': query, 'spaces': 'drive', 'fields': 'files(id)'},
+            timeout=30
+        )
+        response.raise_for_status()
+        items = response.json().get('files', [])
+        
+        if items:
+            return items[0]['id']
+        
+        response = session.post(
+            f"{self.API_BASE_URL}/drive/v3/files",
+            params={'fields': 'id'},
+            json={'name': name, 'mimeType': self.FOLDER_MIME_TYPE, 'parents': [parent_id]},
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json()['id']
+    
+    def _forget_folders(self):
+        """Drop cached folder IDs (after disconnect or a folder vanishing)"""
+        with self._folder_lock:
+            self._folder_ids.clear()
+    
+    def _authorized_session(self) -> AuthorizedSession:
+        """Keep-alive HTTP session that signs requests with the current credentials"""
+        if self._session is None or self._session.credentials is not self.creds:
+            self._session = AuthorizedSession(self.creds)
+        return self._session
     
     def upload_video(self, file_path: str, date_folder: str, product_folder: str, 
-                    job_name: str) -> Optional[Dict[str, str]]:
+                    job_name: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    session_uri: Optional[str] = None,
+                    on_session_created: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, str]]:
         """Upload video to Google Drive with folder structure
         
+        Uses the Drive resumable upload protocol in UPLOAD_CHUNK_SIZE chunks.
+        Passing the session_uri of an interrupted upload continues it from
+        the last byte Drive acknowledged.
+        
         Args:
             file_path: Local path to video file
             date_folder: Date folder name (YYYY-MM-DD)
             product_folder: Product folder name
             job_name: Job name for the file
+            progress_callback: Called with (bytes_uploaded, total_bytes) after each chunk
+            session_uri: Resumable session to continue (from on_session_created)
+            on_session_created: Called with the session URI once an upload session exists
             
         Returns:
             Dict with file_id and web_link, or None on error
@@ -325,35 +376,30 @@ class GoogleDriveService:
             return None
         
         try:
-            # Create folder structure
-            date_folder_id = self._get_or_create_folder(
-                date_folder, 
-                self.main_folder_id
-            )
-            product_folder_id = self._get_or_create_folder(
-                product_folder,
-                date_folder_id
-            )
-            
-            # Prepare file metadata
             file_name = os.path.basename(file_path)
-            file_metadata = {
-                'name': file_name,
-                'parents': [product_folder_id]
-            }
+            file_size = os.path.getsize(file_path)
+            file = None
+            offset = 0
             
-            # Upload file
-            media = MediaFileUpload(
-                file_path,
-                mimetype='video/mp4',
-                resumable=True
-            )
+            # Continue an interrupted session if Drive still has it
+            if session_uri:
+                offset, file = self._query_upload_offset(session_uri, file_size)
+                if offset is None:
+                    logger.info(f"Upload session expired, starting over: {file_name}")
+                    session_uri = None
+                    offset = 0
+                else:
+                    logger.info(f"Resuming Drive upload at {offset}/{file_size} bytes: {file_name}")
             
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id, webViewLink, webContentLink'
-            ).execute()
+            if not session_uri:
+                session_uri = self._start_upload_session(file_name, file_size, date_folder, product_folder)
+                if on_session_created:
+                    on_session_created(session_uri)
+            
+            if file is None:
+                file = self._upload_chunks(session_uri, file_path, file_size, offset, progress_callback)
+            elif progress_callback:
+                progress_callback(file_size, file_size)
             
             # Delete local file after successful upload
             try:
@@ -376,6 +422,130 @@ class GoogleDriveService:
             logger.error(f"Error uploading video: {e}")
             return None
     
+    def _start_upload_session(self, file_name: str, file_size: int,
+                              date_folder: str, product_folder: str) -> str:
+        """Create the folder structure and open a resumable upload session
+        
+        Returns:
+            Session URI to PUT chunks to
+        """
+        session = self._authorized_session()
+        
+        for attempt in range(2):
+            date_folder_id = self._get_or_create_folder(date_folder, self.main_folder_id)
+            product_folder_id = self._get_or_create_folder(product_folder, date_folder_id)
+            
+            response = session.post(
+                f"{self.API_BASE_URL}/upload/drive/v3/files",
+                params={'uploadType': 'resumable', 'fields': 'id, webViewLink, webContentLink'},
+                json={'name': file_name, 'parents': [product_folder_id]},
+                headers={
+                    'X-Upload-Content-Type': 'video/mp4',
+                    'X-Upload-Content-Length': str(file_size)
+                },
+                timeout=30
+            )
+            
+            # Cached parent was deleted in Drive: look folders up again once
+            if response.status_code == 404 and attempt == 0:
+                self._forget_folders()
+                continue
+            
+            response.raise_for_status()
+            return response.headers['Location']
+        
+        raise RuntimeError("Could not open Drive upload session")
+    
+    def _upload_chunks(self, session_uri: str, file_path: str, file_size: int, offset: int,
+                       progress_callback: Optional[Callable[[int, int], None]]) -> Dict[str, Any]:
+        """PUT the file from offset onward; retries transient failures from Drive's acknowledged offset
+        
+        Returns:
+            Drive file resource of the finished upload
+        """
+        session = self._authorized_session()
+        failures = 0
+        
+        with open(file_path, 'rb') as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+                if chunk:
+                    content_range = f"bytes {offset}-{offset + len(chunk) - 1}/{file_size}"
+                else:
+                    content_range = f"bytes */{file_size}"
+                
+                try:
+                    response = session.put(
+                        session_uri, data=chunk,
+                        headers={'Content-Range': content_range},
+                        timeout=120
+                    )
+                    status = response.status_code
+                except Exception as e:
+                    response, status = None, None
+                    logger.warning(f"Drive chunk upload error: {e}")
+                
+                if status in (200, 201):
+                    if progress_callback:
+                        progress_callback(file_size, file_size)
+                    return response.json()
+                
+                if status == 308:
+                    offset = self._next_offset(response)
+                    failures = 0
+                    if progress_callback:
+                        progress_callback(offset, file_size)
+                    continue
+                
+                if status is not None and status < 500 and status != 429:
+                    response.raise_for_status()
+                    raise RuntimeError(f"Unexpected Drive upload status {status}")
+                
+                # Transient: back off and ask Drive where to continue from
+                failures += 1
+                if failures > self.MAX_CHUNK_RETRIES:
+                    raise RuntimeError(f"Drive upload failed after {self.MAX_CHUNK_RETRIES} retries")
+                time.sleep(min(30, 2 ** failures))
+                
+                resumed_offset, file = self._query_upload_offset(session_uri, file_size)
+                if file is not None:
+                    return file
+                if resumed_offset is None:
+                    raise RuntimeError("Drive upload session expired")
+                offset = resumed_offset
+    
+    def _query_upload_offset(self, session_uri: str, file_size: int) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """Ask Drive how much of a resumable upload it has
+        
+        Returns:
+            (next_offset, None) while incomplete, (file_size, file_resource) if
+            already finished, or (None, None) if the session is gone
+        """
+        response = self._authorized_session().put(
+            session_uri, data=b'',
+            headers={'Content-Range': f"bytes */{file_size}"},
+            timeout=30
+        )
+        
+        if response.status_code in (200, 201):
+            return file_size, response.json()
+        if response.status_code == 308:
+            return self._next_offset(response), None
+        if response.status_code in (404, 410):
+            return None, None
+        
+        response.raise_for_status()
+        raise RuntimeError(f"Unexpected Drive upload status {response.status_code}")
+    
+    @staticmethod
+    def _next_offset(response) -> int:
+        """Next byte to send from a 308 response's Range header ('bytes=0-N')"""
+        range_header = response.headers.get('Range')
+        if not range_header:
+            return 0
+        return int(range_header.rsplit('-', 1)[1]) + 1
+    
     def get_folder_contents(self, folder_path: str = None) -> List[Dict[str, Any]]:
         """Get contents of a Drive folder
         
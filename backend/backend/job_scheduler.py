@@ -0,0 +1,269 @@
+"""
+Resource-Aware Job Scheduler for MassUGC Studio
+Admits campaign jobs by estimated CPU / memory / disk cost against the
+node's live load instead of a fixed number of worker slots.
+"""
+
+import os
+import shutil
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # Falls back to os.getloadavg() and no memory check
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobCost:
+    """Estimated peak resources of one job"""
+    cpu: float  # Cores
+    memory_mb: int
+    disk_mb: int
+
+    def __add__(self, other: 'JobCost') -> 'JobCost':
+        return JobCost(self.cpu + other.cpu, self.memory_mb + other.memory_mb, self.disk_mb + other.disk_mb)
+
+
+def estimate_job_cost(job: Dict[str, Any]) -> JobCost:
+    """
+    Estimate a campaign job's peak CPU, memory and scratch-disk needs.
+
+    - MassUGC jobs render remotely; locally they only download the result.
+    - Splice jobs are mostly stream copies of cached clips; randomization,
+      captions (Whisper) and enhanced rendering add full re-encodes.
+    - Avatar jobs always re-encode the lip-synced video and, with captions
+      or randomization, run Whisper / the OpenCV randomizer.
+    """
+    enhanced = job.get("enhanced_settings") or {}
+    captions = bool(job.get("captions_enabled") or (enhanced.get("captions") or {}).get("enabled"))
+    randomization = bool(job.get("use_randomization"))
+    overlay = bool(job.get("use_overlay") and job.get("product_clip_path"))
+    music = bool(job.get("music_enabled") or (enhanced.get("music") or {}).get("enabled"))
+    text_overlays = bool(enhanced.get("text_overlays"))
+
+    if job.get("massugc_settings"):
+        return JobCost(cpu=0.5, memory_mb=300, disk_mb=300)
+
+    if job.get("random_video_settings"):
+        splice = job["random_video_settings"]
+        clips = int(splice.get("total_clips") or 10)
+        cost = JobCost(cpu=1.5, memory_mb=600, disk_mb=400 + 60 * clips)
+        if music or text_overlays:
+            cost += JobCost(cpu=2.0, memory_mb=400, disk_mb=300)
+    else:
+        cost = JobCost(cpu=3.0, memory_mb=1200, disk_mb=800)
+        if job.get("automated_video_editing_enabled") or music:
+            cost += JobCost(cpu=1.0, memory_mb=300, disk_mb=300)
+
+    if randomization:
+        cost += JobCost(cpu=3.0, memory_mb=1500, disk_mb=600)
+    if captions:
+        cost += JobCost(cpu=2.0, memory_mb=1500, disk_mb=100)
+    if overlay:
+        cost += JobCost(cpu=1.0, memory_mb=300, disk_mb=300)
+    return cost
+
+
+class JobScheduler:
+    """Admission control for campaign jobs
+
+    - submit() returns a Future right away; the job starts once it fits.
+    - A job fits when reserved + its cost stays within the node's CPU and
+      memory budgets, the live load / free memory leave room for it, and
+      the scratch disk has space. One job is always allowed to run so an
+      oversized job on a small machine still makes progress.
+    - Jobs start in FIFO order, but a small job may pass a large one that
+      doesn't fit yet; once the head has waited STARVATION_SECONDS nothing
+      passes it.
+    - Cancelling the Future of a job that hasn't started removes it.
+    """
+
+    CPU_OVERCOMMIT = 1.0  # Budget = cores * this
+    MEMORY_FRACTION = 0.8  # Never reserve more than this share of RAM
+    MEMORY_RESERVE_MB = 1024  # Keep free for the OS / Flask / Electron
+    DISK_RESERVE_MB = 2048
+    STARVATION_SECONDS = 120
+    POLL_SECONDS = 2.0  # Re-check live load while jobs wait
+    MAX_JOBS = int(os.getenv("MASSUGC_MAX_CONCURRENT_JOBS", "0")) or None
+
+    def __init__(self, scratch_dir: Optional[Path] = None, cpu_count: Optional[int] = None,
+                 total_memory_mb: Optional[int] = None, max_jobs: Optional[int] = None):
+        """Initialize scheduler
+
+        Args:
+            scratch_dir: Directory whose free space bounds disk admission
+            cpu_count: Override detected cores (tests)
+            total_memory_mb: Override detected RAM (tests)
+            max_jobs: Hard cap on concurrent jobs (default: cores)
+        """
+        self.scratch_dir = Path(scratch_dir or Path.home() / ".zyra-video-agent")
+        self.cpu_count = cpu_count or os.cpu_count() or 2
+        self.total_memory_mb = total_memory_mb or self._detect_total_memory_mb()
+        self.max_jobs = max_jobs or self.MAX_JOBS or self.cpu_count
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._shutdown = False
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="job-scheduler", daemon=True)
+        self._dispatcher.start()
+
+    # ─── Public API ──────────────────────────────────────────────────
+
+    def submit(self, run_id: str, fn: Callable[[], Any], cost: JobCost) -> Future:
+        """Queue fn to run once cost fits on this node"""
+        future: Future = Future()
+        with self._wake:
+            self._pending[run_id] = {
+                'run_id': run_id,
+                'fn': fn,
+                'cost': cost,
+                'future': future,
+                'queued_at': time.time()
+            }
+            self._wake.notify()
+        logger.info(f"[SCHEDULER] Queued {run_id} (cpu={cost.cpu}, mem={cost.memory_mb}MB, disk={cost.disk_mb}MB)")
+        return future
+
+    def status(self) -> Dict[str, Any]:
+        """Reservations, live load and waiting jobs (for /queue/status)"""
+        with self._lock:
+            reserved = self._reserved_locked()
+            pending = [
+                {'run_id': entry['run_id'], 'waiting': round(time.time() - entry['queued_at'], 1),
+                 **asdict(entry['cost'])}
+                for entry in self._pending.values() if not entry['future'].cancelled()
+            ]
+            running = {run_id: asdict(entry['cost']) for run_id, entry in self._running.items()}
+        load = self._live_load()
+        return {
+            'capacity': {
+                'cpu': self.cpu_count * self.CPU_OVERCOMMIT,
+                'memory_mb': int(self.total_memory_mb * self.MEMORY_FRACTION),
+                'max_jobs': self.max_jobs
+            },
+            'reserved': asdict(reserved),
+            'live': load,
+            'running': running,
+            'pending': pending
+        }
+
+    def shutdown(self, wait: bool = False):
+        with self._wake:
+            self._shutdown = True
+            self._wake.notify()
+        self._executor.shutdown(wait=wait)
+
+    # ─── Admission ───────────────────────────────────────────────────
+
+    def _dispatch_loop(self):
+        with self._wake:
+            while not self._shutdown:
+                self._admit_locked()
+                # Waiting jobs re-check live load periodically; finishes wake us early
+                self._wake.wait(self.POLL_SECONDS if self._pending else None)
+
+    def _admit_locked(self):
+        for run_id in [r for r, e in self._pending.items() if e['future'].cancelled()]:
+            del self._pending[run_id]
+        if not self._pending:
+            return
+
+        load = self._live_load()
+        head = next(iter(self._pending.values()))
+        head_starving = time.time() - head['queued_at'] > self.STARVATION_SECONDS
+
+        for run_id, entry in list(self._pending.items()):
+            if entry is not head and head_starving:
+                break
+            if not self._fits_locked(entry['cost'], load):
+                continue
+
+            del self._pending[run_id]
+            if not entry['future'].set_running_or_notify_cancel():
+                continue
+            self._running[run_id] = entry
+            # Count the new job against live numbers until the next sample
+            load['free_memory_mb'] = load['free_memory_mb'] - entry['cost'].memory_mb if load['free_memory_mb'] is not None else None
+            load['free_disk_mb'] = load['free_disk_mb'] - entry['cost'].disk_mb if load['free_disk_mb'] is not None else None
+            logger.info(f"[SCHEDULER] Starting {run_id} ({len(self._running)} running, {len(self._pending)} waiting)")
+            self._executor.submit(self._run, entry)
+
+    def _fits_locked(self, cost: JobCost, load: Dict[str, Any]) -> bool:
+        if not self._running:
+            return True
+        if len(self._running) >= self.max_jobs:
+            return False
+
+        reserved = self._reserved_locked()
+        cpu_budget = self.cpu_count * self.CPU_OVERCOMMIT
+        # Live load includes our own jobs, so take whichever view is busier
+        busy = max(reserved.cpu, load['load_1m'] or 0.0)
+        if busy + cost.cpu > cpu_budget:
+            return False
+
+        if reserved.memory_mb + cost.memory_mb > self.total_memory_mb * self.MEMORY_FRACTION:
+            return False
+        if load['free_memory_mb'] is not None and cost.memory_mb + self.MEMORY_RESERVE_MB > load['free_memory_mb']:
+            return False
+
+        if load['free_disk_mb'] is not None and cost.disk_mb + self.DISK_RESERVE_MB > load['free_disk_mb']:
+            return False
+        return True
+
+    def _reserved_locked(self) -> JobCost:
+        total = JobCost(0.0, 0, 0)
+        for entry in self._running.values():
+            total += entry['cost']
+        return total
+
+    def _run(self, entry: Dict[str, Any]):
+        future = entry['future']
+        try:
+            future.set_result(entry['fn']())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._wake:
+                self._running.pop(entry['run_id'], None)
+                self._wake.notify()
+
+    # ─── Node probes ─────────────────────────────────────────────────
+
+    def _live_load(self) -> Dict[str, Any]:
+        try:
+            load_1m = os.getloadavg()[0]
+        except (AttributeError, OSError):  # Windows
+            load_1m = psutil.cpu_percent(interval=None) / 100 * self.cpu_count if psutil else None
+
+        free_memory_mb = psutil.virtual_memory().available // (1024 * 1024) if psutil else None
+
+        try:
+            self.scratch_dir.mkdir(parents=True, exist_ok=True)
+            free_disk_mb = shutil.disk_usage(self.scratch_dir).free // (1024 * 1024)
+        except OSError:
+            free_disk_mb = None
+
+        return {'load_1m': load_1m, 'free_memory_mb': free_memory_mb, 'free_disk_mb': free_disk_mb}
+
+    @staticmethod
+    def _detect_total_memory_mb() -> int:
+        if psutil:
+            return psutil.virtual_memory().total // (1024 * 1024)
+        try:
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+        except (AttributeError, ValueError, OSError):
+            return 8192
@@ -0,0 +1,401 @@
+"""
+Shared Job Store for MassUGC Studio render farm mode
+Lets several backend instances pull campaign jobs from one queue and
+publish their progress events back to the instance that accepted the job.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class JobStore(ABC):
+    """Interface of a shared job queue
+
+    Status flow: pending -> claimed -> running -> completed | failed, or
+    pending -> cancelled. A claim is a lease: a worker that stops renewing
+    it loses the job back to the queue (up to MAX_ATTEMPTS).
+    """
+
+    LEASE_SECONDS = 90
+    MAX_ATTEMPTS = 2
+    WORKER_TIMEOUT = 60  # Workers not seen for this long are ignored
+    AFFINITY_WAIT = 30  # Seconds a job waits for a worker that has its clips cached
+    CLAIM_WINDOW = 50  # Oldest pending jobs considered per claim
+    EVENT_RETENTION = 24 * 3600
+
+    @abstractmethod
+    def enqueue(self, run_id: str, campaign_id: str, job: Dict[str, Any],
+                cost: Dict[str, Any], affinity: Iterable[str] = ()) -> None:
+        pass
+
+    @abstractmethod
+    def claim(self, worker_id: str, cached_keys: Set[str], memory_mb: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def mark_running(self, run_id: str, worker_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def renew(self, worker_id: str, run_ids: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def finish(self, run_id: str, status: str, error: Optional[str] = None) -> None:
+        pass
+
+    @abstractmethod
+    def cancel(self, run_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def append_event(self, run_id: str, payload: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def events_since(self, last_id: int, limit: int = 500) -> List[Tuple[int, str, Dict[str, Any]]]:
+        pass
+
+    @abstractmethod
+    def last_event_id(self) -> int:
+        pass
+
+    @abstractmethod
+    def register_worker(self, worker_id: str, info: Dict[str, Any], cached_keys: Iterable[str] = ()) -> None:
+        pass
+
+    @abstractmethod
+    def workers(self) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        pass
+
+
+class SQLiteJobStore(JobStore):
+    """JobStore on a SQLite file
+
+    Put the file on a volume every render box mounts for a multi-node farm,
+    or on local disk as a single-node stand-in. Uses the rollback journal
+    (not WAL) so file locking also works on network filesystems.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            run_id TEXT PRIMARY KEY,
+            campaign_id TEXT,
+            job_json TEXT NOT NULL,
+            cost_json TEXT NOT NULL,
+            affinity_json TEXT NOT NULL DEFAULT '[]',
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker_id TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            claimed_at REAL,
+            lease_expires REAL,
+            finished_at REAL,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id TEXT PRIMARY KEY,
+            info_json TEXT NOT NULL,
+            keys_json TEXT NOT NULL DEFAULT '[]',
+            last_seen REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: Path):
+        """Open (and create) the store
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    # ─── Jobs ────────────────────────────────────────────────────────
+
+    def enqueue(self, run_id, campaign_id, job, cost, affinity=()):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (run_id, campaign_id, job_json, cost_json, affinity_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, campaign_id, json.dumps(job, default=str), json.dumps(cost),
+                 json.dumps(sorted(set(affinity))), time.time())
+            )
+
+    def claim(self, worker_id, cached_keys, memory_mb=None):
+        """Lease the best pending job for this worker, or None
+
+        Among the oldest CLAIM_WINDOW pending jobs, picks the one whose clips
+        this worker has cached the most of. A job is left for another live
+        worker with a better clip match until it has waited AFFINITY_WAIT;
+        after that the oldest job goes to whoever asks first.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+
+            rows = conn.execute(
+                "SELECT run_id, cost_json, affinity_json, created_at FROM jobs "
+                "WHERE status = 'pending' ORDER BY created_at LIMIT ?",
+                (self.CLAIM_WINDOW,)
+            ).fetchall()
+            if not rows:
+                return None
+
+            others = [
+                set(json.loads(keys_json))
+                for other_id, keys_json in conn.execute(
+                    "SELECT worker_id, keys_json FROM workers WHERE last_seen > ? AND worker_id != ?",
+                    (now - self.WORKER_TIMEOUT, worker_id)
+                )
+            ]
+
+            chosen, best_score = None, -1.0
+            for index, (run_id, cost_json, affinity_json, created_at) in enumerate(rows):
+                waited = now - created_at
+                if index == 0 and waited > self.AFFINITY_WAIT:
+                    chosen = run_id
+                    break
+
+                cost = json.loads(cost_json)
+                if memory_mb and cost.get('memory_mb', 0) > memory_mb:
+                    continue  # Would not fit this box at all
+
+                affinity = set(json.loads(affinity_json))
+                score = len(affinity & cached_keys) / len(affinity) if affinity else 0.0
+                if (affinity and waited < self.AFFINITY_WAIT
+                        and any(len(affinity & keys) / len(affinity) > score for keys in others)):
+                    continue  # Another worker has more of these clips; let it take the job
+                if score > best_score:
+                    chosen, best_score = run_id, score
+
+            if chosen is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'claimed', worker_id = ?, attempts = attempts + 1, "
+                "claimed_at = ?, lease_expires = ? WHERE run_id = ?",
+                (worker_id, now, now + self.LEASE_SECONDS, chosen)
+            )
+            return self._row_to_job(conn.execute("SELECT * FROM jobs WHERE run_id = ?", (chosen,)).fetchone())
+
+    def mark_running(self, run_id, worker_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', lease_expires = ? "
+                "WHERE run_id = ? AND worker_id = ? AND status = 'claimed'",
+                (time.time() + self.LEASE_SECONDS, run_id, worker_id)
+            )
+
+    def renew(self, worker_id, run_ids):
+        run_ids = list(run_ids)
+        if not run_ids:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE run_id = ? AND worker_id = ? "
+                "AND status IN ('claimed', 'running')",
+                [(time.time() + self.LEASE_SECONDS, run_id, worker_id) for run_id in run_ids]
+            )
+
+    def finish(self, run_id, status, error=None):
+        """Record a final status unless one was already set (e.g. by a done event)"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(?, error), finished_at = ? "
+                f"WHERE run_id = ? AND status NOT IN {TERMINAL_STATUSES}",
+                (status, error, time.time(), run_id)
+            )
+
+    def cancel(self, run_id):
+        """Cancel a job no worker has claimed yet"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE run_id = ? AND status = 'pending'",
+                (time.time(), run_id)
+            )
+            return cursor.rowcount > 0
+
+    def get(self, run_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def stats(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    # ─── Events ──────────────────────────────────────────────────────
+
+    def append_event(self, run_id, payload):
+        """Publish a job event; 'done' / 'error' events also settle the job status"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO events (run_id, payload_json, created_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(payload, default=str), now)
+            )
+            event_type = payload.get('type')
+            if event_type in ('done', 'error'):
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+                    f"WHERE run_id = ? AND status NOT IN {TERMINAL_STATUSES}",
+                    ('completed' if event_type == 'done' else 'failed',
+                     payload.get('message') if event_type == 'error' else None, now, run_id)
+                )
+
+    def events_since(self, last_id, limit=500):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, run_id, payload_json FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit)
+            ).fetchall()
+        return [(event_id, run_id, json.loads(payload)) for event_id, run_id, payload in rows]
+
+    def last_event_id(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    # ─── Workers ─────────────────────────────────────────────────────
+
+    def register_worker(self, worker_id, info, cached_keys=()):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, info_json, keys_json, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET info_json = excluded.info_json, "
+                "keys_json = excluded.keys_json, last_seen = excluded.last_seen",
+                (worker_id, json.dumps(info, default=str), json.dumps(sorted(cached_keys)), time.time())
+            )
+
+    def workers(self):
+        """Workers seen within WORKER_TIMEOUT, with their running jobs"""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT worker_id, info_json, last_seen FROM workers WHERE last_seen > ? ORDER BY worker_id",
+                (now - self.WORKER_TIMEOUT,)
+            ).fetchall()
+            running = conn.execute(
+                "SELECT worker_id, run_id FROM jobs WHERE status IN ('claimed', 'running')"
+            ).fetchall()
+        jobs_by_worker: Dict[str, List[str]] = {}
+        for worker_id, run_id in running:
+            jobs_by_worker.setdefault(worker_id, []).append(run_id)
+        return [
+            {'worker_id': worker_id, 'last_seen': round(now - last_seen, 1),
+             'jobs': jobs_by_worker.get(worker_id, []), **json.loads(info_json)}
+            for worker_id, info_json, last_seen in rows
+        ]
+
+    # ─── Internals ───────────────────────────────────────────────────
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float):
+        """Give jobs of dead workers back to the queue (or fail them after MAX_ATTEMPTS)"""
+        expired = conn.execute(
+            "SELECT run_id, attempts, worker_id FROM jobs "
+            "WHERE status IN ('claimed', 'running') AND lease_expires < ?",
+            (now,)
+        ).fetchall()
+        for run_id, attempts, worker_id in expired:
+            if attempts < self.MAX_ATTEMPTS:
+                logger.warning(f"[FARM] Lease of {run_id} on {worker_id} expired; requeueing")
+                conn.execute(
+                    "UPDATE jobs SET status = 'pending', worker_id = NULL, lease_expires = NULL WHERE run_id = ?",
+                    (run_id,)
+                )
+            else:
+                message = f"Worker {worker_id} stopped responding ({attempts} attempts)"
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE run_id = ?",
+                    (message, now, run_id)
+                )
+                conn.execute(
+                    "INSERT INTO events (run_id, payload_json, created_at) VALUES (?, ?, ?)",
+                    (run_id, json.dumps({'type': 'error', 'message': message}), now)
+                )
+        conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.EVENT_RETENTION,))
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['job'] = json.loads(job.pop('job_json'))
+        job['cost'] = json.loads(job.pop('cost_json'))
+        job['affinity'] = json.loads(job.pop('affinity_json'))
+        return job
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread, in autocommit mode"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout = 30000")
+            self._local.conn = conn
+        return _NoCloseConnection(conn)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE: take the write lock up front so claims never race"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+class _NoCloseConnection:
+    """Context manager over a cached connection that leaves it open"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, *exc):
+        return False
+
+
+def open_job_store(url: str) -> JobStore:
+    """
+    Open a job store from a URL.
+
+    Supported:
+        sqlite:///absolute/path/jobs.db
+        /plain/path/jobs.db (treated as SQLite)
+    """
+    if url.startswith('sqlite:///'):
+        return SQLiteJobStore(Path(url[len('sqlite:///') - 1:]))
+    if '://' not in url:
+        return SQLiteJobStore(Path(url).expanduser())
+    raise ValueError(f"Unsupported job store URL: {url}")
@@ -11,7 +11,6 @@ import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, Callable
-from elevenlabs import ElevenLabs
 from openai import OpenAI
 
 from massugc_api_client import create_massugc_client, MassUGCApiError,MassUGCApiClient, MassUGCApiKeyManager
@@ -119,8 +118,9 @@ async def create_massugc_video_job(
         if not elevenlabs_api_key:
             return False, "ElevenLabs API key is required for audio generation"
         
-        # Initialize ElevenLabs client
-        eleven_client = ElevenLabs(api_key=elevenlabs_api_key)
+        # Shared ElevenLabs client (pooled per API key)
+        from backend.services.api_clients import APIClientRegistry
+        eleven_client = APIClientRegistry.get_elevenlabs_client(elevenlabs_api_key)
         
         # Use the example script content directly
         script_text = example_script_content
@@ -15,6 +15,10 @@ import hashlib
 import logging
 import subprocess
 import shutil
+import bisect
+import threading
+import time
+import atexit
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
@@ -25,7 +29,6 @@ from mutagen import File as AudioFile
 from mutagen.mp3 import MP3
 from mutagen.mp4 import MP4
 import librosa
-import soundfile as sf
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -157,12 +160,25 @@ CATEGORY_VOLUME_PRESETS = {
 }
 
 
+# Supported audio extensions picked up by directory scans
+SUPPORTED_MUSIC_FORMATS = ['.mp3', '.m4a', '.wav', '.ogg', '.flac']
+
+# Usage statistics are flushed to disk after this many picks or this many seconds
+USAGE_FLUSH_EVERY_PICKS = 10
+USAGE_FLUSH_INTERVAL_SECONDS = 30.0
+
+
 # ============== Main Music Library Manager ==============
 
 class MusicLibrary:
     """
     Enterprise-grade music library manager with intelligent selection
     and audio processing capabilities.
+    
+    Tracks are indexed by category and mood (inverted indexes) and by BPM
+    and duration (sorted lists), so candidate lookup is a set intersection
+    plus binary searches instead of repeated linear scans. Use
+    get_shared_music_library() to reuse one instance across renders.
     """
     
     def __init__(self, library_dir: Optional[Path] = None):
@@ -173,8 +189,24 @@ class MusicLibrary:
         self.metadata_file = self.library_dir / "music_library.yaml"
         self.tracks: Dict[str, TrackMetadata] = {}
         self.categories: Dict[MusicCategory, List[str]] = {cat: [] for cat in MusicCategory}
+        self.moods: Dict[MusicMood, List[str]] = {mood: [] for mood in MusicMood}
         self.recently_used: List[str] = []
         
+        # Sorted (value, track_id) pairs for range queries
+        self._bpm_index: List[Tuple[float, str]] = []
+        self._duration_index: List[Tuple[float, str]] = []
+        
+        # Guards shared state when one instance serves several job threads
+        self._lock = threading.RLock()
+        
+        # Batched usage persistence
+        self._pending_usage_writes = 0
+        self._last_flush_time = time.monotonic()
+        
+        # File-watch state (mtimes seen at last load/scan/save)
+        self._dir_mtime: Optional[float] = None
+        self._metadata_mtime: Optional[float] = None
+        
         # Load existing library
         self._load_library()
         
@@ -182,6 +214,48 @@ class MusicLibrary:
         self._scan_directory()
     
     
+    def refresh_if_changed(self) -> bool:
+        """
+        Rescan the library if the music folder or metadata file changed on disk.
+        
+        Only two stat() calls when nothing changed, so it is cheap enough to
+        call before every selection.
+        
+        Returns:
+            True if the library was reloaded or rescanned
+        """
+        with self._lock:
+            metadata_mtime = self._stat_mtime(self.metadata_file)
+            dir_mtime = self._stat_mtime(self.library_dir)
+            
+            if metadata_mtime != self._metadata_mtime:
+                # Another process rewrote the library file - reload from scratch
+                logger.info("Music library file changed on disk, reloading")
+                self._pending_usage_writes = 0
+                self.tracks = {}
+                self.categories = {cat: [] for cat in MusicCategory}
+                self.moods = {mood: [] for mood in MusicMood}
+                self.recently_used = []
+                self._load_library()
+                self._scan_directory()
+                return True
+            
+            if dir_mtime != self._dir_mtime:
+                logger.info("Music folder changed on disk, rescanning")
+                self._prune_missing_tracks()
+                self._scan_directory()
+                return True
+            
+            return False
+    
+    
+    def flush(self):
+        """Persist pending usage statistics to disk."""
+        with self._lock:
+            if self._pending_usage_writes:
+                self._save_library()
+    
+    
     def select_track(
         self,
         config: Optional[MusicSelectionConfig] = None,
@@ -195,22 +269,23 @@ class MusicLibrary:
         """
         config = config or MusicSelectionConfig()
         
-        # Get candidate tracks
-        candidates = self._get_candidate_tracks(config, video_duration)
-        
-        if not candidates:
-            logger.warning("No suitable tracks found with given criteria")
-            return None
-        
-        # Select track
-        if config.random_selection:
-            selected = random.choice(candidates)
-        else:
-            # Select based on best match score
-            selected = self._select_best_match(candidates, config)
-        
-        # Update usage statistics
-        self._update_usage(selected)
+        with self._lock:
+            # Get candidate tracks
+            candidates = self._get_candidate_tracks(config, video_duration)
+            
+            if not candidates:
+                logger.warning("No suitable tracks found with given criteria")
+                return None
+            
+            # Select track
+            if config.random_selection:
+                selected = random.choice(candidates)
+            else:
+                # Select based on best match score
+                selected = self._select_best_match(candidates, config)
+            
+            # Update usage statistics
+            self._update_usage(selected)
         
         return selected
     
@@ -297,11 +372,11 @@ class MusicLibrary:
         )
         
         # Add to library
-        self.tracks[track_id] = track_metadata
-        self.categories[track_metadata.category].append(track_id)
-        
-        # Save library
-        self._save_library()
+        with self._lock:
+            self._index_track(track_metadata)
+            
+            # Save library
+            self._save_library()
         
         logger.info(f"Added track: {track_metadata.title} (ID: {track_id})")
         return track_metadata
@@ -319,48 +394,30 @@ class MusicLibrary:
         """
         Prepare music track for video (trim, loop, adjust volume)
         
+        Served from the shared music asset cache: the track is decoded once to
+        44.1 kHz stereo and each (duration, fades, gain) variant is written
+        atomically, so concurrent jobs using the same track don't collide.
+        Without a fade-out the file may run past video_duration (variants
+        are shared across nearby lengths), so trim it when mixing.
+        
         Returns:
             Path to processed audio file
         """
-        output_path = self.library_dir / "processed" / f"{track.id}_processed.mp3"
-        output_path.parent.mkdir(exist_ok=True)
-        
-        # Load audio
-        audio, sr = librosa.load(track.path, sr=None)
-        
-        # Adjust length
-        if track.duration < video_duration and loop:
-            # Loop the track
-            repeats = int(np.ceil(video_duration / track.duration))
-            audio = np.tile(audio, repeats)
-        
-        # Trim to video duration
-        target_samples = int(video_duration * sr)
-        audio = audio[:target_samples]
-        
-        # Apply fades
-        # Fade-in disabled
-        # if fade_in > 0:
-        #     fade_in_samples = int(fade_in * sr)
-        #     fade_in_curve = np.linspace(0, 1, fade_in_samples)
-        #     audio[:fade_in_samples] *= fade_in_curve
-        
-        if fade_out > 0:
-            fade_out_samples = int(fade_out * sr)
-            fade_out_curve = np.linspace(1, 0, fade_out_samples)
-            audio[-fade_out_samples:] *= fade_out_curve
+        from backend.services.music_cache import MusicAssetCache
         
         # Adjust volume
         if volume_db is None:
             volume_db = CATEGORY_VOLUME_PRESETS.get(track.category, -25)
         
-        volume_factor = 10 ** (volume_db / 20)
-        audio *= volume_factor
-        
-        # Save processed audio
-        sf.write(str(output_path), audio, sr, format='mp3')
-        
-        return str(output_path)
+        # Fade-in disabled
+        return MusicAssetCache.get_variant(
+            track.path,
+            duration=video_duration,
+            volume_db=volume_db,
+            fade_in=0.0,
+            fade_out=fade_out,
+            loop=loop
+        )
     
     
     def calculate_optimal_volume(
@@ -487,13 +544,14 @@ class MusicLibrary:
                     data = yaml.safe_load(f) or {}
                 
                 for track_data in data.get('tracks', []):
-                    track = TrackMetadata.from_dict(track_data)
-                    self.tracks[track.id] = track
-                    self.categories[track.category].append(track.id)
+                    self._index_track(TrackMetadata.from_dict(track_data), rebuild=False)
                 
                 self.recently_used = data.get('recently_used', [])
             except Exception as e:
                 logger.error(f"Failed to load library: {e}")
+        
+        self._rebuild_indexes()
+        self._metadata_mtime = self._stat_mtime(self.metadata_file)
     
     
     def _save_library(self):
@@ -504,8 +562,20 @@ class MusicLibrary:
                 'recently_used': self.recently_used[-20:]  # Keep last 20
             }
             
-            with open(self.metadata_file, 'w') as f:
+            # Our own write touches the folder mtime; don't treat it as a change
+            dir_unchanged = self._stat_mtime(self.library_dir) == self._dir_mtime
+            
+            # Write to a temp file and swap it in so readers never see a partial file
+            tmp_file = self.metadata_file.with_suffix('.yaml.tmp')
+            with open(tmp_file, 'w') as f:
                 yaml.dump(data, f, default_flow_style=False)
+            os.replace(tmp_file, self.metadata_file)
+            
+            self._pending_usage_writes = 0
+            self._last_flush_time = time.monotonic()
+            self._metadata_mtime = self._stat_mtime(self.metadata_file)
+            if dir_unchanged:
+                self._dir_mtime = self._stat_mtime(self.library_dir)
             
             logger.debug("Library saved successfully")
         except Exception as e:
@@ -514,10 +584,10 @@ class MusicLibrary:
     
     def _scan_directory(self):
         """Scan directory for new music files"""
-        supported_formats = ['.mp3', '.m4a', '.wav', '.ogg', '.flac']
+        added = False
         
         for file_path in self.library_dir.iterdir():
-            if file_path.suffix.lower() in supported_formats:
+            if file_path.suffix.lower() in SUPPORTED_MUSIC_FORMATS:
                 track_id = self._generate_track_id(file_path.name)
                 
                 if track_id not in self.tracks:
@@ -539,15 +609,94 @@ class MusicLibrary:
                             **audio_info
                         )
                         
-                        self.tracks[track_id] = track
-                        self.categories[category].append(track_id)
+                        self._index_track(track, rebuild=False)
+                        added = True
                         
                     except Exception as e:
                         logger.error(f"Failed to analyze {file_path.name}: {e}")
         
+        if added:
+            self._rebuild_indexes()
+        
         # Save updated library
-        if self.tracks:
+        if added or (self.tracks and not self.metadata_file.exists()):
             self._save_library()
+        
+        self._dir_mtime = self._stat_mtime(self.library_dir)
+    
+    
+    def _prune_missing_tracks(self):
+        """Drop tracks whose files were removed from the music folder"""
+        missing = [tid for tid, t in self.tracks.items() if not os.path.exists(t.path)]
+        
+        for track_id in missing:
+            logger.info(f"Track file missing, removing from library: {self.tracks[track_id].filename}")
+            self._unindex_track(track_id, rebuild=False)
+        
+        if missing:
+            self._rebuild_indexes()
+            self._save_library()
+    
+    
+    def _index_track(self, track: TrackMetadata, rebuild: bool = True):
+        """Add a track to the tracks dict and the category/mood indexes"""
+        if track.id in self.tracks:
+            self._unindex_track(track.id, rebuild=False)
+        
+        self.tracks[track.id] = track
+        self.categories[track.category].append(track.id)
+        self.moods[track.mood].append(track.id)
+        
+        if rebuild:
+            self._rebuild_indexes()
+    
+    
+    def _unindex_track(self, track_id: str, rebuild: bool = True):
+        """Remove a track from the tracks dict and all indexes"""
+        track = self.tracks.pop(track_id, None)
+        if track is None:
+            return
+        
+        if track_id in self.categories[track.category]:
+            self.categories[track.category].remove(track_id)
+        if track_id in self.moods[track.mood]:
+            self.moods[track.mood].remove(track_id)
+        if track_id in self.recently_used:
+            self.recently_used.remove(track_id)
+        
+        if rebuild:
+            self._rebuild_indexes()
+    
+    
+    def _rebuild_indexes(self):
+        """Rebuild the sorted BPM and duration indexes"""
+        self._bpm_index = sorted(
+            (t.bpm, t.id) for t in self.tracks.values() if t.bpm
+        )
+        self._duration_index = sorted(
+            (t.duration, t.id) for t in self.tracks.values()
+        )
+    
+    
+    @staticmethod
+    def _range_ids(
+        index: List[Tuple[float, str]],
+        low: Optional[float] = None,
+        high: Optional[float] = None
+    ) -> set:
+        """Track IDs whose indexed value lies in [low, high] (binary search)"""
+        start = bisect.bisect_left(index, (low, '')) if low is not None else 0
+        end = bisect.bisect_right(index, (high, '\uffff')) if high is not None else len(index)
+        return {track_id for _, track_id in index[start:end]}
+    
+    
+    @staticmethod
+    def _stat_mtime(path: Path) -> Optional[float]:
+        """mtime of a path, or None if it does not exist"""
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
     
     
     def _analyze_audio(self, file_path: Path) -> Dict[str, Any]:
@@ -646,33 +795,46 @@ class MusicLibrary:
         video_duration: Optional[float] = None
     ) -> List[TrackMetadata]:
         """Get candidate tracks based on criteria"""
-        candidates = list(self.tracks.values())
+        candidate_ids = None
+        
+        def narrow(ids):
+            nonlocal candidate_ids
+            ids = set(ids)
+            candidate_ids = ids if candidate_ids is None else candidate_ids & ids
         
         # Filter by category
         if config.category:
-            candidates = [t for t in candidates if t.category == config.category]
+            narrow(self.categories.get(config.category, []))
         
         # Filter by mood
         if config.mood:
-            candidates = [t for t in candidates if t.mood == config.mood]
+            narrow(self.moods.get(config.mood, []))
         
         # Filter by BPM
-        if config.min_bpm:
-            candidates = [t for t in candidates if t.bpm and t.bpm >= config.min_bpm]
-        if config.max_bpm:
-            candidates = [t for t in candidates if t.bpm and t.bpm <= config.max_bpm]
+        if config.min_bpm or config.max_bpm:
+            narrow(self._range_ids(self._bpm_index, config.min_bpm or None, config.max_bpm or None))
+        
+        # Filter by explicit duration range
+        if config.min_duration or config.max_duration:
+            narrow(self._range_ids(
+                self._duration_index, config.min_duration or None, config.max_duration or None
+            ))
         
         # Filter by duration
         if video_duration:
             # Prefer tracks that are at least half the video duration
-            min_duration = video_duration * 0.5
-            candidates = [t for t in candidates if t.duration >= min_duration or t.duration >= 30]
+            min_duration = min(video_duration * 0.5, 30)
+            narrow(self._range_ids(self._duration_index, min_duration))
+        
+        if candidate_ids is None:
+            candidate_ids = set(self.tracks)
         
         # Filter recently used
         if config.exclude_recently_used:
-            candidates = [t for t in candidates if t.id not in self.recently_used]
+            candidate_ids.difference_update(self.recently_used)
         
-        return candidates
+        # Sort so selection order does not depend on set iteration order
+        return [self.tracks[tid] for tid in sorted(candidate_ids) if tid in self.tracks]
     
     
     def _select_best_match(
@@ -717,8 +879,11 @@ class MusicLibrary:
             self.recently_used.remove(track.id)
         self.recently_used.append(track.id)
         
-        # Save updated library
-        self._save_library()
+        # Batch usage writes instead of rewriting the library on every pick
+        self._pending_usage_writes += 1
+        if (self._pending_usage_writes >= USAGE_FLUSH_EVERY_PICKS or
+                time.monotonic() - self._last_flush_time >= USAGE_FLUSH_INTERVAL_SECONDS):
+            self._save_library()
     
     
     def _get_most_used_tracks(self, count: int) -> List[Dict]:
@@ -752,26 +917,24 @@ class MusicLibrary:
             bool: True if track was deleted successfully
         """
         try:
-            if track_id not in self.tracks:
-                logger.warning(f"Track {track_id} not found for deletion")
-                return False
-            
-            track = self.tracks[track_id]
-            
-            # Delete the physical file if it exists
-            if os.path.exists(track.path):
-                os.remove(track.path)
-                logger.info(f"Deleted physical file: {track.path}")
-            
-            # Remove from tracks dictionary
-            del self.tracks[track_id]
-            
-            # Remove from recently used if present
-            if track_id in self.recently_used:
-                self.recently_used.remove(track_id)
-            
-            # Save updated library
-            self._save_library()
+            with self._lock:
+                if track_id not in self.tracks:
+                    logger.warning(f"Track {track_id} not found for deletion")
+                    return False
+                
+                track = self.tracks[track_id]
+                
+                # Delete the physical file if it exists
+                if os.path.exists(track.path):
+                    os.remove(track.path)
+                    logger.info(f"Deleted physical file: {track.path}")
+                
+                # Remove from tracks dictionary and indexes (incl. recently used)
+                self._unindex_track(track_id)
+                
+                # Save updated library
+                self._save_library()
+                self._dir_mtime = self._stat_mtime(self.library_dir)
             
             logger.info(f"Successfully deleted track {track_id}: {track.title}")
             return True
@@ -796,6 +959,41 @@ class MusicLibrary:
         return results
 
 
+# ============== Shared Instance ==============
+
+_shared_libraries: Dict[str, MusicLibrary] = {}
+_shared_libraries_lock = threading.Lock()
+
+
+def get_shared_music_library(library_dir: Optional[Path] = None) -> MusicLibrary:
+    """
+    Get the process-wide MusicLibrary for a folder, creating it on first use.
+    
+    The library JSON/YAML is loaded and the folder scanned only once; later
+    calls just check the folder and metadata mtimes and rescan on change.
+    """
+    key = str(library_dir) if library_dir else ''
+    
+    with _shared_libraries_lock:
+        library = _shared_libraries.get(key)
+        if library is None:
+            library = MusicLibrary(library_dir)
+            _shared_libraries[key] = library
+            return library
+    
+    library.refresh_if_changed()
+    return library
+
+
+def _flush_shared_libraries():
+    """Persist batched usage stats on interpreter shutdown"""
+    for library in list(_shared_libraries.values()):
+        library.flush()
+
+
+atexit.register(_flush_shared_libraries)
+
+
 # ============== Testing ==============
 
 if __name__ == "__main__":
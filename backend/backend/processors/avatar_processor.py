@@ -7,8 +7,7 @@ Handles video generation for Avatar campaigns using AI-powered lip-sync technolo
 from typing import Callable, Optional
 
 from .base_processor import BaseCampaignProcessor
-from backend.services import FileService
-from backend.create_video import create_video_job
+from backend.services import FileService, LazyLoader
 
 
 class AvatarCampaignProcessor(BaseCampaignProcessor):
@@ -100,6 +99,9 @@ class AvatarCampaignProcessor(BaseCampaignProcessor):
         except Exception as e:
             return False, f"Failed to read script file: {str(e)}"
         
+        # Whisper / torch load with the pipeline, on the first Avatar job
+        create_video_job = LazyLoader.load('avatar_pipeline').create_video_job
+
         # Call the existing create_video_job function with all parameters
         return create_video_job(
             # Core parameters
@@ -12,7 +12,7 @@ from typing import Callable, Optional
 from pathlib import Path
 
 from .base_processor import BaseCampaignProcessor
-from backend.services import FileService, TTSService, ScriptService, AudioService
+from backend.services import FileService, TTSService, ScriptService, AudioService, Tracer
 from backend.clip_stitch_generator import build_clip_stitch_video_smart
 
 
@@ -145,9 +145,11 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
         job_start = time.time()
         
         temp_audio_path = None
+        pending_voiceover = None
         
         try:
             # Step 1: Initialization
+            Tracer.stage("initialization", step="1")
             progress_callback(step, total_steps, steps[step])
             step += 1
             
@@ -211,6 +213,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             
             if use_voiceover:
                 # Step 2a: Read script file
+                Tracer.stage("read_script", step="2a")
                 progress_callback(step, total_steps, steps[step])
                 step += 1
                 
@@ -222,6 +225,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 print(f"[{job_name}] Script file loaded ({len(script_content)} characters)")
                 
                 # Step 2b: Generate or use exact script
+                Tracer.stage("generate_script", step="2b")
                 progress_callback(step, total_steps, steps[step])
                 step += 1
                 
@@ -248,23 +252,24 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 print(f"[{job_name}] Script ready: {final_script[:100]}...")
                 
                 # Step 2c: Generate audio
+                Tracer.stage("generate_audio", step="2c")
                 progress_callback(step, total_steps, steps[step])
                 step += 1
                 
                 print(f"[{job_name}] Generating voiceover audio")
                 temp_audio_path = FileService.get_temp_audio_path(job_name)
                 
-                success, error = TTSService.generate_audio(
+                # Synthesize in the background; clip selection and normalization
+                # start from the duration estimate and wait for the audio at merge
+                pending_voiceover = TTSService.start_audio(
                     api_key=elevenlabs_key,
                     script_text=final_script,
                     voice_id=voice_id,
                     output_path=temp_audio_path,
                     language=language
                 )
-                if not success:
-                    return False, error
                 
-                print(f"[{job_name}] Audio generated: {temp_audio_path}")
+                print(f"[{job_name}] Voiceover rendering (estimated {pending_voiceover.estimated_duration:.1f}s): {temp_audio_path}")
             else:
                 print(f"[{job_name}] Voiceover disabled - skipping script/audio generation")
                 # Skip script and audio steps
@@ -274,6 +279,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                     return False, "Manual duration required when voiceover is disabled"
             
             # Step 5: Stitch video clips with SMART processing (GPU + caching)
+            Tracer.stage("stitch_clips", step="5")
             progress_callback(step, total_steps, steps[step])
             step += 1
             
@@ -290,6 +296,19 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             print(f"[{job_name}] Stitching video clips (smart mode)")
             output_path = FileService.get_output_path(product_for_path, job_name, output_dir)
             
+            # Music goes into the stitch render unless randomization re-encodes
+            # the video in between (it must not warp the music bed)
+            use_randomization = job_config.get('use_randomization', False)
+            music_config = None
+            if enhanced_settings:
+                try:
+                    music_config = self._parse_music(enhanced_settings.get('music', {}))
+                except Exception as e:
+                    print(f"[{job_name}] Music selection failed: {e}")
+            music_in_timeline = bool(music_config and music_config.track_path and not use_randomization)
+            if music_in_timeline:
+                print(f"[{job_name}] Mixing background music in the stitch render")
+            
             success, result = build_clip_stitch_video_smart(
                 random_source_dir=source_dir,
                 output_path=output_path,
@@ -297,7 +316,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 canvas_height=canvas_height,
                 crop_mode=crop_mode,
                 target_duration=target_duration,  # Used if no voiceover
-                tts_audio_path=temp_audio_path,  # None if voiceover disabled
+                pending_voiceover=pending_voiceover,  # None if voiceover disabled
                 random_count=total_clips,
                 hook_video=hook_video,
                 original_volume=original_volume,
@@ -305,6 +324,10 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 clip_duration_mode=clip_duration_mode,
                 clip_duration_fixed=clip_duration_fixed,
                 clip_duration_range=clip_duration_range,
+                music_path=music_config.track_path if music_in_timeline else None,
+                music_volume_db=music_config.volume_db if music_in_timeline else -25.0,
+                extend_music=duration_source != 'voiceover',
+                debug_level=job_config.get('pipeline_debug'),
                 extensions=(".mp4", ".mov", ".mkv", ".avi", ".hevc", ".m4v", ".webm")
             )
             
@@ -314,10 +337,10 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             print(f"[{job_name}] Video stitched successfully (smart processing)")
             
             # Step 6: Apply video effects (randomization)
+            Tracer.stage("randomization", step="6")
             progress_callback(step, total_steps, steps[step])
             step += 1
             
-            use_randomization = job_config.get('use_randomization', False)
             if use_randomization:
                 print(f"[{job_name}] Applying video randomization effects")
                 randomization_intensity = job_config.get('randomization_intensity', 'medium')
@@ -347,11 +370,18 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 print(f"[{job_name}] Randomization not enabled")
             
             # Step 7: Enhanced Video Features (music, captions, text overlays)
+            Tracer.stage("enhanced_video_processing", step="7")
             progress_callback(step, total_steps, "Applying enhanced features")
             step += 1
             
             enhanced_settings = job_config.get('enhanced_settings')
-            if enhanced_settings:
+            overlays_configured = enhanced_settings and (
+                any(overlay.get('enabled') for overlay in enhanced_settings.get('text_overlays') or [])
+                or (enhanced_settings.get('captions') or {}).get('enabled')
+            )
+            if enhanced_settings and music_in_timeline and not overlays_configured:
+                print(f"[{job_name}] Music already mixed, no overlays configured - skipping enhanced pass")
+            elif enhanced_settings:
                 print(f"[{job_name}] Applying enhanced video features...")
                 
                 try:
@@ -368,7 +398,6 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                     # Parse enhancement configurations (reuse Avatar logic)
                     text_configs = self._parse_text_overlays(enhanced_settings.get('text_overlays', []), job_config, openai_key)
                     caption_config = self._parse_captions(enhanced_settings.get('captions', {}))
-                    music_config = self._parse_music(enhanced_settings.get('music', {}))
                     
                     # Determine audio source for captions (NEW: supports music-based captions)
                     caption_audio_path = temp_audio_path  # Default to voiceover
@@ -402,7 +431,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                         output_path=enhanced_output_path,
                         text_configs=text_configs,
                         caption_config=caption_config,
-                        music_config=music_config,
+                        music_config=None if music_in_timeline else music_config,
                         audio_path=caption_audio_path,  # Now supports voiceover OR music
                         extend_music_to_video_duration=extend_music  # SPLICE-SPECIFIC: extend music when using music/manual duration
                     )
@@ -425,6 +454,7 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
                 print(f"[{job_name}] No enhanced features configured")
             
             # Step 8: Finalize
+            Tracer.stage("finalize", step="8")
             progress_callback(step, total_steps, steps[step])
             
             duration = time.time() - job_start
@@ -442,6 +472,10 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             return False, error_msg
             
         finally:
+            # Don't delete the voiceover out from under a synthesis still in flight
+            if pending_voiceover and not pending_voiceover.done:
+                pending_voiceover.wait()
+            
             # Cleanup temporary files
             if temp_audio_path:
                 FileService.cleanup_temp_file(temp_audio_path)
@@ -572,10 +606,10 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             return None
             
         from backend.enhanced_video_processor import MusicConfig
-        from backend.music_library import MusicLibrary, MusicSelectionConfig, MusicCategory
+        from backend.music_library import get_shared_music_library, MusicSelectionConfig, MusicCategory
         
-        # Initialize music library (same as Avatar)
-        music_library = MusicLibrary()
+        # Shared music library (same as Avatar)
+        music_library = get_shared_music_library()
         
         # Select track (EXACTLY like Avatar does it)
         track_id = music_data.get('track_id')
@@ -654,10 +688,10 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
         if not music_data or not music_data.get('enabled'):
             return None
         
-        from backend.music_library import MusicLibrary, MusicSelectionConfig, MusicCategory
+        from backend.music_library import get_shared_music_library, MusicSelectionConfig, MusicCategory
         
         try:
-            music_library = MusicLibrary()
+            music_library = get_shared_music_library()
             track_id = music_data.get('track_id')
             selected_track = None
             
@@ -700,8 +734,8 @@ class SpliceCampaignProcessor(BaseCampaignProcessor):
             music_settings = enhanced_settings.get('music', {})
             if music_settings.get('enabled') and music_settings.get('track_id'):
                 try:
-                    from backend.music_library import MusicLibrary
-                    library = MusicLibrary()
+                    from backend.music_library import get_shared_music_library
+                    library = get_shared_music_library()
                     # Access track directly from tracks dict (same as enhanced_video_processor)
                     track_metadata = library.tracks.get(music_settings['track_id'])
                     if track_metadata and track_metadata.duration:
@@ -16,6 +16,8 @@ import glob  # Added for clip variants later (good to have imports ready)
 import yaml  # Added for loading overlay positions later
 import math
 
+from backend.services.ffmpeg_runner import FFmpegRunner
+
 # --- Helper Functions ---
 
 
@@ -39,39 +41,27 @@ def generate_random_string(length=10):
     return "".join(random.choices(string.ascii_letters + string.digits, k=length))
 
 
-def run_ffmpeg_command(cmd_list):
-    """Executes an FFmpeg command using subprocess."""
+def run_ffmpeg_command(cmd_list, label="randomization"):
+    """Executes an FFmpeg command via FFmpegRunner (live progress, duration-scaled timeout)."""
     try:
-        # Import locally to avoid circular import
-        from backend.create_video import calculate_ffmpeg_timeout
-        
         print(f"Running FFmpeg command: {' '.join(cmd_list)}")
-        process = subprocess.Popen(
+        result = FFmpegRunner.run(
             cmd_list,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            label=label,
+            capture_output=True,
             text=True,
             encoding="utf-8",
             errors="ignore",
         )
-        stdout, stderr = process.communicate(timeout=calculate_ffmpeg_timeout(1800, "randomization_encoding"))  # Dynamic timeout - was 30 minutes
-        if process.returncode != 0:
+        if result.returncode != 0:
             print("FFmpeg Error Output:")
-            print(stderr)
-            return False, stderr
+            print(result.stderr)
+            return False, result.stderr
         else:
-            # print("FFmpeg Output:") # Optional: print stdout for debugging
-            # print(stdout)
             return True, None
-    except subprocess.TimeoutExpired:
-        print("FFmpeg command timed out.")
-        # Attempt to kill the process if it's still running
-        if process and process.poll() is None:
-            try:
-                process.kill()
-                print("Killed hung FFmpeg process.")
-            except Exception as kill_e:
-                print(f"Error trying to kill FFmpeg process: {kill_e}")
+    except subprocess.TimeoutExpired as e:
+        # FFmpegRunner has already killed the process
+        print(f"FFmpeg command timed out after {e.timeout:.0f}s.")
         return False, "FFmpeg command timed out"
     except FileNotFoundError:
         print(
@@ -1721,7 +1711,7 @@ def apply_ffmpeg_effects_and_reencode_randomized(
     cmd.extend(metadata_params)
     cmd.append(output_path)
 
-    success, error = run_ffmpeg_command(cmd)
+    success, error = run_ffmpeg_command(cmd, label="randomization_encode")
     return success, error, ffmpeg_log
 
 
@@ -1830,7 +1820,7 @@ def randomize_video(
             "copy",
             temp_audio_original_path,
         ]
-        success, err = run_ffmpeg_command(extract_cmd)
+        success, err = run_ffmpeg_command(extract_cmd, label="randomization_extract_audio")
         if not success or not os.path.exists(temp_audio_original_path):
             raise RuntimeError(f"Failed to extract audio from {input_path}: {err}")
 
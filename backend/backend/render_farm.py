@@ -0,0 +1,251 @@
+"""
+Render Farm Mode for MassUGC Studio
+Several backend instances share one JobStore: the instance that accepts a
+job enqueues it, any instance running a FarmWorker may claim it, and job
+events flow back through the store to the accepting instance's SSE stream.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.job_scheduler import JobCost, JobScheduler
+from backend.job_store import JobStore, TERMINAL_STATUSES
+from backend.services.clip_cache import ClipCache
+from backend.services.gpu_detector import GPUEncoder
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".avi", ".hevc", ".m4v", ".webm")
+
+
+def splice_clip_sources(job: Dict[str, Any]) -> Optional[Tuple[List[str], int, int, str, str]]:
+    """
+    Source clips of a Splice job and the normalization they go through.
+
+    Returns:
+        (clip_paths, canvas_width, canvas_height, crop_mode, audio_mode),
+        or None for other campaign types / unreadable folders
+    """
+    splice = job.get("random_video_settings") or {}
+    source_dir = splice.get("source_directory")
+    if not source_dir:
+        return None
+
+    try:
+        clips = sorted(str(p) for p in Path(source_dir).iterdir()
+                       if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS)
+    except OSError:
+        return None
+    audio_mode = 'strip' if splice.get("original_volume", 0.6) == 0 else 'keep'
+    return (clips, splice.get("canvas_width", 1080), splice.get("canvas_height", 1920),
+            splice.get("crop_mode", "center"), audio_mode)
+
+
+def clip_affinity_keys(job: Dict[str, Any]) -> List[str]:
+    """
+    ClipCache keys a Splice job's source clips normalize to.
+
+    Workers that already hold these keys skip normalization, so the store
+    routes the job to them first. Other campaign types have no affinity.
+    """
+    sources = splice_clip_sources(job)
+    if not sources:
+        return []
+    clips, canvas_width, canvas_height, crop_mode, audio_mode = sources
+    return [ClipCache.get_cache_key(clip, canvas_width, canvas_height, crop_mode, audio_mode) for clip in clips]
+
+
+def worker_capabilities(scheduler: JobScheduler) -> Dict[str, Any]:
+    """What a worker advertises to the farm"""
+    return {
+        'hostname': socket.gethostname(),
+        'pid': os.getpid(),
+        'encoder': GPUEncoder.detect_available_encoder(),
+        'hevc_encoder': GPUEncoder.best_encoder('hevc'),
+        'hwaccel': GPUEncoder.best_hwaccel(),
+        'cpu_count': scheduler.cpu_count,
+        'memory_mb': scheduler.total_memory_mb,
+        'max_jobs': scheduler.max_jobs,
+    }
+
+
+class FarmJobHandle:
+    """Stands in for the scheduler Future of a job enqueued to the farm
+
+    Lets the cancel endpoints treat farm jobs like local ones: cancel()
+    succeeds only while no worker has claimed the job.
+    """
+
+    def __init__(self, store: JobStore, run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self._cancelled = False
+
+    def cancel(self) -> bool:
+        self._cancelled = self.store.cancel(self.run_id)
+        return self._cancelled
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def done(self) -> bool:
+        job = self.store.get(self.run_id)
+        return job is None or job['status'] in TERMINAL_STATUSES
+
+
+class FarmWorker:
+    """Pulls jobs from a shared JobStore into the local JobScheduler
+
+    - Heartbeats every HEARTBEAT_SECONDS with its capabilities and cached
+      clip keys, renewing the leases of the jobs it runs.
+    - Claims a new job only while the local scheduler has nothing waiting,
+      so a busy node leaves work for idle ones.
+    - Runs claimed jobs through execute(run_id, campaign_id, job); events
+      they emit are published to the store (see runs()).
+    """
+
+    HEARTBEAT_SECONDS = 10
+    POLL_SECONDS = 2.0
+
+    def __init__(self, store: JobStore, scheduler: JobScheduler,
+                 execute: Callable[[str, str, Dict[str, Any]], Any], worker_id: Optional[str] = None):
+        """Initialize worker
+
+        Args:
+            store: Shared job store
+            scheduler: Local admission control the claimed jobs go through
+            execute: Runs one job to completion
+            worker_id: Stable name in the farm (default: hostname + random suffix)
+        """
+        self.store = store
+        self.scheduler = scheduler
+        self.execute = execute
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.capabilities = worker_capabilities(scheduler)
+
+        self._lock = threading.Lock()
+        self._runs: Set[str] = set()
+        self._stop = threading.Event()
+        self._last_heartbeat = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="farm-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"[FARM] Worker {self.worker_id} started ({self.capabilities['encoder']}, "
+                    f"{self.capabilities['cpu_count']} cores, {self.capabilities['memory_mb']}MB)")
+
+    def stop(self):
+        self._stop.set()
+
+    def runs(self) -> Set[str]:
+        """Run IDs this worker is executing"""
+        with self._lock:
+            return set(self._runs)
+
+    def poll_once(self) -> Optional[str]:
+        """Heartbeat if due and claim one job if the node is idle; returns the claimed run ID"""
+        if time.time() - self._last_heartbeat >= self.HEARTBEAT_SECONDS:
+            self._heartbeat()
+
+        if self.scheduler.status()['pending']:
+            return None
+        claimed = self.store.claim(self.worker_id, ClipCache.cached_keys(), self.scheduler.total_memory_mb)
+        if not claimed:
+            return None
+
+        run_id = claimed['run_id']
+        with self._lock:
+            self._runs.add(run_id)
+        logger.info(f"[FARM] {self.worker_id} claimed {run_id} (attempt {claimed['attempts']})")
+        self.scheduler.submit(run_id, lambda: self._run(claimed), JobCost(**claimed['cost']))
+        return run_id
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning(f"[FARM] Worker poll failed: {e}")
+            self._stop.wait(self.POLL_SECONDS)
+
+    def _heartbeat(self):
+        self._last_heartbeat = time.time()
+        self.store.register_worker(self.worker_id, self.capabilities, ClipCache.cached_keys())
+        self.store.renew(self.worker_id, self.runs())
+
+    def _run(self, claimed: Dict[str, Any]):
+        run_id = claimed['run_id']
+        try:
+            self.store.mark_running(run_id, self.worker_id)
+            return self.execute(run_id, claimed['campaign_id'], claimed['job'])
+        finally:
+            with self._lock:
+                self._runs.discard(run_id)
+            # No-op when the job's done / error event already settled it
+            self.store.finish(run_id, 'failed', f"Worker {self.worker_id} exited without a result")
+
+
+class FarmRelay:
+    """Forwards store events of jobs this instance accepted to on_event
+
+    Runs on the instance that enqueued the jobs, whichever worker executes
+    them. Stops watching a job after its done / error event.
+    """
+
+    POLL_SECONDS = 1.0
+
+    def __init__(self, store: JobStore, on_event: Callable[[str, Dict[str, Any]], None]):
+        """Initialize relay
+
+        Args:
+            store: Shared job store
+            on_event: Called with (run_id, payload) for each relayed event
+        """
+        self.store = store
+        self.on_event = on_event
+        self._lock = threading.Lock()
+        self._watched: Set[str] = set()
+        self._last_id = store.last_event_id()
+        self._stop = threading.Event()
+
+    def watch(self, run_id: str):
+        with self._lock:
+            self._watched.add(run_id)
+
+    def start(self):
+        threading.Thread(target=self._loop, name="farm-relay", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll_once(self) -> int:
+        """Forward new events; returns how many were relayed"""
+        relayed = 0
+        for event_id, run_id, payload in self.store.events_since(self._last_id):
+            self._last_id = event_id
+            with self._lock:
+                if run_id not in self._watched:
+                    continue
+                if payload.get('type') in ('done', 'error'):
+                    self._watched.discard(run_id)
+            try:
+                self.on_event(run_id, payload)
+                relayed += 1
+            except Exception as e:
+                logger.warning(f"[FARM] Relaying event for {run_id} failed: {e}")
+        return relayed
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning(f"[FARM] Relay poll failed: {e}")
+            self._stop.wait(self.POLL_SECONDS)
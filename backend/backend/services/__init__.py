@@ -6,22 +6,43 @@ audio processing, and file management.
 """
 
 from .file_service import FileService
-from .tts_service import TTSService
+from .tts_service import TTSService, PendingVoiceover
 from .script_service import ScriptService
 from .audio_service import AudioService
 from .clip_analyzer import ClipAnalyzer
 from .gpu_detector import GPUEncoder
 from .clip_cache import ClipCache
 from .clip_preprocessor import ClipPreprocessor
+from .clip_pool import ClipPool
+from .music_cache import MusicAssetCache
+from .api_clients import APIClientRegistry
+from .tts_cache import TTSCache
+from .gcs_transfer import GCSTransferService
+from .tracing import Tracer
+from .ffmpeg_runner import FFmpegRunner
+from .lazy_loader import LazyLoader
+from .media_index import MediaMetadataIndex
+from .media_preview import MediaPreviewService
 
 __all__ = [
     'FileService',
     'TTSService',
+    'PendingVoiceover',
     'ScriptService',
     'AudioService',
     'ClipAnalyzer',
     'GPUEncoder',
     'ClipCache',
     'ClipPreprocessor',
+    'ClipPool',
+    'MusicAssetCache',
+    'APIClientRegistry',
+    'TTSCache',
+    'GCSTransferService',
+    'Tracer',
+    'FFmpegRunner',
+    'LazyLoader',
+    'MediaMetadataIndex',
+    'MediaPreviewService',
 ]
 
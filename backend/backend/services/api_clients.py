@@ -0,0 +1,241 @@
+"""
+API Client Registry
+
+Process-wide, pooled clients for the remote providers used by campaign jobs
+(OpenAI, ElevenLabs, DreamFace). Clients are created once per API key and
+reused so every job doesn't pay TLS and connection setup again.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Status codes worth retrying (rate limits and transient upstream failures)
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Statuses that mean a non-idempotent request was rejected before it was processed
+REJECTED_STATUS_CODES = (429, 503)
+
+
+class APIClientRegistry:
+    """
+    Registry of reusable API clients keyed by (provider, API key).
+
+    - OpenAI / ElevenLabs SDK clients are cached so their internal httpx
+      connection pools stay warm between jobs.
+    - Plain HTTP providers (DreamFace) get a requests.Session with a
+      keep-alive pool and urllib3 retries with jittered backoff; sessions
+      for non-idempotent calls (paid job submits) only retry rejections.
+    - provider_slot() bounds concurrent calls per provider so large batches
+      don't trip provider rate limits.
+    """
+
+    # Max concurrent in-flight calls per provider
+    MAX_CONCURRENCY = {
+        'openai': 8,
+        'elevenlabs': 4,
+        'dreamface': 4,
+    }
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    # Keep-alive pool size per client
+    POOL_SIZE = 10
+
+    # Retry policy
+    MAX_RETRIES = 3
+    BACKOFF_BASE_SECONDS = 1.0
+    BACKOFF_MAX_SECONDS = 20.0
+
+    _clients: Dict[Tuple[str, str], Any] = {}
+    _semaphores: Dict[str, threading.BoundedSemaphore] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_openai_client(cls, api_key: str):
+        """
+        Get the shared OpenAI client for an API key.
+
+        Args:
+            api_key: OpenAI API key
+
+        Returns:
+            OpenAI client (SDK retries transient errors with jittered backoff)
+        """
+        def factory():
+            from openai import OpenAI
+            return OpenAI(api_key=api_key, max_retries=cls.MAX_RETRIES)
+
+        return cls._get_or_create('openai', api_key, factory)
+
+    @classmethod
+    def get_elevenlabs_client(cls, api_key: str):
+        """
+        Get the shared ElevenLabs client for an API key.
+
+        Args:
+            api_key: ElevenLabs API key
+
+        Returns:
+            ElevenLabs client backed by a keep-alive httpx pool
+        """
+        def factory():
+            from elevenlabs.client import ElevenLabs
+            http_client = httpx.Client(
+                timeout=240,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=cls.POOL_SIZE,
+                    max_keepalive_connections=cls.POOL_SIZE
+                )
+            )
+            return ElevenLabs(api_key=api_key, httpx_client=http_client)
+
+        return cls._get_or_create('elevenlabs', api_key, factory)
+
+    @classmethod
+    def get_http_session(cls, provider: str, api_key: str = "", idempotent: bool = True) -> requests.Session:
+        """
+        Get a pooled requests.Session for a plain HTTP provider.
+
+        Connection errors are retried by urllib3 with exponential backoff
+        plus jitter, honouring Retry-After. Idempotent sessions also retry
+        429/5xx responses; non-idempotent ones (e.g. a paid job submit the
+        server may already have accepted on a 5xx) only retry 429/503.
+
+        Args:
+            provider: Provider name (e.g. 'dreamface')
+            api_key: API key the session is used with (sessions are per key)
+            idempotent: Whether requests sent on the session are safe to resend
+
+        Returns:
+            requests.Session with a keep-alive connection pool
+        """
+        def factory():
+            retry = Retry(
+                total=cls.MAX_RETRIES,
+                connect=cls.MAX_RETRIES,
+                read=0,  # Don't resend a request the server may already have processed
+                status=cls.MAX_RETRIES,
+                status_forcelist=RETRYABLE_STATUS_CODES if idempotent else REJECTED_STATUS_CODES,
+                allowed_methods=None,  # DreamFace uses POST for both submit and poll
+                backoff_factor=cls.BACKOFF_BASE_SECONDS,
+                backoff_max=cls.BACKOFF_MAX_SECONDS,
+                backoff_jitter=cls.BACKOFF_BASE_SECONDS,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=cls.POOL_SIZE,
+                pool_maxsize=cls.POOL_SIZE,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            if api_key:
+                session.headers.update({"Authorization": f"Bearer {api_key}"})
+            return session
+
+        client_name = provider if idempotent else f"{provider}:submit"
+        return cls._get_or_create(client_name, api_key, factory)
+
+    @classmethod
+    @contextmanager
+    def provider_slot(cls, provider: str):
+        """
+        Bound concurrent calls to a provider.
+
+        Usage:
+            with APIClientRegistry.provider_slot('elevenlabs'):
+                client.text_to_speech.convert(...)
+        """
+        with cls._lock:
+            semaphore = cls._semaphores.get(provider)
+            if semaphore is None:
+                limit = cls.MAX_CONCURRENCY.get(provider, cls.DEFAULT_MAX_CONCURRENCY)
+                semaphore = cls._semaphores[provider] = threading.BoundedSemaphore(limit)
+
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @classmethod
+    def call_with_retry(cls, provider: str, func: Callable[[], Any], max_retries: int = None) -> Any:
+        """
+        Run a provider call inside its concurrency slot, retrying transient failures.
+
+        Uses exponential backoff with full jitter so a batch of jobs that fail
+        together don't retry in lockstep.
+
+        Args:
+            provider: Provider name used for the concurrency bound
+            func: Zero-argument callable performing the request
+            max_retries: Override for the number of retries
+
+        Returns:
+            Whatever func returns
+        """
+        retries = cls.MAX_RETRIES if max_retries is None else max_retries
+        attempt = 0
+
+        while True:
+            try:
+                with cls.provider_slot(provider):
+                    return func()
+            except Exception as e:
+                if attempt >= retries or not cls.is_retryable_error(e):
+                    raise
+                delay = random.uniform(0, min(cls.BACKOFF_MAX_SECONDS, cls.BACKOFF_BASE_SECONDS * (2 ** attempt)))
+                attempt += 1
+                print(f"   ⚠️ {provider} call failed ({e}); retry {attempt}/{retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        """True for network errors and rate-limit / 5xx responses."""
+        if isinstance(error, (httpx.TransportError, requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout)):
+            return True
+
+        status_code = getattr(error, 'status_code', None)
+        if status_code is None:
+            response = getattr(error, 'response', None)
+            status_code = getattr(response, 'status_code', None)
+
+        return status_code in RETRYABLE_STATUS_CODES
+
+    @classmethod
+    def close_all(cls):
+        """Close every pooled client (for shutdown and tests)."""
+        with cls._lock:
+            clients = list(cls._clients.values())
+            cls._clients.clear()
+
+        for client in clients:
+            try:
+                close = getattr(client, 'close', None)
+                if close:
+                    close()
+            except Exception:
+                pass
+
+    @classmethod
+    def _get_or_create(cls, provider: str, api_key: str, factory: Callable[[], Any]) -> Any:
+        """Return the cached client for (provider, api_key), creating it once."""
+        key = (provider, api_key or "")
+
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = cls._clients[key] = factory()
+            return client
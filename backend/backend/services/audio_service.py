@@ -11,6 +11,8 @@ import subprocess
 import traceback
 import imageio_ffmpeg
 
+from backend.services.ffmpeg_runner import FFmpegRunner
+
 
 class AudioService:
     """Manages audio processing operations."""
@@ -49,14 +51,13 @@ class AudioService:
                 '-f', 'null', '-'
             ]
             
-            process = subprocess.run(
+            process = FFmpegRunner.run(
                 silence_detect_cmd,
                 capture_output=True,
                 text=True,
                 check=False,
                 encoding='utf-8',
-                errors='ignore',
-                timeout=600
+                errors='ignore'
             )
             
             stderr_output = process.stderr
@@ -257,14 +258,13 @@ class AudioService:
         ]
         
         try:
-            process = subprocess.run(
+            process = FFmpegRunner.run(
                 final_cmd,
                 capture_output=True,
                 text=True,
                 check=True,
                 encoding='utf-8',
-                errors='ignore',
-                timeout=1800
+                errors='ignore'
             )
             
             if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
@@ -7,6 +7,7 @@ Categorizes clips to minimize unnecessary re-encoding (CapCut/Premiere approach)
 
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple, List, Dict, Any
 import imageio_ffmpeg
@@ -156,7 +157,8 @@ class ClipAnalyzer:
         cls,
         clips: List[str],
         target_width: int,
-        target_height: int
+        target_height: int,
+        max_workers: int = 1
     ) -> Tuple[List[str], List[str], List[str]]:
         """
         Categorize clips by required processing level.
@@ -165,6 +167,7 @@ class ClipAnalyzer:
             clips: List of clip file paths
             target_width: Target canvas width
             target_height: Target canvas height
+            max_workers: Clips to probe in parallel (each probe is an FFmpeg process)
             
         Returns:
             Tuple of (compatible, needs_resize, needs_convert) clip lists
@@ -173,9 +176,22 @@ class ClipAnalyzer:
         needs_resize = []    # Right codec, wrong size - fast resize
         needs_convert = []   # Different codec/format - full conversion
         
-        for clip in clips:
+        def probe(clip):
             try:
-                info = cls.probe_clip(clip)
+                return cls.probe_clip(clip)
+            except Exception:
+                return None
+        
+        if max_workers > 1 and len(clips) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(clips)), thread_name_prefix="clip-probe") as pool:
+                infos = list(pool.map(probe, clips))
+        else:
+            infos = [probe(clip) for clip in clips]
+        
+        for clip, info in zip(clips, infos):
+            try:
+                if info is None:
+                    raise ValueError(f"Could not probe {clip}")
                 
                 # Check for problematic color formats that cause overlay issues
                 has_color_issues = (
@@ -12,6 +12,8 @@ import time
 from pathlib import Path
 from typing import Optional
 
+from backend.services.tracing import Tracer
+
 
 class ClipCache:
     """
@@ -94,8 +96,10 @@ class ClipCache:
         if cached_path.exists():
             # Update access time for LRU tracking
             cached_path.touch()
+            Tracer.record_cache("clip", hit=True)
             return str(cached_path)
         
+        Tracer.record_cache("clip", hit=False)
         return None
     
     @classmethod
@@ -185,6 +189,17 @@ class ClipCache:
         except Exception as e:
             print(f"⚠️ Cache clear failed: {e}")
     
+    @classmethod
+    def cached_keys(cls) -> set:
+        """
+        Get the keys of all cached clips (advertised to the render farm
+        so jobs are routed to workers that already have their clips).
+        """
+        try:
+            return {f.stem for f in cls.CACHE_DIR.glob("*.mp4")}
+        except OSError:
+            return set()
+
     @classmethod
     def get_cache_stats(cls) -> dict:
         """
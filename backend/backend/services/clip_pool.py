@@ -0,0 +1,284 @@
+"""
+Clip Pool Service
+
+Keeps one pool per Splice source directory so jobs stop re-listing and
+re-shuffling the folder: the listing is refreshed only when the directory
+changes, clip durations are probed once per file version, and clips are
+drawn with an alias-method sampler weighted against recent use.
+"""
+
+import os
+import random
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.services.tracing import Tracer
+
+
+class AliasTable:
+    """
+    Vose's alias method: O(n) to build, O(1) per weighted draw.
+
+    Args:
+        weights: Positive weight per index
+    """
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to float error
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self) -> int:
+        column = int(random.random() * len(self.prob))
+        return column if random.random() < self.prob[column] else self.alias[column]
+
+
+class ClipPool:
+    """
+    Clips of one source directory and how often they were picked lately.
+
+    - refresh() re-lists the folder only when its mtime changes; clips that
+      stay keep their usage and cached durations.
+    - Every pick adds 1 to the clip's usage score and each new draw decays
+      all scores by USAGE_DECAY, so a clip's weight USAGE_PENALTY ** score
+      drops right after use and recovers over the following runs.
+    - The last NO_REPEAT_WINDOW picks (capped at half the pool) are skipped
+      by later draws while other clips are available, so consecutive runs
+      of a batch don't open with the same clips.
+
+    Pools live in a process-wide registry (for_directory), which is what
+    spreads a batch's variants across the folder.
+    """
+
+    USAGE_DECAY = 0.9
+    USAGE_PENALTY = 0.1
+    NO_REPEAT_WINDOW = 8
+    MAX_REJECTIONS = 32  # Draws that hit taken/recent clips before falling back to a weighted shuffle
+    MAX_POOLS = 64
+
+    _pools: Dict[Tuple[str, Tuple[str, ...]], "ClipPool"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, directory: str, extensions: Tuple[str, ...]):
+        self.directory = Path(directory)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.clips: List[str] = []
+        self._index: Dict[str, int] = {}  # realpath -> position in clips
+        self._usage: Dict[str, float] = {}
+        self._durations: Dict[str, Tuple[int, int, float]] = {}  # path -> (size, mtime_ns, seconds)
+        self._recent: deque = deque()
+        self._table: Optional[AliasTable] = None
+        self._mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, directory: str, extensions: Iterable[str]) -> "ClipPool":
+        """
+        Shared pool for a source directory, refreshed if the folder changed.
+
+        Raises:
+            FileNotFoundError: If directory is not a directory
+        """
+        key = (os.path.abspath(directory), tuple(sorted(ext.lower() for ext in extensions)))
+        with cls._registry_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                if len(cls._pools) >= cls.MAX_POOLS:
+                    cls._pools.pop(next(iter(cls._pools)))
+                pool = cls._pools[key] = cls(directory, key[1])
+        pool.refresh()
+        return pool
+
+    @classmethod
+    def clear(cls):
+        """Forget all pools (usage history included)"""
+        with cls._registry_lock:
+            cls._pools.clear()
+
+    def refresh(self) -> bool:
+        """
+        Re-list the folder if its mtime changed.
+
+        Returns:
+            True if the folder was re-listed
+
+        Raises:
+            FileNotFoundError: If the directory is gone
+        """
+        try:
+            mtime_ns = self.directory.stat().st_mtime_ns
+        except OSError:
+            raise FileNotFoundError(f"Source directory not found: {self.directory}")
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Source directory not found: {self.directory}")
+
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                Tracer.record_cache("clip_pool", True)
+                return False
+            Tracer.record_cache("clip_pool", False)
+
+            clips = sorted(
+                str(p) for p in self.directory.iterdir()
+                if p.suffix.lower() in self.extensions and p.is_file()
+            )
+            kept = set(clips)
+            self.clips = clips
+            self._index = {os.path.realpath(clip): index for index, clip in enumerate(clips)}
+            self._usage = {clip: self._usage.get(clip, 0.0) for clip in clips}
+            self._durations = {clip: entry for clip, entry in self._durations.items() if clip in kept}
+            self._recent = deque(clip for clip in self._recent if clip in kept)
+            self._table = None
+            self._mtime_ns = mtime_ns
+            return True
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+    def duration(self, clip_path: str, probe: Callable[[str], float]) -> float:
+        """
+        Clip duration in seconds, probed once per file version.
+
+        Args:
+            clip_path: Clip in this pool (other paths are probed uncached)
+            probe: Function reading the duration from the file
+        """
+        try:
+            stat = os.stat(clip_path)
+        except OSError:
+            return probe(clip_path)
+
+        cached = self._durations.get(clip_path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            Tracer.record_cache("clip_duration", True)
+            return cached[2]
+
+        Tracer.record_cache("clip_duration", False)
+        seconds = probe(clip_path)
+        if clip_path in self._usage:
+            self._durations[clip_path] = (stat.st_size, stat.st_mtime_ns, seconds)
+        return seconds
+
+    def picks(self, exclude: Iterable[str] = ()) -> Iterator[str]:
+        """
+        Draw distinct clips lazily, least recently used first by weight.
+
+        Stops once every clip (minus exclude) was drawn. Each yielded clip
+        counts as used, so callers should only pull the clips they keep.
+
+        Args:
+            exclude: Paths never to draw (e.g. the hook video)
+        """
+        with self._lock:
+            for clip in self._usage:
+                self._usage[clip] *= self.USAGE_DECAY
+            self._table = None
+            clips = self.clips
+            taken = self._positions(exclude)
+
+        remaining = len(clips) - len(taken)
+        while remaining > 0:
+            index = self._draw(clips, taken)
+            if index is None:
+                break
+            taken.add(index)
+            remaining -= 1
+            self._mark_used(clips[index])
+            yield clips[index]
+
+        # Table too crowded with taken clips for rejection: weighted shuffle of the rest
+        if remaining > 0:
+            with self._lock:
+                weights = {i: self._weight(clips[i]) for i in range(len(clips)) if i not in taken}
+            order = sorted(weights, key=lambda i: random.random() ** (1.0 / weights[i]), reverse=True)
+            for index in order:
+                self._mark_used(clips[index])
+                yield clips[index]
+
+    def pick(self, count: Optional[int] = None, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Draw up to count distinct clips (all clips when count is None or <= 0).
+        """
+        picks = self.picks(exclude)
+        if not count or count <= 0:
+            return list(picks)
+        selected = []
+        for clip in picks:
+            selected.append(clip)
+            if len(selected) >= count:
+                break
+        return selected
+
+    def sample(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        One weighted draw that may repeat clips already picked for this job.
+
+        Returns:
+            A clip path, or None if the pool has nothing besides exclude
+        """
+        with self._lock:
+            clips = self.clips
+            taken = self._positions(exclude)
+        if len(taken) >= len(clips):
+            return None
+        index = self._draw(clips, taken)
+        if index is None:
+            index = random.choice([i for i in range(len(clips)) if i not in taken])
+        self._mark_used(clips[index])
+        return clips[index]
+
+    def _positions(self, paths: Iterable[str]) -> set:
+        """Indexes of the given paths that are in the pool (caller holds the lock)"""
+        positions = (self._index.get(os.path.realpath(path)) for path in paths)
+        return {index for index in positions if index is not None}
+
+    def _weight(self, clip: str) -> float:
+        return self.USAGE_PENALTY ** self._usage.get(clip, 0.0)
+
+    def _draw(self, clips: List[str], taken: set) -> Optional[int]:
+        """
+        Alias-table draw skipping taken indexes, and recent picks while the
+        first half of the rejection budget lasts. None if the budget runs out.
+        """
+        with self._lock:
+            if clips is not self.clips:
+                return None  # Folder re-listed mid-draw
+            if self._table is None:
+                self._table = AliasTable([self._weight(clip) for clip in clips])
+            table = self._table
+            recent = set(self._recent)
+
+        for attempt in range(self.MAX_REJECTIONS):
+            index = table.sample()
+            if index in taken:
+                continue
+            if attempt < self.MAX_REJECTIONS // 2 and clips[index] in recent:
+                continue
+            return index
+        return None
+
+    def _mark_used(self, clip: str):
+        with self._lock:
+            if clip in self._usage:
+                self._usage[clip] += 1.0
+            self._recent.append(clip)
+            window = min(self.NO_REPEAT_WINDOW, len(self.clips) // 2)
+            while len(self._recent) > window:
+                self._recent.popleft()
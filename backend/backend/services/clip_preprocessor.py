@@ -8,6 +8,7 @@ Uses GPU acceleration and caching for professional-grade performance.
 import os
 import subprocess
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 import imageio_ffmpeg
@@ -15,6 +16,7 @@ import imageio_ffmpeg
 from backend.services.clip_analyzer import ClipAnalyzer
 from backend.services.gpu_detector import GPUEncoder
 from backend.services.clip_cache import ClipCache
+from backend.services.ffmpeg_runner import FFmpegRunner
 
 
 class ClipPreprocessor:
@@ -30,6 +32,10 @@ class ClipPreprocessor:
     
     WORKING_DIR = Path.home() / ".zyra-video-agent" / "working-dir"
     
+    # Concurrent probes / encodes per batch (consumer NVENC cards allow
+    # only a few encode sessions, and jobs already run side by side)
+    MAX_WORKERS = 3
+    
     @classmethod
     def normalize_clips(
         cls,
@@ -37,28 +43,36 @@ class ClipPreprocessor:
         canvas_width: int,
         canvas_height: int,
         crop_mode: str = 'center',
-        audio_mode: str = 'keep'
+        audio_mode: str = 'keep',
+        max_workers: Optional[int] = None
     ) -> Tuple[List[str], dict]:
         """
         Normalize all clips to target canvas size with audio-aware processing.
         
+        The whole selection is prepared as one batch: repeated picks are
+        normalized once, clips are probed in parallel, cache misses are
+        encoded concurrently, and the result lines up with the input.
+        
         Args:
-            clips: List of source clip paths
+            clips: List of source clip paths (may repeat)
             canvas_width: Target width
             canvas_height: Target height
             crop_mode: How to crop ('center', 'fill', 'fit')
             audio_mode: Audio handling mode:
                        'keep' - Preserve/add audio for mixing
                        'strip' - Remove all audio (original_volume=0)
+            max_workers: Concurrent probes/encodes (default MAX_WORKERS)
             
         Returns:
-            Tuple of (normalized_clip_paths, processing_stats)
+            Tuple of (normalized_clip_paths in input order, processing_stats)
         """
         cls.WORKING_DIR.mkdir(parents=True, exist_ok=True)
+        workers = max(1, max_workers or cls.MAX_WORKERS)
+        unique_clips = list(dict.fromkeys(str(clip) for clip in clips))
         
         # Step 1: Analyze clips
         compatible, needs_resize, needs_convert = ClipAnalyzer.analyze_clips(
-            clips, canvas_width, canvas_height
+            unique_clips, canvas_width, canvas_height, max_workers=workers
         )
         
         # Step 2: Detect GPU encoder
@@ -66,11 +80,11 @@ class ClipPreprocessor:
         
         # Only log for batch operations (multiple clips), not single-clip calls
         if len(clips) > 1:
-            print(f"[CLIP_PREP] clips={len(clips)} target={canvas_width}x{canvas_height} compatible={len(compatible)} resize={len(needs_resize)} convert={len(needs_convert)} gpu={gpu_encoder} audio_mode={audio_mode}")
+            print(f"[CLIP_PREP] clips={len(clips)} unique={len(unique_clips)} target={canvas_width}x{canvas_height} compatible={len(compatible)} resize={len(needs_resize)} convert={len(needs_convert)} gpu={gpu_encoder} audio_mode={audio_mode}")
         
-        normalized_clips = []
         stats = {
             'total': len(clips),
+            'unique': len(unique_clips),
             'compatible': len(compatible),
             'resized': 0,
             'converted': 0,
@@ -81,51 +95,37 @@ class ClipPreprocessor:
         import time
         start_time = time.time()
         
-        # Step 3: Process each category
+        # Step 3: Resolve each unique clip
         
         # Compatible clips - use as-is (NO processing)
-        for clip in compatible:
-            normalized_clips.append(clip)
+        resolved = {clip: clip for clip in compatible}
         
-        # Clips needing resize - fast GPU resize
-        for clip in needs_resize:
-            # Check cache first
+        # Cache lookups first; whatever is left gets encoded
+        misses = []
+        for clip, method in [(c, cls._resize_clip) for c in needs_resize] + [(c, cls._convert_clip) for c in needs_convert]:
             cached = ClipCache.get_cached_clip(clip, canvas_width, canvas_height, crop_mode, audio_mode)
             if cached:
-                normalized_clips.append(cached)
+                resolved[clip] = cached
                 stats['cached_hits'] += 1
             else:
-                # Resize with GPU
-                normalized = cls._resize_clip(
-                    clip, canvas_width, canvas_height, crop_mode, gpu_encoder, audio_mode
-                )
-                if normalized:
-                    # Cache the result
-                    cached = ClipCache.cache_clip(clip, normalized, canvas_width, canvas_height, crop_mode, audio_mode)
-                    normalized_clips.append(cached)
-                    stats['resized'] += 1
-                else:
-                    normalized_clips.append(clip)
-        
-        # Clips needing full conversion
-        for clip in needs_convert:
-            # Check cache first
-            cached = ClipCache.get_cached_clip(clip, canvas_width, canvas_height, crop_mode, audio_mode)
-            if cached:
-                normalized_clips.append(cached)
-                stats['cached_hits'] += 1
-            else:
-                # Full conversion with GPU
-                normalized = cls._convert_clip(
-                    clip, canvas_width, canvas_height, crop_mode, gpu_encoder, audio_mode
-                )
-                if normalized:
-                    # Cache the result
-                    cached = ClipCache.cache_clip(clip, normalized, canvas_width, canvas_height, crop_mode, audio_mode)
-                    normalized_clips.append(cached)
-                    stats['converted'] += 1
-                else:
-                    normalized_clips.append(clip)
+                misses.append((clip, method))
+        
+        parallel = min(workers, len(misses))
+        
+        def normalize(miss):
+            clip, method = miss
+            normalized = method(clip, canvas_width, canvas_height, crop_mode, gpu_encoder, audio_mode, parallel)
+            if not normalized:
+                return None
+            # Cache the result
+            return ClipCache.cache_clip(clip, normalized, canvas_width, canvas_height, crop_mode, audio_mode)
+        
+        if misses:
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="clip-prep") as pool:
+                for (clip, method), normalized in zip(misses, pool.map(normalize, misses)):
+                    resolved[clip] = normalized or clip
+                    if normalized:
+                        stats['resized' if method == cls._resize_clip else 'converted'] += 1
         
         stats['processing_time'] = time.time() - start_time
         
@@ -133,7 +133,7 @@ class ClipPreprocessor:
         if len(clips) > 1:
             print(f"[CLIP_PREP] complete time={stats['processing_time']:.1f}s cache_hits={stats['cached_hits']} resized={stats['resized']} converted={stats['converted']}")
         
-        return normalized_clips, stats
+        return [resolved[str(clip)] for clip in clips], stats
     
     @classmethod
     def _resize_clip(
@@ -143,7 +143,8 @@ class ClipPreprocessor:
         canvas_h: int,
         crop_mode: str,
         gpu_encoder: str,
-        audio_mode: str = 'keep'
+        audio_mode: str = 'keep',
+        parallel: int = 1
     ) -> Optional[str]:
         """
         Resize clip to target canvas with audio-aware processing and PTS synchronization.
@@ -155,6 +156,7 @@ class ClipPreprocessor:
             crop_mode: Crop mode
             gpu_encoder: GPU encoder to use
             audio_mode: Audio handling mode ('keep' or 'strip')
+            parallel: Encodes running alongside this one (CPU thread split)
             
         Returns:
             Path to resized clip, or None if failed
@@ -166,7 +168,7 @@ class ClipPreprocessor:
         vf = f"{vf},fps=30,setpts=PTS-STARTPTS"  # Lock to 30 FPS, then reset timestamps
         
         # Get GPU encoding params
-        video_params = GPUEncoder.get_encode_params(gpu_encoder, quality='balanced')
+        video_params = GPUEncoder.get_encode_params(gpu_encoder, quality='balanced', parallel=parallel)
         
         ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
         
@@ -221,7 +223,7 @@ class ClipPreprocessor:
         cmd.extend(['-movflags', '+faststart', output_path])
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
+            result = FFmpegRunner.run(cmd, capture_output=True, text=True, check=True)
             
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
                 return output_path
@@ -252,7 +254,8 @@ class ClipPreprocessor:
         canvas_h: int,
         crop_mode: str,
         gpu_encoder: str,
-        audio_mode: str = 'keep'
+        audio_mode: str = 'keep',
+        parallel: int = 1
     ) -> Optional[str]:
         """
         Full conversion of clip with audio-aware processing and PTS synchronization.
@@ -264,6 +267,7 @@ class ClipPreprocessor:
             crop_mode: Crop mode
             gpu_encoder: GPU encoder to use
             audio_mode: Audio handling mode ('keep' or 'strip')
+            parallel: Encodes running alongside this one (CPU thread split)
             
         Returns:
             Path to converted clip, or None if failed
@@ -277,7 +281,7 @@ class ClipPreprocessor:
         vf = f"{color_filter},{vf},fps=30,setpts=PTS-STARTPTS"  # Normalize color → resize → fps → timing
         
         # Get GPU encoding params
-        video_params = GPUEncoder.get_encode_params(gpu_encoder, quality='balanced')
+        video_params = GPUEncoder.get_encode_params(gpu_encoder, quality='balanced', parallel=parallel)
         
         ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
         
@@ -341,7 +345,7 @@ class ClipPreprocessor:
         
         try:
             # Convert with audio (tolerate AAC warnings)
-            result = subprocess.run(cmd, capture_output=True, check=True, timeout=600)
+            result = FFmpegRunner.run(cmd, capture_output=True, check=True)
             
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
                 # Verify it's actually a video (not just a single frame)
@@ -354,7 +358,7 @@ class ClipPreprocessor:
                     '-of', 'default=nokey=1:noprint_wrappers=1',
                     output_path
                 ]
-                verify_result = subprocess.run(verify_cmd, capture_output=True, text=True, check=False)
+                verify_result = FFmpegRunner.run(verify_cmd, capture_output=True, text=True, check=False)
                 try:
                     frame_count = int(verify_result.stdout.strip() or 0)
                 except:
@@ -425,7 +429,7 @@ class ClipPreprocessor:
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=10)
+            result = FFmpegRunner.run(cmd, capture_output=True, text=True, check=False, timeout=10)
             
             # FFmpeg outputs stream info to stderr
             stderr_output = result.stderr
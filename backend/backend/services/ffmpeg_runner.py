@@ -0,0 +1,408 @@
+"""
+FFmpeg Runner Service
+
+Shared runner for FFmpeg commands: runs with -progress, turns out_time and
+speed into progress events with an ETA, learns encode speed per operation
+on this node and derives timeouts from the media duration instead of fixed
+limits.
+"""
+
+import contextvars
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.services.tracing import Tracer
+
+
+ProgressListener = Callable[[Dict[str, Any]], None]
+
+_listener: contextvars.ContextVar = contextvars.ContextVar('ffmpeg_progress_listener', default=None)
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+# Keys of the -progress protocol; any other stdout line is FFmpeg's own output
+_PROGRESS_LINE_RE = re.compile(
+    r'^(frame|fps|stream_\d+_\d+_\w+|bitrate|total_size|out_time(_us|_ms)?|dup_frames|drop_frames|speed|progress)='
+)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Seconds from an FFmpeg time value ('12.5', '00:01:02.50')."""
+    try:
+        parts = [float(p) for p in str(value).strip().split(':')]
+    except ValueError:
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+class FFmpegRunner:
+    """
+    Runs FFmpeg with live progress and duration-scaled timeouts.
+
+    - run() is a drop-in for subprocess.run(): same return value, check,
+      capture_output, text/encoding and timeout semantics. Tracked runs
+      share stdout with -progress; the progress lines are filtered out of
+      the returned stdout. Each call is recorded as an 'ffmpeg' tracing span.
+    - Without an explicit timeout, the budget is MIN_TIMEOUT plus
+      TIMEOUT_SAFETY times the expected encode time (duration / learned
+      speed). It grows while the encode keeps progressing, and a process
+      whose out_time stops advancing for STALL_SECONDS is killed.
+    - Speed (media seconds per wall second) is tracked per operation label
+      as an exponential moving average.
+    """
+
+    MIN_TIMEOUT = 120
+    MAX_TIMEOUT = 10800  # Same 3 hour ceiling as calculate_ffmpeg_timeout
+    TIMEOUT_SAFETY = 3.0
+    DEFAULT_SPEED = 0.25  # Assume 4x slower than realtime until measured
+    STALL_SECONDS = 300
+    SPEED_SMOOTHING = 0.3
+    PROGRESS_INTERVAL = 2.0  # Seconds between events sent to listeners
+
+    _lock = threading.Lock()
+    _speed_stats: Dict[str, Dict[str, Any]] = {}
+
+    # ─── Progress listeners ──────────────────────────────────────────
+
+    @classmethod
+    def set_listener(cls, listener: Optional[ProgressListener]):
+        """Receive progress events for FFmpeg runs in the current context."""
+        _listener.set(listener)
+
+    # ─── Running ─────────────────────────────────────────────────────
+
+    @classmethod
+    def run(
+        cls,
+        cmd: List[str],
+        label: Optional[str] = None,
+        duration: Optional[float] = None,
+        on_progress: Optional[ProgressListener] = None,
+        timeout: Optional[float] = None,
+        check: bool = False,
+        capture_output: bool = False,
+        text: bool = False,
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        **popen_kwargs
+    ) -> subprocess.CompletedProcess:
+        """
+        Run an FFmpeg command.
+
+        Args:
+            cmd: FFmpeg argument list (executable first)
+            label: Operation name for spans and speed stats (default: caller's function name)
+            duration: Expected output duration in seconds (default: -t or the first input's Duration)
+            on_progress: Called with progress dicts (out_time, duration, percent, speed, eta, elapsed)
+            timeout: Hard timeout in seconds; None derives one from the duration
+
+        Returns:
+            subprocess.CompletedProcess, as subprocess.run() would
+        """
+        if label is None:
+            label = sys._getframe(1).f_code.co_name
+        cmd = [str(part) for part in cmd]
+        inputs, output, encoder = cls.parse_command(cmd)
+        decode = text or encoding is not None or errors is not None or popen_kwargs.pop('universal_newlines', False)
+
+        span = Tracer.start_span(f"ffmpeg.{label}", kind="ffmpeg", encoder=encoder)
+        span.add_bytes(bytes_in=sum(cls._file_size(path) for path in inputs))
+
+        try:
+            if cls._can_track(cmd, popen_kwargs):
+                result, stats = cls._run_tracked(
+                    cmd, label, duration if duration is not None else cls._duration_limit(cmd),
+                    on_progress, timeout, capture_output, decode, encoding, errors, popen_kwargs
+                )
+            else:
+                result = subprocess.run(
+                    cmd, timeout=timeout, capture_output=capture_output, text=text,
+                    encoding=encoding, errors=errors, **popen_kwargs
+                )
+                stats = {}
+        except BaseException as e:
+            span.end(error=f"{type(e).__name__}: {e}")
+            raise
+
+        if output:
+            span.add_bytes(bytes_out=cls._file_size(output))
+        span.set(returncode=result.returncode, **stats)
+        span.end(error=f"exit {result.returncode}" if result.returncode != 0 else None)
+
+        if result.returncode == 0 and stats.get('media_seconds') and stats.get('wall'):
+            cls._record_speed(label, stats['media_seconds'] / stats['wall'])
+
+        if check:
+            result.check_returncode()
+        return result
+
+    @classmethod
+    def _run_tracked(cls, cmd, label, duration, on_progress, timeout, capture_output, decode,
+                     encoding, errors, popen_kwargs) -> Tuple[subprocess.CompletedProcess, Dict[str, Any]]:
+        """Run with -progress on stdout and a watchdog enforcing the timeout."""
+        tracked_cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + cmd[1:]
+        process = subprocess.Popen(
+            tracked_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            stdin=popen_kwargs.pop('stdin', subprocess.DEVNULL),
+            text=True, encoding=encoding or 'utf-8', errors=errors or 'replace', **popen_kwargs
+        )
+
+        start = time.monotonic()
+        state = {
+            'duration': duration,
+            'out_time': 0.0,
+            'speed': None,
+            'last_advance': start,
+            'timed_out': None
+        }
+        stderr_lines: List[str] = []
+        stdout_lines: List[str] = []
+        listeners = [cb for cb in (on_progress, _listener.get()) if cb is not None]
+        done = threading.Event()
+
+        def read_stderr():
+            for line in process.stderr:
+                stderr_lines.append(line)
+                if not capture_output:
+                    sys.stderr.write(line)
+                if state['duration'] is None:
+                    match = _DURATION_RE.search(line)
+                    if match:
+                        state['duration'] = parse_timestamp(':'.join(match.groups()))
+
+        def watchdog():
+            while not done.wait(1.0):
+                now = time.monotonic()
+                elapsed = now - start
+                if timeout is not None:
+                    if elapsed > timeout:
+                        state['timed_out'] = timeout
+                        break
+                    continue
+                if now - state['last_advance'] > cls.STALL_SECONDS:
+                    state['timed_out'] = elapsed
+                    break
+                if elapsed > cls._budget(label, state, elapsed):
+                    state['timed_out'] = elapsed
+                    break
+            if state['timed_out'] is not None and process.poll() is None:
+                process.kill()
+
+        stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+        watchdog_thread = threading.Thread(target=watchdog, daemon=True)
+        stderr_thread.start()
+        watchdog_thread.start()
+
+        last_emit = 0.0
+        block: Dict[str, str] = {}
+        try:
+            for line in process.stdout:
+                if not _PROGRESS_LINE_RE.match(line):
+                    stdout_lines.append(line)
+                    continue
+                key, _, value = line.strip().partition('=')
+                block[key] = value
+                if key != 'progress':
+                    continue
+
+                out_time = cls._out_time(block)
+                if out_time is not None and out_time > state['out_time']:
+                    state['out_time'] = out_time
+                    state['last_advance'] = time.monotonic()
+                speed = block.get('speed', '').rstrip('x').strip()
+                if speed and speed != 'N/A':
+                    try:
+                        state['speed'] = float(speed)
+                    except ValueError:
+                        pass
+
+                now = time.monotonic()
+                if listeners and (value == 'end' or now - last_emit >= cls.PROGRESS_INTERVAL):
+                    last_emit = now
+                    event = cls._progress_event(label, state, now - start, finished=value == 'end')
+                    for listener in listeners:
+                        try:
+                            listener(event)
+                        except Exception as e:
+                            print(f"⚠️  FFmpeg progress listener failed: {e}")
+                block = {}
+            process.wait()
+        finally:
+            done.set()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_thread.join(timeout=5)
+            watchdog_thread.join(timeout=5)
+
+        wall = time.monotonic() - start
+        stderr_text = ''.join(stderr_lines)
+        if state['timed_out'] is not None:
+            raise subprocess.TimeoutExpired(
+                cmd, state['timed_out'],
+                output=None, stderr=stderr_text if decode else stderr_text.encode('utf-8', 'replace')
+            )
+
+        if capture_output:
+            stdout_text = ''.join(stdout_lines)
+            stdout, stderr = ((stdout_text, stderr_text) if decode else
+                              (stdout_text.encode('utf-8', 'replace'), stderr_text.encode('utf-8', 'replace')))
+        else:
+            stdout, stderr = None, None
+            if stdout_lines:
+                sys.stdout.write(''.join(stdout_lines))
+
+        stats = {'wall': round(wall, 3)}
+        if state['out_time']:
+            stats['media_seconds'] = round(state['out_time'], 3)
+        if state['speed']:
+            stats['speed'] = state['speed']
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr), stats
+
+    # ─── Timeouts and speed stats ────────────────────────────────────
+
+    @classmethod
+    def expected_speed(cls, label: str) -> float:
+        """Learned encode speed for an operation on this node (x realtime)."""
+        with cls._lock:
+            stats = cls._speed_stats.get(label)
+            return stats['speed'] if stats else cls.DEFAULT_SPEED
+
+    @classmethod
+    def timeout_for(cls, duration: Optional[float], label: str = "") -> float:
+        """Timeout budget for encoding duration seconds of media."""
+        if not duration or duration <= 0:
+            return cls.MAX_TIMEOUT
+        expected = duration / cls.expected_speed(label)
+        return min(cls.MAX_TIMEOUT, cls.MIN_TIMEOUT + cls.TIMEOUT_SAFETY * expected)
+
+    @classmethod
+    def get_speed_stats(cls) -> Dict[str, Any]:
+        """Per-operation encode speed on this node (for /queue/status)."""
+        with cls._lock:
+            operations = {label: dict(stats) for label, stats in cls._speed_stats.items()}
+        return {'node': socket.gethostname(), 'operations': operations}
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        """Learned encode speeds as a Prometheus gauge."""
+        with cls._lock:
+            stats = {label: dict(value) for label, value in cls._speed_stats.items()}
+        lines = [
+            "# HELP massugc_ffmpeg_speed_ratio Smoothed FFmpeg speed (media seconds per wall second)",
+            "# TYPE massugc_ffmpeg_speed_ratio gauge",
+        ]
+        for label, value in sorted(stats.items()):
+            lines.append(f'massugc_ffmpeg_speed_ratio{{operation="{label}"}} {value["speed"]:.4f}')
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def reset_stats(cls):
+        """Forget learned speeds (for tests)."""
+        with cls._lock:
+            cls._speed_stats.clear()
+
+    @classmethod
+    def _record_speed(cls, label: str, speed: float):
+        if speed <= 0:
+            return
+        with cls._lock:
+            stats = cls._speed_stats.get(label)
+            if stats is None:
+                cls._speed_stats[label] = {'speed': round(speed, 4), 'last': round(speed, 4), 'samples': 1}
+            else:
+                smoothed = stats['speed'] + cls.SPEED_SMOOTHING * (speed - stats['speed'])
+                stats.update(speed=round(smoothed, 4), last=round(speed, 4), samples=stats['samples'] + 1)
+
+    @classmethod
+    def _budget(cls, label: str, state: Dict[str, Any], elapsed: float) -> float:
+        """Current timeout budget; grows while the encode keeps progressing."""
+        budget = cls.timeout_for(state['duration'], label)
+        duration, speed = state['duration'], state['speed']
+        if duration and speed and speed > 0:
+            remaining = max(0.0, duration - state['out_time']) / speed
+            budget = max(budget, elapsed + cls.MIN_TIMEOUT + cls.TIMEOUT_SAFETY * remaining)
+        return min(budget, cls.MAX_TIMEOUT)
+
+    # ─── Command inspection ──────────────────────────────────────────
+
+    @staticmethod
+    def parse_command(cmd: List[str]) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """(input files, output file, video encoder) from an FFmpeg argument list."""
+        inputs, encoder = [], None
+        while cmd and cmd[-1] in ('-y', '-n'):
+            cmd = cmd[:-1]
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-i':
+                inputs.append(cmd[i + 1])
+            elif arg in ('-c:v', '-vcodec', '-codec:v'):
+                encoder = cmd[i + 1]
+        output = cmd[-1] if len(cmd) > 1 and not cmd[-1].startswith('-') and cmd[-1] not in inputs else None
+        if output in ('-', 'pipe:', 'pipe:1', os.devnull):
+            output = None
+        return inputs, output, encoder
+
+    @staticmethod
+    def _can_track(cmd: List[str], popen_kwargs: Dict[str, Any]) -> bool:
+        """-progress needs stdout; skip commands that pipe media through it."""
+        if '-progress' in cmd or 'stdout' in popen_kwargs or 'input' in popen_kwargs:
+            return False
+        for i, arg in enumerate(cmd[1:], start=1):
+            if arg in ('-', 'pipe:', 'pipe:1') and cmd[i - 2:i] != ['-f', 'null']:
+                return False
+        return True
+
+    @staticmethod
+    def _duration_limit(cmd: List[str]) -> Optional[float]:
+        """Output duration from -t, if the command sets one."""
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-t':
+                return parse_timestamp(cmd[i + 1])
+        return None
+
+    @staticmethod
+    def _out_time(block: Dict[str, str]) -> Optional[float]:
+        for key in ('out_time_us', 'out_time_ms'):  # Both are microseconds
+            value = block.get(key)
+            if value and value != 'N/A':
+                try:
+                    return int(value) / 1_000_000
+                except ValueError:
+                    pass
+        if block.get('out_time') and block['out_time'] != 'N/A':
+            return parse_timestamp(block['out_time'])
+        return None
+
+    @staticmethod
+    def _progress_event(label: str, state: Dict[str, Any], elapsed: float, finished: bool) -> Dict[str, Any]:
+        duration, out_time, speed = state['duration'], state['out_time'], state['speed']
+        event = {
+            'operation': label,
+            'out_time': round(out_time, 2),
+            'duration': round(duration, 2) if duration else None,
+            'percent': None,
+            'speed': speed,
+            'eta': None,
+            'elapsed': round(elapsed, 1),
+            'finished': finished
+        }
+        if duration:
+            event['percent'] = 100.0 if finished else round(min(99.9, 100.0 * out_time / duration), 1)
+            if speed and speed > 0 and not finished:
+                event['eta'] = round(max(0.0, duration - out_time) / speed, 1)
+        return event
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except (OSError, TypeError):
+            return 0
@@ -0,0 +1,430 @@
+"""
+GCS Transfer Service
+
+Shared Google Cloud Storage transfer layer for the Avatar pipeline:
+concurrent chunked uploads, content-addressed dedupe for reusable inputs
+(avatar videos), signed-URL reuse and deferred, batched deletes.
+"""
+
+import os
+import atexit
+import hashlib
+import math
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+class GCSTransferService:
+    """
+    Manages uploads, signed URLs and cleanup against GCS.
+
+    - One storage client and one thread pool are shared by all jobs.
+    - Uploads are resumable in CHUNK_SIZE chunks; files over
+      COMPOSITE_THRESHOLD_BYTES are split into parts that upload in
+      parallel and are composed server-side.
+    - upload_content() names blobs by SHA-256 of the file, so an avatar used
+      by many jobs is uploaded once and its signed URL reused until it gets
+      close to expiry. Content blobs are shared by every process and farm
+      worker using the bucket, so no job deletes them: upload_content()
+      installs a bucket lifecycle rule deleting CONTENT_PREFIX blobs
+      CONTENT_RETENTION_DAYS after creation, and re-uploads a blob that is
+      within CONTENT_REFRESH_SECONDS of that age so a job never gets one
+      that is about to expire. Local state for blobs unused for
+      CONTENT_IDLE_SECONDS is just forgotten.
+    - schedule_delete() queues per-job blobs and deletes them in batch
+      requests from a background thread.
+    """
+
+    MAX_WORKERS = 4
+    CHUNK_SIZE = 8 * 1024 * 1024  # Must be a multiple of 256 KiB
+    COMPOSITE_THRESHOLD_BYTES = 64 * 1024 * 1024
+    COMPOSITE_MAX_PARTS = 8  # GCS composes at most 32 sources
+    UPLOAD_TIMEOUT = 600
+
+    CONTENT_PREFIX = "content_uploads/"
+    CONTENT_IDLE_SECONDS = 6 * 3600  # Forget local state (not the blob) after this long unused
+    CONTENT_RECHECK_SECONDS = 3600  # Re-confirm a known blob still exists after this long
+    CONTENT_RETENTION_DAYS = 7  # Bucket lifecycle rule: delete content blobs this long after upload
+    CONTENT_REFRESH_SECONDS = 24 * 3600  # Re-upload content this close to its lifecycle deletion
+
+    SIGNED_URL_MINUTES = 60
+    SIGNED_URL_MIN_REMAINING_SECONDS = 15 * 60
+
+    DELETE_DELAY_SECONDS = 30
+    DELETE_BATCH_SIZE = 100
+
+    _client = None
+    _lock = threading.RLock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _part_executor: Optional[ThreadPoolExecutor] = None
+
+    _digests: Dict[Tuple[str, int, int], str] = {}  # (path, size, mtime_ns) -> sha256
+    _content_blobs: Dict[Tuple[str, str], Dict[str, float]] = {}  # (bucket, blob) -> {'verified_at', 'last_used'}
+    _content_locks: Dict[Tuple[str, str], threading.Lock] = {}
+    _signed_urls: Dict[Tuple[str, str], Tuple[str, float]] = {}  # (bucket, blob) -> (url, expires_at)
+    _lifecycle_checked: set = set()  # Buckets whose content lifecycle rule was checked
+
+    _pending_deletes: List[Tuple[str, str]] = []
+    _delete_event = threading.Event()
+    _delete_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_client(cls):
+        """Shared storage client (created on first use)."""
+        with cls._lock:
+            if cls._client is None:
+                from google.cloud import storage
+                cls._client = storage.Client()
+            return cls._client
+
+    @classmethod
+    def upload_many(cls, bucket_name: str, uploads: List[Tuple[str, Optional[str]]]) -> List[Optional[str]]:
+        """
+        Upload independent files concurrently.
+
+        Args:
+            bucket_name: Target bucket
+            uploads: (local_path, blob_name) pairs; blob_name None means
+                content-addressed (deduplicated, see upload_content)
+
+        Returns:
+            Blob name per upload (same order), or None where it failed
+        """
+        executor = cls._get_executor()
+        futures = [
+            executor.submit(cls.upload_content, bucket_name, path) if blob_name is None
+            else executor.submit(cls._upload_or_none, bucket_name, path, blob_name)
+            for path, blob_name in uploads
+        ]
+        return [future.result() for future in futures]
+
+    @classmethod
+    def upload_file(cls, bucket_name: str, source_file_name: str, destination_blob_name: str) -> bool:
+        """Upload a file to a specific blob name. Returns True/False."""
+        if not os.path.exists(source_file_name):
+            print(f"Error: Source file for GCS upload not found: {source_file_name}"); return False
+        if os.path.getsize(source_file_name) == 0:
+            print(f"Error: Source file for GCS upload is empty: {source_file_name}"); return False
+
+        print(f"Uploading {source_file_name} to gs://{bucket_name}/{destination_blob_name}...")
+        start = time.time()
+        try:
+            size = os.path.getsize(source_file_name)
+            if size >= cls.COMPOSITE_THRESHOLD_BYTES:
+                cls._composite_upload(bucket_name, source_file_name, destination_blob_name, size)
+            else:
+                blob = cls.get_client().bucket(bucket_name).blob(destination_blob_name, chunk_size=cls.CHUNK_SIZE)
+                blob.upload_from_filename(source_file_name, timeout=cls.UPLOAD_TIMEOUT)
+            print(f"File uploaded successfully ({size / (1024**2):.1f}MB in {time.time() - start:.1f}s).")
+            return True
+        except Exception as e:
+            print(f"Error uploading to GCS: {e}")
+            traceback.print_exc()
+            return False
+
+    @classmethod
+    def upload_content(cls, bucket_name: str, source_file_name: str) -> Optional[str]:
+        """
+        Upload a file under a content-addressed name, skipping it if already there.
+
+        Returns:
+            Blob name (CONTENT_PREFIX + sha256 + extension), or None on failure
+        """
+        try:
+            digest = cls.file_digest(source_file_name)
+        except OSError as e:
+            print(f"Error: Cannot read file for GCS upload: {e}")
+            return None
+
+        extension = os.path.splitext(source_file_name)[1].lower()
+        blob_name = f"{cls.CONTENT_PREFIX}{digest}{extension}"
+        key = (bucket_name, blob_name)
+
+        cls.ensure_content_lifecycle(bucket_name)
+
+        with cls._lock:
+            lock = cls._content_locks.setdefault(key, threading.Lock())
+
+        # Per-blob lock: concurrent jobs with the same avatar upload it once
+        with lock:
+            now = time.time()
+            with cls._lock:
+                known = cls._content_blobs.get(key)
+            if (known and now - known['verified_at'] < cls.CONTENT_RECHECK_SECONDS
+                    and not cls._content_expiring(known['created_at'], now)):
+                print(f"Reusing uploaded content gs://{bucket_name}/{blob_name}")
+                cls._touch_content(key)
+                return blob_name
+
+            try:
+                blob = cls.get_client().bucket(bucket_name).get_blob(blob_name)
+            except Exception as e:
+                print(f"Warning: Could not check gs://{bucket_name}/{blob_name}: {e}")
+                blob = None
+
+            created_at = blob.time_created.timestamp() if blob is not None and blob.time_created else None
+            if created_at is not None and not cls._content_expiring(created_at, now):
+                print(f"Content already in GCS, skipping upload: gs://{bucket_name}/{blob_name}")
+            else:
+                # Missing, or close to lifecycle deletion: (re)upload to reset its age
+                with cls._lock:
+                    cls._signed_urls.pop(key, None)
+                if not cls.upload_file(bucket_name, source_file_name, blob_name):
+                    return None
+                created_at = time.time()
+
+            cls._touch_content(key, created_at=created_at)
+            cls._ensure_delete_worker()
+            return blob_name
+
+    @classmethod
+    def ensure_content_lifecycle(cls, bucket_name: str) -> bool:
+        """
+        Make sure the bucket deletes CONTENT_PREFIX blobs after CONTENT_RETENTION_DAYS.
+
+        Checked once per bucket per process; the rule is added with a single
+        bucket patch if no Delete rule on CONTENT_PREFIX exists yet.
+
+        Returns:
+            True if the rule is in place, False if it could not be checked or set
+        """
+        with cls._lock:
+            if bucket_name in cls._lifecycle_checked:
+                return True
+            cls._lifecycle_checked.add(bucket_name)
+
+        try:
+            bucket = cls.get_client().get_bucket(bucket_name)
+            for rule in bucket.lifecycle_rules:
+                if (rule.get('action', {}).get('type') == 'Delete'
+                        and cls.CONTENT_PREFIX in rule.get('condition', {}).get('matchesPrefix', [])):
+                    return True
+            bucket.add_lifecycle_delete_rule(age=cls.CONTENT_RETENTION_DAYS, matches_prefix=[cls.CONTENT_PREFIX])
+            bucket.patch()
+            print(f"Added lifecycle rule to gs://{bucket_name}: delete {cls.CONTENT_PREFIX}* after {cls.CONTENT_RETENTION_DAYS} days")
+            return True
+        except Exception as e:
+            # Not retried: missing storage.buckets.update permission won't fix itself
+            print(f"Warning: Could not set content lifecycle rule on gs://{bucket_name}: {e}")
+            return False
+
+    @classmethod
+    def get_signed_url(cls, bucket_name: str, blob_name: str, expiration_minutes: Optional[int] = None) -> Optional[str]:
+        """
+        Get a v4 signed GET URL, reusing a cached one that is still valid long enough.
+
+        Returns:
+            Signed URL, or None on failure
+        """
+        key = (bucket_name, blob_name)
+        now = time.time()
+
+        with cls._lock:
+            cached = cls._signed_urls.get(key)
+        if cached and cached[1] - now >= cls.SIGNED_URL_MIN_REMAINING_SECONDS:
+            return cached[0]
+
+        minutes = expiration_minutes or cls.SIGNED_URL_MINUTES
+        print(f"Generating signed URL for gs://{bucket_name}/{blob_name}...")
+        try:
+            blob = cls.get_client().bucket(bucket_name).blob(blob_name)
+            url = blob.generate_signed_url(version="v4", expiration=timedelta(minutes=minutes), method="GET")
+        except Exception as e:
+            print(f"Error generating signed URL: {e}")
+            traceback.print_exc()
+            return None
+
+        with cls._lock:
+            cls._signed_urls[key] = (url, now + minutes * 60)
+        print(f"Signed URL generated (valid for {minutes} mins).")
+        return url
+
+    @classmethod
+    def schedule_delete(cls, bucket_name: str, blob_name: str):
+        """Queue a blob for deletion in the next batch (content blobs are kept)."""
+        if blob_name.startswith(cls.CONTENT_PREFIX):
+            return
+        with cls._lock:
+            cls._pending_deletes.append((bucket_name, blob_name))
+            cls._signed_urls.pop((bucket_name, blob_name), None)
+            flush_now = len(cls._pending_deletes) >= cls.DELETE_BATCH_SIZE
+        cls._ensure_delete_worker()
+        if flush_now:
+            cls._delete_event.set()
+
+    @classmethod
+    def flush_deletes(cls) -> int:
+        """
+        Delete queued blobs now, in batch requests.
+
+        Content blobs idle for CONTENT_IDLE_SECONDS are only dropped from the
+        local caches; the blobs themselves stay for other processes.
+
+        Returns:
+            Number of blobs deleted (or already gone)
+        """
+        cls._forget_idle_content()
+        with cls._lock:
+            pending = list(dict.fromkeys(cls._pending_deletes))
+            cls._pending_deletes.clear()
+
+        if not pending:
+            return 0
+
+        by_bucket: Dict[str, List[str]] = {}
+        for bucket_name, blob_name in pending:
+            by_bucket.setdefault(bucket_name, []).append(blob_name)
+
+        client = cls.get_client()
+        deleted = 0
+        for bucket_name, blob_names in by_bucket.items():
+            bucket = client.bucket(bucket_name)
+            for start in range(0, len(blob_names), cls.DELETE_BATCH_SIZE):
+                batch_names = blob_names[start:start + cls.DELETE_BATCH_SIZE]
+                try:
+                    # Missing blobs (already deleted) aren't errors for cleanup
+                    with client.batch(raise_exception=False):
+                        for blob_name in batch_names:
+                            bucket.delete_blob(blob_name)
+                    deleted += len(batch_names)
+                except Exception as e:
+                    print(f"Warning: Batched GCS delete failed for {len(batch_names)} blobs: {e}")
+
+        print(f"Deleted {deleted} temporary GCS blobs")
+        return deleted
+
+    @classmethod
+    def file_digest(cls, path: str) -> str:
+        """SHA-256 of a file, memoized by path, size and modification time."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        with cls._lock:
+            digest = cls._digests.get(key)
+        if digest:
+            return digest
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+
+        with cls._lock:
+            cls._digests[key] = digest
+        return digest
+
+    @classmethod
+    def _upload_or_none(cls, bucket_name: str, path: str, blob_name: str) -> Optional[str]:
+        return blob_name if cls.upload_file(bucket_name, path, blob_name) else None
+
+    @classmethod
+    def _composite_upload(cls, bucket_name: str, path: str, blob_name: str, size: int):
+        """Upload byte ranges as parallel part blobs, then compose them into blob_name."""
+        bucket = cls.get_client().bucket(bucket_name)
+
+        part_count = min(cls.COMPOSITE_MAX_PARTS, math.ceil(size / cls.CHUNK_SIZE))
+        # Part boundaries on chunk multiples so each part is a clean resumable upload
+        part_size = math.ceil(size / part_count / cls.CHUNK_SIZE) * cls.CHUNK_SIZE
+        ranges = [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)]
+        part_names = [f"{blob_name}.part{i}" for i in range(len(ranges))]
+
+        def upload_part(part_name: str, offset: int, length: int):
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                part = bucket.blob(part_name, chunk_size=cls.CHUNK_SIZE)
+                part.upload_from_file(f, size=length, timeout=cls.UPLOAD_TIMEOUT)
+
+        executor = cls._get_part_executor()
+        try:
+            futures = [
+                executor.submit(upload_part, name, offset, length)
+                for name, (offset, length) in zip(part_names, ranges)
+            ]
+            for future in futures:
+                future.result()
+
+            bucket.blob(blob_name).compose([bucket.blob(name) for name in part_names], timeout=cls.UPLOAD_TIMEOUT)
+        finally:
+            for name in part_names:
+                cls.schedule_delete(bucket_name, name)
+
+    @classmethod
+    def _forget_idle_content(cls):
+        """Drop cached state for content blobs unused for CONTENT_IDLE_SECONDS."""
+        now = time.time()
+        with cls._lock:
+            for key, info in list(cls._content_blobs.items()):
+                if now - info['last_used'] > cls.CONTENT_IDLE_SECONDS:
+                    cls._content_blobs.pop(key, None)
+                    cls._signed_urls.pop(key, None)
+                    lock = cls._content_locks.get(key)
+                    if lock is not None and not lock.locked():
+                        cls._content_locks.pop(key, None)
+
+    @classmethod
+    def _touch_content(cls, key: Tuple[str, str], created_at: Optional[float] = None):
+        """Mark a content blob used; passing created_at records a fresh existence check."""
+        now = time.time()
+        with cls._lock:
+            info = cls._content_blobs.setdefault(key, {'verified_at': now, 'last_used': now, 'created_at': now})
+            info['last_used'] = now
+            if created_at is not None:
+                info['verified_at'] = now
+                info['created_at'] = created_at
+
+    @classmethod
+    def _content_expiring(cls, created_at: float, now: float) -> bool:
+        """True if the lifecycle rule will delete a blob created at created_at soon."""
+        age = now - created_at
+        return age > cls.CONTENT_RETENTION_DAYS * 86400 - cls.CONTENT_REFRESH_SECONDS
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS, thread_name_prefix="gcs-upload")
+            return cls._executor
+
+    @classmethod
+    def _get_part_executor(cls) -> ThreadPoolExecutor:
+        # Separate pool: composite parts are submitted from upload_many workers
+        with cls._lock:
+            if cls._part_executor is None:
+                cls._part_executor = ThreadPoolExecutor(max_workers=cls.COMPOSITE_MAX_PARTS, thread_name_prefix="gcs-part")
+            return cls._part_executor
+
+    @classmethod
+    def _ensure_delete_worker(cls):
+        """Start the background thread that flushes deletes every DELETE_DELAY_SECONDS."""
+        with cls._lock:
+            if cls._delete_thread is not None and cls._delete_thread.is_alive():
+                return
+            cls._delete_thread = threading.Thread(target=cls._delete_worker, name="gcs-delete", daemon=True)
+            cls._delete_thread.start()
+
+    @classmethod
+    def _delete_worker(cls):
+        while True:
+            cls._delete_event.wait(timeout=cls.DELETE_DELAY_SECONDS)
+            cls._delete_event.clear()
+            try:
+                cls.flush_deletes()
+            except Exception as e:
+                print(f"Warning: GCS delete worker error: {e}")
+
+
+@atexit.register
+def _flush_gcs_deletes_at_exit():
+    """Don't leave temporary per-job blobs behind on a clean shutdown."""
+    with GCSTransferService._lock:
+        has_work = bool(GCSTransferService._pending_deletes)
+    if has_work:
+        try:
+            GCSTransferService.flush_deletes()
+        except Exception as e:
+            print(f"Warning: GCS cleanup at exit failed: {e}")
@@ -3,12 +3,25 @@ GPU Detector Service
 
 Auto-detects available GPU encoders and provides optimal encoding parameters.
 Supports Apple Silicon, NVIDIA, AMD, and CPU fallback.
+
+Encoders are validated with a tiny test encode (an encoder compiled into
+FFmpeg is useless without the device behind it), and the resulting
+capability matrix is cached on disk per host and FFmpeg build.
 """
 
+import hashlib
+import json
+import os
+import socket
 import subprocess
 import platform
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
 import imageio_ffmpeg
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 class GPUEncoder:
@@ -19,7 +32,39 @@ class GPUEncoder:
     to GPU instead of CPU.
     """
     
+    CACHE_PATH = Path.home() / ".zyra-video-agent" / "encoder-capabilities.json"
+    
+    # Test encode: small enough to finish in well under a second on CPU. Its
+    # time is mostly process spawn and device init, so it is recorded for
+    # diagnostics only and doesn't rank encoders.
+    TEST_SIZE = "640x360"
+    TEST_FRAMES = 30
+    TEST_TIMEOUT = 20
+    
+    # Candidates per codec in preference order; the software encoder always comes last
+    ENCODER_CANDIDATES = {
+        'h264': {
+            'Darwin': ['h264_videotoolbox'],
+            'Windows': ['h264_nvenc', 'h264_amf'],
+            'Linux': ['h264_nvenc'],
+            'software': 'libx264',
+        },
+        'hevc': {
+            'Darwin': ['hevc_videotoolbox'],
+            'Windows': ['hevc_nvenc', 'hevc_amf'],
+            'Linux': ['hevc_nvenc'],
+            'software': 'libx265',
+        },
+    }
+    HWACCEL_CANDIDATES = {
+        'Darwin': ['videotoolbox'],
+        'Windows': ['cuda', 'd3d11va', 'dxva2'],
+        'Linux': ['cuda', 'vaapi'],
+    }
+    
     _detected_encoder = None  # Cache detection result
+    _capabilities: Optional[Dict] = None
+    _lock = threading.Lock()
     
     @classmethod
     def detect_available_encoder(cls) -> str:
@@ -32,52 +77,258 @@ class GPUEncoder:
         if cls._detected_encoder:
             return cls._detected_encoder
         
-        system = platform.system()
+        cls._detected_encoder = cls.best_encoder('h264')
+        return cls._detected_encoder
+    
+    @classmethod
+    def best_encoder(cls, codec: str = 'h264') -> str:
+        """
+        First encoder in preference order (hardware before software) that
+        passed its test encode.
         
-        # macOS: Always prefer VideoToolbox (works on M1/M2/M3 and Intel Macs)
-        if system == 'Darwin':
-            if cls._test_encoder('h264_videotoolbox'):
-                cls._detected_encoder = 'h264_videotoolbox'
-                return cls._detected_encoder
+        Args:
+            codec: 'h264' or 'hevc'
+            
+        Returns:
+            Encoder name; the software encoder if nothing else works
+        """
+        encoders = cls.get_capabilities()['encoders']
+        candidates = cls.ENCODER_CANDIDATES[codec]
+        for name in candidates.get(platform.system(), []):
+            result = encoders.get(name)
+            if result and result['codec'] == codec and result['ok']:
+                return name
+        return candidates['software']
+    
+    @classmethod
+    def best_hwaccel(cls) -> Optional[str]:
+        """
+        First hardware decode method in preference order that decoded the
+        test clip, or None (software decoding).
+        """
+        hwaccels = cls.get_capabilities()['hwaccels']
+        for name in cls.HWACCEL_CANDIDATES.get(platform.system(), []):
+            if hwaccels.get(name, {}).get('ok'):
+                return name
+        return None
+    
+    @classmethod
+    def get_capabilities(cls, force: bool = False) -> Dict:
+        """
+        Capability matrix for this host and FFmpeg build.
         
-        # Windows/Linux: Check for NVIDIA
-        if cls._test_encoder('h264_nvenc'):
-            cls._detected_encoder = 'h264_nvenc'
-            return cls._detected_encoder
+        Probed once and cached on disk; the cache key changes with the host
+        name and the FFmpeg binary, so a new build or machine re-probes.
         
-        # Windows: Check for AMD
-        if system == 'Windows' and cls._test_encoder('h264_amf'):
-            cls._detected_encoder = 'h264_amf'
-            return cls._detected_encoder
+        Args:
+            force: Ignore cached results and run the test encodes again
+            
+        Returns:
+            {'key', 'host', 'ffmpeg', 'encoders': {name: {codec, ok, seconds, error}},
+             'hwaccels': {name: {ok, seconds, error}}}
+        """
+        with cls._lock:
+            key = cls._build_key()
+            if not force and cls._capabilities and cls._capabilities['key'] == key:
+                return cls._capabilities
+            
+            capabilities = None if force else cls._load_cached(key)
+            if capabilities is None:
+                capabilities = cls.probe_capabilities()
+                capabilities['key'] = key
+                cls._save_cached(capabilities)
+                print(f"[GPU] Probed encoders: {cls._summary(capabilities)}")
+            
+            cls._capabilities = capabilities
+            cls._detected_encoder = None
+            return capabilities
+    
+    @classmethod
+    def probe_capabilities(cls) -> Dict:
+        """Run the test encodes/decodes for every candidate FFmpeg lists"""
+        system = platform.system()
+        listed = cls._listed_encoders()
+        capabilities = {
+            'host': socket.gethostname(),
+            'ffmpeg': cls._ffmpeg_version(),
+            'encoders': {},
+            'hwaccels': {},
+        }
         
-        # Fallback to CPU
-        cls._detected_encoder = 'libx264'
-        return cls._detected_encoder
+        for codec, candidates in cls.ENCODER_CANDIDATES.items():
+            for encoder in candidates.get(system, []) + [candidates['software']]:
+                if encoder not in listed:
+                    continue
+                seconds, error = cls._test_encoder(encoder)
+                capabilities['encoders'][encoder] = {
+                    'codec': codec, 'ok': error is None, 'seconds': seconds, 'error': error
+                }
+        
+        hwaccels = [name for name in cls.HWACCEL_CANDIDATES.get(system, []) if name in cls._listed_hwaccels()]
+        if hwaccels:
+            sample = cls._make_test_clip()
+            try:
+                for hwaccel in hwaccels:
+                    seconds, error = cls._test_decoder(hwaccel, sample) if sample else (None, "no test clip")
+                    capabilities['hwaccels'][hwaccel] = {'ok': error is None, 'seconds': seconds, 'error': error}
+            finally:
+                if sample and os.path.exists(sample):
+                    os.remove(sample)
+        
+        return capabilities
     
     @classmethod
-    def _test_encoder(cls, encoder: str) -> bool:
+    def _test_encoder(cls, encoder: str) -> Tuple[Optional[float], Optional[str]]:
         """
-        Test if an encoder is available in FFmpeg.
+        Encode a few synthetic frames with the parameters jobs would use.
         
         Args:
             encoder: Encoder name to test
             
         Returns:
-            True if encoder is available
+            (seconds, None) if the encode succeeded, else (None, error)
         """
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-v', 'error',
+            '-f', 'lavfi', '-i', f'testsrc2=size={cls.TEST_SIZE}:rate=30',
+            '-frames:v', str(cls.TEST_FRAMES),
+            '-pix_fmt', 'yuv420p',
+            *cls.get_encode_params(encoder, quality='balanced'),
+            '-f', 'null', '-'
+        ]
+        return cls._timed(cmd)
+    
+    @classmethod
+    def _test_decoder(cls, hwaccel: str, sample_path: str) -> Tuple[Optional[float], Optional[str]]:
+        """Decode the test clip through a hardware decode method"""
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-v', 'error',
+            '-hwaccel', hwaccel,
+            '-i', sample_path,
+            '-f', 'null', '-'
+        ]
+        return cls._timed(cmd)
+    
+    @classmethod
+    def _timed(cls, cmd: List[str]) -> Tuple[Optional[float], Optional[str]]:
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=cls.TEST_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return None, str(e)
+        seconds = round(time.perf_counter() - start, 4)
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            return None, lines[-1] if lines else f"exit code {result.returncode}"
+        return seconds, None
+    
+    @classmethod
+    def _make_test_clip(cls) -> Optional[str]:
+        """Short H.264 clip for decode tests (software encoded)"""
+        path = os.path.join(tempfile.gettempdir(), f"encoder_probe_{uuid.uuid4().hex[:8]}.mp4")
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f'testsrc2=size={cls.TEST_SIZE}:rate=30',
+            '-frames:v', str(cls.TEST_FRAMES),
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+            path
+        ]
+        _, error = cls._timed(cmd)
+        return None if error else path
+    
+    @classmethod
+    def _listed_encoders(cls) -> set:
+        """Encoder names compiled into the FFmpeg build"""
+        return cls._list_section('-encoders', lambda parts: parts[1] if len(parts) > 1 else None)
+    
+    @classmethod
+    def _listed_hwaccels(cls) -> set:
+        """Hardware decode methods compiled into the FFmpeg build"""
+        return cls._list_section('-hwaccels', lambda parts: parts[0] if len(parts) == 1 else None)
+    
+    @classmethod
+    def _list_section(cls, flag: str, parse) -> set:
         try:
             ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-            cmd = [ffmpeg_exe, '-hide_banner', '-encoders']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            return encoder in result.stdout
-        except:
-            return False
+            result = subprocess.run([ffmpeg_exe, '-hide_banner', flag], capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            return set()
+        names = (parse(line.split()) for line in result.stdout.splitlines() if line.strip())
+        return {name for name in names if name}
+    
+    @classmethod
+    def _ffmpeg_version(cls) -> str:
+        try:
+            result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-version'],
+                                    capture_output=True, text=True, timeout=5)
+            return result.stdout.splitlines()[0] if result.stdout else ""
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+    
+    @classmethod
+    def _build_key(cls) -> str:
+        """Host name plus FFmpeg binary identity (path, size, mtime)"""
+        ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        try:
+            stat = os.stat(ffmpeg_exe)
+            identifier = f"{socket.gethostname()}_{ffmpeg_exe}_{stat.st_size}_{stat.st_mtime}"
+        except OSError:
+            identifier = f"{socket.gethostname()}_{ffmpeg_exe}"
+        return hashlib.md5(identifier.encode()).hexdigest()
+    
+    @classmethod
+    def _load_cached(cls, key: str) -> Optional[Dict]:
+        try:
+            with open(cls.CACHE_PATH, 'r') as f:
+                return json.load(f).get(key)
+        except (OSError, ValueError):
+            return None
+    
+    @classmethod
+    def _save_cached(cls, capabilities: Dict):
+        """Merge into the cache file (several builds/hosts may share a home dir)"""
+        try:
+            with open(cls.CACHE_PATH, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        cached[capabilities['key']] = capabilities
+        
+        try:
+            cls.CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cls.CACHE_PATH.with_name(f"{cls.CACHE_PATH.name}.{uuid.uuid4().hex[:8]}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(cached, f, indent=2)
+            os.replace(tmp_path, cls.CACHE_PATH)
+        except OSError as e:
+            print(f"[GPU] Could not cache encoder capabilities: {e}")
+    
+    @classmethod
+    def _summary(cls, capabilities: Dict) -> str:
+        parts = [
+            f"{name}={'%.2fs' % result['seconds'] if result['ok'] else 'failed'}"
+            for name, result in {**capabilities['encoders'], **capabilities['hwaccels']}.items()
+        ]
+        return " ".join(parts) or "none"
+    
+    @classmethod
+    def x264_threads(cls, parallel: int = 1) -> Optional[int]:
+        """
+        Threads per software encode when `parallel` encodes share the CPU.
+        
+        Returns:
+            Thread count, or None to keep FFmpeg's default (single encode)
+        """
+        if parallel <= 1:
+            return None
+        return max(1, (os.cpu_count() or 1) // parallel)
     
     @classmethod
     def get_encode_params(
         cls,
         encoder: str = None,
-        quality: str = 'balanced'
+        quality: str = 'balanced',
+        parallel: int = 1
     ) -> List[str]:
         """
         Get optimal encoding parameters for the detected encoder.
@@ -85,6 +336,8 @@ class GPUEncoder:
         Args:
             encoder: Specific encoder to use (None = auto-detect)
             quality: 'fast', 'balanced', or 'quality'
+            parallel: Encodes running side by side (splits CPU threads
+                between software encodes instead of oversubscribing)
             
         Returns:
             List of FFmpeg parameters
@@ -119,14 +372,17 @@ class GPUEncoder:
             else:  # balanced
                 return ['-c:v', encoder, '-quality', 'balanced', '-rc', 'vbr_peak', '-b:v', '10M']
         
-        # CPU fallback (libx264)
+        # CPU fallback (libx264 / libx265)
         else:
+            software = 'libx265' if encoder == 'libx265' else 'libx264'
+            threads = cls.x264_threads(parallel)
+            thread_params = ['-threads', str(threads)] if threads else []
             if quality == 'fast':
-                return ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '26']
+                return ['-c:v', software, '-preset', 'veryfast', '-crf', '26', *thread_params]
             elif quality == 'quality':
-                return ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20']
+                return ['-c:v', software, '-preset', 'medium', '-crf', '20', *thread_params]
             else:  # balanced
-                return ['-c:v', 'libx264', '-preset', 'faster', '-crf', '23']
+                return ['-c:v', software, '-preset', 'faster', '-crf', '23', *thread_params]
     
     @classmethod
     def get_audio_params(cls, copy_if_possible: bool = True) -> List[str]:
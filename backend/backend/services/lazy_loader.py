@@ -0,0 +1,182 @@
+"""
+Lazy Loader Service
+
+Defers importing heavy subsystems (Whisper/torch, OpenCV, librosa, the
+ElevenLabs and OpenAI SDKs) until a job first needs them, so the backend
+answers /health right after launch and nodes that never run Avatar jobs
+never pay for torch.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource  # POSIX only; memory deltas are skipped on Windows
+except ImportError:
+    resource = None
+
+
+class LazyLoader:
+    """
+    Imports registered subsystems on first use and records what each cost.
+
+    - function(module, name) returns a facade that imports module on its
+      first call and then forwards to module.name.
+    - prewarm() loads subsystems on a background thread (e.g. right after
+      the server starts listening) so the first job doesn't wait either.
+    - report() lists every subsystem with its load time, the modules it
+      pulled in and the peak-RSS growth it caused.
+    """
+
+    # Subsystem name -> module; the comment lists what makes it heavy
+    SUBSYSTEMS = OrderedDict([
+        ('avatar_pipeline', 'backend.create_video'),  # whisper (torch), cv2, librosa, elevenlabs, openai
+        ('massugc_pipeline', 'backend.massugc_video_job'),  # elevenlabs, openai
+        ('processors', 'backend.processors'),  # Splice: cv2, PIL, numpy
+        ('whisper', 'backend.whisper_service'),  # whisper (torch)
+        ('randomizer', 'backend.randomizer'),  # cv2, librosa, soundfile
+    ])
+
+    # Warm-up hooks usable in prewarm(): name -> (module, function)
+    WARMUPS = OrderedDict([
+        ('whisper_timing', ('backend.whisper_service', 'warmup_timing_kernels')),  # numba DTW kernels
+    ])
+
+    _lock = threading.RLock()
+    _loads: Dict[str, Dict[str, Any]] = {}
+    _warmups: Dict[str, Dict[str, Any]] = {}
+    _started_at = time.time()
+    _ready_seconds: Optional[float] = None
+
+    @classmethod
+    def load(cls, module_name: str) -> Any:
+        """Import a module (by subsystem or module name), recording the first import"""
+        module_name = cls.SUBSYSTEMS.get(module_name, module_name)
+        module = sys.modules.get(module_name)
+        if module is not None and module_name in cls._loads:
+            return module
+
+        with cls._lock:
+            if module_name in cls._loads:
+                return sys.modules[module_name]
+
+            modules_before = len(sys.modules)
+            rss_before = cls._peak_rss_mb()
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            seconds = time.perf_counter() - start
+
+            cls._loads[module_name] = {
+                'seconds': round(seconds, 3),
+                'modules': len(sys.modules) - modules_before,
+                'peak_rss_growth_mb': (round(cls._peak_rss_mb() - rss_before, 1)
+                                       if rss_before is not None else None),
+                'loaded_at': round(time.time() - cls._started_at, 3),
+                'thread': threading.current_thread().name,
+            }
+            print(f"[LAZY] Loaded {module_name} in {seconds:.2f}s "
+                  f"(+{cls._loads[module_name]['modules']} modules)")
+            return module
+
+    @classmethod
+    def function(cls, module_name: str, attr: str) -> Callable[..., Any]:
+        """Facade for module.attr that imports the module on first call"""
+        def facade(*args, **kwargs):
+            return getattr(cls.load(module_name), attr)(*args, **kwargs)
+        facade.__name__ = attr
+        facade.__qualname__ = attr
+        facade.__doc__ = f"Lazy facade for {module_name}.{attr}"
+        return facade
+
+    @classmethod
+    def warm(cls, name: str) -> Any:
+        """Run a registered warm-up hook (importing its module first)"""
+        module_name, attr = cls.WARMUPS[name]
+        start = time.perf_counter()
+        result = getattr(cls.load(module_name), attr)()
+        cls._warmups[name] = {
+            'seconds': round(time.perf_counter() - start, 3),
+            'finished_at': round(time.time() - cls._started_at, 3),
+            'result': result,
+        }
+        return result
+
+    @classmethod
+    def is_loaded(cls, module_name: str) -> bool:
+        module_name = cls.SUBSYSTEMS.get(module_name, module_name)
+        return module_name in sys.modules
+
+    @classmethod
+    def prewarm(cls, subsystems: Optional[Iterable[str]] = None, delay: float = 0.0) -> threading.Thread:
+        """
+        Load subsystems on a daemon thread.
+
+        Args:
+            subsystems: Subsystem, module or warm-up names (default: all registered)
+            delay: Seconds to wait first, leaving startup to the web server
+        """
+        names = list(subsystems) if subsystems is not None else list(cls.SUBSYSTEMS) + list(cls.WARMUPS)
+
+        def warm():
+            if delay:
+                time.sleep(delay)
+            for name in names:
+                try:
+                    if name in cls.WARMUPS:
+                        cls.warm(name)
+                    else:
+                        cls.load(name)
+                except Exception as e:
+                    # The job that needs it will raise the real error
+                    print(f"[LAZY] Pre-warm of {name} failed: {e}")
+
+        thread = threading.Thread(target=warm, name="lazy-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def parse_prewarm_setting(cls, value: Optional[str]) -> List[str]:
+        """MASSUGC_PREWARM: '' / '0' = none, '1' / 'all' = every subsystem, else a comma list"""
+        value = (value or "").strip().lower()
+        if value in ("", "0", "false", "no", "none"):
+            return []
+        if value in ("1", "true", "yes", "all"):
+            return list(cls.SUBSYSTEMS) + list(cls.WARMUPS)
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    @classmethod
+    def mark_ready(cls) -> float:
+        """Record that the app finished importing; returns seconds since this loader was imported"""
+        cls._ready_seconds = round(time.time() - cls._started_at, 3)
+        return cls._ready_seconds
+
+    @classmethod
+    def report(cls) -> Dict[str, Any]:
+        """Startup time plus the load state of every subsystem"""
+        subsystems = {}
+        for name, module_name in cls.SUBSYSTEMS.items():
+            load = cls._loads.get(module_name)
+            subsystems[name] = {
+                'module': module_name,
+                'loaded': module_name in sys.modules,
+                **(load or {}),
+            }
+        return {
+            'ready_seconds': cls._ready_seconds,
+            'modules_loaded': len(sys.modules),
+            'peak_rss_mb': cls._peak_rss_mb(),
+            'subsystems': subsystems,
+            'warmups': {name: cls._warmups.get(name) for name in cls.WARMUPS},
+        }
+
+    @staticmethod
+    def _peak_rss_mb() -> Optional[float]:
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
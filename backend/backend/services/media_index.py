@@ -0,0 +1,228 @@
+"""
+Media Metadata Index
+
+Persistent index of video metadata (dimensions, duration, frame rate,
+codec) keyed by resolved path, size and mtime, so overlay editing and
+library views read it from memory/SQLite instead of spawning a probe per
+request. Files are probed with FFmpeg's input banner (no decoding).
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import imageio_ffmpeg
+
+from backend.services.tracing import Tracer
+
+
+class MediaMetadataIndex:
+    """
+    Two-level cache of probe results.
+
+    - Memory: bounded LRU of the most recent entries.
+    - SQLite (DB_PATH): survives restarts; one connection per thread.
+
+    An entry is valid while the file's size and mtime match; a changed
+    file is probed again and its row replaced. Every entry carries an
+    etag derived from the same key for conditional HTTP responses.
+    """
+
+    DB_PATH = Path.home() / ".zyra-video-agent" / "media-index.db"
+    MEMORY_ENTRIES = 4096
+    MAX_WORKERS = 4
+    PROBE_TIMEOUT = 30
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            info_json TEXT NOT NULL,
+            indexed_at REAL NOT NULL
+        );
+    """
+
+    _DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+    _VIDEO_RE = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+)(.*)")
+    _SIZE_RE = re.compile(r", (\d{2,5})x(\d{2,5})")
+    _FPS_RE = re.compile(r", (\d+(?:\.\d+)?)(k?) (fps|tbr)")
+    _ROTATION_RE = re.compile(r"rotation of (-?\d+(?:\.\d+)?) degrees")
+    _AUDIO_RE = re.compile(r"Stream #\d+:\d+.*?: Audio: ")
+
+    _memory: "OrderedDict[Tuple[str, int, int], dict]" = OrderedDict()
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @classmethod
+    def lookup(cls, media_path: str) -> dict:
+        """
+        Metadata for a video file, probing it only if not indexed yet.
+
+        Returns:
+            {'width', 'height', 'duration', 'fps', 'codec', 'rotation',
+             'has_audio', 'aspect_ratio', 'path', 'etag'}
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file has no video stream
+        """
+        path = os.path.realpath(media_path)
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+
+        with cls._lock:
+            info = cls._memory.get(key)
+            if info is not None:
+                cls._memory.move_to_end(key)
+        if info is not None:
+            Tracer.record_cache("media_index", True)
+            return info
+
+        info = cls._load_row(key)
+        if info is not None and 'has_audio' not in info:
+            info = None  # Indexed before audio detection, probe again
+        Tracer.record_cache("media_index", info is not None)
+        if info is None:
+            info = cls.probe(path)
+            info['etag'] = cls._etag(key)
+            cls._store_row(key, info)
+        cls._remember(key, info)
+        return info
+
+    @classmethod
+    def lookup_many(cls, media_paths: Iterable[str]) -> Dict[str, Union[dict, Exception]]:
+        """
+        Metadata for many files; unindexed files are probed in parallel.
+
+        Returns:
+            {requested path: metadata dict, or the exception lookup raised}
+        """
+        paths = list(dict.fromkeys(media_paths))
+
+        def safe_lookup(path):
+            try:
+                return cls.lookup(path)
+            except Exception as e:
+                return e
+
+        if len(paths) <= 1:
+            return {path: safe_lookup(path) for path in paths}
+        with ThreadPoolExecutor(max_workers=min(cls.MAX_WORKERS, len(paths)), thread_name_prefix="media-index") as pool:
+            return dict(zip(paths, pool.map(safe_lookup, paths)))
+
+    @classmethod
+    def probe(cls, media_path: str) -> dict:
+        """
+        Read metadata from FFmpeg's input banner (no decoding, no ffprobe).
+
+        Raises:
+            ValueError: If no video stream is found
+        """
+        result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-i', str(media_path)],
+                                capture_output=True, text=True, errors='replace', timeout=cls.PROBE_TIMEOUT)
+        banner = result.stderr
+
+        video = cls._VIDEO_RE.search(banner)
+        if not video:
+            raise ValueError(f"No video stream found in {media_path}")
+        codec, details = video.groups()
+
+        size = cls._SIZE_RE.search(details)
+        width, height = (int(size.group(1)), int(size.group(2))) if size else (0, 0)
+
+        fps = 0.0
+        for value, thousands, _ in cls._FPS_RE.findall(details):
+            fps = float(value) * (1000 if thousands else 1)
+            break
+
+        duration = 0.0
+        match = cls._DURATION_RE.search(banner)
+        if match:
+            hours, minutes, seconds = match.groups()
+            duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        rotation = cls._ROTATION_RE.search(banner)
+        return {
+            "width": width,
+            "height": height,
+            "duration": duration,
+            "fps": fps,
+            "codec": codec,
+            "rotation": float(rotation.group(1)) if rotation else 0.0,
+            "has_audio": bool(cls._AUDIO_RE.search(banner)),
+            "path": str(media_path),
+            "aspect_ratio": round(width / height, 3) if height else 0.0,
+        }
+
+    @classmethod
+    def invalidate(cls, media_path: Optional[str] = None):
+        """Drop one file (or everything) from the index"""
+        with cls._lock:
+            if media_path is None:
+                cls._memory.clear()
+            else:
+                path = os.path.realpath(media_path)
+                for key in [key for key in cls._memory if key[0] == path]:
+                    del cls._memory[key]
+        conn = cls._connect()
+        if media_path is None:
+            conn.execute("DELETE FROM media")
+        else:
+            conn.execute("DELETE FROM media WHERE path = ?", (os.path.realpath(media_path),))
+
+    @classmethod
+    def _etag(cls, key: Tuple[str, int, int]) -> str:
+        return hashlib.md5(f"{key[0]}_{key[1]}_{key[2]}".encode()).hexdigest()[:16]
+
+    @classmethod
+    def _remember(cls, key: Tuple[str, int, int], info: dict):
+        with cls._lock:
+            cls._memory[key] = info
+            cls._memory.move_to_end(key)
+            while len(cls._memory) > cls.MEMORY_ENTRIES:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def _load_row(cls, key: Tuple[str, int, int]) -> Optional[dict]:
+        try:
+            row = cls._connect().execute(
+                "SELECT info_json FROM media WHERE path = ? AND size = ? AND mtime_ns = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[MEDIA_INDEX] Read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    @classmethod
+    def _store_row(cls, key: Tuple[str, int, int], info: dict):
+        try:
+            cls._connect().execute(
+                "INSERT OR REPLACE INTO media (path, size, mtime_ns, info_json, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(info), time.time())
+            )
+        except sqlite3.Error as e:
+            # Still served from memory; the next process probes again
+            print(f"[MEDIA_INDEX] Write failed: {e}")
+
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        """One autocommit connection per thread (and per DB_PATH)"""
+        conn = getattr(cls._local, 'conn', None)
+        if conn is None or getattr(cls._local, 'path', None) != cls.DB_PATH:
+            cls.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(cls.DB_PATH), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.executescript(cls.SCHEMA)
+            cls._local.conn = conn
+            cls._local.path = cls.DB_PATH
+        return conn
@@ -0,0 +1,288 @@
+"""
+Media Preview Service
+
+Builds library previews for avatars and clips off the request path: a
+square thumbnail and a small hover sprite sheet per asset, cut with fast
+keyframe seeking and cached by content hash, so re-uploads and renamed
+copies of the same file reuse their previews.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import imageio_ffmpeg
+
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.media_index import MediaMetadataIndex
+from backend.services.tracing import Tracer
+
+
+class MediaPreviewService:
+    """
+    Disk cache of thumbnails and sprite sheets plus a small worker pool.
+
+    - request() never blocks: it returns the cached preview or queues the
+      asset and reports 'pending' (or 'failed' with the error).
+    - Per asset the cache holds <key>_thumb.jpg, <key>_sprite.jpg and
+      <key>.json (sprite layout); the manifest is written last, so its
+      presence means the preview is complete.
+    - Keys hash the file size and sampled content (start, middle, end), so
+      a large avatar is identified without reading all of it; the key is
+      memoized per (path, size, mtime).
+    """
+
+    CACHE_DIR = Path.home() / ".zyra-video-agent" / "previews"
+    THUMB_SIZE = 320
+    SPRITE_FRAMES = 8
+    SPRITE_COLUMNS = 4
+    SPRITE_TILE = 160
+    HASH_SAMPLE_BYTES = 64 * 1024
+    MAX_WORKERS = 2
+    TIMEOUT = 60
+
+    _queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+    _workers: List[threading.Thread] = []
+    _pending: Dict[str, threading.Event] = {}
+    _failed: Dict[str, str] = {}
+    _keys: Dict[Tuple[str, int, int], str] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def initialize(cls):
+        """Create cache directory if it doesn't exist."""
+        cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def content_key(cls, media_path: str) -> str:
+        """
+        Content hash of a media file (size + start/middle/end samples).
+
+        Raises:
+            OSError: If the file can't be read
+        """
+        stat = os.stat(media_path)
+        memo_key = (os.path.abspath(media_path), stat.st_size, stat.st_mtime_ns)
+        with cls._lock:
+            key = cls._keys.get(memo_key)
+        if key:
+            return key
+
+        digest = hashlib.md5(str(stat.st_size).encode())
+        sample = cls.HASH_SAMPLE_BYTES
+        with open(media_path, 'rb') as f:
+            if stat.st_size <= 3 * sample:
+                digest.update(f.read())
+            else:
+                for offset in (0, stat.st_size // 2 - sample // 2, stat.st_size - sample):
+                    f.seek(offset)
+                    digest.update(f.read(sample))
+        key = digest.hexdigest()
+
+        with cls._lock:
+            cls._keys[memo_key] = key
+        return key
+
+    @classmethod
+    def get_preview(cls, media_path: str) -> Optional[dict]:
+        """Cached preview for a file, or None (never generates)"""
+        try:
+            key = cls.content_key(media_path)
+        except OSError:
+            return None
+        preview = cls._load_manifest(key)
+        Tracer.record_cache("media_preview", preview is not None)
+        return preview
+
+    @classmethod
+    def request(cls, media_path: str) -> dict:
+        """
+        Preview status for a file, queueing generation if it's missing.
+
+        Returns:
+            {'status': 'ready', 'thumbnail_path', 'sprite_path', 'sprite'},
+            {'status': 'pending'}, {'status': 'failed', 'error'} or
+            {'status': 'missing'} when the file doesn't exist
+        """
+        try:
+            key = cls.content_key(media_path)
+        except OSError:
+            return {'status': 'missing'}
+
+        preview = cls._load_manifest(key)
+        if preview:
+            return preview
+
+        with cls._lock:
+            if key in cls._failed:
+                return {'status': 'failed', 'error': cls._failed[key]}
+            if key not in cls._pending:
+                cls._pending[key] = threading.Event()
+                cls._queue.put((key, str(media_path)))
+                cls._ensure_workers()
+        return {'status': 'pending'}
+
+    @classmethod
+    def backfill(cls, media_paths: Iterable[str]) -> int:
+        """
+        Queue previews for every existing file that has none yet.
+
+        Returns:
+            Number of files queued
+        """
+        queued = 0
+        for media_path in media_paths:
+            if media_path and os.path.isfile(media_path) and cls.request(media_path)['status'] == 'pending':
+                queued += 1
+        return queued
+
+    @classmethod
+    def wait(cls, media_path: str, timeout: Optional[float] = None) -> dict:
+        """Block until a queued preview is done (for tests and scripts)"""
+        try:
+            key = cls.content_key(media_path)
+        except OSError:
+            return {'status': 'missing'}
+        with cls._lock:
+            event = cls._pending.get(key)
+        if event:
+            event.wait(timeout)
+        return cls.request(media_path)
+
+    @classmethod
+    def retry_failed(cls):
+        """Forget failures so the next request tries again"""
+        with cls._lock:
+            cls._failed.clear()
+
+    @classmethod
+    def generate(cls, media_path: str, key: Optional[str] = None) -> dict:
+        """
+        Build thumbnail + sprite sheet for a file now (worker threads call this).
+
+        Raises:
+            ValueError: If the file has no video stream
+            subprocess.CalledProcessError: If FFmpeg fails
+        """
+        key = key or cls.content_key(media_path)
+        cls.initialize()
+        duration = MediaMetadataIndex.lookup(media_path)['duration']
+
+        # Thumbnail: first keyframe at ~10% in (skips black first frames), square crop
+        thumb_path = cls.CACHE_DIR / f"{key}_thumb.jpg"
+        size = cls.THUMB_SIZE
+        cls._render(
+            [*cls._seek_input(media_path, duration * 0.1),
+             '-vf', f'scale={size}:{size}:force_original_aspect_ratio=increase,crop={size}:{size}',
+             '-frames:v', '1'],
+            thumb_path, "preview_thumbnail"
+        )
+
+        # Sprite: one fast keyframe seek per tile, tiled in a single pass
+        frames = cls.SPRITE_FRAMES
+        columns = min(cls.SPRITE_COLUMNS, frames)
+        rows = -(-frames // columns)
+        tile = cls.SPRITE_TILE
+        timestamps = [round(duration * (i + 0.5) / frames, 3) for i in range(frames)]
+        inputs, chains = [], []
+        for index, timestamp in enumerate(timestamps):
+            inputs.extend(cls._seek_input(media_path, timestamp))
+            chains.append(
+                f"[{index}:v]trim=end_frame=1,setpts=PTS-STARTPTS,"
+                f"scale={tile}:{tile}:force_original_aspect_ratio=increase,crop={tile}:{tile},setsar=1[f{index}]"
+            )
+        labels = "".join(f"[f{index}]" for index in range(frames))
+        chains.append(f"{labels}concat=n={frames}:v=1:a=0,tile={columns}x{rows}[sprite]")
+        sprite_path = cls.CACHE_DIR / f"{key}_sprite.jpg"
+        cls._render(
+            [*inputs, '-filter_complex', ";".join(chains), '-map', '[sprite]', '-frames:v', '1'],
+            sprite_path, "preview_sprite"
+        )
+
+        manifest = {
+            'status': 'ready',
+            'thumbnail_path': str(thumb_path),
+            'sprite_path': str(sprite_path),
+            'sprite': {
+                'frames': frames,
+                'columns': columns,
+                'rows': rows,
+                'tile_width': tile,
+                'tile_height': tile,
+                'timestamps': timestamps,
+            },
+            'duration': duration,
+        }
+        cls._write_json(cls.CACHE_DIR / f"{key}.json", manifest)
+        return manifest
+
+    @classmethod
+    def _seek_input(cls, media_path: str, timestamp: float) -> List[str]:
+        """Input args that jump to the keyframe before timestamp and decode keyframes only"""
+        return ['-skip_frame', 'nokey', '-noaccurate_seek', '-ss', f"{max(timestamp, 0):.3f}", '-i', str(media_path)]
+
+    @classmethod
+    def _render(cls, args: List[str], output_path: Path, label: str):
+        """Run FFmpeg into a temp file and rename it into place"""
+        tmp_path = output_path.with_name(f"{output_path.stem}.{uuid.uuid4().hex[:8]}.tmp.jpg")
+        cmd = [imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error', *args, '-q:v', '4', str(tmp_path)]
+        try:
+            FFmpegRunner.run(cmd, label=label, timeout=cls.TIMEOUT, check=True, capture_output=True)
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @classmethod
+    def _load_manifest(cls, key: str) -> Optional[dict]:
+        try:
+            with open(cls.CACHE_DIR / f"{key}.json", 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not (os.path.exists(manifest['thumbnail_path']) and os.path.exists(manifest['sprite_path'])):
+            return None
+        return manifest
+
+    @classmethod
+    def _write_json(cls, path: Path, data: dict):
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def _ensure_workers(cls):
+        """Start daemon workers on first use (caller holds the lock)"""
+        cls._workers = [worker for worker in cls._workers if worker.is_alive()]
+        for index in range(len(cls._workers), cls.MAX_WORKERS):
+            worker = threading.Thread(target=cls._work, name=f"media-preview-{index}", daemon=True)
+            worker.start()
+            cls._workers.append(worker)
+
+    @classmethod
+    def _work(cls):
+        while True:
+            key, media_path = cls._queue.get()
+            try:
+                cls.generate(media_path, key)
+            except Exception as e:
+                stderr = getattr(e, 'stderr', None) or ''
+                if isinstance(stderr, bytes):
+                    stderr = stderr.decode(errors='replace')
+                lines = stderr.strip().splitlines()
+                error = lines[-1] if lines else str(e)
+                print(f"[PREVIEW] Failed for {media_path}: {error}")
+                with cls._lock:
+                    cls._failed[key] = error
+            finally:
+                with cls._lock:
+                    event = cls._pending.pop(key, None)
+                if event:
+                    event.set()
+                cls._queue.task_done()
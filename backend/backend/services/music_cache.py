@@ -0,0 +1,313 @@
+"""
+Music Asset Cache Service
+
+Caches decoded, mix-ready renditions of background music tracks so mixing
+does not re-decode the source MP3/M4A and rebuild a loop chain per render.
+"""
+
+import os
+import hashlib
+import math
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import imageio_ffmpeg
+
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.tracing import Tracer
+
+
+class MusicAssetCache:
+    """
+    Manages a disk cache of pre-resampled music renditions.
+
+    Two levels are cached:
+    - Base rendition: the source track decoded once to 44.1 kHz stereo FLAC.
+    - Variants: base rendition looped/trimmed with gain and fades applied,
+      keyed by (track, length, fades, gain, loop). The length is the
+      requested duration rounded up to VARIANT_STEP_SECONDS, so renders of
+      slightly different lengths share a variant and trim it at mix time
+      (a fade-out is tied to the exact end, so those keep the duration).
+
+    All writes go to a unique temp file and are renamed into place, so two
+    jobs preparing the same variant never see a partial file, and cleanup
+    skips renditions used within CLEANUP_GRACE_SECONDS.
+    """
+
+    CACHE_DIR = Path.home() / ".zyra-video-agent" / "music-cache"
+    MAX_CACHE_SIZE_GB = 2  # Auto-cleanup after 2GB
+    CLEANUP_GRACE_SECONDS = 600  # Never remove a rendition handed out this recently
+    VARIANT_STEP_SECONDS = 30
+    SAMPLE_RATE = 44100
+    CHANNELS = 2
+
+    _key_locks: Dict[str, threading.Lock] = {}
+    _key_locks_guard = threading.Lock()
+
+    @classmethod
+    def initialize(cls):
+        """Create cache directory if it doesn't exist."""
+        cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def get_track_key(cls, track_path: str) -> str:
+        """
+        Generate a cache key for a source track.
+
+        Args:
+            track_path: Source music file path
+
+        Returns:
+            MD5 hash of path, size and modification time
+        """
+        try:
+            stat = os.stat(track_path)
+            identifier = f"{os.path.abspath(track_path)}_{stat.st_size}_{stat.st_mtime}"
+        except OSError:
+            identifier = os.path.abspath(track_path)
+
+        return hashlib.md5(identifier.encode()).hexdigest()
+
+    @classmethod
+    def variant_length(cls, duration: float, fade_out: float = 0.0) -> float:
+        """
+        Length a variant is rendered to: duration rounded up to the next
+        VARIANT_STEP_SECONDS, or the exact duration when it fades out.
+        """
+        if fade_out > 0:
+            return round(duration, 2)
+        return float(math.ceil(round(duration, 2) / cls.VARIANT_STEP_SECONDS) * cls.VARIANT_STEP_SECONDS)
+
+    @classmethod
+    def get_variant_key(
+        cls,
+        track_path: str,
+        duration: float,
+        volume_db: float = 0.0,
+        fade_in: float = 0.0,
+        fade_out: float = 0.0,
+        loop: bool = True
+    ) -> str:
+        """
+        Generate a cache key for a prepared variant.
+
+        The duration is keyed by variant_length() and gains are rounded, so
+        float noise and small length differences share a variant.
+        """
+        identifier = (
+            f"{cls.get_track_key(track_path)}_{cls.variant_length(duration, fade_out)}_{round(volume_db, 2)}_"
+            f"{round(fade_in, 2)}_{round(fade_out, 2)}_{int(loop)}"
+        )
+        return hashlib.md5(identifier.encode()).hexdigest()
+
+    @classmethod
+    def get_base_rendition(cls, track_path: str) -> str:
+        """
+        Get the 44.1 kHz stereo FLAC rendition of a track, decoding it on first use.
+
+        Args:
+            track_path: Source music file path
+
+        Returns:
+            Path to cached FLAC rendition
+        """
+        cls.initialize()
+
+        cached_path = cls.CACHE_DIR / f"{cls.get_track_key(track_path)}.flac"
+
+        with cls._lock_for(cached_path.name):
+            if cached_path.exists():
+                cached_path.touch()
+                Tracer.record_cache("music_base", hit=True)
+                return str(cached_path)
+
+            Tracer.record_cache("music_base", hit=False)
+            cls._write_atomic(cached_path, [
+                '-i', track_path,
+                '-vn',
+                '-ar', str(cls.SAMPLE_RATE),
+                '-ac', str(cls.CHANNELS),
+                '-c:a', 'flac',
+            ])
+
+        cls._cleanup_if_needed()
+        return str(cached_path)
+
+    @classmethod
+    def get_variant(
+        cls,
+        track_path: str,
+        duration: float,
+        volume_db: float = 0.0,
+        fade_in: float = 0.0,
+        fade_out: float = 0.0,
+        loop: bool = True
+    ) -> str:
+        """
+        Get a mix-ready variant of a track.
+
+        The variant may run past duration (see variant_length), so callers
+        trim it at mix time (-t / atrim / -shortest).
+
+        Args:
+            track_path: Source music file path
+            duration: Minimum duration in seconds
+            volume_db: Gain applied to the music in dB
+            fade_in: Fade-in length in seconds (0 = none)
+            fade_out: Fade-out length in seconds (0 = none)
+            loop: Loop the track if it is shorter than duration
+
+        Returns:
+            Path to cached FLAC variant (44.1 kHz stereo)
+        """
+        cls.initialize()
+
+        variant_key = cls.get_variant_key(track_path, duration, volume_db, fade_in, fade_out, loop)
+        cached_path = cls.CACHE_DIR / f"variant_{variant_key}.flac"
+
+        if cached_path.exists():
+            cached_path.touch()
+            Tracer.record_cache("music_variant", hit=True)
+            return str(cached_path)
+
+        base_path = cls.get_base_rendition(track_path)
+
+        with cls._lock_for(cached_path.name):
+            if cached_path.exists():
+                Tracer.record_cache("music_variant", hit=True)
+                return str(cached_path)
+
+            Tracer.record_cache("music_variant", hit=False)
+            length = cls.variant_length(duration, fade_out)
+
+            filters = []
+            if volume_db:
+                filters.append(f"volume={10 ** (volume_db / 20)}")
+            if fade_in > 0:
+                filters.append(f"afade=t=in:st=0:d={fade_in}")
+            if fade_out > 0:
+                filters.append(f"afade=t=out:st={max(0.0, length - fade_out)}:d={fade_out}")
+
+            args = []
+            if loop:
+                args += ['-stream_loop', '-1']
+            args += ['-i', base_path, '-t', f"{length:.3f}"]
+            if filters:
+                args += ['-af', ','.join(filters)]
+            # 24-bit samples so attenuated music keeps its resolution
+            args += ['-c:a', 'flac', '-sample_fmt', 's32']
+
+            cls._write_atomic(cached_path, args)
+
+        cls._cleanup_if_needed()
+        return str(cached_path)
+
+    @classmethod
+    def _write_atomic(cls, final_path: Path, ffmpeg_args: list):
+        """Run FFmpeg into a unique temp file and rename it into place."""
+        tmp_path = final_path.with_name(f".{final_path.stem}.{uuid.uuid4().hex[:8]}.tmp.flac")
+        cmd = [imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error'] + ffmpeg_args + [str(tmp_path)]
+
+        try:
+            result = FFmpegRunner.run(cmd, label="music_rendition", capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"Music rendition failed: {result.stderr.strip()[-500:]}")
+            os.replace(tmp_path, final_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @classmethod
+    def _lock_for(cls, key: str) -> threading.Lock:
+        """Per-key lock so concurrent jobs build each rendition only once."""
+        with cls._key_locks_guard:
+            lock = cls._key_locks.get(key)
+            if lock is None:
+                lock = cls._key_locks[key] = threading.Lock()
+            return lock
+
+    @classmethod
+    def _forget_lock(cls, key: str):
+        """Evict the per-key lock of a removed rendition (unless a job holds it)."""
+        with cls._key_locks_guard:
+            lock = cls._key_locks.get(key)
+            if lock is not None and not lock.locked():
+                del cls._key_locks[key]
+
+    @classmethod
+    def _cleanup_if_needed(cls):
+        """
+        Clean up old renditions if total size exceeds limit.
+        Uses LRU (Least Recently Used) strategy; renditions used within
+        CLEANUP_GRACE_SECONDS may still be mixed by a job and are kept.
+        """
+        try:
+            cache_files = [f for f in cls.CACHE_DIR.glob("*.flac") if not f.name.startswith('.')]
+            total_size_bytes = sum(f.stat().st_size for f in cache_files)
+            limit_bytes = cls.MAX_CACHE_SIZE_GB * (1024**3)
+
+            if total_size_bytes > limit_bytes:
+                print(f"\n🧹 Music cache ({total_size_bytes / (1024**3):.1f}GB) exceeds limit, cleaning up...")
+
+                # touch() on every hand-out refreshes the mtime
+                last_used = {f: max(f.stat().st_atime, f.stat().st_mtime) for f in cache_files}
+                cache_files.sort(key=last_used.get)
+                cutoff = time.time() - cls.CLEANUP_GRACE_SECONDS
+
+                removed_count = 0
+                for cache_file in cache_files:
+                    if total_size_bytes <= limit_bytes * 0.8:  # Clean to 80% of limit
+                        break
+                    if last_used[cache_file] > cutoff:
+                        break  # Sorted oldest first: the rest are in use
+
+                    file_size = cache_file.stat().st_size
+                    cache_file.unlink()
+                    cls._forget_lock(cache_file.name)
+                    total_size_bytes -= file_size
+                    removed_count += 1
+
+                print(f"   Removed {removed_count} old music renditions")
+
+        except Exception as e:
+            print(f"   ⚠️ Music cache cleanup failed: {e}")
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear entire cache (for maintenance/debugging)."""
+        try:
+            for cache_file in cls.CACHE_DIR.glob("*.flac"):
+                cache_file.unlink()
+                cls._forget_lock(cache_file.name)
+            print("✓ Music cache cleared")
+        except Exception as e:
+            print(f"⚠️ Music cache clear failed: {e}")
+
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache size, file count, etc.
+        """
+        try:
+            cls.initialize()
+            cache_files = list(cls.CACHE_DIR.glob("*.flac"))
+            total_size_bytes = sum(f.stat().st_size for f in cache_files)
+
+            return {
+                'file_count': len(cache_files),
+                'total_size_gb': total_size_bytes / (1024**3),
+                'cache_dir': str(cls.CACHE_DIR)
+            }
+        except Exception:
+            return {
+                'file_count': 0,
+                'total_size_gb': 0,
+                'cache_dir': str(cls.CACHE_DIR)
+            }
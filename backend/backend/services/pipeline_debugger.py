@@ -1,42 +1,90 @@
 """
 Complete Pipeline Debugger - Tracks entire video processing flow in ONE place
+
+Leveled: stage timings are always recorded (and traced), but file probes
+only run when verbose pipeline debugging is on for the run, either via
+the job's pipeline_debug setting or MASSUGC_PIPELINE_DEBUG.
 """
 
 import time
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import os
 
+from backend.services.tracing import Tracer
+
 
 class PipelineDebugger:
     """
     Master debugger that logs EVERYTHING that happens in video processing.
     One simple block showing the complete flow.
+    
+    - OFF: stages are traced, nothing is printed
+    - SUMMARY (default): one condensed report per job, no file probes
+    - VERBOSE: every log_probe() runs probe_file_details (cached per file)
     """
     
-    def __init__(self, job_name: str):
+    OFF = 0
+    SUMMARY = 1
+    VERBOSE = 2
+    
+    ENV_VAR = "MASSUGC_PIPELINE_DEBUG"
+    
+    def __init__(self, job_name: str, level: Union[int, str, bool, None] = None):
         self.job_name = job_name
+        self.level = self.parse_level(level if level is not None else os.environ.get(self.ENV_VAR))
         self.start_time = time.time()
         self.stages = []
         self.current_stage = None
+    
+    @classmethod
+    def parse_level(cls, value: Union[int, str, bool, None]) -> int:
+        """
+        Numbers (int or numeric string, from YAML or JSON alike) are levels:
+        0 = OFF, 1 = SUMMARY, 2+ = VERBOSE. 'off'/False = OFF, ''/None/'summary'
+        = SUMMARY, 'verbose'/True = VERBOSE.
+        """
+        if isinstance(value, bool):
+            return cls.VERBOSE if value else cls.OFF
+        if isinstance(value, str):
+            value = value.strip().lower()
+            try:
+                value = int(float(value))
+            except (ValueError, OverflowError):
+                pass
+        if isinstance(value, (int, float)):
+            return max(cls.OFF, min(cls.VERBOSE, int(value)))
+        if value in ("off", "false", "no", "none"):
+            return cls.OFF
+        if value in ("verbose", "true", "yes", "on"):
+            return cls.VERBOSE
+        return cls.SUMMARY
+    
+    @property
+    def verbose(self) -> bool:
+        return self.level >= self.VERBOSE
         
     def start_stage(self, stage_name: str, details: Dict[str, Any] = None):
         """Start a new stage in the pipeline"""
         if self.current_stage:
             self.current_stage['end_time'] = time.time()
             self.current_stage['duration'] = self.current_stage['end_time'] - self.current_stage['start_time']
+            self.current_stage['span'].end()
         
         self.current_stage = {
             'name': stage_name,
             'start_time': time.time(),
             'details': details or {},
-            'substeps': []
+            'substeps': [],
+            'span': Tracer.start_span(stage_name, kind="pipeline")
         }
         self.stages.append(self.current_stage)
     
     def log(self, message: str, data: Any = None):
         """Log a message in the current stage"""
-        if not self.current_stage:
+        if not self.current_stage or self.level == self.OFF:
             return
         
         self.current_stage['substeps'].append({
@@ -45,11 +93,25 @@ class PipelineDebugger:
             'data': data
         })
     
+    def log_probe(self, message: str, file_path: str, **fields):
+        """
+        Log a file's details. The probe (an FFmpeg spawn plus OpenCV/mutagen
+        reads) only runs at VERBOSE; otherwise just the given fields are kept.
+        """
+        if self.verbose:
+            self.log(message, {**fields, **probe_file_details(file_path)})
+        else:
+            self.log(message, fields or None)
+    
     def print_full_report(self):
         """Print condensed AI-readable pipeline report"""
         if self.current_stage:
             self.current_stage['end_time'] = time.time()
             self.current_stage['duration'] = self.current_stage['end_time'] - self.current_stage['start_time']
+            self.current_stage['span'].end()
+        
+        if self.level == self.OFF:
+            return
         
         total_time = time.time() - self.start_time
         
@@ -83,7 +145,36 @@ class PipelineDebugger:
         print(f"[PIPELINE] complete\n")
 
 
+# Probe results shared across runs, keyed by (path, size, mtime)
+_probe_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_probe_cache_lock = threading.Lock()
+PROBE_CACHE_SIZE = 512
+
+
 def probe_file_details(file_path: str) -> Dict[str, Any]:
+    """Get detailed info about a video/audio file (cached until the file changes)"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return {'error': 'File does not exist'}
+    
+    key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    with _probe_cache_lock:
+        if key in _probe_cache:
+            _probe_cache.move_to_end(key)
+            Tracer.record_cache("probe", hit=True)
+            return dict(_probe_cache[key])
+    
+    Tracer.record_cache("probe", hit=False)
+    details = _probe_file_details(file_path)
+    with _probe_cache_lock:
+        _probe_cache[key] = details
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return dict(details)
+
+
+def _probe_file_details(file_path: str) -> Dict[str, Any]:
     """Get detailed info about a video/audio file"""
     import subprocess
     import imageio_ffmpeg
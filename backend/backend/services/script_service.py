@@ -6,7 +6,8 @@ Handles script generation using OpenAI API and script file processing.
 
 import re
 from pathlib import Path
-from openai import OpenAI
+
+from .api_clients import APIClientRegistry
 
 
 class ScriptService:
@@ -56,8 +57,8 @@ class ScriptService:
             return False, "OpenAI API key is required"
         
         try:
-            # Initialize client
-            client = OpenAI(api_key=api_key)
+            # Shared client (keeps the connection pool warm across jobs)
+            client = APIClientRegistry.get_openai_client(api_key)
             
             # Build system prompt
             system_prompt = cls._build_system_prompt()
@@ -75,15 +76,16 @@ class ScriptService:
                 brand_name=brand_name
             )
             
-            # Generate script
-            response = client.chat.completions.create(
-                model=cls.DEFAULT_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7
-            )
+            # Generate script (SDK retries transient errors itself)
+            with APIClientRegistry.provider_slot('openai'):
+                response = client.chat.completions.create(
+                    model=cls.DEFAULT_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.7
+                )
             
             script_content = response.choices[0].message.content.strip()
             
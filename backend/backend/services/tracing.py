@@ -0,0 +1,383 @@
+"""
+Tracing Service
+
+Structured per-stage and per-FFmpeg spans for campaign jobs, aggregated
+in process for the Prometheus-style /metrics endpoint and kept per run
+as a timeline for /queue/status.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource  # POSIX only; child CPU time is unavailable on Windows
+except ImportError:
+    resource = None
+
+
+# Wall-time histogram buckets (seconds): sub-second probes up to long renders
+HISTOGRAM_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar('trace_run', default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('trace_span', default=None)
+
+
+def _children_cpu() -> float:
+    """User+system CPU of finished child processes (FFmpeg) so far."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Span:
+    """
+    One timed unit of work (a stage, an FFmpeg invocation, a sub-step).
+
+    CPU time is this thread's CPU plus CPU of child processes that finished
+    during the span. Child CPU is process-wide, so it's approximate while
+    several jobs run FFmpeg at the same time.
+    """
+
+    def __init__(self, name: str, kind: str, run_id: Optional[str], parent: Optional['Span'], attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.run_id = run_id
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self.wall: Optional[float] = None
+        self.cpu: Optional[float] = None
+        self._perf_start = time.perf_counter()
+        self._thread_cpu_start = time.thread_time()
+        self._children_cpu_start = _children_cpu()
+        self._token = None
+
+    @property
+    def open(self) -> bool:
+        return self.wall is None
+
+    def set(self, **attrs):
+        """Attach attributes (encoder, clip count, ...)."""
+        self.attrs.update(attrs)
+
+    def add_bytes(self, bytes_in: int = 0, bytes_out: int = 0):
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def end(self, error: Optional[str] = None):
+        """Close the span and fold it into the aggregates (idempotent)."""
+        if not self.open:
+            return
+        self.wall = time.perf_counter() - self._perf_start
+        self.cpu = (time.thread_time() - self._thread_cpu_start) + (_children_cpu() - self._children_cpu_start)
+        if error:
+            self.error = error
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                _current_span.set(self.parent)  # Ended from another context
+            self._token = None
+        Tracer._record(self)
+
+    def to_dict(self, run_start: Optional[float] = None) -> Dict[str, Any]:
+        data = {
+            'name': self.name,
+            'kind': self.kind,
+            'offset': round(self.start - run_start, 3) if run_start else None,
+            'wall': round(self.wall, 3) if self.wall is not None else round(time.perf_counter() - self._perf_start, 3),
+            'cpu': round(self.cpu, 3) if self.cpu is not None else None,
+            'open': self.open,
+        }
+        if self.parent is not None:
+            data['parent'] = self.parent.name
+        if self.bytes_in or self.bytes_out:
+            data['bytes_in'] = self.bytes_in
+            data['bytes_out'] = self.bytes_out
+        if self.cache_hits or self.cache_misses:
+            data['cache_hits'] = self.cache_hits
+            data['cache_misses'] = self.cache_misses
+        if self.attrs:
+            data['attrs'] = self.attrs
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class Tracer:
+    """
+    Process-wide tracer.
+
+    - begin_run() binds a run to the current thread (context); stage()
+      marks sequential pipeline stages, span() / start_span() time nested
+      work. FFmpeg calls are recorded by FFmpegRunner.run().
+    - Spans started outside a run (e.g. in helper thread pools) still count
+      towards the aggregates, just not a run timeline.
+    - Timelines of the last MAX_RUNS finished runs are kept in memory.
+    """
+
+    MAX_RUNS = 50
+    MAX_SPANS_PER_RUN = 500
+
+    _lock = threading.Lock()
+    _runs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+    _stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    _cache_stats: Dict[Tuple[str, str], int] = {}
+    _encoder_stats: Dict[str, int] = {}
+    _run_stats: Dict[Tuple[str, str], int] = {}
+
+    # ─── Runs ────────────────────────────────────────────────────────
+
+    @classmethod
+    def begin_run(cls, run_id: str, campaign_type: str = "unknown", **attrs):
+        """Start tracing a job run in the current context."""
+        with cls._lock:
+            cls._runs[run_id] = {
+                'run_id': run_id,
+                'campaign_type': campaign_type,
+                'status': 'running',
+                'start': time.time(),
+                'end': None,
+                'attrs': attrs,
+                'spans': [],
+                'stage': None
+            }
+            cls._runs.move_to_end(run_id)
+            cls._trim_runs_locked()
+        _current_run.set(run_id)
+        _current_span.set(None)
+
+    @classmethod
+    def end_run(cls, run_id: str, status: str = "completed"):
+        """Close the run's open stage and mark it finished."""
+        with cls._lock:
+            run = cls._runs.get(run_id)
+            stage = run['stage'] if run else None
+        if stage is not None:
+            stage.end()
+        with cls._lock:
+            run = cls._runs.get(run_id)
+            if run and run['status'] == 'running':
+                run['status'] = status
+                run['end'] = time.time()
+                run['stage'] = None
+                key = (run['campaign_type'], status)
+                cls._run_stats[key] = cls._run_stats.get(key, 0) + 1
+        if _current_run.get() == run_id:
+            _current_run.set(None)
+            _current_span.set(None)
+
+    @classmethod
+    def current_run(cls) -> Optional[str]:
+        return _current_run.get()
+
+    # ─── Spans ───────────────────────────────────────────────────────
+
+    @classmethod
+    def stage(cls, name: str, **attrs) -> Optional[Span]:
+        """
+        Mark the start of the next sequential stage of the current run.
+
+        The previous stage is closed, so existing "Step N" code paths only
+        need one call per step. Outside a run this is a no-op.
+        """
+        run_id = _current_run.get()
+        if run_id is None:
+            return None
+        with cls._lock:
+            run = cls._runs.get(run_id)
+            previous = run['stage'] if run else None
+        if previous is not None:
+            previous.end()
+        _current_span.set(None)
+
+        span = cls.start_span(name, kind="stage", **attrs)
+        with cls._lock:
+            if run_id in cls._runs:
+                cls._runs[run_id]['stage'] = span
+        return span
+
+    @classmethod
+    def start_span(cls, name: str, kind: str = "op", **attrs) -> Span:
+        """Open a span under the current span; call span.end() to close it."""
+        parent = _current_span.get()
+        span = Span(name, kind, _current_run.get(), parent, attrs)
+        span._token = _current_span.set(span)
+        if span.run_id is not None:
+            with cls._lock:
+                run = cls._runs.get(span.run_id)
+                if run is not None and len(run['spans']) < cls.MAX_SPANS_PER_RUN:
+                    run['spans'].append(span)
+        return span
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, kind: str = "op", **attrs) -> Iterator[Span]:
+        """
+        Time a block of work.
+
+        Usage:
+            with Tracer.span("whisper.transcribe", model="base") as span:
+                ...
+        """
+        span = cls.start_span(name, kind, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(error=f"{type(e).__name__}: {e}")
+            raise
+        span.end()
+
+    @classmethod
+    def record_cache(cls, cache: str, hit: bool):
+        """Count a cache lookup (and attribute it to the current span)."""
+        result = 'hit' if hit else 'miss'
+        with cls._lock:
+            cls._cache_stats[(cache, result)] = cls._cache_stats.get((cache, result), 0) + 1
+        span = _current_span.get()
+        if span is not None and span.open:
+            if hit:
+                span.cache_hits += 1
+            else:
+                span.cache_misses += 1
+
+    # ─── Reporting ───────────────────────────────────────────────────
+
+    @classmethod
+    def get_timeline(cls, run_id: str) -> Optional[Dict[str, Any]]:
+        """Spans of one run with offsets from the run start."""
+        with cls._lock:
+            run = cls._runs.get(run_id)
+            if run is None:
+                return None
+            spans = list(run['spans'])
+            summary = {k: run[k] for k in ('run_id', 'campaign_type', 'status', 'attrs')}
+            start, end = run['start'], run['end']
+
+        summary['started_at'] = start
+        summary['duration'] = round((end or time.time()) - start, 3)
+        summary['spans'] = [span.to_dict(start) for span in spans]
+        return summary
+
+    @classmethod
+    def get_timelines(cls, limit: int = 20) -> Dict[str, Dict[str, Any]]:
+        """Timelines for running jobs plus the most recent finished ones."""
+        with cls._lock:
+            run_ids = list(cls._runs)[-limit:]
+        return {run_id: timeline for run_id in run_ids if (timeline := cls.get_timeline(run_id))}
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        with cls._lock:
+            stats = {key: dict(value, buckets=list(value['buckets'])) for key, value in cls._stats.items()}
+            cache_stats = dict(cls._cache_stats)
+            encoder_stats = dict(cls._encoder_stats)
+            run_stats = dict(cls._run_stats)
+            active = sum(1 for run in cls._runs.values() if run['status'] == 'running')
+
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{k}="{cls._escape(v)}"' for k, v in values.items()) + "}"
+
+        metric("massugc_span_duration_seconds", "histogram", "Wall time of pipeline spans")
+        for (kind, name), s in sorted(stats.items()):
+            cumulative = 0
+            for bound, count in zip(HISTOGRAM_BUCKETS, s['buckets']):
+                cumulative += count
+                lines.append(f"massugc_span_duration_seconds_bucket{labels(kind=kind, span=name, le=bound)} {cumulative}")
+            lines.append(f"massugc_span_duration_seconds_bucket{labels(kind=kind, span=name, le='+Inf')} {s['count']}")
+            lines.append(f"massugc_span_duration_seconds_sum{labels(kind=kind, span=name)} {s['wall']:.6f}")
+            lines.append(f"massugc_span_duration_seconds_count{labels(kind=kind, span=name)} {s['count']}")
+
+        for metric_name, field, help_text in (
+            ("massugc_span_cpu_seconds_total", 'cpu', "CPU time of pipeline spans (thread + child processes)"),
+            ("massugc_span_bytes_in_total", 'bytes_in', "Bytes read by pipeline spans"),
+            ("massugc_span_bytes_out_total", 'bytes_out', "Bytes written by pipeline spans"),
+            ("massugc_span_errors_total", 'errors', "Pipeline spans that failed"),
+        ):
+            metric(metric_name, "counter", help_text)
+            for (kind, name), s in sorted(stats.items()):
+                value = f"{s[field]:.6f}" if isinstance(s[field], float) else s[field]
+                lines.append(f"{metric_name}{labels(kind=kind, span=name)} {value}")
+
+        metric("massugc_cache_lookups_total", "counter", "Cache lookups by cache and result")
+        for (cache, result), count in sorted(cache_stats.items()):
+            lines.append(f"massugc_cache_lookups_total{labels(cache=cache, result=result)} {count}")
+
+        metric("massugc_ffmpeg_encoder_runs_total", "counter", "FFmpeg invocations by video encoder")
+        for encoder, count in sorted(encoder_stats.items()):
+            lines.append(f"massugc_ffmpeg_encoder_runs_total{labels(encoder=encoder)} {count}")
+
+        metric("massugc_job_runs_total", "counter", "Finished job runs by campaign type and status")
+        for (campaign_type, status), count in sorted(run_stats.items()):
+            lines.append(f"massugc_job_runs_total{labels(campaign_type=campaign_type, status=status)} {count}")
+
+        metric("massugc_jobs_running", "gauge", "Job runs currently being traced")
+        lines.append(f"massugc_jobs_running {active}")
+
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def reset(cls):
+        """Drop all runs and aggregates (for tests)."""
+        with cls._lock:
+            cls._runs.clear()
+            cls._stats.clear()
+            cls._cache_stats.clear()
+            cls._encoder_stats.clear()
+            cls._run_stats.clear()
+        _current_run.set(None)
+        _current_span.set(None)
+
+    # ─── Internals ───────────────────────────────────────────────────
+
+    @classmethod
+    def _record(cls, span: Span):
+        key = (span.kind, span.name)
+        with cls._lock:
+            s = cls._stats.get(key)
+            if s is None:
+                s = cls._stats[key] = {
+                    'count': 0, 'errors': 0, 'wall': 0.0, 'cpu': 0.0,
+                    'bytes_in': 0, 'bytes_out': 0, 'buckets': [0] * len(HISTOGRAM_BUCKETS)
+                }
+            s['count'] += 1
+            s['errors'] += 1 if span.error else 0
+            s['wall'] += span.wall
+            s['cpu'] += span.cpu
+            s['bytes_in'] += span.bytes_in
+            s['bytes_out'] += span.bytes_out
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if span.wall <= bound:
+                    s['buckets'][i] += 1
+                    break
+            if span.kind == 'ffmpeg':
+                encoder = span.attrs.get('encoder') or 'none'
+                cls._encoder_stats[encoder] = cls._encoder_stats.get(encoder, 0) + 1
+
+    @classmethod
+    def _trim_runs_locked(cls):
+        """Keep running jobs plus the newest MAX_RUNS finished ones."""
+        finished = [run_id for run_id, run in cls._runs.items() if run['status'] != 'running']
+        for run_id in finished[:max(0, len(finished) - cls.MAX_RUNS)]:
+            del cls._runs[run_id]
+
+    @staticmethod
+    def _escape(value: Any) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,241 @@
+"""
+TTS Cache Service
+
+Content-addressed disk cache for generated voiceovers, so re-running a
+campaign (or a variant batch reusing one script) doesn't pay ElevenLabs
+again for identical audio.
+"""
+
+import os
+import hashlib
+import shutil
+import threading
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.services.tracing import Tracer
+
+
+class TTSCache:
+    """
+    Manages a disk cache of synthesized voiceovers.
+
+    Entries are keyed by normalized script text, voice ID, model ID and
+    output format. Concurrent requests for the same key are collapsed
+    (singleflight): the first caller synthesizes, the others wait and copy
+    the cached result.
+    """
+
+    CACHE_DIR = Path.home() / ".zyra-video-agent" / "tts-cache"
+    MAX_CACHE_SIZE_GB = 1  # Auto-cleanup after 1GB
+
+    _inflight: Dict[str, List] = {}  # cache_key -> [lock, callers holding or waiting for it]
+    _inflight_guard = threading.Lock()
+
+    @classmethod
+    def initialize(cls):
+        """Create cache directory if it doesn't exist."""
+        cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def normalize_script(script_text: str) -> str:
+        """
+        Normalize script text for cache keying.
+
+        Unicode is NFC-normalized and runs of whitespace collapse to a single
+        space. Case and punctuation are kept since they change delivery.
+        """
+        text = unicodedata.normalize('NFC', script_text or "")
+        return " ".join(text.split())
+
+    @classmethod
+    def get_cache_key(
+        cls,
+        script_text: str,
+        voice_id: str,
+        model_id: str,
+        output_format: str
+    ) -> str:
+        """
+        Generate unique cache key for a voiceover.
+
+        Returns:
+            SHA-256 hash as cache key
+        """
+        identifier = "\x1f".join([
+            cls.normalize_script(script_text), voice_id or "", model_id or "", output_format or ""
+        ])
+        return hashlib.sha256(identifier.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_or_generate(
+        cls,
+        script_text: str,
+        voice_id: str,
+        model_id: str,
+        output_format: str,
+        output_path: str,
+        generate: Callable[[str], None]
+    ) -> Tuple[bool, bool]:
+        """
+        Copy a cached voiceover to output_path, synthesizing it on a miss.
+
+        Args:
+            script_text: Script being voiced
+            voice_id: ElevenLabs voice ID
+            model_id: ElevenLabs model ID
+            output_format: ElevenLabs output format (e.g. 'mp3_44100_128')
+            output_path: Where the job expects the audio file
+            generate: Callable that writes synthesized audio to the path it is given
+
+        Returns:
+            Tuple of (success, cache_hit)
+        """
+        cls.initialize()
+
+        cache_key = cls.get_cache_key(script_text, voice_id, model_id, output_format)
+        cached_path = cls._cache_path(cache_key, output_format)
+
+        with cls._inflight_lock(cache_key):
+            cache_hit = cached_path.exists() and cached_path.stat().st_size > 0
+
+            if not cache_hit:
+                tmp_path = cls.CACHE_DIR / f".{cache_key}.{uuid.uuid4().hex[:8]}.tmp"
+                try:
+                    generate(str(tmp_path))
+                    if not tmp_path.exists() or tmp_path.stat().st_size == 0:
+                        return False, False
+                    os.replace(tmp_path, cached_path)
+                finally:
+                    if tmp_path.exists():
+                        tmp_path.unlink()
+            else:
+                # Update access time for LRU tracking
+                cached_path.touch()
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        shutil.copyfile(cached_path, output_path)
+
+        Tracer.record_cache("tts", hit=cache_hit)
+        if not cache_hit:
+            cls._cleanup_if_needed()
+
+        return True, cache_hit
+
+    @classmethod
+    def get_cached_path(
+        cls,
+        script_text: str,
+        voice_id: str,
+        model_id: str,
+        output_format: str
+    ) -> Optional[Path]:
+        """
+        Look up a cached voiceover without generating it.
+
+        Returns:
+            Path to the cached audio, or None on a miss
+        """
+        cache_key = cls.get_cache_key(script_text, voice_id, model_id, output_format)
+        cached_path = cls._cache_path(cache_key, output_format)
+        if cached_path.exists() and cached_path.stat().st_size > 0:
+            return cached_path
+        return None
+
+    @classmethod
+    def _cache_path(cls, cache_key: str, output_format: str) -> Path:
+        """Cache file for a key (extension taken from the ElevenLabs format, e.g. 'mp3_44100_128')."""
+        extension = output_format.split('_', 1)[0] if output_format else "mp3"
+        return cls.CACHE_DIR / f"{cache_key}.{extension}"
+
+    @classmethod
+    @contextmanager
+    def _inflight_lock(cls, cache_key: str) -> Iterator[None]:
+        """
+        Hold the per-key lock shared by concurrent requests for the same voiceover.
+
+        The entry is dropped when the last caller holding or waiting for it
+        leaves, so keys don't accumulate over a long-running process.
+        """
+        with cls._inflight_guard:
+            entry = cls._inflight.setdefault(cache_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with cls._inflight_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del cls._inflight[cache_key]
+
+    @classmethod
+    def _cleanup_if_needed(cls):
+        """
+        Clean up old voiceovers if total size exceeds limit.
+        Uses LRU (Least Recently Used) strategy.
+        """
+        try:
+            cache_files = [f for f in cls.CACHE_DIR.iterdir() if f.is_file() and not f.name.startswith('.')]
+            total_size_bytes = sum(f.stat().st_size for f in cache_files)
+            limit_bytes = cls.MAX_CACHE_SIZE_GB * (1024**3)
+
+            if total_size_bytes > limit_bytes:
+                print(f"\n🧹 TTS cache ({total_size_bytes / (1024**3):.2f}GB) exceeds limit, cleaning up...")
+
+                # Sort by last use (hits touch the file), oldest first
+                cache_files.sort(key=lambda f: f.stat().st_mtime)
+
+                removed_count = 0
+                for cache_file in cache_files:
+                    if total_size_bytes <= limit_bytes * 0.8:  # Clean to 80% of limit
+                        break
+
+                    file_size = cache_file.stat().st_size
+                    cache_file.unlink()
+                    total_size_bytes -= file_size
+                    removed_count += 1
+
+                print(f"   Removed {removed_count} old cached voiceovers")
+
+        except Exception as e:
+            print(f"   ⚠️ TTS cache cleanup failed: {e}")
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear entire cache (for maintenance/debugging)."""
+        try:
+            if cls.CACHE_DIR.exists():
+                shutil.rmtree(cls.CACHE_DIR)
+                cls.initialize()
+                print("✓ TTS cache cleared")
+        except Exception as e:
+            print(f"⚠️ TTS cache clear failed: {e}")
+
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache size, file count, etc.
+        """
+        try:
+            cls.initialize()
+            cache_files = [f for f in cls.CACHE_DIR.iterdir() if f.is_file() and not f.name.startswith('.')]
+            total_size_bytes = sum(f.stat().st_size for f in cache_files)
+
+            return {
+                'file_count': len(cache_files),
+                'total_size_gb': total_size_bytes / (1024**3),
+                'cache_dir': str(cls.CACHE_DIR)
+            }
+        except Exception:
+            return {
+                'file_count': 0,
+                'total_size_gb': 0,
+                'cache_dir': str(cls.CACHE_DIR)
+            }
@@ -5,7 +5,41 @@ Handles text-to-speech generation using ElevenLabs API.
 """
 
 import os
-from elevenlabs.client import ElevenLabs
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from mutagen import File as MutagenFile
+
+from .api_clients import APIClientRegistry
+from .tts_cache import TTSCache
+
+
+class PendingVoiceover:
+    """
+    Voiceover that is still being synthesized in the background.
+    
+    Carries a duration estimate so callers can plan and encode video while
+    ElevenLabs renders; wait() blocks until the audio file is complete.
+    """
+    
+    def __init__(self, output_path: str, estimated_duration: float, future: Future):
+        self.output_path = output_path
+        self.estimated_duration = estimated_duration
+        self._future = future
+    
+    @property
+    def done(self) -> bool:
+        """True once synthesis has finished (successfully or not)."""
+        return self._future.done()
+    
+    def wait(self, timeout: Optional[float] = None) -> tuple[bool, str]:
+        """
+        Block until the audio file is written.
+        
+        Returns:
+            Tuple of (success, error_message_if_failed)
+        """
+        return self._future.result(timeout=timeout)
 
 
 class TTSService:
@@ -13,6 +47,70 @@ class TTSService:
     
     DEFAULT_MODEL = "eleven_multilingual_v2"
     MONOLINGUAL_MODEL = "eleven_monolingual_v1"
+    OUTPUT_FORMAT = "mp3_44100_128"
+    
+    # Speaking rate used to estimate voiceover length before audio exists.
+    # Slightly slower than typical ElevenLabs delivery so estimates err long
+    # and clip selection covers the real voiceover.
+    ESTIMATE_CHARS_PER_SECOND = 13.0
+    
+    # Background synthesis for start_audio(); actual ElevenLabs concurrency is
+    # still bounded by APIClientRegistry.provider_slot('elevenlabs')
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tts")
+    
+    @classmethod
+    def start_audio(
+        cls,
+        api_key: str,
+        script_text: str,
+        voice_id: str,
+        output_path: str,
+        language: str = "English"
+    ) -> PendingVoiceover:
+        """
+        Start generating audio in the background and return immediately.
+        
+        Args:
+            api_key: ElevenLabs API key
+            script_text: Text to convert to speech
+            voice_id: ElevenLabs voice ID
+            output_path: Path to save generated audio
+            language: Language for TTS (affects model selection)
+            
+        Returns:
+            PendingVoiceover with a duration estimate; wait() returns the
+            same (success, error_message) tuple as generate_audio()
+        """
+        estimated_duration = cls.estimate_duration(script_text, voice_id, language)
+        future = cls._executor.submit(
+            cls.generate_audio, api_key, script_text, voice_id, output_path, language
+        )
+        return PendingVoiceover(output_path, estimated_duration, future)
+    
+    @classmethod
+    def estimate_duration(cls, script_text: str, voice_id: str, language: str = "English") -> float:
+        """
+        Estimate voiceover duration without calling ElevenLabs.
+        
+        Exact when the voiceover is already cached, otherwise derived from
+        script length.
+        
+        Returns:
+            Estimated duration in seconds
+        """
+        cached_path = TTSCache.get_cached_path(
+            script_text, voice_id, cls._select_model(language), cls.OUTPUT_FORMAT
+        )
+        if cached_path:
+            try:
+                audio = MutagenFile(str(cached_path))
+                if audio and getattr(audio.info, 'length', 0):
+                    return float(audio.info.length)
+            except Exception:
+                pass
+        
+        characters = len(TTSCache.normalize_script(script_text))
+        return max(1.0, characters / cls.ESTIMATE_CHARS_PER_SECOND)
     
     @classmethod
     def generate_audio(
@@ -45,25 +143,34 @@ class TTSService:
             if not api_key:
                 return False, "ElevenLabs API key is required"
             
-            # Initialize client
-            client = ElevenLabs(api_key=api_key)
+            # Shared client (keeps the connection pool warm across jobs)
+            client = APIClientRegistry.get_elevenlabs_client(api_key)
             
-            # Select model based on language
-            model = cls.MONOLINGUAL_MODEL if language == "English" else cls.DEFAULT_MODEL
+            model = cls._select_model(language)
             
-            # Generate audio
-            audio_bytes = client.text_to_speech.convert(
-                text=script_text,
-                voice_id=voice_id,
-                model_id=model,
-                output_format="mp3_44100_128"
-            )
+            def synthesize(target_path: str):
+                # Generate audio
+                audio_bytes = client.text_to_speech.convert(
+                    text=script_text,
+                    voice_id=voice_id,
+                    model_id=model,
+                    output_format=cls.OUTPUT_FORMAT
+                )
+                
+                # Save audio to file (response is streamed, so errors can surface here)
+                with open(target_path, 'wb') as f:
+                    for chunk in audio_bytes:
+                        if isinstance(chunk, bytes):
+                            f.write(chunk)
             
-            # Save audio to file
-            with open(output_path, 'wb') as f:
-                for chunk in audio_bytes:
-                    if isinstance(chunk, bytes):
-                        f.write(chunk)
+            # Identical script/voice/model reuses cached audio; concurrent
+            # jobs asking for the same audio wait on a single request
+            _, cache_hit = TTSCache.get_or_generate(
+                script_text, voice_id, model, cls.OUTPUT_FORMAT, output_path,
+                lambda target_path: APIClientRegistry.call_with_retry('elevenlabs', lambda: synthesize(target_path))
+            )
+            if cache_hit:
+                print("Reusing cached voiceover (identical script, voice and model)")
             
             # Verify file creation
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -89,6 +196,11 @@ class TTSService:
             
             return False, error_msg
     
+    @classmethod
+    def _select_model(cls, language: str) -> str:
+        """Select ElevenLabs model based on language."""
+        return cls.MONOLINGUAL_MODEL if language == "English" else cls.DEFAULT_MODEL
+    
     @classmethod
     def validate_voice_id(cls, voice_id: str) -> tuple[bool, str]:
         """
@@ -0,0 +1,196 @@
+"""
+Timeline Renderer for MassUGC Studio
+Describes a Splice ad as an edit decision list (clip segments, clip audio,
+voiceover, music bed) and renders it with a single FFmpeg invocation:
+video is stream-copied through the concat demuxer, the audio sources are
+mixed in one filter graph and the output length comes from the timeline.
+"""
+
+import math
+import os
+import uuid
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import imageio_ffmpeg
+
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.media_index import MediaMetadataIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ClipSegment(NamedTuple):
+    """A normalized clip played from its start, up to outpoint seconds (None = whole clip)"""
+    path: str
+    outpoint: Optional[float] = None
+
+
+@dataclass
+class AudioTrack:
+    """An audio file laid under the whole timeline from 0s"""
+    path: str
+    gain: float = 1.0
+    loop: bool = False  # Repeat until the timeline ends
+
+
+@dataclass
+class Timeline:
+    """
+    One Splice ad.
+
+    - clips play back to back; they must share codec, canvas and frame
+      rate (ClipPreprocessor output) so the video can be stream-copied.
+    - clip_audio_gain > 0 keeps the clips' own audio in the mix (clips
+      normalized with audio_mode='strip' have none). render() drops it
+      when a clip has no audio stream (compatible clips are used as-is).
+    - duration is the output length; nothing is trimmed afterwards.
+    """
+    clips: List[ClipSegment]
+    duration: float
+    clip_audio_gain: float = 0.0
+    voiceover: Optional[AudioTrack] = None
+    music: Optional[AudioTrack] = None
+    fps: int = 30
+    audio_bitrate: str = "192k"
+
+    def clips_have_audio(self) -> bool:
+        """True if every clip has an audio stream (the concat demuxer needs it in all of them)"""
+        try:
+            return all(MediaMetadataIndex.lookup(path)['has_audio']
+                       for path in dict.fromkeys(clip.path for clip in self.clips))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[TIMELINE] Could not detect clip audio: {e}")
+            return False
+
+    def resolve_clip_audio(self) -> None:
+        """Fall back to voiceover/music only when the clips have no audio to mix"""
+        if self.clip_audio_gain > 0 and not self.clips_have_audio():
+            logger.info("[TIMELINE] Clips have no audio stream, mixing without clip audio")
+            self.clip_audio_gain = 0.0
+
+    def mix_levels(self) -> List[Tuple[str, float]]:
+        """
+        Input labels and gains for the audio mix.
+
+        Levels match the former passes, where the voiceover was amixed onto
+        the clip audio and the music onto that result, each amix halving
+        both of its inputs.
+        """
+        levels: List[Tuple[str, float]] = []
+        if self.clip_audio_gain > 0:
+            levels.append(("0:a", self.clip_audio_gain))
+        if self.voiceover:
+            if levels:
+                levels = [(label, gain / 2) for label, gain in levels]
+            levels.append(("1:a", self.voiceover.gain / 2 if levels else self.voiceover.gain))
+        if self.music:
+            music_input = "2:a" if self.voiceover else "1:a"
+            if levels:
+                levels = [(label, gain / 2) for label, gain in levels]
+            levels.append((music_input, self.music.gain / 2 if levels else self.music.gain))
+        return levels
+
+    def audio_filter(self) -> Optional[str]:
+        """filter_complex producing [aout], or None for a silent timeline"""
+        levels = self.mix_levels()
+        if not levels:
+            return None
+
+        chains = [
+            f"[{label}]aformat=sample_rates=44100:channel_layouts=stereo,volume={gain:.6g}[a{index}]"
+            for index, (label, gain) in enumerate(levels)
+        ]
+        if len(levels) == 1:
+            chains[0] = chains[0].replace("[a0]", "[aout]")
+        else:
+            inputs = "".join(f"[a{index}]" for index in range(len(levels)))
+            chains.append(f"{inputs}amix=inputs={len(levels)}:duration=longest:normalize=0[aout]")
+        return ";".join(chains)
+
+    def compile(self, output_path: str, filelist_path: str) -> List[str]:
+        """FFmpeg command rendering the timeline (the concat list must already exist)"""
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-y',
+            '-fflags', '+genpts',  # Generate PTS metadata
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', filelist_path,
+        ]
+        for track in (self.voiceover, self.music):
+            if track:
+                if track.loop:
+                    cmd.extend(['-stream_loop', '-1'])
+                cmd.extend(['-i', track.path])
+
+        audio_filter = self.audio_filter()
+        if audio_filter:
+            cmd.extend(['-filter_complex', audio_filter, '-map', '0:v', '-map', '[aout]',
+                        '-c:a', 'aac', '-b:a', self.audio_bitrate])
+        else:
+            cmd.extend(['-map', '0:v'])
+
+        cmd.extend([
+            '-c:v', 'copy',        # Stream copy video (fast)
+            '-fps_mode', 'cfr',    # Force constant frame rate
+            '-r', str(self.fps),
+            '-t', f"{self.duration:.3f}",  # Output length comes from the timeline
+            '-movflags', '+faststart',
+            output_path
+        ])
+        return cmd
+
+    def render(self, output_path: str, working_dir: Path) -> str:
+        """
+        Render the timeline to output_path in one FFmpeg pass.
+
+        Raises:
+            ValueError: If the timeline has no clips
+            subprocess.CalledProcessError: If FFmpeg fails
+        """
+        if not self.clips:
+            raise ValueError("Timeline has no clips")
+
+        self.resolve_clip_audio()
+        working_dir.mkdir(parents=True, exist_ok=True)
+        filelist_path = str(working_dir / f"timeline_{uuid.uuid4().hex[:8]}.txt")
+        try:
+            write_concat_list(filelist_path, self.clips)
+            cmd = self.compile(output_path, filelist_path)
+            logger.info(f"[TIMELINE] clips={len(self.clips)} duration={self.duration:.2f}s "
+                        f"mix={[label for label, _ in self.mix_levels()]}")
+            FFmpegRunner.run(cmd, label="timeline_render", duration=self.duration,
+                             check=True, capture_output=True)
+        finally:
+            if os.path.exists(filelist_path):
+                os.remove(filelist_path)
+        return output_path
+
+
+def snap_outpoint(use_duration: float, fps: float = 30.0) -> float:
+    """
+    Round a trim length up to the next frame boundary.
+
+    Normalized clips are locked to 30 FPS, so an outpoint between frames
+    would otherwise drop the partially covered last frame.
+    """
+    frames = math.ceil(round(use_duration * fps, 6))
+    return round(frames / fps, 6)
+
+
+def write_concat_list(filelist_path: str, clips: List[tuple]) -> None:
+    """
+    Write a concat demuxer list of (path, outpoint) entries.
+
+    An outpoint of None plays the whole clip; otherwise the demuxer stops
+    reading the clip at that timestamp, which is what a separate
+    `-t ... -c copy` trim used to do.
+    """
+    with open(filelist_path, 'w') as f:
+        for clip, outpoint in clips:
+            safe_path = str(clip).replace("'", "'\\''")
+            f.write(f"file '{safe_path}'\n")
+            if outpoint is not None:
+                f.write(f"outpoint {outpoint}\n")
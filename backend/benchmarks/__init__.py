@@ -0,0 +1,13 @@
+"""
+Render Pipeline Benchmarks
+==========================
+Times the render pipeline stages on deterministic footage generated with
+FFmpeg lavfi sources, stores results as JSON and compares runs to catch
+regressions before a build ships to render nodes.
+
+Run the suite (from backend/):
+    python benchmarks/run_benchmarks.py --repeat 3 --output benchmarks/results/current.json
+
+Compare against a baseline (exit code 1 on regression):
+    python benchmarks/compare.py benchmarks/results/baseline.json benchmarks/results/current.json
+"""
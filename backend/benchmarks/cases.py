@@ -0,0 +1,166 @@
+"""
+Benchmark Cases
+===============
+Each case is called as case(media, work_dir, stack, options), prepares its
+inputs and returns a zero-argument callable; only the callable is timed.
+Cases can register cleanup on stack (an ExitStack closed after timing). Every repetition gets a fresh working directory,
+and the clip cache / working dirs are redirected into it, so "cold"
+cases really start cold.
+"""
+
+import os
+import random
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class SkipBenchmark(Exception):
+    """Raised by a case whose prerequisites are missing (recorded, not failed)"""
+
+
+# name -> (case function, description)
+CASES: Dict[str, tuple] = {}
+
+
+def case(name: str, description: str):
+    """Register a benchmark case"""
+    def register(func: Callable):
+        CASES[name] = (func, description)
+        return func
+    return register
+
+
+@contextmanager
+def isolated_caches(work_dir: Path):
+    """Point ClipCache / ClipPreprocessor / stitch working dirs at work_dir"""
+    from backend import clip_stitch_generator
+    from backend.services.clip_cache import ClipCache
+    from backend.services.clip_preprocessor import ClipPreprocessor
+
+    saved = (ClipCache.CACHE_DIR, ClipPreprocessor.WORKING_DIR, clip_stitch_generator.WORKING_DIR)
+    ClipCache.CACHE_DIR = work_dir / "clip-cache"
+    ClipPreprocessor.WORKING_DIR = work_dir / "working-dir"
+    clip_stitch_generator.WORKING_DIR = work_dir / "working-dir"
+    ClipPreprocessor.WORKING_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        yield
+    finally:
+        ClipCache.CACHE_DIR, ClipPreprocessor.WORKING_DIR, clip_stitch_generator.WORKING_DIR = saved
+
+
+def seed_everything(seed: int = 1234):
+    """Randomized stages pick the same effects every run"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+@case("normalize_clips_cold", "ClipPreprocessor.normalize_clips, empty clip cache")
+def normalize_clips_cold(media: dict, work_dir: Path, stack, options: dict):
+    from backend.services.clip_preprocessor import ClipPreprocessor
+
+    stack.enter_context(isolated_caches(work_dir))
+    return lambda: ClipPreprocessor.normalize_clips(media['clips'], 1080, 1920)
+
+
+@case("normalize_clips_warm", "ClipPreprocessor.normalize_clips, every clip cached")
+def normalize_clips_warm(media: dict, work_dir: Path, stack, options: dict):
+    from backend.services.clip_preprocessor import ClipPreprocessor
+
+    stack.enter_context(isolated_caches(work_dir))
+    ClipPreprocessor.normalize_clips(media['clips'], 1080, 1920)
+    return lambda: ClipPreprocessor.normalize_clips(media['clips'], 1080, 1920)
+
+
+@case("concatenate_clips_smart", "clip_stitch_generator.concatenate_clips_smart, mixed inputs")
+def concatenate_clips_smart(media: dict, work_dir: Path, stack, options: dict):
+    from backend.clip_stitch_generator import concatenate_clips_smart as concat
+
+    stack.enter_context(isolated_caches(work_dir))
+    output_path = str(work_dir / "stitched.mp4")
+    return lambda: concat(media['clips'], output_path, 1080, 1920)
+
+
+@case("randomize_video", "randomizer.randomize_video, medium intensity")
+def randomize_video(media: dict, work_dir: Path, stack, options: dict):
+    from backend.randomizer import randomize_video as randomize
+
+    def run():
+        seed_everything()
+        output_path, _ = randomize(
+            input_path=media['speech_video'],
+            output_base_path=str(work_dir / "randomized"),
+            working_dir=str(work_dir),
+            intensity="medium"
+        )
+        if not output_path:
+            raise RuntimeError("randomize_video returned no output")
+    return run
+
+
+@case("remove_silence", "AudioService.remove_silence on a 12s talking-head stand-in")
+def remove_silence(media: dict, work_dir: Path, stack, options: dict):
+    from backend.services.audio_service import AudioService
+
+    def run():
+        success, error = AudioService.remove_silence(media['speech_video'], str(work_dir / "trimmed.mp4"))
+        if not success:
+            raise RuntimeError(error)
+    return run
+
+
+@case("enhanced_video", "EnhancedVideoProcessor.process_enhanced_video, 2 text overlays + music")
+def enhanced_video(media: dict, work_dir: Path, stack, options: dict):
+    from backend.enhanced_video_processor import (
+        EnhancedVideoProcessor, TextOverlayConfig, TextPosition, MusicConfig
+    )
+
+    processor = EnhancedVideoProcessor(working_dir=work_dir / "enhanced")
+    overlays = [
+        TextOverlayConfig(
+            text="BENCHMARK HOOK", position=TextPosition.TOP_CENTER, font_size=64,
+            design_width=1080, design_height=1920, x_pct=50.0, y_pct=15.0, anchor="center"
+        ),
+        TextOverlayConfig(
+            text="Call to action", position=TextPosition.BOTTOM_CENTER, font_size=48,
+            design_width=1080, design_height=1920, x_pct=50.0, y_pct=85.0, anchor="center"
+        ),
+    ]
+    music = MusicConfig(track_path=media['music'], volume_db=-20.0)
+
+    def run():
+        result = processor.process_enhanced_video(
+            media['speech_video'], str(work_dir / "enhanced.mp4"),
+            text_configs=overlays, music_config=music, validate_quality=False
+        )
+        if not result.get('success'):
+            raise RuntimeError(result.get('error') or "process_enhanced_video failed")
+    return run
+
+
+@case("whisper_transcribe", "whisper transcription of a 12s voiceover (word timestamps)")
+def whisper_transcribe(media: dict, work_dir: Path, stack, options: dict):
+    import whisper
+
+    whisper_model = options.get('whisper_model', 'tiny')
+
+    # Same default location whisper.load_model downloads to
+    cache_root = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "whisper"
+    model_file = cache_root / f"{whisper_model}.pt"
+    if not options.get('download_models') and not model_file.exists():
+        raise SkipBenchmark(f"whisper model '{whisper_model}' not downloaded (use --download-models)")
+
+    model = whisper.load_model(whisper_model)
+    return lambda: model.transcribe(media['voiceover'], word_timestamps=True, fp16=False, language="en")
+
+
+def select_cases(only: Optional[List[str]] = None) -> List[str]:
+    """Case names to run, in registration order"""
+    if not only:
+        return list(CASES)
+    unknown = [name for name in only if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(CASES)}")
+    return [name for name in CASES if name in only]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark Regression Comparator
+===============================
+Compares two benchmark result files by median time per case.
+
+A case regresses when it is slower than the baseline by more than the
+relative threshold AND by more than an absolute noise floor, so tiny
+cases don't flap on scheduler jitter.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.10] [--min-delta 0.05]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+
+DEFAULT_THRESHOLD = 0.10  # 10% slower
+DEFAULT_MIN_DELTA = 0.05  # seconds
+
+# Host fields that make timings incomparable when they differ
+HOST_KEYS = ('platform', 'machine', 'cpu_count', 'ffmpeg', 'gpu_encoder')
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta: float = DEFAULT_MIN_DELTA
+) -> Dict[str, Any]:
+    """
+    Compare two result documents written by run_benchmarks.py.
+
+    Returns:
+        Dict with 'rows' (per-case comparison), 'regressions' and
+        'improvements' (case names), 'missing' (ok in baseline but not
+        measured now) and 'host_mismatch' (differing host fields)
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions, improvements, missing = [], [], []
+
+    base_cases = baseline.get('benchmarks', {})
+    curr_cases = current.get('benchmarks', {})
+
+    for name in sorted(set(base_cases) | set(curr_cases)):
+        base = base_cases.get(name, {})
+        curr = curr_cases.get(name, {})
+
+        if base.get('status') != 'ok':
+            rows.append({'name': name, 'verdict': 'new' if curr.get('status') == 'ok' else 'n/a',
+                         'baseline': None, 'current': curr.get('median')})
+            continue
+        if curr.get('status') != 'ok':
+            missing.append(name)
+            rows.append({'name': name, 'verdict': curr.get('status', 'missing'),
+                         'baseline': base['median'], 'current': None})
+            continue
+
+        delta = curr['median'] - base['median']
+        ratio = delta / base['median'] if base['median'] > 0 else 0.0
+
+        if ratio > threshold and delta > min_delta:
+            verdict = 'regression'
+            regressions.append(name)
+        elif ratio < -threshold and -delta > min_delta:
+            verdict = 'improvement'
+            improvements.append(name)
+        else:
+            verdict = 'same'
+
+        rows.append({'name': name, 'verdict': verdict, 'baseline': base['median'],
+                     'current': curr['median'], 'change': ratio})
+
+    base_host, curr_host = baseline.get('host', {}), current.get('host', {})
+    host_mismatch = [key for key in HOST_KEYS if base_host.get(key) != curr_host.get(key)]
+
+    return {
+        'rows': rows,
+        'regressions': regressions,
+        'improvements': improvements,
+        'missing': missing,
+        'host_mismatch': host_mismatch
+    }
+
+
+def format_report(comparison: Dict[str, Any]) -> str:
+    """Human-readable table of a compare_results() result"""
+    lines = [f"{'benchmark':<28} {'baseline':>10} {'current':>10} {'change':>9}  verdict"]
+    for row in comparison['rows']:
+        base = f"{row['baseline']:.2f}s" if row.get('baseline') is not None else "-"
+        curr = f"{row['current']:.2f}s" if row.get('current') is not None else "-"
+        change = f"{row['change'] * 100:+.1f}%" if 'change' in row else "-"
+        lines.append(f"{row['name']:<28} {base:>10} {curr:>10} {change:>9}  {row['verdict']}")
+
+    if comparison['host_mismatch']:
+        lines.append(f"\n⚠️  Hosts differ ({', '.join(comparison['host_mismatch'])}); timings may not be comparable")
+    if comparison['regressions']:
+        lines.append(f"\n❌ {len(comparison['regressions'])} regression(s): {', '.join(comparison['regressions'])}")
+    else:
+        lines.append("\n✅ No regressions")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('baseline', help="Baseline results JSON")
+    parser.add_argument('current', help="Current results JSON")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                        help="Absolute slowdown in seconds below which changes are noise (default 0.05)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    comparison = compare_results(baseline, current, args.threshold, args.min_delta)
+    print(format_report(comparison))
+    return 1 if comparison['regressions'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
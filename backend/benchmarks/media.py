@@ -0,0 +1,144 @@
+"""
+Synthetic Benchmark Media
+=========================
+Deterministic test footage built from FFmpeg lavfi sources: a mix of
+aspect ratios, codecs, frame rates and clips with and without audio.
+
+Files are generated once per spec and reused; the file name carries a hash
+of the spec, so changing a spec regenerates only that file.
+"""
+
+import hashlib
+import json
+import subprocess
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import imageio_ffmpeg
+
+
+DEFAULT_MEDIA_DIR = Path(__file__).parent / ".media"
+
+
+@dataclass(frozen=True)
+class ClipSpec:
+    """One synthetic clip"""
+    name: str
+    width: int
+    height: int
+    fps: int = 30
+    duration: float = 4.0
+    video_codec: str = "libx264"
+    audio: bool = True
+    container: str = "mp4"
+
+
+# Stitch/normalize inputs: the shapes users actually upload
+CLIP_SPECS: List[ClipSpec] = [
+    ClipSpec("portrait_h264_aac", 1080, 1920),
+    ClipSpec("portrait_720_h264_noaudio", 720, 1280, audio=False),
+    ClipSpec("landscape_h264_aac", 1920, 1080, fps=25),
+    ClipSpec("square_hevc_aac", 1080, 1080, video_codec="libx265"),
+    ClipSpec("portrait_vp9_noaudio", 1080, 1920, fps=24, video_codec="libvpx-vp9", audio=False, container="webm"),
+    ClipSpec("landscape_60fps_h264_aac", 1280, 720, fps=60, duration=3.0),
+]
+
+# A rendered talking-head stand-in: speech-like bursts separated by silences
+SPEECH_VIDEO_SPEC = ClipSpec("speech_portrait_h264_aac", 1080, 1920, duration=12.0)
+
+# Music bed for the enhanced-processing benchmark
+MUSIC_DURATION = 20.0
+
+
+def _video_source(spec: ClipSpec) -> str:
+    # testsrc2 is deterministic frame-by-frame; the rate/size make it per-spec
+    return f"testsrc2=size={spec.width}x{spec.height}:rate={spec.fps}:duration={spec.duration}"
+
+
+def _speech_source(duration: float) -> str:
+    """1.5s voiced bursts (modulated tone) alternating with 0.7s silence"""
+    return (
+        f"aevalsrc='if(lt(mod(t,2.2),1.5),0.4*sin(2*PI*(180+40*sin(2*PI*3*t))*t),0)'"
+        f":s=44100:d={duration}"
+    )
+
+
+def _codec_args(spec: ClipSpec) -> List[str]:
+    args = ['-c:v', spec.video_codec, '-pix_fmt', 'yuv420p']
+    if spec.video_codec == 'libx264':
+        args += ['-preset', 'veryfast']
+    elif spec.video_codec == 'libx265':
+        args += ['-preset', 'ultrafast', '-tag:v', 'hvc1', '-x265-params', 'log-level=error']
+    elif spec.video_codec == 'libvpx-vp9':
+        args += ['-deadline', 'realtime', '-cpu-used', '8', '-b:v', '2M']
+    if spec.audio:
+        args += ['-c:a', 'libopus' if spec.container == 'webm' else 'aac', '-b:a', '128k']
+    return args
+
+
+def _spec_path(media_dir: Path, spec: ClipSpec, speech: bool = False) -> Path:
+    identity = json.dumps(dict(asdict(spec), speech=speech), sort_keys=True)
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:10]
+    return media_dir / f"{spec.name}_{digest}.{spec.container}"
+
+
+def _run_ffmpeg(args: List[str], output_path: Path):
+    """Write to a temp name and rename, so an interrupted run never leaves a partial clip"""
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp{output_path.suffix}")
+    cmd = [imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error'] + args + ['-map_metadata', '-1', str(tmp_path)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        if result.returncode != 0:
+            raise RuntimeError(f"Media generation failed for {output_path.name}: {result.stderr.strip()[-500:]}")
+        tmp_path.replace(output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def generate_clip(spec: ClipSpec, media_dir: Path, speech: bool = False) -> Path:
+    """Generate (or reuse) one clip"""
+    path = _spec_path(media_dir, spec, speech)
+    if path.exists():
+        return path
+
+    args = ['-f', 'lavfi', '-i', _video_source(spec)]
+    if spec.audio:
+        audio = _speech_source(spec.duration) if speech else f"sine=frequency=440:sample_rate=44100:duration={spec.duration}"
+        args += ['-f', 'lavfi', '-i', audio, '-shortest']
+    args += _codec_args(spec)
+    _run_ffmpeg(args, path)
+    return path
+
+
+def generate_audio(name: str, source: str, media_dir: Path) -> Path:
+    """Generate (or reuse) an audio-only file from a lavfi source"""
+    digest = hashlib.sha256(source.encode()).hexdigest()[:10]
+    path = media_dir / f"{name}_{digest}.mp3"
+    if not path.exists():
+        _run_ffmpeg(['-f', 'lavfi', '-i', source, '-c:a', 'libmp3lame', '-b:a', '128k'], path)
+    return path
+
+
+def generate_media(media_dir: Optional[Path] = None) -> Dict[str, object]:
+    """
+    Generate the full benchmark media set.
+
+    Returns:
+        Dict with 'clips' (list of paths, CLIP_SPECS order), 'speech_video',
+        'voiceover' and 'music' paths
+    """
+    media_dir = Path(media_dir or DEFAULT_MEDIA_DIR)
+    media_dir.mkdir(parents=True, exist_ok=True)
+
+    return {
+        'clips': [str(generate_clip(spec, media_dir)) for spec in CLIP_SPECS],
+        'speech_video': str(generate_clip(SPEECH_VIDEO_SPEC, media_dir, speech=True)),
+        'voiceover': str(generate_audio("voiceover", _speech_source(SPEECH_VIDEO_SPEC.duration), media_dir)),
+        'music': str(generate_audio(
+            "music",
+            f"sine=frequency=220:sample_rate=44100:duration={MUSIC_DURATION},volume=0.5",
+            media_dir
+        )),
+    }
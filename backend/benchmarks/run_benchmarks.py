@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Render Pipeline Benchmark Runner
+================================
+Generates the synthetic media set (once), runs each benchmark case
+--repeat times in a fresh working directory and writes a JSON result file
+that benchmarks/compare.py can diff against a baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--repeat 3] [--only remove_silence randomize_video]
+                                        [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path (we're in benchmarks/, need to go up 1 level)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from benchmarks.cases import CASES, SkipBenchmark, select_cases
+from benchmarks.compare import compare_results, format_report
+from benchmarks.media import DEFAULT_MEDIA_DIR, generate_media
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SCHEMA_VERSION = 1
+
+
+def host_info() -> Dict[str, Any]:
+    """What the timings were measured on (compare.py warns when these differ)"""
+    try:
+        ffmpeg_version = subprocess.run(
+            [imageio_ffmpeg.get_ffmpeg_exe(), '-version'], capture_output=True, text=True, timeout=10
+        ).stdout.splitlines()[0]
+    except Exception:
+        ffmpeg_version = "unknown"
+
+    try:
+        from backend.services.gpu_detector import GPUEncoder
+        gpu_encoder = GPUEncoder.detect_available_encoder()
+    except Exception:
+        gpu_encoder = "unknown"
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+            cwd=project_root
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'ffmpeg': ffmpeg_version,
+        'gpu_encoder': gpu_encoder,
+        'git_commit': commit
+    }
+
+
+def run_case(name: str, media: dict, repeat: int, options: dict, verbose: bool) -> Dict[str, Any]:
+    """Time one case; each repetition gets its own working directory"""
+    func, description = CASES[name]
+    runs: List[float] = []
+    result: Dict[str, Any] = {'description': description}
+
+    for _ in range(repeat):
+        work_dir = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+        output = io.StringIO()
+        try:
+            # Pipeline stages print a lot; keep it unless --verbose
+            quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output)
+            with contextlib.ExitStack() as stack, quiet:
+                target = func(media, work_dir, stack, options)
+                start = time.perf_counter()
+                target()
+                runs.append(time.perf_counter() - start)
+        except SkipBenchmark as e:
+            result.update(status='skipped', reason=str(e))
+            return result
+        except Exception as e:
+            result.update(status='error', error=f"{type(e).__name__}: {e}",
+                          traceback=traceback.format_exc(limit=5), runs=runs)
+            return result
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    result.update(
+        status='ok',
+        runs=[round(r, 4) for r in runs],
+        median=round(statistics.median(runs), 4),
+        min=round(min(runs), 4),
+        mean=round(statistics.fmean(runs), 4),
+        stdev=round(statistics.stdev(runs), 4) if len(runs) > 1 else 0.0
+    )
+    return result
+
+
+def run_suite(only: Optional[List[str]] = None, repeat: int = 3, media_dir: Optional[Path] = None,
+              options: Optional[dict] = None, verbose: bool = False) -> Dict[str, Any]:
+    """Run the selected cases and return the result document"""
+    names = select_cases(only)
+    options = options or {}
+
+    print("🎬 Preparing benchmark media...")
+    start = time.perf_counter()
+    media = generate_media(media_dir)
+    print(f"   Ready in {time.perf_counter() - start:.1f}s ({len(media['clips'])} clips + speech video)")
+
+    document = {
+        'schema': SCHEMA_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'host': host_info(),
+        'repeat': repeat,
+        'options': options,
+        'benchmarks': {}
+    }
+
+    for name in names:
+        print(f"⏱️  {name}...", end=" ", flush=True)
+        result = run_case(name, media, repeat, options, verbose)
+        document['benchmarks'][name] = result
+        if result['status'] == 'ok':
+            print(f"median {result['median']:.2f}s (min {result['min']:.2f}s)")
+        elif result['status'] == 'skipped':
+            print(f"skipped: {result['reason']}")
+        else:
+            print(f"❌ {result['error']}")
+
+    return document
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the render pipeline on synthetic media")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case (default 3)")
+    parser.add_argument('--only', nargs='+', metavar='CASE', help=f"Cases to run: {', '.join(CASES)}")
+    parser.add_argument('--output', help="Result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="Compare against this result file; exit 1 on regression")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Regression threshold for --baseline")
+    parser.add_argument('--media-dir', default=str(DEFAULT_MEDIA_DIR), help="Where synthetic media is cached")
+    parser.add_argument('--whisper-model', default='tiny', help="Whisper model for whisper_transcribe")
+    parser.add_argument('--download-models', action='store_true', help="Allow downloading the whisper model")
+    parser.add_argument('--verbose', action='store_true', help="Show pipeline output")
+    args = parser.parse_args(argv)
+
+    document = run_suite(
+        only=args.only,
+        repeat=max(1, args.repeat),
+        media_dir=Path(args.media_dir),
+        options={'whisper_model': args.whisper_model, 'download_models': args.download_models},
+        verbose=args.verbose
+    )
+
+    output_path = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\n📄 Results written to {output_path}")
+
+    exit_code = 1 if any(r['status'] == 'error' for r in document['benchmarks'].values()) else 0
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare_results(baseline, document, threshold=args.threshold)
+        print()
+        print(format_report(comparison))
+        if comparison['regressions']:
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,8 @@ import platform
 import socket
 import time
 import logging
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Optional, Dict, Any, Tuple
 import requests
@@ -21,10 +23,21 @@ logger = logging.getLogger(__name__)
 class DeviceFingerprintGenerator:
     """Generates unique device fingerprints for API authentication"""
     
+    _shared = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         self._cached_fingerprint = None
         self._machine_id = None
     
+    @classmethod
+    def shared(cls) -> 'DeviceFingerprintGenerator':
+        """Process-wide generator, so the fingerprint is computed once and stays stable"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
     def _get_machine_id(self) -> str:
         """Get a unique machine identifier"""
         if self._machine_id:
@@ -128,7 +141,7 @@ class MassUGCApiClient:
     def __init__(self, api_key: str, base_url: str = 'https://massugc-cloud-api.onrender.com'):
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
-        self.device_fingerprint_generator = DeviceFingerprintGenerator()
+        self.device_fingerprint_generator = DeviceFingerprintGenerator.shared()
         self.device_fingerprint = None
         self.session = requests.Session()
         self.user_info = None
@@ -349,6 +362,10 @@ class MassUGCApiClient:
             
             return result
             
+        except MassUGCApiError as e:
+            # Keep status/error code so callers can tell a bad key from an outage
+            logger.error(f"Failed to validate API connection: {e}")
+            raise
         except Exception as e:
             logger.error(f"Failed to validate API connection: {e}")
             raise MassUGCApiError(f"Failed to validate API connection: {str(e)}")
@@ -520,6 +537,12 @@ class MassUGCApiKeyManager:
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(parents=True, exist_ok=True)
         self.keyfile_path = self.config_dir / '.massugc_api_key'
+        
+        # Decoded key memoized against the keyfile's mtime, so per-request
+        # checks cost a stat() instead of a read + base64 decode
+        self._cached_key = None
+        self._cached_mtime = None
+        self._lock = threading.Lock()
     
     def store_api_key(self, api_key: str) -> None:
         """Store API key securely"""
@@ -532,6 +555,10 @@ class MassUGCApiKeyManager:
             
             # Set restrictive permissions
             os.chmod(self.keyfile_path, 0o600)
+            
+            with self._lock:
+                self._cached_key = api_key
+                self._cached_mtime = self.keyfile_path.stat().st_mtime_ns
             logger.info("MassUGC API key stored securely")
             
         except Exception as e:
@@ -541,16 +568,25 @@ class MassUGCApiKeyManager:
     def get_api_key(self) -> Optional[str]:
         """Retrieve stored API key"""
         try:
-            if not self.keyfile_path.exists():
+            try:
+                mtime = self.keyfile_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                with self._lock:
+                    self._cached_key = self._cached_mtime = None
                 return None
             
+            with self._lock:
+                if self._cached_mtime == mtime:
+                    return self._cached_key
+            
             with open(self.keyfile_path, 'r') as f:
                 encoded_key = f.read().strip()
             
-            if not encoded_key:
-                return None
+            api_key = base64.b64decode(encoded_key.encode()).decode() if encoded_key else None
             
-            api_key = base64.b64decode(encoded_key.encode()).decode()
+            with self._lock:
+                self._cached_key = api_key
+                self._cached_mtime = mtime
             return api_key
             
         except Exception as e:
@@ -560,6 +596,8 @@ class MassUGCApiKeyManager:
     def remove_api_key(self) -> None:
         """Remove stored API key"""
         try:
+            with self._lock:
+                self._cached_key = self._cached_mtime = None
             if self.keyfile_path.exists():
                 self.keyfile_path.unlink()
                 logger.info("MassUGC API key removed")
@@ -568,7 +606,131 @@ class MassUGCApiKeyManager:
     
     def has_api_key(self) -> bool:
         """Check if API key is stored"""
-        return self.keyfile_path.exists() and self.get_api_key() is not None
+        return self.get_api_key() is not None
+
+
+class MassUGCLicenseCache:
+    """
+    In-memory license validation state with stale-while-revalidate.
+    
+    - A result is fresh for TTL_SECONDS; in the last REFRESH_AHEAD_SECONDS a
+      background refresh starts while requests keep using the current result.
+    - Past that, the last result is still served (up to MAX_STALE_SECONDS)
+      while the refresh runs, so only the first check of a key blocks on
+      the network.
+    - Concurrent checks share one in-flight validation per key.
+    - Outages (network errors, 429/5xx) keep the last known result and retry
+      after RETRY_SECONDS instead of locking the user out.
+    """
+    
+    TTL_SECONDS = 300
+    REFRESH_AHEAD_SECONDS = 60
+    MAX_STALE_SECONDS = 3600
+    RETRY_SECONDS = 30
+    
+    def __init__(self, base_url: str = 'https://massugc-cloud-api.onrender.com'):
+        self.base_url = base_url
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._clients: Dict[str, MassUGCApiClient] = {}
+        self._lock = threading.Lock()
+    
+    def check(self, api_key: str) -> Dict[str, Any]:
+        """
+        Get the license state for an API key.
+        
+        Returns:
+            Dict with 'valid', 'error_code', 'message', 'user_info', 'checked_at'
+        """
+        now = time.time()
+        
+        with self._lock:
+            result = self._results.get(api_key)
+            if result and now < result['refresh_at']:
+                return result
+            
+            future = self._inflight.get(api_key)
+            start_validation = future is None
+            if start_validation:
+                future = self._inflight[api_key] = Future()
+        
+        usable_stale = result is not None and now < result['expires_at']
+        
+        if start_validation:
+            if usable_stale:
+                threading.Thread(
+                    target=self._validate, args=(api_key, future),
+                    name="massugc-license-refresh", daemon=True
+                ).start()
+            else:
+                self._validate(api_key, future)
+        
+        if usable_stale:
+            return result
+        return future.result()
+    
+    def invalidate(self, api_key: Optional[str] = None) -> None:
+        """Forget cached results (all keys if api_key is None)."""
+        with self._lock:
+            if api_key is None:
+                self._results.clear()
+                self._clients.clear()
+            else:
+                self._results.pop(api_key, None)
+                self._clients.pop(api_key, None)
+    
+    def size(self) -> int:
+        """Number of keys with a cached result."""
+        with self._lock:
+            return len(self._results)
+    
+    def _validate(self, api_key: str, future: Future) -> None:
+        """Run one validation round-trip and publish it to every waiter."""
+        previous = self._results.get(api_key)
+        now = time.time()
+        
+        try:
+            client = self._client_for(api_key)
+            client.validate_connection()
+            result = self._make_result(True, now, user_info=client.user_info)
+        except MassUGCApiError as e:
+            if previous and self._is_transient(e):
+                logger.warning(f"License revalidation failed ({e.message}); keeping last result")
+                result = dict(previous, refresh_at=now + self.RETRY_SECONDS)
+            else:
+                result = self._make_result(False, now, error_code=e.error_code, message=e.message)
+        except Exception as e:
+            result = self._make_result(False, now, message=str(e))
+        
+        with self._lock:
+            self._results[api_key] = result
+            self._inflight.pop(api_key, None)
+        future.set_result(result)
+    
+    def _client_for(self, api_key: str) -> MassUGCApiClient:
+        """Reuse one client (and its keep-alive session) per key."""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = self._clients[api_key] = create_massugc_client(api_key, self.base_url)
+            return client
+    
+    def _make_result(self, valid: bool, now: float, error_code: Optional[str] = None,
+                     message: str = "", user_info: Optional[Dict] = None) -> Dict[str, Any]:
+        return {
+            'valid': valid,
+            'error_code': error_code,
+            'message': message,
+            'user_info': user_info,
+            'checked_at': now,
+            'refresh_at': now + self.TTL_SECONDS - self.REFRESH_AHEAD_SECONDS,
+            'expires_at': now + self.MAX_STALE_SECONDS
+        }
+    
+    @staticmethod
+    def _is_transient(error: MassUGCApiError) -> bool:
+        """Network errors, rate limits and server errors say nothing about the key."""
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
 
 
 def create_massugc_client(api_key: str, base_url: str = 'https://massugc-cloud-api.onrender.com') -> MassUGCApiClient:
@@ -6,7 +6,7 @@ organized according to the testing priority order documented in test_alpha_notes
 
 The tests are organized in the following priority order:
 1. Foundation Tests (test_device_fingerprint, test_gcs_auth)
-2. API Integration Tests (test_with_new_key, test_massugc_integration)
+2. API Integration Tests (test_with_new_key, test_massugc_integration, test_license_cache)
 3. Operational Tests (test_usage_logging, test_failed_job_tracking)
 4. Enhancement Tests (test_rate_limit_fix, test_enhanced_error_messages, test_real_validation)
 """
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+License Cache Tests
+===================
+Exercises MassUGCLicenseCache and the memoized key manager against a local
+stub of the MassUGC /api/validate endpoint: one shared validation for
+concurrent checks, stale results served during refresh, outages keeping
+the last known result.
+
+Usage:
+    python tests/test_alpha/test_license_cache.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from massugc_api_client import MassUGCApiKeyManager, MassUGCLicenseCache
+
+TEST_KEY = "massugc_" + "a" * 32
+
+
+class StubValidateHandler(BaseHTTPRequestHandler):
+    """Answers /api/validate with the server's configured status after an optional delay"""
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.request_count += 1
+        time.sleep(server.delay)
+        
+        if server.status == 200:
+            body = {"success": True, "data": {"user_id": "u1", "email": "stub@example.com"}}
+        else:
+            body = {"error": "invalid_api_key" if server.status == 401 else "rate_limit", "message": "stub"}
+        payload = json.dumps(body).encode()
+        self.send_response(server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(status: int = 200, delay: float = 0.0):
+    """Start the stub on an ephemeral port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubValidateHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.status = status
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_concurrent_checks_share_one_validation():
+    """Cold cache: concurrent requests wait on a single round-trip"""
+    server, base_url = start_stub_server(delay=0.2)
+    try:
+        cache = MassUGCLicenseCache(base_url)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.check(TEST_KEY))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert server.request_count == 1
+        assert all(r['valid'] for r in results)
+        assert results[0]['user_info']['email'] == "stub@example.com"
+        
+        # Fresh result: no further requests
+        cache.check(TEST_KEY)
+        assert server.request_count == 1
+    finally:
+        server.shutdown()
+    print("✅ Concurrent checks share one validation")
+
+
+def test_stale_result_served_during_refresh():
+    """Once a refresh is due, requests keep the last result and don't wait"""
+    server, base_url = start_stub_server()
+    try:
+        cache = MassUGCLicenseCache(base_url)
+        assert cache.check(TEST_KEY)['valid']
+        
+        server.delay = 1.0
+        cache._results[TEST_KEY]['refresh_at'] = 0  # Refresh due
+        
+        start = time.time()
+        assert cache.check(TEST_KEY)['valid']
+        assert time.time() - start < 0.5, "Check should not block on the refresh"
+        
+        deadline = time.time() + 5
+        while cache._results[TEST_KEY]['refresh_at'] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        assert cache._results[TEST_KEY]['refresh_at'] > time.time()
+        assert server.request_count == 2
+    finally:
+        server.shutdown()
+    print("✅ Stale result served while revalidating")
+
+
+def test_outage_keeps_last_result_but_rejection_does_not():
+    """429/5xx keep the last valid result; a 401 revokes it"""
+    server, base_url = start_stub_server()
+    try:
+        cache = MassUGCLicenseCache(base_url)
+        assert cache.check(TEST_KEY)['valid']
+        
+        server.status = 429
+        cache._results[TEST_KEY]['refresh_at'] = 0
+        cache._results[TEST_KEY]['expires_at'] = 0  # Force a blocking revalidation
+        assert cache.check(TEST_KEY)['valid']
+        
+        server.status = 401
+        cache._results[TEST_KEY]['refresh_at'] = 0
+        cache._results[TEST_KEY]['expires_at'] = 0
+        result = cache.check(TEST_KEY)
+        assert not result['valid']
+        assert result['error_code'] == 'invalid_api_key'
+    finally:
+        server.shutdown()
+    print("✅ Outages keep the license, rejections revoke it")
+
+
+def test_key_manager_memoizes_key():
+    """Key is decoded once and re-read only when the keyfile changes"""
+    manager = MassUGCApiKeyManager(Path(tempfile.mkdtemp(prefix="massugc_cfg_")))
+    assert manager.get_api_key() is None
+    assert not manager.has_api_key()
+    
+    manager.store_api_key(TEST_KEY)
+    assert manager.get_api_key() == TEST_KEY
+    assert manager.has_api_key()
+    
+    # Changed on disk by someone else: picked up via mtime
+    other_key = "massugc_" + "b" * 32
+    other = MassUGCApiKeyManager(manager.config_dir)
+    time.sleep(0.01)
+    other.store_api_key(other_key)
+    assert manager.get_api_key() == other_key
+    
+    manager.remove_api_key()
+    assert manager.get_api_key() is None
+    print("✅ Key manager memoizes the decoded key")
+
+
+if __name__ == "__main__":
+    test_concurrent_checks_share_one_validation()
+    test_stale_result_served_during_refresh()
+    test_outage_keeps_last_result_but_rejection_does_not()
+    test_key_manager_memoizes_key()
@@ -0,0 +1,30 @@
+"""
+Services Test Package
+=====================
+Tests for the shared backend services (music library, caches, clients,
+schedulers) using real files and local stand-ins instead of remote APIs.
+
+Run individual test files:
+    python tests/test_services/test_music_library.py
+    python tests/test_services/test_music_cache.py
+    python tests/test_services/test_api_clients.py
+    python tests/test_services/test_tts_cache.py
+    python tests/test_services/test_tts_service.py
+    python tests/test_services/test_drive_upload_queue.py
+    python tests/test_services/test_gcs_transfer.py
+    python tests/test_services/test_streaming_silence.py
+    python tests/test_services/test_tracing.py
+    python tests/test_services/test_ffmpeg_runner.py
+    python tests/test_services/test_job_scheduler.py
+    python tests/test_services/test_render_farm.py
+    python tests/test_services/test_batch_planner.py
+    python tests/test_services/test_lazy_loader.py
+    python tests/test_services/test_whisper_timing.py
+    python tests/test_services/test_clip_preprocessor.py
+    python tests/test_services/test_timeline.py
+    python tests/test_services/test_pipeline_debugger.py
+    python tests/test_services/test_clip_pool.py
+    python tests/test_services/test_gpu_detector.py
+    python tests/test_services/test_media_preview.py
+    python tests/test_services/test_media_index.py
+"""
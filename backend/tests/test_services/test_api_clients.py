@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+API Client Registry Tests
+=========================
+Exercises pooled provider clients against a local HTTP stub server that
+stands in for DreamFace: keep-alive reuse, retries on 503 (but no resent
+submits on other 5xx) and bounded per-provider concurrency.
+
+Usage:
+    python tests/test_services/test_api_clients.py
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.api_clients import APIClientRegistry
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Minimal JSON API: records client ports, fails the first N requests (503 by default)"""
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.request_count += 1
+            fail = server.failures_remaining > 0
+            if fail:
+                server.failures_remaining -= 1
+        
+        status = server.failure_status if fail else 200
+        body = json.dumps({"code": 0 if not fail else 1, "data": {"taskId": "stub-task"}}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if fail:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(failures: int = 0, failure_status: int = 503):
+    """Start the stub on an ephemeral port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubProviderHandler)
+    server.lock = threading.Lock()
+    server.failure_status = failure_status
+    server.client_ports = set()
+    server.request_count = 0
+    server.failures_remaining = failures
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_session_is_reused_per_key():
+    """Same provider + key returns one session whose connection is kept alive"""
+    server, base_url = start_stub_server()
+    try:
+        session = APIClientRegistry.get_http_session('dreamface-stub', 'key-a')
+        assert APIClientRegistry.get_http_session('dreamface-stub', 'key-a') is session
+        assert APIClientRegistry.get_http_session('dreamface-stub', 'key-b') is not session
+        
+        for _ in range(5):
+            response = session.post(f"{base_url}/api/getAsyncResult", json={"taskId": "x"}, timeout=5)
+            assert response.status_code == 200
+        
+        assert server.request_count == 5
+        assert len(server.client_ports) == 1, "Expected one keep-alive connection"
+        assert session.headers['Authorization'] == "Bearer key-a"
+    finally:
+        server.shutdown()
+        APIClientRegistry.close_all()
+    print("✅ Pooled session reuses one connection across requests")
+
+
+def test_session_retries_transient_status():
+    """503 responses are retried with backoff until the stub recovers"""
+    server, base_url = start_stub_server(failures=2)
+    previous_base = APIClientRegistry.BACKOFF_BASE_SECONDS
+    APIClientRegistry.BACKOFF_BASE_SECONDS = 0.01
+    try:
+        session = APIClientRegistry.get_http_session('dreamface-retry-stub', 'key')
+        response = session.post(f"{base_url}/api/async/talking_face", json={}, timeout=5)
+        assert response.status_code == 200
+        assert response.json()["data"]["taskId"] == "stub-task"
+        assert server.request_count == 3
+    finally:
+        APIClientRegistry.BACKOFF_BASE_SECONDS = previous_base
+        server.shutdown()
+        APIClientRegistry.close_all()
+    print("✅ Transient 503s are retried")
+
+
+def test_submit_session_does_not_resend_on_server_error():
+    """A 500 on a non-idempotent submit is returned as-is; a 503 rejection is retried"""
+    previous_base = APIClientRegistry.BACKOFF_BASE_SECONDS
+    APIClientRegistry.BACKOFF_BASE_SECONDS = 0.01
+    try:
+        session = APIClientRegistry.get_http_session('dreamface-submit-stub', 'key', idempotent=False)
+        assert session is not APIClientRegistry.get_http_session('dreamface-submit-stub', 'key')
+
+        server, base_url = start_stub_server(failures=1, failure_status=500)
+        try:
+            response = session.post(f"{base_url}/api/async/talking_face", json={}, timeout=5)
+            assert response.status_code == 500
+            assert server.request_count == 1, "Submit was resent after a 500"
+        finally:
+            server.shutdown()
+
+        server, base_url = start_stub_server(failures=1, failure_status=503)
+        try:
+            response = session.post(f"{base_url}/api/async/talking_face", json={}, timeout=5)
+            assert response.status_code == 200
+            assert server.request_count == 2
+        finally:
+            server.shutdown()
+    finally:
+        APIClientRegistry.BACKOFF_BASE_SECONDS = previous_base
+        APIClientRegistry.close_all()
+    print("✅ Submits retry rejections only, never a possibly accepted 5xx")
+
+
+def test_call_with_retry_and_concurrency_bound():
+    """call_with_retry retries retryable errors and respects the provider limit"""
+    previous_base = APIClientRegistry.BACKOFF_BASE_SECONDS
+    APIClientRegistry.BACKOFF_BASE_SECONDS = 0.01
+    APIClientRegistry.MAX_CONCURRENCY['bounded-stub'] = 2
+    
+    class RateLimited(Exception):
+        status_code = 429
+    
+    try:
+        attempts = []
+        
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimited("slow down")
+            return "ok"
+        
+        assert APIClientRegistry.call_with_retry('bounded-stub', flaky) == "ok"
+        assert len(attempts) == 3
+        
+        # Non-retryable errors surface immediately
+        def broken():
+            raise ValueError("bad request")
+        try:
+            APIClientRegistry.call_with_retry('bounded-stub', broken)
+            assert False, "ValueError should propagate"
+        except ValueError:
+            pass
+        
+        # No more than 2 concurrent calls inside the slot
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_call():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+        
+        threads = [threading.Thread(target=APIClientRegistry.call_with_retry, args=('bounded-stub', slow_call))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(peak) <= 2
+    finally:
+        APIClientRegistry.BACKOFF_BASE_SECONDS = previous_base
+        APIClientRegistry.MAX_CONCURRENCY.pop('bounded-stub', None)
+    print("✅ Retries with jitter and bounded concurrency work")
+
+
+if __name__ == "__main__":
+    test_session_is_reused_per_key()
+    test_session_retries_transient_status()
+    test_submit_session_does_not_resend_on_server_error()
+    test_call_with_retry_and_concurrency_bound()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Batch Planner Tests
+===================
+Checks /run-batch request parsing, interleaved run order, when a Splice
+source folder gets one shared normalization pass, the prep run filling
+ClipCache for a folder of real FFmpeg-encoded clips, and a pinned batch
+script travelling in the run payload so any farm node can execute it.
+
+Usage:
+    python tests/test_services/test_batch_planner.py
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.batch_planner import parse_batch_request, pin_shared_script, plan_batch, run_prep
+from backend.job_scheduler import JobScheduler
+from backend.services.clip_cache import ClipCache
+from backend.services.script_service import ScriptService
+
+
+@contextmanager
+def temp_clip_cache():
+    """Point ClipCache at a fresh temp dir for the duration of a test"""
+    previous = ClipCache.CACHE_DIR
+    ClipCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="clip_cache_"))
+    try:
+        yield ClipCache.CACHE_DIR
+    finally:
+        ClipCache.CACHE_DIR = previous
+
+
+def make_clip_folder(count: int) -> Path:
+    folder = Path(tempfile.mkdtemp(prefix="batch_clips_"))
+    for i in range(count):
+        subprocess.run([
+            imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', 'testsrc2=size=320x240:rate=25:duration=0.5',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+            str(folder / f"clip_{i}.mp4")
+        ], check=True, capture_output=True)
+    return folder
+
+
+def splice_job(campaign_id: str, folder: Path, total_clips: int, **extra):
+    return {'id': campaign_id, 'random_video_settings': {
+        'source_directory': str(folder), 'total_clips': total_clips,
+        'canvas_width': 180, 'canvas_height': 320, 'original_volume': 0}, **extra}
+
+
+def test_parse_batch_request():
+    assert parse_batch_request({'campaign_id': 'a', 'count': '3'}) == [('a', 3, False)]
+    assert parse_batch_request({'campaigns': ['a', {'campaign_id': 'b', 'count': 2, 'share_script': True}],
+                                'share_script': False}) == [('a', 1, False), ('b', 2, True)]
+    for bad in ({}, {'campaigns': []}, {'campaign_id': 'a', 'count': 0},
+                {'campaign_id': 'a', 'count': 'many'}, {'campaign_id': 'a', 'count': 5000}):
+        try:
+            parse_batch_request(bad)
+            raise AssertionError(f"accepted {bad}")
+        except ValueError:
+            pass
+    print("✅ Batch requests parse and reject bad input")
+
+
+def test_plan_interleaves_and_shares_prep():
+    """Runs alternate between campaigns; a well-covered folder is prepped once"""
+    folder = Path(tempfile.mkdtemp(prefix="batch_plan_"))
+    for i in range(4):
+        (folder / f"clip_{i}.mp4").write_bytes(b"x")
+
+    jobs = {
+        'a': splice_job('a', folder, total_clips=2),
+        'b': splice_job('b', folder, total_clips=2, useExactScript=True),
+        'avatar': {'id': 'avatar', 'avatar_video_path': 'a.mp4'},
+    }
+    plan = plan_batch([('a', 3, True), ('b', 2, True), ('avatar', 1, False)], jobs)
+
+    assert [run.campaign_id for run in plan.runs] == ['a', 'b', 'avatar', 'a', 'b', 'a']
+    assert [run.variant for run in plan.runs if run.campaign_id == 'a'] == [1, 2, 3]
+    assert len({run.run_id for run in plan.runs}) == 6
+    assert plan.runs[0].job is not plan.runs[3].job  # Variants can be pinned independently
+
+    # a and b draw 5 x 2 clips from a 4-clip folder with the same canvas: one prep
+    assert len(plan.clip_preps) == 1
+    assert plan.clip_preps[0].runs == 5 and len(plan.clip_preps[0].clips) == 4
+    assert plan.clip_preps[0].audio_mode == 'strip'
+
+    # Only the generated-script campaign pins a shared script
+    assert plan.shared_scripts == ['a']
+
+    # A single run (or few picks from a large folder) normalizes on demand
+    assert plan_batch([('a', 1, False)], jobs).clip_preps == []
+    jobs['big'] = splice_job('big', folder, total_clips=1)
+    assert plan_batch([('big', 2, False)], jobs).clip_preps == []
+    print("✅ Plan interleaves runs and shares prep")
+
+
+def test_prep_fills_clip_cache():
+    """Running the plan's prep normalizes each folder clip into ClipCache once"""
+    folder = make_clip_folder(2)
+    jobs = {'a': splice_job('a', folder, total_clips=2)}
+    scheduler = JobScheduler(scratch_dir=tempfile.mkdtemp(), cpu_count=2, total_memory_mb=8000)
+
+    with temp_clip_cache():
+        plan = plan_batch([('a', 3, True)], jobs)
+        report = run_prep(plan, scheduler.submit, api_key=None)
+
+        assert report['clip_preps'][0]['total'] == 2
+        assert report['clip_preps'][0]['converted'] + report['clip_preps'][0]['resized'] == 2
+        keys = {ClipCache.get_cache_key(str(clip), 180, 320, 'center', 'strip') for clip in folder.iterdir()}
+        assert keys <= ClipCache.cached_keys()
+
+        # Without an OpenAI key the variants keep generating their own scripts
+        assert report['shared_scripts'] == {'a': "OpenAI API key not configured"}
+        assert not any(run.job.get('useExactScript') for run in plan.runs)
+
+        # A second batch over the same folder is all cache hits
+        again = run_prep(plan_batch([('a', 2, False)], jobs), scheduler.submit, None)
+        assert again['clip_preps'][0]['cached_hits'] == 2
+    scheduler.shutdown()
+    print("✅ Prep fills ClipCache")
+
+
+def test_pinned_script_travels_with_runs():
+    """A pinned script is carried in each run's job; the campaign's script path is kept"""
+    original_script = Path(tempfile.mkdtemp()) / "example.txt"
+    original_script.write_text("An example script.")
+    jobs = {'a': {'id': 'a', 'example_script_file': str(original_script), 'product': 'Tea'}}
+
+    original = ScriptService.__dict__['generate_script']
+    ScriptService.generate_script = classmethod(lambda cls, **kwargs: (True, "One script for every variant."))
+    try:
+        plan = plan_batch([('a', 3, True)], jobs)
+        assert pin_shared_script(plan, 'a', 'sk-test') is None
+    finally:
+        ScriptService.generate_script = original
+
+    for run in plan.runs:
+        assert run.job['example_script_content'] == "One script for every variant." and run.job['useExactScript']
+        # Failure tracking keeps grouping by the campaign's own script
+        assert run.job['example_script_file'] == str(original_script)
+        json.loads(json.dumps(run.job))  # Farm workers receive the job as JSON
+    assert 'example_script_content' not in jobs['a']  # Campaign itself untouched
+    print("✅ Pinned script carried in the run payload")
+
+
+if __name__ == "__main__":
+    test_parse_batch_request()
+    test_plan_interleaves_and_shares_prep()
+    test_prep_fills_clip_cache()
+    test_pinned_script_travels_with_runs()
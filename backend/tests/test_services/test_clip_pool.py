@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Clip Pool Tests
+===============
+Checks the alias sampler against its weights, that a pool re-lists its
+folder only when the folder changes, that durations are probed once per
+file, and that a 100-variant batch spreads clips evenly without
+consecutive runs sharing clips.
+
+Usage:
+    python tests/test_services/test_clip_pool.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.clip_pool import AliasTable, ClipPool
+
+
+def make_folder(count: int) -> Path:
+    folder = Path(tempfile.mkdtemp(prefix="clip_pool_"))
+    for i in range(count):
+        (folder / f"clip_{i:02d}.mp4").write_bytes(b"not really a video")
+    (folder / "notes.txt").write_text("ignored")
+    return folder
+
+
+def touch_dir(folder: Path, offset: int):
+    """Bump the folder mtime explicitly (coarse filesystem clocks)"""
+    stat = folder.stat()
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset))
+
+
+def test_alias_table_follows_weights():
+    random.seed(7)
+    table = AliasTable([1, 2, 3, 4])
+    counts = Counter(table.sample() for _ in range(40000))
+    for index, weight in enumerate([1, 2, 3, 4]):
+        assert abs(counts[index] / 40000 - weight / 10) < 0.01, counts
+    print("✅ Alias table draws in proportion to the weights")
+
+
+def test_pool_relists_only_on_change():
+    ClipPool.clear()
+    folder = make_folder(3)
+    pool = ClipPool.for_directory(str(folder), (".mp4",))
+    assert len(pool) == 3 and all(clip.endswith(".mp4") for clip in pool.clips)
+    assert ClipPool.for_directory(str(folder), (".MP4",)) is pool
+    assert not pool.refresh()
+
+    (folder / "clip_99.mp4").write_bytes(b"new")
+    touch_dir(folder, 1_000_000)
+    assert pool.refresh() and len(pool) == 4
+
+    probes = []
+    probe = lambda path: probes.append(path) or 2.5
+    clip = pool.clips[0]
+    assert pool.duration(clip, probe) == 2.5 and pool.duration(clip, probe) == 2.5
+    assert probes == [clip]
+
+    # A replaced file is probed again, a removed one drops out of the pool
+    Path(clip).write_bytes(b"a longer replacement clip")
+    pool.duration(clip, probe)
+    assert probes == [clip, clip]
+    Path(clip).unlink()
+    touch_dir(folder, 2_000_000)
+    assert pool.refresh() and clip not in pool.clips
+    print("✅ Pool re-lists only when the folder changes, durations probed once")
+
+
+def test_exclude_and_exhaustion():
+    ClipPool.clear()
+    random.seed(3)
+    folder = make_folder(5)
+    pool = ClipPool.for_directory(str(folder), (".mp4",))
+    hook = pool.clips[0]
+
+    everything = pool.pick(exclude=[hook])
+    assert sorted(everything) == pool.clips[1:]
+    assert len(pool.pick(10, exclude=[hook])) == 4
+    assert all(pool.sample(exclude=[hook]) != hook for _ in range(50))
+    assert pool.sample(exclude=pool.clips) is None
+    print("✅ Draws are distinct, skip excluded clips and stop when exhausted")
+
+
+def test_batch_spreads_clips_evenly():
+    ClipPool.clear()
+    random.seed(11)
+    folder = make_folder(10)
+    pool = ClipPool.for_directory(str(folder), (".mp4",))
+
+    counts = Counter()
+    previous = set()
+    for _ in range(100):
+        run = pool.pick(3)
+        assert len(set(run)) == 3
+        assert not previous & set(run), "consecutive runs share a clip"
+        counts.update(run)
+        previous = set(run)
+
+    # 300 picks over 10 clips: every clip close to 30 uses
+    assert len(counts) == 10
+    assert max(counts.values()) - min(counts.values()) <= 6, counts
+    print("✅ 100-variant batch spreads clips evenly with no back-to-back repeats")
+
+
+if __name__ == "__main__":
+    test_alias_table_follows_weights()
+    test_pool_relists_only_on_change()
+    test_exclude_and_exhaustion()
+    test_batch_spreads_clips_evenly()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Clip Preprocessor Tests
+=======================
+Checks that a Splice selection is prepared as one batch: repeated picks
+are normalized once, misses are encoded concurrently, and the normalized
+list lines up with the selection order.
+
+Usage:
+    python tests/test_services/test_clip_preprocessor.py
+"""
+
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.clip_analyzer import ClipAnalyzer
+from backend.services.clip_cache import ClipCache
+from backend.services.clip_preprocessor import ClipPreprocessor
+
+
+@contextmanager
+def temp_clip_cache():
+    """Point ClipCache at a fresh temp dir for the duration of a test"""
+    previous = ClipCache.CACHE_DIR
+    ClipCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="clip_cache_"))
+    try:
+        yield ClipCache.CACHE_DIR
+    finally:
+        ClipCache.CACHE_DIR = previous
+
+
+def make_clips(count: int) -> list:
+    folder = Path(tempfile.mkdtemp(prefix="prep_clips_"))
+    clips = []
+    for i in range(count):
+        path = folder / f"clip_{i}.mp4"
+        subprocess.run([
+            imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', 'testsrc2=size=320x240:rate=25:duration=0.5',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+            str(path)
+        ], check=True, capture_output=True)
+        clips.append(str(path))
+    return clips
+
+
+def test_analyze_clips_in_parallel_keeps_order():
+    clips = make_clips(3)
+    serial = ClipAnalyzer.analyze_clips(clips, 180, 320)
+    parallel = ClipAnalyzer.analyze_clips(clips, 180, 320, max_workers=3)
+    assert serial == parallel
+    assert sum(len(group) for group in parallel) == 3
+    print("✅ Parallel probing categorizes like serial probing")
+
+
+def test_repeated_picks_normalize_once():
+    a, b, c = make_clips(3)
+    encodes = []
+    active = {'now': 0, 'peak': 0}
+    lock = threading.Lock()
+    originals = {name: ClipPreprocessor.__dict__[name] for name in ('_resize_clip', '_convert_clip')}
+
+    def tracked(original):
+        def encode(clip, *args):
+            with lock:
+                encodes.append(clip)
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.2)  # Hold the slot so overlapping encodes are visible
+            try:
+                return original(clip, *args)
+            finally:
+                with lock:
+                    active['now'] -= 1
+        return encode
+
+    for name in originals:
+        setattr(ClipPreprocessor, name, tracked(getattr(ClipPreprocessor, name)))
+    try:
+        with temp_clip_cache():
+            picks = [a, b, a, c, a]
+            normalized, stats = ClipPreprocessor.normalize_clips(picks, 180, 320, audio_mode='strip')
+
+            assert sorted(encodes) == [a, b, c]
+            assert active['peak'] == 3
+            assert stats['total'] == 5 and stats['unique'] == 3
+            assert stats['resized'] + stats['converted'] == 3
+
+            # Output lines up with the picks; repeats share one normalized file
+            assert len(normalized) == 5
+            assert normalized[0] == normalized[2] == normalized[4]
+            assert len({normalized[0], normalized[1], normalized[3]}) == 3
+            assert all(Path(path).parent == ClipCache.CACHE_DIR for path in normalized)
+
+            # A second selection is all cache hits, still in order
+            again, stats = ClipPreprocessor.normalize_clips([c, a], 180, 320, audio_mode='strip')
+            assert again == [normalized[3], normalized[0]]
+            assert stats['cached_hits'] == 2 and len(encodes) == 3
+    finally:
+        for name, original in originals.items():
+            setattr(ClipPreprocessor, name, original)
+    print("✅ Repeated picks normalize once, misses encode concurrently")
+
+
+if __name__ == "__main__":
+    test_analyze_clips_in_parallel_keeps_order()
+    test_repeated_picks_normalize_once()
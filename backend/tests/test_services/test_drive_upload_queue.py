@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Drive Upload Queue Tests
+========================
+Runs GoogleDriveService uploads and DriveUploadQueue against a local HTTP
+stand-in for the Drive v3 API: folder-ID caching, chunked resumable
+uploads with progress events, retry after a 503 and resuming a persisted
+session after a restart.
+
+Usage:
+    python tests/test_services/test_drive_upload_queue.py
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from google.oauth2.credentials import Credentials
+
+from backend.google_drive_service import GoogleDriveService
+from backend.drive_upload_queue import DriveUploadQueue
+
+CHUNK = 256 * 1024
+
+
+class StubDriveHandler(BaseHTTPRequestHandler):
+    """Just enough of Drive v3: folder list/create and resumable uploads"""
+    protocol_version = "HTTP/1.1"
+    
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+    
+    def do_GET(self):
+        drive = self.server.drive
+        url = urlparse(self.path)
+        query = parse_qs(url.query)['q'][0]
+        name = re.search(r"name='((?:[^'\\]|\\.)*)'", query).group(1).replace("\\'", "'")
+        parent = re.search(r"'([^']+)' in parents", query).group(1)
+        with drive['lock']:
+            drive['list_calls'] += 1
+            folder_id = drive['folders'].get((parent, name))
+        self._send(200, {'files': [{'id': folder_id}] if folder_id else []})
+    
+    def do_POST(self):
+        drive = self.server.drive
+        url = urlparse(self.path)
+        metadata = json.loads(self._body() or b'{}')
+        
+        with drive['lock']:
+            if url.path == '/drive/v3/files':
+                folder_id = f"folder-{len(drive['folders']) + 1}"
+                drive['folders'][(metadata['parents'][0], metadata['name'])] = folder_id
+                drive['create_calls'] += 1
+                return self._send(200, {'id': folder_id})
+            
+            session_id = str(len(drive['sessions']) + 1)
+            drive['sessions'][session_id] = {
+                'name': metadata['name'],
+                'parent': metadata['parents'][0],
+                'size': int(self.headers['X-Upload-Content-Length']),
+                'data': b''
+            }
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._send(200, {}, {'Location': f"{base}/upload/session/{session_id}"})
+    
+    def do_PUT(self):
+        drive = self.server.drive
+        session_id = self.path.rsplit('/', 1)[1]
+        body = self._body()
+        content_range = self.headers['Content-Range']
+        
+        with drive['lock']:
+            session = drive['sessions'].get(session_id)
+            if session is None:
+                return self._send(404, {'error': 'not found'})
+            
+            if drive['fail_next_puts'] > 0 and body:
+                drive['fail_next_puts'] -= 1
+                return self._send(503, {'error': 'backend error'})
+            
+            if body:
+                start = int(re.match(r'bytes (\d+)-', content_range).group(1))
+                assert start == len(session['data']), "Chunk must continue at the acknowledged offset"
+                session['data'] += body
+                drive['bytes_received'] += len(body)
+            
+            received = len(session['data'])
+            if received >= session['size']:
+                return self._send(200, {
+                    'id': f"file-{session_id}",
+                    'webViewLink': f"https://drive.google.com/file/d/file-{session_id}/view",
+                    'webContentLink': ''
+                })
+        
+        headers = {'Range': f"bytes=0-{received - 1}"} if received else {}
+        self._send(308, None, headers)
+    
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_drive():
+    """Start the Drive stand-in; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubDriveHandler)
+    server.drive = {
+        'lock': threading.Lock(),
+        'folders': {},
+        'sessions': {},
+        'list_calls': 0,
+        'create_calls': 0,
+        'bytes_received': 0,
+        'fail_next_puts': 0
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_drive_service(base_url: str) -> GoogleDriveService:
+    """GoogleDriveService pointed at the stand-in with a static token"""
+    service = GoogleDriveService.__new__(GoogleDriveService)
+    service.creds = Credentials(token="test-token")
+    service.service = None
+    service.main_folder_id = "main-folder"
+    service._folder_ids = {}
+    service._folder_lock = threading.Lock()
+    service._session = None
+    service.API_BASE_URL = base_url
+    service.UPLOAD_CHUNK_SIZE = CHUNK
+    return service
+
+
+def make_video(size: int) -> str:
+    """Local file standing in for a finished render"""
+    path = os.path.join(tempfile.mkdtemp(prefix="drive_upload_"), "video.mp4")
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+class EventRecorder:
+    """Collects emit_event calls and lets tests wait for a terminal state"""
+    
+    def __init__(self):
+        self.events = []
+        self.finished = threading.Event()
+    
+    def __call__(self, run_id, payload):
+        self.events.append(dict(payload, run_id=run_id))
+        if payload.get('state') in ('completed', 'failed'):
+            self.finished.set()
+
+
+def test_folder_ids_are_cached():
+    """Date/product folders are looked up once, then served from memory"""
+    server, base_url = start_stub_drive()
+    try:
+        drive = make_drive_service(base_url)
+        for _ in range(3):
+            date_id = drive._get_or_create_folder("2026-01-01", drive.main_folder_id)
+            product_id = drive._get_or_create_folder("Brand's Product", date_id)
+        
+        assert server.drive['list_calls'] == 2
+        assert server.drive['create_calls'] == 2
+        assert product_id == server.drive['folders'][(date_id, "Brand's Product")]
+    finally:
+        server.shutdown()
+    print("✅ Folder IDs cached after first lookup")
+
+
+def test_queue_uploads_in_background_with_progress():
+    """Upload runs on the pool, reports chunk progress and survives a 503"""
+    server, base_url = start_stub_drive()
+    try:
+        server.drive['fail_next_puts'] = 1
+        drive = make_drive_service(base_url)
+        drive.MAX_CHUNK_RETRIES = 3
+        recorder = EventRecorder()
+        state_file = Path(tempfile.mkdtemp(prefix="drive_state_")) / "uploads.json"
+        upload_queue = DriveUploadQueue(drive, recorder, state_file=state_file)
+        
+        video = make_video(3 * CHUNK + 1000)
+        upload_queue.enqueue("run-1", video, "2026-01-01", "Product", "Job")
+        
+        assert recorder.finished.wait(timeout=30)
+        states = [e['state'] for e in recorder.events]
+        assert states[0] == 'queued'
+        assert states[-1] == 'completed'
+        progress = [e['progress'] for e in recorder.events if e['state'] == 'uploading']
+        assert progress == sorted(progress) and len(progress) >= 3
+        
+        final = recorder.events[-1]
+        assert final['output_path'].startswith("https://drive.google.com/")
+        assert server.drive['bytes_received'] == 3 * CHUNK + 1000
+        assert not os.path.exists(video), "Local file is removed after upload"
+        assert json.loads(state_file.read_text()) == {}
+        upload_queue.shutdown()
+    finally:
+        server.shutdown()
+    print("✅ Background upload with progress and retry")
+
+
+def test_interrupted_upload_resumes_after_restart():
+    """A persisted session continues from Drive's offset instead of re-sending"""
+    server, base_url = start_stub_drive()
+    try:
+        drive = make_drive_service(base_url)
+        video = make_video(4 * CHUNK)
+        session = {}
+        
+        # First "process": dies after the first chunk is acknowledged
+        def crash_after_first_chunk(sent, total):
+            if sent >= CHUNK:
+                raise KeyboardInterrupt
+        
+        try:
+            drive.upload_video(
+                video, "2026-01-01", "Product", "Job",
+                progress_callback=crash_after_first_chunk,
+                on_session_created=lambda uri: session.setdefault('uri', uri)
+            )
+        except KeyboardInterrupt:
+            pass
+        assert server.drive['bytes_received'] == CHUNK
+        
+        state_file = Path(tempfile.mkdtemp(prefix="drive_state_")) / "uploads.json"
+        state_file.write_text(json.dumps({"run-2": {
+            'run_id': "run-2", 'file_path': video, 'date_folder': "2026-01-01",
+            'product_folder': "Product", 'job_name': "Job", 'session_uri': session['uri'],
+            'bytes_uploaded': CHUNK, 'total_bytes': 4 * CHUNK
+        }}))
+        
+        # Second "process": picks the upload back up
+        recorder = EventRecorder()
+        upload_queue = DriveUploadQueue(make_drive_service(base_url), recorder, state_file=state_file)
+        assert upload_queue.resume_pending() == 1
+        assert recorder.finished.wait(timeout=30)
+        
+        assert recorder.events[-1]['state'] == 'completed'
+        assert server.drive['bytes_received'] == 4 * CHUNK, "Already-uploaded bytes are not re-sent"
+        assert len(server.drive['sessions']) == 1
+        upload_queue.shutdown()
+    finally:
+        server.shutdown()
+    print("✅ Interrupted upload resumes from the persisted session")
+
+
+if __name__ == "__main__":
+    test_folder_ids_are_cached()
+    test_queue_uploads_in_background_with_progress()
+    test_interrupted_upload_resumes_after_restart()
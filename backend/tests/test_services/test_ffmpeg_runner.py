@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+FFmpeg Runner Tests
+===================
+Runs real FFmpeg encodes of lavfi sources through FFmpegRunner and checks
+progress events, learned speeds, duration-scaled timeouts and
+subprocess.run compatibility.
+
+Usage:
+    python tests/test_services/test_ffmpeg_runner.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.ffmpeg_runner import FFmpegRunner, parse_timestamp
+
+FFMPEG = imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def encode_cmd(output_path: str, duration: float = 4.0, realtime: bool = False):
+    cmd = [FFMPEG, '-y', '-v', 'info']
+    if realtime:
+        cmd.append('-re')
+    return cmd + [
+        '-f', 'lavfi', '-i', 'testsrc2=size=320x240:rate=25',
+        '-t', str(duration),  # lavfi reports no Duration; the runner reads -t
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+        output_path
+    ]
+
+
+def test_progress_events_and_speed_stats():
+    """Progress carries percent/ETA; a finished run teaches the operation's speed"""
+    FFmpegRunner.reset_stats()
+    work_dir = tempfile.mkdtemp(prefix="ffmpeg_runner_")
+    output_path = os.path.join(work_dir, "out.mp4")
+    events = []
+
+    # -re paces the encode at realtime so several progress blocks arrive
+    old_interval = FFmpegRunner.PROGRESS_INTERVAL
+    FFmpegRunner.PROGRESS_INTERVAL = 0.0
+    try:
+        result = FFmpegRunner.run(
+            encode_cmd(output_path, duration=2.0, realtime=True),
+            label="test_encode", on_progress=events.append, capture_output=True, text=True
+        )
+    finally:
+        FFmpegRunner.PROGRESS_INTERVAL = old_interval
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ''
+    assert 'Duration' in result.stderr or 'Output #0' in result.stderr
+    assert os.path.getsize(output_path) > 0
+
+    assert len(events) >= 2, events
+    assert events[-1]['finished'] and events[-1]['percent'] == 100.0
+    assert events[-1]['duration'] == 2.0
+    midway = [e for e in events if not e['finished'] and e['percent']]
+    assert midway and all(0 < e['percent'] < 100 for e in midway)
+    assert any(e['eta'] is not None for e in midway)
+
+    stats = FFmpegRunner.get_speed_stats()
+    assert stats['node']
+    learned = stats['operations']['test_encode']
+    assert learned['samples'] == 1
+    assert 0.5 < learned['speed'] < 1.5  # paced at ~1x by -re
+    assert 'massugc_ffmpeg_speed_ratio{operation="test_encode"}' in FFmpegRunner.render_prometheus()
+    print("✅ Progress events and learned speed")
+
+
+def test_timeouts_scale_with_duration_and_speed():
+    """Budget grows with media duration and shrinks as the node proves faster"""
+    FFmpegRunner.reset_stats()
+    short = FFmpegRunner.timeout_for(10, "op")
+    long = FFmpegRunner.timeout_for(600, "op")
+    assert FFmpegRunner.MIN_TIMEOUT < short < long <= FFmpegRunner.MAX_TIMEOUT
+    assert FFmpegRunner.timeout_for(None, "op") == FFmpegRunner.MAX_TIMEOUT
+
+    FFmpegRunner._record_speed("op", 4.0)
+    assert FFmpegRunner.timeout_for(600, "op") < long
+
+    assert parse_timestamp("00:01:02.50") == 62.5
+    assert parse_timestamp("12") == 12.0
+    assert parse_timestamp("N/A") is None
+    print("✅ Timeouts scale with duration and speed")
+
+
+def test_subprocess_run_compatibility():
+    """check, timeouts, bytes output and piped commands behave like subprocess.run"""
+    work_dir = tempfile.mkdtemp(prefix="ffmpeg_runner_")
+
+    # check=True raises CalledProcessError with the captured stderr
+    try:
+        FFmpegRunner.run([FFMPEG, '-i', os.path.join(work_dir, "missing.mp4"), os.path.join(work_dir, "x.mp4")],
+                         capture_output=True, text=True, check=True)
+        raise AssertionError("expected CalledProcessError")
+    except subprocess.CalledProcessError as e:
+        assert e.returncode != 0
+        assert "missing.mp4" in e.stderr
+
+    # Explicit timeout kills a realtime-paced encode
+    try:
+        FFmpegRunner.run(encode_cmd(os.path.join(work_dir, "slow.mp4"), duration=30, realtime=True),
+                         capture_output=True, timeout=1)
+        raise AssertionError("expected TimeoutExpired")
+    except subprocess.TimeoutExpired as e:
+        assert isinstance(e.stderr, bytes)
+
+    # Media piped to stdout is returned untouched (no -progress injected)
+    result = FFmpegRunner.run(
+        [FFMPEG, '-v', 'error', '-f', 'lavfi', '-i', 'sine=f=440:d=0.5', '-f', 's16le', '-'],
+        capture_output=True
+    )
+    assert result.returncode == 0
+    assert len(result.stdout) > 0 and b'progress=' not in result.stdout
+    print("✅ subprocess.run compatibility")
+
+
+def test_tracked_run_returns_stdout():
+    """capture_output returns FFmpeg's own stdout, without the -progress lines"""
+    cmd = [FFMPEG, '-hide_banner', '-encoders']
+    assert FFmpegRunner._can_track(cmd, {})
+    expected = subprocess.run(cmd, capture_output=True, text=True).stdout
+    assert 'libx264' in expected
+
+    result = FFmpegRunner.run(cmd, capture_output=True, text=True)
+    assert result.stdout == expected
+    assert FFmpegRunner.run(cmd, capture_output=True).stdout == expected.encode()
+
+    # An encode only writes progress to stdout: nothing is left over
+    work_dir = tempfile.mkdtemp(prefix="ffmpeg_runner_")
+    result = FFmpegRunner.run(encode_cmd(os.path.join(work_dir, "out.mp4"), duration=1),
+                              capture_output=True, text=True)
+    assert result.returncode == 0 and result.stdout == ''
+    print("✅ Tracked runs return the real stdout")
+
+
+if __name__ == "__main__":
+    test_progress_events_and_speed_stats()
+    test_timeouts_scale_with_duration_and_speed()
+    test_subprocess_run_compatibility()
+    test_tracked_run_returns_stdout()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+GCS Transfer Tests
+==================
+Runs GCSTransferService against a local HTTP stand-in for the GCS JSON
+API: concurrent uploads, content-hash dedupe of a reused avatar,
+composite uploads, signed-URL reuse, deferred batched deletes and the
+content lifecycle rule.
+
+Usage:
+    python tests/test_services/test_gcs_transfer.py
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.cloud import storage
+from google.oauth2 import service_account
+
+from backend.services.gcs_transfer import GCSTransferService
+
+BUCKET = "test-bucket"
+OBJECT_PATH = re.compile(r"^/storage/v1/b/([^/]+)/o/(.+?)(/compose)?$")
+
+
+class StubGCSHandler(BaseHTTPRequestHandler):
+    """Just enough of the GCS JSON API: token, bucket get/patch, multipart upload, get, delete, compose, batch"""
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, body=None, content_type='application/json', raw=None):
+        payload = raw if raw is not None else (json.dumps(body).encode() if body is not None else b'')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _resource(self, bucket, name):
+        data = self.server.gcs['objects'][(bucket, name)]
+        created = self.server.gcs['created'].get((bucket, name), time.time())
+        return {
+            'bucket': bucket, 'name': name, 'size': str(len(data)), 'generation': '1',
+            'timeCreated': datetime.fromtimestamp(created, timezone.utc).isoformat().replace('+00:00', 'Z')
+        }
+
+    def _bucket_resource(self):
+        resource = {'name': BUCKET}
+        if self.server.gcs['lifecycle'] is not None:
+            resource['lifecycle'] = self.server.gcs['lifecycle']
+        return resource
+
+    def do_GET(self):
+        gcs = self.server.gcs
+        path = urlparse(self.path).path
+        if path == f"/storage/v1/b/{BUCKET}":
+            return self._send(200, self._bucket_resource())
+        match = OBJECT_PATH.match(path)
+        bucket, name = match.group(1), unquote(match.group(2))
+        with gcs['lock']:
+            gcs['get_calls'] += 1
+            if (bucket, name) not in gcs['objects']:
+                return self._send(404, {'error': {'code': 404, 'message': 'Not Found'}})
+            self._send(200, self._resource(bucket, name))
+
+    def do_DELETE(self):
+        gcs = self.server.gcs
+        match = OBJECT_PATH.match(urlparse(self.path).path)
+        with gcs['lock']:
+            gcs['objects'].pop((match.group(1), unquote(match.group(2))), None)
+        self._send(204)
+
+    def do_PATCH(self):
+        gcs = self.server.gcs
+        body = json.loads(self._body())
+        with gcs['lock']:
+            gcs['patch_calls'] += 1
+            if 'lifecycle' in body:
+                gcs['lifecycle'] = body['lifecycle']
+            self._send(200, self._bucket_resource())
+
+    def do_POST(self):
+        gcs = self.server.gcs
+        url = urlparse(self.path)
+        body = self._body()
+
+        if url.path == '/token':
+            return self._send(200, {'access_token': 'test-token', 'expires_in': 3600, 'token_type': 'Bearer'})
+
+        if url.path.startswith('/upload/storage/v1/b/'):
+            bucket = url.path.split('/')[5]
+            message = BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            metadata_part, media_part = message.get_payload()
+            name = json.loads(metadata_part.get_payload())['name']
+            with gcs['lock']:
+                gcs['inflight'] += 1
+                gcs['max_inflight'] = max(gcs['max_inflight'], gcs['inflight'])
+            time.sleep(gcs['upload_delay'])
+            with gcs['lock']:
+                gcs['inflight'] -= 1
+                gcs['objects'][(bucket, name)] = media_part.get_payload(decode=True)
+                gcs['created'][(bucket, name)] = time.time()
+                gcs['uploads'].append(name)
+                return self._send(200, self._resource(bucket, name))
+
+        if url.path == '/batch/storage/v1':
+            return self._batch(body)
+
+        match = OBJECT_PATH.match(url.path)
+        if match and match.group(3):
+            bucket, name = match.group(1), unquote(match.group(2))
+            sources = [s['name'] for s in json.loads(body)['sourceObjects']]
+            with gcs['lock']:
+                gcs['objects'][(bucket, name)] = b''.join(gcs['objects'][(bucket, s)] for s in sources)
+                gcs['compose_calls'] += 1
+                return self._send(200, self._resource(bucket, name))
+
+        self._send(404, {'error': {'code': 404, 'message': 'Unknown endpoint'}})
+
+    def _batch(self, body):
+        gcs = self.server.gcs
+        deletes = re.findall(rb"DELETE (\S+) HTTP/1\.1", body)
+        parts = []
+        with gcs['lock']:
+            gcs['batch_calls'] += 1
+            for index, uri in enumerate(deletes, start=1):
+                match = OBJECT_PATH.match(urlparse(uri.decode()).path)
+                existed = gcs['objects'].pop((match.group(1), unquote(match.group(2))), None) is not None
+                status = "204 No Content" if existed else "404 Not Found"
+                parts.append(
+                    f"--batch_stub\r\nContent-Type: application/http\r\n"
+                    f"Content-ID: <response-{index}>\r\n\r\n"
+                    f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n\r\n\r\n"
+                )
+        payload = ("".join(parts) + "--batch_stub--\r\n").encode()
+        self._send(200, content_type='multipart/mixed; boundary=batch_stub', raw=payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_gcs():
+    """Start the GCS stand-in; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGCSHandler)
+    server.gcs = {
+        'lock': threading.Lock(),
+        'objects': {},
+        'created': {},
+        'uploads': [],
+        'lifecycle': None,
+        'patch_calls': 0,
+        'get_calls': 0,
+        'compose_calls': 0,
+        'batch_calls': 0,
+        'inflight': 0,
+        'max_inflight': 0,
+        'upload_delay': 0.0
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_client(base_url: str) -> storage.Client:
+    """Storage client with signing-capable service account credentials, pointed at the stand-in"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    credentials = service_account.Credentials.from_service_account_info({
+        'type': 'service_account',
+        'project_id': 'test-project',
+        'private_key_id': 'test-key',
+        'private_key': pem,
+        'client_email': 'uploader@test-project.iam.gserviceaccount.com',
+        'token_uri': f"{base_url}/token"
+    })
+    return storage.Client(
+        project='test-project',
+        credentials=credentials,
+        client_options={'api_endpoint': base_url}
+    )
+
+
+def reset_service(client=None):
+    """Fresh GCSTransferService state so tests don't leak blobs into each other"""
+    GCSTransferService._client = client
+    GCSTransferService._digests.clear()
+    GCSTransferService._content_blobs.clear()
+    GCSTransferService._content_locks.clear()
+    GCSTransferService._signed_urls.clear()
+    GCSTransferService._pending_deletes.clear()
+    GCSTransferService._lifecycle_checked.clear()
+
+
+def make_file(size: int, suffix: str) -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="gcs_transfer_"), f"input{suffix}")
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_concurrent_uploads_and_avatar_dedupe():
+    """Audio and avatar upload in parallel; a reused avatar is uploaded only once"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    try:
+        server.gcs['upload_delay'] = 0.5
+        avatar = make_file(200_000, ".mp4")
+        audio_1 = make_file(50_000, ".mp3")
+        audio_2 = make_file(50_000, ".mp3")
+
+        audio_blob, avatar_blob = GCSTransferService.upload_many(BUCKET, [
+            (audio_1, "audio_uploads/job1_audio.mp3"),
+            (avatar, None),
+        ])
+        assert audio_blob == "audio_uploads/job1_audio.mp3"
+        assert avatar_blob == f"content_uploads/{GCSTransferService.file_digest(avatar)}.mp4"
+        assert server.gcs['max_inflight'] == 2, "Independent blobs upload concurrently"
+
+        _, second_avatar_blob = GCSTransferService.upload_many(BUCKET, [
+            (audio_2, "audio_uploads/job2_audio.mp3"),
+            (avatar, None),
+        ])
+        assert second_avatar_blob == avatar_blob
+        assert server.gcs['uploads'].count(avatar_blob) == 1
+        with open(avatar, 'rb') as f:
+            assert server.gcs['objects'][(BUCKET, avatar_blob)] == f.read()
+
+        # A fresh process finds the blob already in the bucket and skips the upload
+        reset_service(make_client(base_url))
+        assert GCSTransferService.upload_content(BUCKET, avatar) == avatar_blob
+        assert server.gcs['uploads'].count(avatar_blob) == 1
+    finally:
+        reset_service()
+        server.shutdown()
+    print("✅ Concurrent uploads, avatar uploaded once")
+
+
+def test_composite_upload_for_large_files():
+    """Large files upload as parallel parts, composed server-side, parts cleaned up"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    original = (GCSTransferService.CHUNK_SIZE, GCSTransferService.COMPOSITE_THRESHOLD_BYTES)
+    try:
+        GCSTransferService.CHUNK_SIZE = 256 * 1024
+        GCSTransferService.COMPOSITE_THRESHOLD_BYTES = 512 * 1024
+        path = make_file(4 * 256 * 1024 + 1000, ".mp4")
+
+        assert GCSTransferService.upload_file(BUCKET, path, "video_uploads/large.mp4")
+        with open(path, 'rb') as f:
+            assert server.gcs['objects'][(BUCKET, "video_uploads/large.mp4")] == f.read()
+        assert server.gcs['compose_calls'] == 1
+        part_names = [n for n in server.gcs['uploads'] if ".part" in n]
+        assert len(part_names) == 5
+
+        assert GCSTransferService.flush_deletes() == 5
+        assert list(server.gcs['objects']) == [(BUCKET, "video_uploads/large.mp4")]
+    finally:
+        GCSTransferService.CHUNK_SIZE, GCSTransferService.COMPOSITE_THRESHOLD_BYTES = original
+        reset_service()
+        server.shutdown()
+    print("✅ Composite upload assembled and parts deleted")
+
+
+def test_signed_url_reused_until_near_expiry():
+    """Signed URLs are cached and regenerated only when close to expiring"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    try:
+        first = GCSTransferService.get_signed_url(BUCKET, "content_uploads/avatar.mp4")
+        assert first and "X-Goog-Signature=" in first
+        assert GCSTransferService.get_signed_url(BUCKET, "content_uploads/avatar.mp4") == first
+
+        # Simulate the cached URL being about to expire
+        key = (BUCKET, "content_uploads/avatar.mp4")
+        GCSTransferService._signed_urls[key] = (first, time.time() + 60)
+        time.sleep(1.1)  # X-Goog-Date has second resolution
+        refreshed = GCSTransferService.get_signed_url(BUCKET, "content_uploads/avatar.mp4")
+        assert refreshed and refreshed != first
+    finally:
+        reset_service()
+        server.shutdown()
+    print("✅ Signed URL reused until near expiry")
+
+
+def test_deletes_are_deferred_and_batched():
+    """schedule_delete queues blobs; flush removes them in one batch request"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    try:
+        names = [f"audio_uploads/job{i}_audio.mp3" for i in range(3)]
+        for name in names:
+            server.gcs['objects'][(BUCKET, name)] = b'audio'
+            GCSTransferService.schedule_delete(BUCKET, name)
+        GCSTransferService.schedule_delete(BUCKET, "audio_uploads/already_gone.mp3")
+
+        # Content blobs are never deleted per job
+        GCSTransferService.schedule_delete(BUCKET, "content_uploads/avatar.mp4")
+
+        assert all((BUCKET, name) in server.gcs['objects'] for name in names), "Deletes are deferred"
+        assert GCSTransferService.flush_deletes() == 4
+        assert server.gcs['batch_calls'] == 1
+        assert not server.gcs['objects']
+        assert GCSTransferService.flush_deletes() == 0
+    finally:
+        reset_service()
+        server.shutdown()
+    print("✅ Deferred deletes sent as one batch")
+
+
+def test_idle_content_blobs_are_kept():
+    """Idle shared content blobs are forgotten locally but never deleted"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    try:
+        avatar = make_file(20_000, ".mp4")
+        blob_name = GCSTransferService.upload_content(BUCKET, avatar)
+        key = (BUCKET, blob_name)
+        assert GCSTransferService.get_signed_url(BUCKET, blob_name)
+
+        GCSTransferService._content_blobs[key]['last_used'] -= GCSTransferService.CONTENT_IDLE_SECONDS + 1
+        assert GCSTransferService.flush_deletes() == 0
+        assert key in server.gcs['objects']
+        assert key not in GCSTransferService._content_blobs
+        assert key not in GCSTransferService._signed_urls
+        assert key not in GCSTransferService._content_locks
+    finally:
+        reset_service()
+        server.shutdown()
+    print("✅ Idle content blobs stay in the bucket, local caches cleared")
+
+
+def test_content_lifecycle_rule_installed():
+    """upload_content adds one Delete rule for CONTENT_PREFIX and refreshes blobs near expiry"""
+    server, base_url = start_stub_gcs()
+    reset_service(make_client(base_url))
+    try:
+        avatar = make_file(20_000, ".mp4")
+        blob_name = GCSTransferService.upload_content(BUCKET, avatar)
+        assert server.gcs['patch_calls'] == 1
+        assert server.gcs['lifecycle'] == {'rule': [{
+            'action': {'type': 'Delete'},
+            'condition': {
+                'age': GCSTransferService.CONTENT_RETENTION_DAYS,
+                'matchesPrefix': [GCSTransferService.CONTENT_PREFIX]
+            }
+        }]}
+
+        # Checked once per process, and a fresh process finds the rule already there
+        GCSTransferService.upload_content(BUCKET, make_file(20_000, ".mp4"))
+        reset_service(make_client(base_url))
+        assert GCSTransferService.upload_content(BUCKET, avatar) == blob_name
+        assert server.gcs['patch_calls'] == 1
+        assert server.gcs['uploads'].count(blob_name) == 1
+
+        # A blob the rule is about to delete is uploaded again to reset its age
+        reset_service(make_client(base_url))
+        retention = GCSTransferService.CONTENT_RETENTION_DAYS * 86400
+        server.gcs['created'][(BUCKET, blob_name)] -= retention - GCSTransferService.CONTENT_REFRESH_SECONDS + 60
+        assert GCSTransferService.upload_content(BUCKET, avatar) == blob_name
+        assert server.gcs['uploads'].count(blob_name) == 2
+    finally:
+        reset_service()
+        server.shutdown()
+    print("✅ Content lifecycle rule installed once, expiring blobs refreshed")
+
+
+if __name__ == "__main__":
+    test_concurrent_uploads_and_avatar_dedupe()
+    test_composite_upload_for_large_files()
+    test_signed_url_reused_until_near_expiry()
+    test_deletes_are_deferred_and_batched()
+    test_idle_content_blobs_are_kept()
+    test_content_lifecycle_rule_installed()
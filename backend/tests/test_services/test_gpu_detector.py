@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+GPU Encoder Detection Tests
+===========================
+Checks that encoders are validated with a real test encode (an encoder
+compiled into FFmpeg without its device is rejected), that a working
+hardware encoder wins even when its short test encode is slower, that the
+capability matrix is cached on disk per host/FFmpeg build, and the
+libx264 thread split for parallel encodes.
+
+Usage:
+    python tests/test_services/test_gpu_detector.py
+"""
+
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.gpu_detector import GPUEncoder
+
+
+@contextmanager
+def fresh_detector():
+    """Empty in-memory state and a temp capability cache file"""
+    previous = GPUEncoder.CACHE_PATH, GPUEncoder._capabilities, GPUEncoder._detected_encoder
+    GPUEncoder.CACHE_PATH = Path(tempfile.mkdtemp(prefix="gpu_caps_")) / "encoder-capabilities.json"
+    GPUEncoder._capabilities = GPUEncoder._detected_encoder = None
+    try:
+        yield GPUEncoder.CACHE_PATH
+    finally:
+        GPUEncoder.CACHE_PATH, GPUEncoder._capabilities, GPUEncoder._detected_encoder = previous
+
+
+@contextmanager
+def patched(name, replacement):
+    original = GPUEncoder.__dict__[name]
+    setattr(GPUEncoder, name, classmethod(replacement))
+    try:
+        yield
+    finally:
+        setattr(GPUEncoder, name, original)
+
+
+@contextmanager
+def candidates(h264, hevc):
+    """Same hardware candidates on every platform"""
+    previous = GPUEncoder.ENCODER_CANDIDATES
+    GPUEncoder.ENCODER_CANDIDATES = {
+        'h264': {'Darwin': h264, 'Windows': h264, 'Linux': h264, 'software': 'libx264'},
+        'hevc': {'Darwin': hevc, 'Windows': hevc, 'Linux': hevc, 'software': 'libx265'},
+    }
+    try:
+        yield
+    finally:
+        GPUEncoder.ENCODER_CANDIDATES = previous
+
+
+def test_listed_but_broken_encoder_is_rejected():
+    """The build lists h264_nvenc but there is no device behind it"""
+    listed = GPUEncoder._listed_encoders() | {'h264_nvenc'}
+
+    with fresh_detector(), candidates(['h264_nvenc'], []), patched('_listed_encoders', lambda cls: listed):
+        capabilities = GPUEncoder.get_capabilities()
+        nvenc = capabilities['encoders']['h264_nvenc']
+        assert not nvenc['ok'] and nvenc['error'] and nvenc['seconds'] is None
+        assert capabilities['encoders']['libx264']['ok']
+        assert GPUEncoder.detect_available_encoder() == 'libx264'
+    print("✅ Listed-but-broken hardware encoder is rejected by the test encode")
+
+
+def test_working_hardware_encoder_wins_and_is_cached():
+    # Device init makes the short hardware test encodes slower than libx264
+    timings = {'h264_amf': (None, "No AMF device"), 'h264_nvenc': (0.9, None), 'h264_qsv': (0.7, None),
+               'libx264': (0.4, None), 'libx265': (0.9, None),
+               'hevc_nvenc': (None, "No NVENC capable devices found")}
+    runs = []
+
+    def fake_test(cls, encoder):
+        runs.append(encoder)
+        return timings[encoder]
+
+    with fresh_detector() as cache_path, candidates(['h264_amf', 'h264_nvenc', 'h264_qsv'], ['hevc_nvenc']), \
+            patched('_test_encoder', fake_test), \
+            patched('_listed_encoders', lambda cls: set(timings)), \
+            patched('_listed_hwaccels', lambda cls: set()):
+        capabilities = GPUEncoder.get_capabilities()
+        assert sorted(runs) == sorted(timings)
+        assert GPUEncoder.best_encoder('h264') == 'h264_nvenc'
+        assert GPUEncoder.best_encoder('hevc') == 'libx265'  # hevc_nvenc failed its test encode
+        assert GPUEncoder.best_hwaccel() is None
+
+        # Cached on disk under this host/build key; a new process doesn't re-probe
+        on_disk = json.loads(cache_path.read_text())
+        assert list(on_disk) == [capabilities['key']]
+        GPUEncoder._capabilities = None
+        assert GPUEncoder.get_capabilities()['encoders'] == capabilities['encoders']
+        assert len(runs) == 6
+
+        # force re-runs the test encodes
+        GPUEncoder.get_capabilities(force=True)
+        assert len(runs) == 12
+    print("✅ First working hardware encoder wins; matrix cached per host and build")
+
+
+def test_x264_thread_split():
+    assert GPUEncoder.x264_threads(1) is None
+    params = GPUEncoder.get_encode_params('libx264', parallel=1)
+    assert params == ['-c:v', 'libx264', '-preset', 'faster', '-crf', '23']
+
+    params = GPUEncoder.get_encode_params('libx264', parallel=3)
+    threads = int(params[params.index('-threads') + 1])
+    assert threads >= 1 and threads == GPUEncoder.x264_threads(3)
+    assert GPUEncoder.get_encode_params('libx265', quality='fast')[:2] == ['-c:v', 'libx265']
+    print("✅ Parallel software encodes split the CPU threads")
+
+
+if __name__ == "__main__":
+    test_listed_but_broken_encoder_is_rejected()
+    test_working_hardware_encoder_wins_and_is_cached()
+    test_x264_thread_split()
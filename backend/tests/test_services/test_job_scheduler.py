@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Job Scheduler Tests
+===================
+Drives JobScheduler with fixed node sizes and a scripted live load, and
+checks cost estimates, concurrent admission, memory limits, cancellation
+and starvation protection.
+
+Usage:
+    python tests/test_services/test_job_scheduler.py
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.job_scheduler import JobCost, JobScheduler, estimate_job_cost
+
+
+class ScriptedScheduler(JobScheduler):
+    """Scheduler whose live load comes from the test instead of the host"""
+    POLL_SECONDS = 0.05
+
+    def __init__(self, load=None, **kwargs):
+        self.load = load or {'load_1m': 0.0, 'free_memory_mb': 64000, 'free_disk_mb': 500000}
+        super().__init__(scratch_dir=Path(tempfile.mkdtemp(prefix="scheduler_")), **kwargs)
+
+    def _live_load(self):
+        return dict(self.load)
+
+
+class Gate:
+    """Jobs that block until released, recording peak concurrency"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+
+    def job(self, name):
+        def run():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+                self.started.append(name)
+            self.release.wait(10)
+            with self.lock:
+                self.running -= 1
+            return name
+        return run
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_cost_estimates_follow_campaign_settings():
+    """Stream-copy Splice jobs are far cheaper than full Avatar pipelines"""
+    splice = estimate_job_cost({'random_video_settings': {'total_clips': 8}})
+    splice_heavy = estimate_job_cost({
+        'random_video_settings': {'total_clips': 8},
+        'use_randomization': True,
+        'enhanced_settings': {'captions': {'enabled': True}, 'music': {'enabled': True}}
+    })
+    avatar = estimate_job_cost({'avatar_video_path': 'a.mp4', 'captions_enabled': True, 'use_randomization': True})
+    massugc = estimate_job_cost({'massugc_settings': {'x': 1}})
+
+    assert massugc.cpu < splice.cpu < splice_heavy.cpu
+    assert splice.memory_mb < avatar.memory_mb
+    assert avatar.cpu >= 8 and avatar.memory_mb >= 4000
+    print("✅ Cost estimates follow campaign settings")
+
+
+def test_light_jobs_fill_the_node_heavy_jobs_do_not():
+    """32 cores: many light Splice jobs at once, heavy Avatar jobs capped by CPU"""
+    scheduler = ScriptedScheduler(cpu_count=32, total_memory_mb=128000)
+    gate = Gate()
+    light = estimate_job_cost({'random_video_settings': {'total_clips': 8}})
+    futures = [scheduler.submit(f"light-{i}", gate.job(i), light) for i in range(12)]
+    assert wait_for(lambda: gate.peak == 12), gate.peak
+    gate.release.set()
+    assert [f.result(timeout=5) for f in futures] == list(range(12))
+
+    gate = Gate()
+    heavy = JobCost(cpu=10.0, memory_mb=4000, disk_mb=1000)
+    futures = [scheduler.submit(f"heavy-{i}", gate.job(i), heavy) for i in range(5)]
+    assert wait_for(lambda: gate.peak == 3)
+    time.sleep(0.2)
+    assert gate.peak == 3  # 3 x 10 cores fit in 32, a 4th would not
+    gate.release.set()
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.shutdown()
+    print("✅ Light jobs fill the node, heavy jobs don't oversubscribe it")
+
+
+def test_live_memory_and_load_gate_admission():
+    """Low free memory or external load holds jobs back; one job always runs"""
+    scheduler = ScriptedScheduler(cpu_count=8, total_memory_mb=16000,
+                                  load={'load_1m': 0.0, 'free_memory_mb': 2500, 'free_disk_mb': 500000})
+    gate = Gate()
+    cost = JobCost(cpu=1.0, memory_mb=2000, disk_mb=100)
+    first = scheduler.submit("a", gate.job("a"), cost)
+    second = scheduler.submit("b", gate.job("b"), cost)
+    assert wait_for(lambda: gate.started == ["a"])
+    time.sleep(0.2)
+    assert gate.started == ["a"]  # 2000MB + reserve doesn't fit in 2500MB free
+
+    scheduler.load = {'load_1m': 7.5, 'free_memory_mb': 12000, 'free_disk_mb': 500000}
+    time.sleep(0.2)
+    assert gate.started == ["a"]  # Memory ok now, but the host is busy
+
+    scheduler.load['load_1m'] = 1.0
+    assert wait_for(lambda: gate.started == ["a", "b"])
+    gate.release.set()
+    first.result(timeout=5)
+    second.result(timeout=5)
+
+    status = scheduler.status()
+    assert status['running'] == {} and status['pending'] == []
+    assert status['capacity']['cpu'] == 8
+    scheduler.shutdown()
+    print("✅ Live memory and load gate admission")
+
+
+def test_cancel_and_starvation():
+    """Pending jobs can be cancelled; a starving head blocks smaller jobs"""
+    scheduler = ScriptedScheduler(cpu_count=8, total_memory_mb=64000)
+    gate = Gate()
+    running = scheduler.submit("running", gate.job("running"), JobCost(6.0, 1000, 100))
+    assert wait_for(lambda: gate.started == ["running"])
+
+    big = scheduler.submit("big", gate.job("big"), JobCost(4.0, 1000, 100))
+    small = scheduler.submit("small", gate.job("small"), JobCost(1.0, 500, 100))
+    assert wait_for(lambda: "small" in gate.started)  # Small passes big while big is fresh
+    assert "big" not in gate.started
+
+    cancelled = scheduler.submit("cancelled", gate.job("cancelled"), JobCost(1.0, 100, 10))
+    assert cancelled.cancel()
+
+    # Once big has waited too long, nothing else may pass it
+    scheduler.STARVATION_SECONDS = 0.0
+    late = scheduler.submit("late", gate.job("late"), JobCost(0.5, 100, 10))
+    time.sleep(0.3)
+    assert "late" not in gate.started and "cancelled" not in gate.started
+
+    gate.release.set()
+    for future in (running, big, small, late):
+        future.result(timeout=5)
+    assert gate.started.index("big") < gate.started.index("late")
+    assert "cancelled" not in gate.started
+    scheduler.shutdown()
+    print("✅ Cancellation and starvation protection")
+
+
+if __name__ == "__main__":
+    test_cost_estimates_follow_campaign_settings()
+    test_light_jobs_fill_the_node_heavy_jobs_do_not()
+    test_live_memory_and_load_gate_admission()
+    test_cancel_and_starvation()
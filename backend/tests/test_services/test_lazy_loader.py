@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Lazy Loader Tests
+=================
+Checks that facades import their module on first call, that pre-warm loads
+subsystems in the background, the startup report, and that the Splice
+processor path no longer drags in Whisper / torch.
+
+Usage:
+    python tests/test_services/test_lazy_loader.py
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.lazy_loader import LazyLoader
+
+
+def make_module(name: str, body: str) -> str:
+    """Write a throwaway module onto sys.path and return its name"""
+    module_dir = Path(tempfile.mkdtemp(prefix="lazy_"))
+    (module_dir / f"{name}.py").write_text(body)
+    sys.path.insert(0, str(module_dir))
+    return name
+
+
+def test_facade_imports_on_first_call():
+    name = make_module("lazy_heavy_example", "import time\ntime.sleep(0.05)\ndef double(x):\n    return 2 * x\n")
+    double = LazyLoader.function(name, "double")
+    assert name not in sys.modules
+    assert double.__name__ == "double"
+
+    assert double(21) == 42
+    assert name in sys.modules
+    load = LazyLoader._loads[name]
+    assert load['seconds'] >= 0.05 and load['modules'] >= 1
+    assert double(1) == 2  # Second call doesn't re-import
+    print("✅ Facades import on first call")
+
+
+def test_prewarm_and_report():
+    name = make_module("lazy_prewarm_example", "VALUE = 7\n")
+    LazyLoader.SUBSYSTEMS['example'] = name
+    try:
+        assert LazyLoader.parse_prewarm_setting("") == []
+        assert LazyLoader.parse_prewarm_setting("0") == []
+        assert LazyLoader.parse_prewarm_setting("all") == list(LazyLoader.SUBSYSTEMS) + list(LazyLoader.WARMUPS)
+        assert LazyLoader.parse_prewarm_setting(" example , whisper") == ["example", "whisper"]
+
+        LazyLoader.prewarm(["example"]).join(5)
+        assert LazyLoader.is_loaded("example")
+        assert LazyLoader.load("example").VALUE == 7
+
+        LazyLoader.mark_ready()
+        report = LazyLoader.report()
+        assert report['ready_seconds'] is not None
+        example = report['subsystems']['example']
+        assert example['loaded'] and example['thread'] == "lazy-prewarm"
+        assert set(report['subsystems']) >= {'avatar_pipeline', 'processors', 'whisper'}
+    finally:
+        del LazyLoader.SUBSYSTEMS['example']
+    print("✅ Pre-warm and startup report")
+
+
+def test_splice_path_skips_torch():
+    """Loading the processor registry no longer imports the Avatar pipeline"""
+    code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from backend.processors import get_processor\n"
+        "get_processor('splice'); get_processor('avatar')\n"
+        "print(sorted(m for m in ('torch', 'whisper', 'backend.create_video') if m in sys.modules))\n"
+    ) % str(project_root)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]", result.stdout
+    print("✅ Splice path skips torch")
+
+
+if __name__ == "__main__":
+    test_facade_imports_on_first_call()
+    test_prewarm_and_report()
+    test_splice_path_skips_torch()
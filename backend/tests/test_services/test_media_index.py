@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Media Metadata Index Tests
+==========================
+Checks banner probing, that indexed files are served from memory and
+then from SQLite (a fresh process) without re-probing, that a changed file
+is probed again with a new etag, and batch lookups with failures.
+
+Usage:
+    python tests/test_services/test_media_index.py
+"""
+
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.media_index import MediaMetadataIndex
+
+
+@contextmanager
+def temp_index():
+    """Fresh SQLite file and empty memory cache; counts real probes"""
+    previous = MediaMetadataIndex.DB_PATH
+    original = MediaMetadataIndex.__dict__['probe']
+    MediaMetadataIndex.DB_PATH = Path(tempfile.mkdtemp(prefix="media_index_")) / "media-index.db"
+    MediaMetadataIndex._memory.clear()
+    probes = []
+
+    def counted(cls, media_path):
+        probes.append(media_path)
+        return original.__func__(cls, media_path)
+
+    MediaMetadataIndex.probe = classmethod(counted)
+    try:
+        yield probes
+    finally:
+        MediaMetadataIndex.probe = original
+        MediaMetadataIndex.DB_PATH = previous
+        MediaMetadataIndex._memory.clear()
+
+
+def ffmpeg(*args):
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y', *args], check=True, capture_output=True)
+
+
+def make_video(path: Path, size: str = "480x270", rate: str = "30000/1001", duration: float = 2) -> str:
+    ffmpeg('-f', 'lavfi', '-i', f'testsrc2=size={size}:rate={rate}:duration={duration}',
+           '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(path))
+    return str(path)
+
+
+def test_probe_reads_banner():
+    folder = Path(tempfile.mkdtemp(prefix="media_"))
+    info = MediaMetadataIndex.probe(make_video(folder / "a.mp4"))
+    assert (info['width'], info['height'], info['codec']) == (480, 270, 'h264')
+    assert info['fps'] == 29.97 and info['duration'] == 2.0 and info['aspect_ratio'] == 1.778
+    print("✅ Banner probe reads size, codec, fps and duration")
+
+
+def test_index_avoids_reprobing():
+    folder = Path(tempfile.mkdtemp(prefix="media_"))
+    video = make_video(folder / "a.mp4")
+
+    with temp_index() as probes:
+        first = MediaMetadataIndex.lookup(video)
+        assert MediaMetadataIndex.lookup(video) is first  # Memory hit
+        assert len(probes) == 1
+
+        # New process: memory is empty, SQLite still has the row
+        MediaMetadataIndex._memory.clear()
+        assert MediaMetadataIndex.lookup(video) == first
+        assert len(probes) == 1
+
+        # Replaced file: new size/mtime → probed again, new etag
+        make_video(folder / "a.mp4", size="320x240", duration=1)
+        changed = MediaMetadataIndex.lookup(video)
+        assert len(probes) == 2
+        assert (changed['width'], changed['height']) == (320, 240)
+        assert changed['etag'] != first['etag']
+    print("✅ Index serves memory, then SQLite, and re-probes changed files")
+
+
+def test_lookup_many():
+    folder = Path(tempfile.mkdtemp(prefix="media_"))
+    videos = [make_video(folder / f"clip_{i}.mp4", duration=1) for i in range(3)]
+    audio = folder / "voice.mp3"
+    ffmpeg('-f', 'lavfi', '-i', 'sine=duration=1', str(audio))
+    missing = str(folder / "gone.mp4")
+
+    with temp_index() as probes:
+        results = MediaMetadataIndex.lookup_many(videos + [videos[0], str(audio), missing])
+        assert list(results) == videos + [str(audio), missing]
+        assert all(results[video]['width'] == 480 for video in videos)
+        assert isinstance(results[str(audio)], ValueError)
+        assert isinstance(results[missing], FileNotFoundError)
+        assert len(probes) == 4  # Three videos + the audio file, once each
+
+        MediaMetadataIndex.lookup_many(videos)
+        assert len(probes) == 4
+    print("✅ Batch lookups probe each unindexed file once and report failures")
+
+
+if __name__ == "__main__":
+    test_probe_reads_banner()
+    test_index_avoids_reprobing()
+    test_lookup_many()
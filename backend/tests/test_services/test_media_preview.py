@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Media Preview Tests
+===================
+Checks that previews are built off the caller's thread, that a thumbnail
+and a tiled hover sprite come out of it, that copies of the same content
+reuse the cached preview, and that backfill only queues missing previews.
+
+Usage:
+    python tests/test_services/test_media_preview.py
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.media_index import MediaMetadataIndex
+from backend.services.media_preview import MediaPreviewService
+
+
+@contextmanager
+def temp_cache():
+    """Point the preview cache and media index at a fresh temp dir and count FFmpeg renders"""
+    previous = MediaPreviewService.CACHE_DIR, MediaMetadataIndex.DB_PATH
+    original = MediaPreviewService.__dict__['_render']
+    MediaPreviewService.CACHE_DIR = Path(tempfile.mkdtemp(prefix="previews_"))
+    MediaMetadataIndex.DB_PATH = MediaPreviewService.CACHE_DIR / "media-index.db"
+    renders = []
+
+    def counted(cls, args, output_path, label):
+        renders.append(label)
+        return original.__func__(cls, args, output_path, label)
+
+    MediaPreviewService._render = classmethod(counted)
+    try:
+        yield renders
+    finally:
+        MediaPreviewService._render = original
+        MediaPreviewService.CACHE_DIR, MediaMetadataIndex.DB_PATH = previous
+
+
+def make_video(folder: Path, name: str, color: str = "testsrc2") -> str:
+    path = folder / name
+    subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'{color}=size=480x270:rate=30:duration=4',
+        '-g', '15', '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+        str(path)
+    ], check=True, capture_output=True)
+    return str(path)
+
+
+def image_size(path: str) -> str:
+    result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-i', path], capture_output=True, text=True)
+    line = next(line for line in result.stderr.splitlines() if 'Video:' in line)
+    return next(part.split()[0] for part in line.split(', ') if 'x' in part.split()[0] and part.split()[0][0].isdigit())
+
+
+def test_preview_builds_in_background():
+    folder = Path(tempfile.mkdtemp(prefix="preview_media_"))
+    video = make_video(folder, "avatar.mp4")
+
+    with temp_cache() as renders:
+        assert MediaPreviewService.request(video) == {'status': 'pending'}
+        preview = MediaPreviewService.wait(video, timeout=60)
+        assert preview['status'] == 'ready', preview
+        assert renders == ["preview_thumbnail", "preview_sprite"]
+
+        sprite = preview['sprite']
+        assert (sprite['frames'], sprite['columns'], sprite['rows']) == (8, 4, 2)
+        assert sprite['timestamps'][0] == 0.25 and sprite['timestamps'][-1] == 3.75
+        assert image_size(preview['thumbnail_path']) == "320x320"
+        assert image_size(preview['sprite_path']) == "640x320"
+
+        # A renamed copy has the same content hash: served from the cache
+        copy = str(folder / "renamed.mp4")
+        shutil.copy(video, copy)
+        assert MediaPreviewService.request(copy) == preview
+        assert len(renders) == 2
+    print("✅ Thumbnail + sprite built off-thread and cached by content")
+
+
+def test_backfill_and_failures():
+    folder = Path(tempfile.mkdtemp(prefix="preview_media_"))
+    first = make_video(folder, "clip_a.mp4")
+    second = make_video(folder, "clip_b.mp4", color="rgbtestsrc")
+    broken = folder / "broken.mp4"
+    broken.write_bytes(b"not a video")
+
+    with temp_cache():
+        MediaPreviewService.generate(first)
+        queued = MediaPreviewService.backfill([first, second, str(broken), str(folder / "gone.mp4"), None])
+        assert queued == 2  # first already cached, missing paths skipped
+
+        assert MediaPreviewService.wait(second, timeout=60)['status'] == 'ready'
+        failed = MediaPreviewService.wait(str(broken), timeout=60)
+        assert failed['status'] == 'failed' and failed['error']
+        assert MediaPreviewService.request(str(folder / "gone.mp4")) == {'status': 'missing'}
+        MediaPreviewService.retry_failed()
+    print("✅ Backfill queues only missing previews; failures are reported")
+
+
+if __name__ == "__main__":
+    test_preview_builds_in_background()
+    test_backfill_and_failures()
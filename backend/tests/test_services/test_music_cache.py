@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Music Asset Cache Tests
+=======================
+Validates pre-decoded music renditions using REAL audio generated with
+FFmpeg's lavfi sine source (no mocks).
+
+Usage:
+    python tests/test_services/test_music_cache.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import imageio_ffmpeg
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.music_cache import MusicAssetCache
+
+
+def _make_track(duration: float = 3.0) -> str:
+    """Generate a short mono 22.05 kHz MP3 test track"""
+    track_path = Path(tempfile.mkdtemp(prefix="music_src_")) / "tone.mp3"
+    subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+        '-ar', '22050', str(track_path)
+    ], check=True)
+    return str(track_path)
+
+
+@contextmanager
+def temp_cache_dir():
+    """Point the cache at a fresh temp dir for the duration of a test"""
+    previous = MusicAssetCache.CACHE_DIR
+    MusicAssetCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="music_cache_"))
+    try:
+        yield MusicAssetCache.CACHE_DIR
+    finally:
+        MusicAssetCache.CACHE_DIR = previous
+
+
+def _probe(path: str) -> str:
+    """Return FFmpeg's stream/duration description of a file"""
+    result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-i', path], capture_output=True, text=True)
+    return result.stderr
+
+
+def test_variant_is_looped_resampled_and_cached():
+    """A variant covers the requested duration at 44.1 kHz stereo and is reused"""
+    with temp_cache_dir():
+        track = _make_track(3.0)
+        
+        variant = MusicAssetCache.get_variant(track, duration=7.5, volume_db=-20, loop=True)
+        info = _probe(variant)
+        assert "Duration: 00:00:30.00" in info  # Rounded up to VARIANT_STEP_SECONDS
+        assert "44100 Hz, stereo" in info
+        
+        # Same key returns the same file without re-rendering, and nearby
+        # render lengths share it (trimmed at mix time)
+        assert MusicAssetCache.get_variant(track, duration=7.5, volume_db=-20, loop=True) == variant
+        assert MusicAssetCache.get_variant(track, duration=21.37, volume_db=-20, loop=True) == variant
+        assert MusicAssetCache.get_variant(track, duration=31.0, volume_db=-20, loop=True) != variant
+        
+        # A fade-out is tied to the exact end
+        faded = MusicAssetCache.get_variant(track, duration=7.5, volume_db=-20, fade_out=1.0, loop=True)
+        assert "Duration: 00:00:07.50" in _probe(faded)
+        
+        # Different gain is a different variant
+        assert MusicAssetCache.get_variant(track, duration=7.5, volume_db=-10, loop=True) != variant
+        
+        # Without looping the variant stops at the end of the source
+        short = MusicAssetCache.get_variant(track, duration=7.5, volume_db=-20, loop=False)
+        assert "Duration: 00:00:03" in _probe(short)
+    print("✅ Music variants are resampled, looped and cached")
+
+
+def test_concurrent_requests_build_once():
+    """Concurrent jobs asking for the same variant get one complete file"""
+    with temp_cache_dir() as cache_dir:
+        track = _make_track(2.0)
+        results = []
+        
+        def worker():
+            results.append(MusicAssetCache.get_variant(track, duration=5.0, volume_db=-25, fade_out=1.0))
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(set(results)) == 1
+        leftovers = [f for f in cache_dir.iterdir() if f.name.startswith('.')]
+        assert leftovers == []
+        assert MusicAssetCache.get_cache_stats()['file_count'] == 2  # base + variant
+    print("✅ Concurrent variant requests share one atomic write")
+
+
+def test_cleanup_keeps_recent_renditions():
+    """Over the size limit, old renditions go but ones just handed out stay"""
+    with temp_cache_dir() as cache_dir:
+        previous = MusicAssetCache.MAX_CACHE_SIZE_GB
+        MusicAssetCache.MAX_CACHE_SIZE_GB = 0  # Everything is over the limit
+        try:
+            track = _make_track(2.0)
+            variant = MusicAssetCache.get_variant(track, duration=5.0, volume_db=-25)
+            assert os.path.exists(variant)
+            assert Path(variant).name in MusicAssetCache._key_locks
+
+            # Age the renditions past the grace period: the next cleanup evicts them and their locks
+            old = time.time() - MusicAssetCache.CLEANUP_GRACE_SECONDS - 60
+            for path in cache_dir.glob("*.flac"):
+                os.utime(path, (old, old))
+            MusicAssetCache._cleanup_if_needed()
+            assert not os.path.exists(variant)
+            assert Path(variant).name not in MusicAssetCache._key_locks
+        finally:
+            MusicAssetCache.MAX_CACHE_SIZE_GB = previous
+    print("✅ Cleanup skips renditions in use and evicts locks with files")
+
+
+if __name__ == "__main__":
+    test_variant_is_looped_resampled_and_cached()
+    test_concurrent_requests_build_once()
+    test_cleanup_keeps_recent_renditions()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Music Library Index Tests
+=========================
+Validates the shared, indexed MusicLibrary: category/mood/BPM/duration
+lookups, folder rescans and batched usage writes.
+
+Usage:
+    python tests/test_services/test_music_library.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.music_library import (
+    MusicLibrary,
+    MusicSelectionConfig,
+    MusicCategory,
+    MusicMood,
+    get_shared_music_library,
+    USAGE_FLUSH_EVERY_PICKS,
+)
+
+
+def _make_library(filenames):
+    """Create a music folder with placeholder files and load it"""
+    library_dir = Path(tempfile.mkdtemp(prefix="music_lib_test_"))
+    for name in filenames:
+        (library_dir / name).write_bytes(b"\0" * 256)
+    return library_dir, MusicLibrary(library_dir)
+
+
+def test_candidate_lookup_uses_indexes():
+    """Category, mood and BPM filters return the same tracks as a linear scan"""
+    _, library = _make_library(["upbeat_one.mp3", "upbeat_two.mp3", "chill_one.mp3", "epic_one.mp3"])
+    
+    # Give tracks distinct BPM/duration values and one a different mood
+    for i, track in enumerate(sorted(library.tracks.values(), key=lambda t: t.filename)):
+        library._unindex_track(track.id)
+        track.bpm = 90 + i * 20
+        track.duration = 20 + i * 30
+        if i == 0:
+            track.mood = MusicMood.CALM
+        library._index_track(track)
+    
+    config = MusicSelectionConfig(
+        category=MusicCategory.UPBEAT_ENERGY,
+        min_bpm=100,
+        max_bpm=200,
+        exclude_recently_used=False
+    )
+    expected = sorted(
+        t.id for t in library.tracks.values()
+        if t.category == MusicCategory.UPBEAT_ENERGY and t.bpm and 100 <= t.bpm <= 200
+    )
+    actual = sorted(t.id for t in library._get_candidate_tracks(config))
+    assert actual == expected
+    
+    calm = library._get_candidate_tracks(MusicSelectionConfig(mood=MusicMood.CALM, exclude_recently_used=False))
+    assert [t.mood for t in calm] == [MusicMood.CALM]
+    
+    # Duration rule: at least half the video, or 30s+
+    long_enough = library._get_candidate_tracks(
+        MusicSelectionConfig(exclude_recently_used=False), video_duration=100
+    )
+    assert all(t.duration >= 30 for t in long_enough)
+    print("✅ Indexed candidate lookup matches linear filtering")
+
+
+def test_usage_writes_are_batched():
+    """Selecting tracks does not rewrite the library file on every pick"""
+    _, library = _make_library(["upbeat_a.mp3", "upbeat_b.mp3"])
+    mtime_before = os.path.getmtime(library.metadata_file)
+    
+    config = MusicSelectionConfig(exclude_recently_used=False)
+    library.select_track(config)
+    assert library._pending_usage_writes == 1
+    assert os.path.getmtime(library.metadata_file) == mtime_before
+    
+    for _ in range(USAGE_FLUSH_EVERY_PICKS - 1):
+        library.select_track(config)
+    assert library._pending_usage_writes == 0
+    
+    library.select_track(config)
+    library.flush()
+    assert library._pending_usage_writes == 0
+    print("✅ Usage statistics are flushed in batches")
+
+
+def test_shared_library_rescans_on_change():
+    """The shared instance picks up added and removed files without reloading"""
+    library_dir = Path(tempfile.mkdtemp(prefix="music_lib_shared_"))
+    (library_dir / "chill_first.mp3").write_bytes(b"\0" * 256)
+    
+    library = get_shared_music_library(library_dir)
+    assert get_shared_music_library(library_dir) is library
+    assert len(library.tracks) == 1
+    assert library.refresh_if_changed() is False
+    
+    (library_dir / "upbeat_second.mp3").write_bytes(b"\0" * 256)
+    os.utime(library_dir, (0, 1))  # Force an observable folder mtime change
+    assert get_shared_music_library(library_dir) is library
+    assert len(library.tracks) == 2
+    
+    os.remove(library_dir / "chill_first.mp3")
+    os.utime(library_dir, (0, 2))
+    library.refresh_if_changed()
+    assert len(library.tracks) == 1
+    assert library.categories[MusicCategory.CHILL_VIBES] == []
+    print("✅ Shared library rescans only when the folder changes")
+
+
+if __name__ == "__main__":
+    test_candidate_lookup_uses_indexes()
+    test_usage_writes_are_batched()
+    test_shared_library_rescans_on_change()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Pipeline Debugger Tests
+=======================
+Checks debug level parsing, that file probes only run at verbose level,
+that repeated probes of an unchanged file come from the probe cache, and
+that the OFF level prints nothing.
+
+Usage:
+    python tests/test_services/test_pipeline_debugger.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services import pipeline_debugger
+from backend.services.pipeline_debugger import PipelineDebugger, probe_file_details
+
+
+@contextlib.contextmanager
+def counted_probes():
+    """Count real probes behind probe_file_details"""
+    calls = []
+    original = pipeline_debugger._probe_file_details
+
+    def probe(file_path):
+        calls.append(file_path)
+        return original(file_path)
+
+    pipeline_debugger._probe_file_details = probe
+    try:
+        yield calls
+    finally:
+        pipeline_debugger._probe_file_details = original
+
+
+def make_file(content: bytes = b"not really a video") -> str:
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.write(fd, content)
+    os.close(fd)
+    return path
+
+
+def test_parse_level():
+    assert PipelineDebugger.parse_level(None) == PipelineDebugger.SUMMARY
+    assert PipelineDebugger.parse_level("") == PipelineDebugger.SUMMARY
+    assert PipelineDebugger.parse_level("summary") == PipelineDebugger.SUMMARY
+    assert PipelineDebugger.parse_level("off") == PipelineDebugger.OFF
+    assert PipelineDebugger.parse_level(False) == PipelineDebugger.OFF
+    assert PipelineDebugger.parse_level(" Verbose ") == PipelineDebugger.VERBOSE
+    assert PipelineDebugger.parse_level(True) == PipelineDebugger.VERBOSE
+    assert PipelineDebugger.parse_level(5) == PipelineDebugger.VERBOSE
+
+    # Numeric levels mean the same from YAML (int) and JSON/env (string)
+    for number, level in ((0, PipelineDebugger.OFF), (1, PipelineDebugger.SUMMARY), (2, PipelineDebugger.VERBOSE)):
+        assert PipelineDebugger.parse_level(number) == level
+        assert PipelineDebugger.parse_level(str(number)) == level
+        assert PipelineDebugger.parse_level(f" {number}.0 ") == level
+    assert PipelineDebugger.parse_level("-1") == PipelineDebugger.OFF
+
+    os.environ[PipelineDebugger.ENV_VAR] = "verbose"
+    try:
+        assert PipelineDebugger("job").verbose
+        assert not PipelineDebugger("job", level="summary").verbose  # Per-run setting wins
+    finally:
+        del os.environ[PipelineDebugger.ENV_VAR]
+    print("✅ Debug levels parse from settings and the environment")
+
+
+def test_probes_only_when_verbose():
+    path = make_file()
+    with counted_probes() as calls:
+        debugger = PipelineDebugger("job", level="summary")
+        debugger.start_stage("CLIP SELECTION")
+        debugger.log_probe("Clip 1", path, will_use="2.00s")
+        assert calls == []
+        assert debugger.current_stage['substeps'][0]['data'] == {'will_use': "2.00s"}
+
+        debugger = PipelineDebugger("job", level="verbose")
+        debugger.start_stage("CLIP SELECTION")
+        debugger.log_probe("Clip 1", path, will_use="2.00s")
+        debugger.log_probe("Clip 1 again", path)
+        assert calls == [path]  # Second probe served from the cache
+        data = debugger.current_stage['substeps'][0]['data']
+        assert data['will_use'] == "2.00s" and data['name'] == Path(path).name
+
+        # A changed file is probed again
+        with open(path, 'ab') as f:
+            f.write(b"more")
+        probe_file_details(path)
+        assert calls == [path, path]
+    print("✅ Probes run only at verbose level and are cached per file")
+
+
+def test_off_prints_nothing():
+    debugger = PipelineDebugger("job", level="off")
+    debugger.start_stage("SETUP", {'Canvas': '1080x1920'})
+    debugger.log("ignored", {'a': 1})
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        debugger.print_full_report()
+    assert output.getvalue() == ""
+    assert debugger.stages[0]['substeps'] == []
+
+    debugger = PipelineDebugger("job")
+    debugger.start_stage("SETUP")
+    with contextlib.redirect_stdout(output):
+        debugger.print_full_report()
+    assert "[PIPELINE] job=job" in output.getvalue()
+    print("✅ OFF prints nothing, SUMMARY keeps the condensed report")
+
+
+if __name__ == "__main__":
+    test_parse_level()
+    test_probes_only_when_verbose()
+    test_off_prints_nothing()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Render Farm Tests
+=================
+Runs two workers against one SQLite job store and checks clip-affinity
+routing, lease expiry and requeueing, cancellation, and the event relay
+back to the instance that accepted the job.
+
+Usage:
+    python tests/test_services/test_render_farm.py
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.job_scheduler import JobScheduler
+from backend.job_store import JobStore, SQLiteJobStore, open_job_store
+from backend.render_farm import FarmJobHandle, FarmRelay, FarmWorker, clip_affinity_keys
+from backend.services.clip_cache import ClipCache
+
+COST = {'cpu': 1.0, 'memory_mb': 500, 'disk_mb': 100}
+
+
+def new_store() -> SQLiteJobStore:
+    return open_job_store(f"sqlite:///{tempfile.mkdtemp(prefix='farm_')}/jobs.db")
+
+
+def test_claims_follow_cached_clips():
+    """A job goes to the worker holding its clips; stale jobs go to anyone"""
+    store = new_store()
+    store.register_worker("warm", {'encoder': 'libx264'}, {"k1", "k2", "k3"})
+    store.register_worker("cold", {'encoder': 'h264_nvenc'}, set())
+
+    store.enqueue("splice-1", "c1", {'job_name': 'A'}, COST, ["k1", "k2", "k3"])
+    store.enqueue("avatar-1", "c2", {'job_name': 'B'}, COST)
+
+    # The cold worker leaves the splice job for the warm one and takes the other
+    claimed = store.claim("cold", set())
+    assert claimed['run_id'] == "avatar-1"
+    assert claimed['job'] == {'job_name': 'B'} and claimed['cost'] == COST
+    assert store.claim("cold", set()) is None
+
+    claimed = store.claim("warm", {"k1", "k2", "k3"})
+    assert claimed['run_id'] == "splice-1" and claimed['attempts'] == 1
+
+    # Once a job has waited AFFINITY_WAIT, the first idle worker takes it
+    store.enqueue("splice-2", "c1", {}, COST, ["k1"])
+    store.AFFINITY_WAIT = 0
+    assert store.claim("cold", set())['run_id'] == "splice-2"
+
+    workers = {w['worker_id']: w for w in store.workers()}
+    assert workers['cold']['encoder'] == 'h264_nvenc'
+    assert sorted(workers['cold']['jobs']) == ["avatar-1", "splice-2"]
+    print("✅ Claims follow cached clips")
+
+
+def test_expired_leases_requeue_then_fail():
+    """A silent worker loses its job, which fails after MAX_ATTEMPTS"""
+    store = new_store()
+    store.LEASE_SECONDS = 0.05
+    store.enqueue("run-1", "c1", {}, COST)
+
+    assert store.claim("dead-1", set())['run_id'] == "run-1"
+    time.sleep(0.1)
+    claimed = store.claim("dead-2", set())
+    assert claimed['run_id'] == "run-1" and claimed['attempts'] == 2
+
+    time.sleep(0.1)
+    assert store.claim("dead-3", set()) is None
+    job = store.get("run-1")
+    assert job['status'] == 'failed' and 'stopped responding' in job['error']
+    events = store.events_since(0)
+    assert events[-1][1] == "run-1" and events[-1][2]['type'] == 'error'
+    print("✅ Expired leases requeue, then fail")
+
+
+def test_cancel_only_before_claim():
+    store = new_store()
+    store.enqueue("pending", "c1", {}, COST)
+    store.enqueue("taken", "c1", {}, COST)
+
+    handle = FarmJobHandle(store, "pending")
+    assert not handle.done()
+    assert handle.cancel() and handle.cancelled() and handle.done()
+
+    assert store.claim("w", set())['run_id'] == "taken"
+    assert not FarmJobHandle(store, "taken").cancel()
+    assert store.stats() == {'cancelled': 1, 'claimed': 1}
+    print("✅ Cancel only before claim")
+
+
+def test_job_store_interface_is_abstract():
+    """Stores must implement the whole interface to be instantiated"""
+    try:
+        JobStore()
+        assert False, "JobStore is abstract"
+    except TypeError:
+        pass
+
+    class PartialStore(JobStore):
+        def enqueue(self, run_id, campaign_id, job, cost, affinity=()):
+            pass
+    try:
+        PartialStore()
+        assert False, "Missing methods must fail at construction"
+    except TypeError:
+        pass
+    assert isinstance(new_store(), JobStore)
+    print("✅ JobStore is an abstract interface")
+
+
+def test_workers_execute_and_relay_events():
+    """Two workers drain the queue; the accepting side sees every event"""
+    store = new_store()
+    relayed = []
+    relay = FarmRelay(store, lambda run_id, payload: relayed.append((run_id, payload['type'])))
+
+    executed = []
+    lock = threading.Lock()
+
+    def execute(run_id, campaign_id, job):
+        with lock:
+            executed.append((run_id, threading.current_thread().name))
+        store.append_event(run_id, {'type': 'progress', 'step': 1})
+        if job.get('fail'):
+            raise RuntimeError("boom")
+        store.append_event(run_id, {'type': 'done', 'output_path': f"/out/{run_id}.mp4"})
+
+    schedulers = [JobScheduler(scratch_dir=tempfile.mkdtemp(), cpu_count=4, total_memory_mb=8000) for _ in range(2)]
+    workers = [FarmWorker(store, scheduler, execute, worker_id=f"node-{i}") for i, scheduler in enumerate(schedulers)]
+
+    for i in range(4):
+        relay.watch(f"run-{i}")
+        store.enqueue(f"run-{i}", "c1", {'fail': i == 3}, COST)
+    store.enqueue("not-mine", "c1", {}, COST)
+
+    deadline = time.time() + 10
+    while time.time() < deadline and sum(store.stats().get(s, 0) for s in ('completed', 'failed')) < 5:
+        for worker in workers:
+            worker.poll_once()
+        time.sleep(0.02)
+    for scheduler in schedulers:
+        scheduler.shutdown(wait=True)
+
+    assert store.stats() == {'completed': 4, 'failed': 1}
+    assert store.get("run-0")['status'] == 'completed'
+    assert 'exited without a result' in store.get("run-3")['error']
+    assert len(executed) == 5
+
+    relay.poll_once()
+    assert ("run-0", 'progress') in relayed and ("run-0", 'done') in relayed
+    assert not any(run_id == "not-mine" for run_id, _ in relayed)
+    assert {w['worker_id'] for w in store.workers()} == {"node-0", "node-1"}
+    print("✅ Workers execute jobs and events are relayed")
+
+
+def test_affinity_keys_match_clip_cache():
+    """Affinity keys are the ClipCache keys the Splice job will look up"""
+    source_dir = Path(tempfile.mkdtemp(prefix="farm_clips_"))
+    (source_dir / "a.mp4").write_bytes(b"x")
+    (source_dir / "b.MOV").write_bytes(b"x")
+    (source_dir / "notes.txt").write_text("skip")
+
+    job = {'random_video_settings': {'source_directory': str(source_dir), 'canvas_width': 720,
+                                     'canvas_height': 1280, 'original_volume': 0}}
+    keys = clip_affinity_keys(job)
+    expected = {ClipCache.get_cache_key(str(source_dir / name), 720, 1280, 'center', 'strip')
+                for name in ("a.mp4", "b.MOV")}
+    assert set(keys) == expected
+    assert clip_affinity_keys({'avatar_video_path': 'a.mp4'}) == []
+    print("✅ Affinity keys match ClipCache")
+
+
+if __name__ == "__main__":
+    test_claims_follow_cached_clips()
+    test_expired_leases_requeue_then_fail()
+    test_cancel_only_before_claim()
+    test_job_store_interface_is_abstract()
+    test_workers_execute_and_relay_events()
+    test_affinity_keys_match_clip_cache()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Streaming Silence Detection Tests
+=================================
+Downloads lip-sync results from a local HTTP stand-in while
+StreamingSilenceDetector analyzes the same bytes, and checks the intervals
+match a separate pass over the finished file.
+
+Usage:
+    python tests/test_services/test_streaming_silence.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.create_video import (
+    StreamingSilenceDetector,
+    download_video,
+    remove_silence_from_video,
+)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_file_server(directory: str):
+    """Serve a directory over HTTP; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_lipsync_video(directory: str, faststart: bool) -> str:
+    """3s clip: 1s tone, 1s silence, 1s tone"""
+    path = os.path.join(directory, "faststart.mp4" if faststart else "result.mp4")
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', 'color=c=blue:s=160x120:r=25:d=3',
+        '-f', 'lavfi', '-i', 'sine=f=440:d=1,apad=pad_dur=1[a];sine=f=440:d=1[b];[a][b]concat=n=2:v=0:a=1',
+        '-shortest', '-c:v', 'libx264', '-c:a', 'aac'
+    ]
+    if faststart:
+        cmd += ['-movflags', '+faststart']
+    subprocess.run(cmd + [path], check=True, capture_output=True)
+    return path
+
+
+def silence_intervals(stderr_output: str):
+    starts = [round(float(t), 2) for t in re.findall(r"silence_start:\s*([\d\.]+)", stderr_output)]
+    ends = [round(float(t), 2) for t in re.findall(r"silence_end:\s*([\d\.]+)", stderr_output)]
+    return list(zip(starts, ends))
+
+
+def file_pass_intervals(path: str):
+    """The separate silencedetect pass remove_silence_from_video used to run"""
+    from backend.create_video import SILENCE_THRESHOLD_DB, SILENCE_MIN_DURATION_S
+    result = subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-nostdin', '-i', path, '-vn',
+        '-af', f'silencedetect=noise={SILENCE_THRESHOLD_DB}:d={SILENCE_MIN_DURATION_S}',
+        '-f', 'null', '-'
+    ], capture_output=True, text=True)
+    return silence_intervals(result.stderr)
+
+
+def test_intervals_ready_when_download_finishes():
+    """Streaming analysis matches a file pass and feeds remove_silence_from_video"""
+    source_dir = tempfile.mkdtemp(prefix="lipsync_src_")
+    work_dir = tempfile.mkdtemp(prefix="lipsync_dl_")
+    server, base_url = start_file_server(source_dir)
+    try:
+        for faststart in (True, False):
+            source = make_lipsync_video(source_dir, faststart)
+            local = os.path.join(work_dir, os.path.basename(source))
+
+            detector = StreamingSilenceDetector()
+            assert download_video(f"{base_url}/{os.path.basename(source)}", local, on_chunk=detector.feed)
+            output = detector.finish(timeout=60)
+
+            assert output is not None
+            with open(source, 'rb') as a, open(local, 'rb') as b:
+                assert a.read() == b.read(), "Teeing must not alter the downloaded file"
+            intervals = silence_intervals(output)
+            assert intervals == file_pass_intervals(local)
+            assert len(intervals) == 1 and 0.9 < intervals[0][0] < 1.1
+
+        edited = os.path.join(work_dir, "edited.mp4")
+        assert remove_silence_from_video(local, edited, silencedetect_output=output)
+        assert os.path.getsize(edited) > 0
+    finally:
+        server.shutdown()
+    print("✅ Silence intervals ready at end of download")
+
+
+def test_unreadable_stream_falls_back_to_file_pass():
+    """Non-media bytes or a failed download never block and report no result"""
+    source_dir = tempfile.mkdtemp(prefix="lipsync_src_")
+    work_dir = tempfile.mkdtemp(prefix="lipsync_dl_")
+    with open(os.path.join(source_dir, "broken.mp4"), 'wb') as f:
+        f.write(os.urandom(2 * 1024 * 1024))
+    server, base_url = start_file_server(source_dir)
+    try:
+        detector = StreamingSilenceDetector()
+        assert download_video(f"{base_url}/broken.mp4", os.path.join(work_dir, "broken.mp4"), on_chunk=detector.feed)
+        assert detector.finish(timeout=60) is None
+
+        detector = StreamingSilenceDetector()
+        assert not download_video(f"{base_url}/missing.mp4", os.path.join(work_dir, "missing.mp4"), on_chunk=detector.feed)
+        detector.abort()
+        assert detector.failed
+    finally:
+        server.shutdown()
+    print("✅ Unreadable stream falls back cleanly")
+
+
+if __name__ == "__main__":
+    test_intervals_ready_when_download_finishes()
+    test_unreadable_stream_falls_back_to_file_pass()
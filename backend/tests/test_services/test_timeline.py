@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Timeline Renderer Tests
+=======================
+Checks the audio mix levels against the old merge + music passes,
+frame-snapped outpoints in the concat list, that trims come from those
+outpoints rather than trimmed copies, that a Splice ad with voiceover and
+a music bed is rendered in a single FFmpeg pass whose output length comes
+from the timeline, and that clips without an audio stream fall back to
+the voiceover alone.
+
+Usage:
+    python tests/test_services/test_timeline.py
+"""
+
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend import clip_stitch_generator
+from backend.clip_stitch_generator import build_clip_stitch_video_smart, prepare_clip_segments
+from backend.services.clip_cache import ClipCache
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.media_index import MediaMetadataIndex
+from backend.services.music_cache import MusicAssetCache
+from backend.timeline import AudioTrack, ClipSegment, Timeline, snap_outpoint, write_concat_list
+
+
+@contextmanager
+def temp_dirs():
+    """Point the clip/music caches, media index and stitch working dir at fresh temp dirs"""
+    previous = (ClipCache.CACHE_DIR, MusicAssetCache.CACHE_DIR, MediaMetadataIndex.DB_PATH,
+                clip_stitch_generator.WORKING_DIR)
+    ClipCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="clip_cache_"))
+    MusicAssetCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="music_cache_"))
+    MediaMetadataIndex.DB_PATH = Path(tempfile.mkdtemp(prefix="media_index_")) / "media-index.db"
+    clip_stitch_generator.WORKING_DIR = Path(tempfile.mkdtemp(prefix="stitch_work_"))
+    try:
+        yield clip_stitch_generator.WORKING_DIR
+    finally:
+        (ClipCache.CACHE_DIR, MusicAssetCache.CACHE_DIR, MediaMetadataIndex.DB_PATH,
+         clip_stitch_generator.WORKING_DIR) = previous
+
+
+def ffmpeg(*args):
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y', *args], check=True, capture_output=True)
+
+
+def make_media() -> Path:
+    folder = Path(tempfile.mkdtemp(prefix="timeline_media_"))
+    (folder / "clips").mkdir()
+    for i in range(3):
+        ffmpeg('-f', 'lavfi', '-i', 'testsrc2=size=320x240:rate=30:duration=2',
+               '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(folder / "clips" / f"clip_{i}.mp4"))
+    ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=440:duration=3.5', str(folder / "voice.mp3"))
+    ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=220:duration=1.5', str(folder / "music.wav"))
+    return folder
+
+
+def probe(path: str) -> dict:
+    """Decoded duration plus the streams FFmpeg reports"""
+    result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-i', path, '-f', 'null', '-'],
+                            capture_output=True, text=True)
+    hours, minutes, seconds = result.stderr.rsplit('time=', 1)[1].split()[0].split(':')
+    return {
+        'duration': int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+        'video': 'Video: h264' in result.stderr,
+        'audio': 'Audio: aac' in result.stderr,
+    }
+
+
+def test_mix_levels_match_old_passes():
+    clips = [ClipSegment("a.mp4")]
+    voice, music = AudioTrack("voice.mp3", gain=1.0), AudioTrack("music.flac")
+
+    # Voiceover amixed onto clip audio, then music amixed onto that
+    assert Timeline(clips, 10, clip_audio_gain=0.6, voiceover=voice, music=music).mix_levels() == [
+        ("0:a", 0.15), ("1:a", 0.25), ("2:a", 0.5)]
+    # Voiceover only (clip audio stripped)
+    assert Timeline(clips, 10, voiceover=voice).mix_levels() == [("1:a", 1.0)]
+    # Music as the only audio (no voiceover, clip audio stripped)
+    assert Timeline(clips, 10, music=music).mix_levels() == [("1:a", 1.0)]
+    assert Timeline(clips, 10).audio_filter() is None
+
+    cmd = Timeline(clips, 12.5, music=AudioTrack("m.mp3", loop=True)).compile("out.mp4", "list.txt")
+    assert cmd[cmd.index('-stream_loop') + 3] == "m.mp3"
+    assert cmd[cmd.index('-t') + 1] == "12.500" and cmd[cmd.index('-c:v') + 1] == "copy"
+    print("✅ Mix levels match the old merge + music passes")
+
+
+def test_snap_and_list():
+    assert snap_outpoint(1.0) == 1.0
+    assert snap_outpoint(1.01) == round(31 / 30, 6)
+    assert snap_outpoint(0.5 + 1e-9) == 0.5  # Float noise doesn't add a frame
+
+    filelist = Path(tempfile.mkdtemp()) / "list.txt"
+    write_concat_list(str(filelist), [ClipSegment("/clips/a.mp4"), ClipSegment("/clips/it's.mp4", 1.5)])
+    assert filelist.read_text() == "file '/clips/a.mp4'\nfile '/clips/it'\\''s.mp4'\noutpoint 1.5\n"
+    print("✅ Outpoints snap to frames and land in the concat list")
+
+
+def test_trims_are_virtual():
+    """Segment outpoints, not trimmed copies, cut the clips (timeline length left longer)"""
+    media = make_media()
+    clips = sorted(str(p) for p in (media / "clips").iterdir())
+    infos = [
+        {'path': clips[0], 'full_duration': 2.0, 'use_duration': 1.0, 'needs_trim': True},
+        {'path': clips[1], 'full_duration': 2.0, 'use_duration': 2.0, 'needs_trim': False},
+        {'path': clips[2], 'full_duration': 2.0, 'use_duration': 0.5, 'needs_trim': True},
+    ]
+    output = str(media / "trimmed.mp4")
+
+    with temp_dirs() as working_dir:
+        segments = prepare_clip_segments(infos, 180, 320, 'center', original_volume=0)
+        assert [segment.outpoint for segment in segments] == [1.0, None, 0.5]
+        Timeline(segments, duration=6.0).render(output, working_dir)
+        # No trimmed copies, no leftover concat list
+        assert list(working_dir.iterdir()) == []
+
+    # 1.0s + 2.0s + 0.5s of the 6s of source; like the old `-t ... -c copy`
+    # trims, a stream-copy cut can keep a few reordered frames past each outpoint
+    details = probe(output)
+    assert details['video'] and not details['audio']
+    assert abs(details['duration'] - 3.5) < 0.3, details
+    print("✅ Trims come from concat-list outpoints")
+
+
+def test_timeline_renders_in_one_pass():
+    media = make_media()
+    clips = sorted(str(p) for p in (media / "clips").iterdir())
+    infos = [{'path': clip, 'full_duration': 2.0, 'use_duration': 1.5, 'needs_trim': True} for clip in clips]
+
+    with temp_dirs() as working_dir:
+        segments = prepare_clip_segments(infos, 180, 320, 'center', original_volume=0.5)
+        assert [segment.outpoint for segment in segments] == [1.5, 1.5, 1.5]
+
+        timeline = Timeline(segments, duration=3.5, clip_audio_gain=0.5,
+                            voiceover=AudioTrack(str(media / "voice.mp3")),
+                            music=AudioTrack(str(media / "music.wav"), gain=0.1, loop=True))
+        output = str(media / "ad.mp4")
+
+        runs = []
+        listener = lambda event: event.get('finished') and runs.append(event['operation'])
+        FFmpegRunner.set_listener(listener)
+        try:
+            timeline.render(output, working_dir)
+        finally:
+            FFmpegRunner.set_listener(None)
+
+        assert runs == ["timeline_render"]
+        assert list(working_dir.iterdir()) == []
+
+    details = probe(output)
+    assert details['video'] and details['audio']
+    assert abs(details['duration'] - 3.5) < 0.1, details
+    print("✅ Timeline renders concat + mix + length in one pass")
+
+
+def test_splice_stitch_with_music():
+    """build_clip_stitch_video_smart: voiceover sets the length, music loops under it"""
+    media = make_media()
+    output = str(media / "splice.mp4")
+
+    with temp_dirs() as working_dir:
+        success, result = build_clip_stitch_video_smart(
+            random_source_dir=str(media / "clips"),
+            output_path=output,
+            canvas_width=180,
+            canvas_height=320,
+            tts_audio_path=str(media / "voice.mp3"),
+            original_volume=0,
+            music_path=str(media / "music.wav"),
+            music_volume_db=-20,
+            extend_music=True
+        )
+        assert success, result
+        leftovers = [p.name for p in working_dir.iterdir()]
+        assert leftovers == [], leftovers
+
+    details = probe(output)
+    assert details['video'] and details['audio']
+    assert abs(details['duration'] - 3.5) < 0.1, details
+    print("✅ Splice stitch writes voiceover + music ad once")
+
+
+def test_silent_clips_fall_back_to_voiceover():
+    """Compatible clips are used as-is and may have no audio stream to mix"""
+    media = make_media()
+    clips = []
+    for i in range(2):
+        clip = media / f"silent_{i}.mp4"
+        ffmpeg('-f', 'lavfi', '-i', 'testsrc2=size=180x320:rate=30:duration=2',
+               '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(clip))
+        clips.append(ClipSegment(str(clip)))
+    output = str(media / "silent_ad.mp4")
+
+    with temp_dirs() as working_dir:
+        timeline = Timeline(clips, duration=3.5, clip_audio_gain=0.5,
+                            voiceover=AudioTrack(str(media / "voice.mp3")))
+        assert not timeline.clips_have_audio()
+        timeline.render(output, working_dir)
+        assert timeline.mix_levels() == [("1:a", 1.0)]
+
+    details = probe(output)
+    assert details['video'] and details['audio']
+    assert abs(details['duration'] - 3.5) < 0.1, details
+    print("✅ Clips without audio fall back to a voiceover-only mix")
+
+
+if __name__ == "__main__":
+    test_mix_levels_match_old_passes()
+    test_snap_and_list()
+    test_trims_are_virtual()
+    test_timeline_renders_in_one_pass()
+    test_splice_stitch_with_music()
+    test_silent_clips_fall_back_to_voiceover()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tracing Tests
+=============
+Runs stages, real FFmpeg encodes and cache lookups under Tracer and checks
+the per-run timelines and the Prometheus text output.
+
+Usage:
+    python tests/test_services/test_tracing.py
+"""
+
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.ffmpeg_runner import FFmpegRunner
+from backend.services.tracing import Tracer
+
+
+def encode_test_clip(output_path: str):
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error',
+        '-f', 'lavfi', '-i', 'testsrc2=size=160x120:rate=25:duration=1',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+        output_path, '-y'
+    ]
+    return FFmpegRunner.run(cmd, capture_output=True, text=True)
+
+
+def test_stages_form_run_timeline():
+    """Each stage() closes the previous one; end_run() closes the last"""
+    Tracer.reset()
+    Tracer.begin_run("run-1", "splice", job_name="Demo")
+    Tracer.stage("generate_script", step="2")
+    time.sleep(0.05)
+    Tracer.stage("generate_audio", step="3")
+    with Tracer.span("tts.request", kind="op"):
+        time.sleep(0.02)
+    Tracer.end_run("run-1", "completed")
+
+    timeline = Tracer.get_timeline("run-1")
+    assert timeline['status'] == 'completed'
+    assert timeline['campaign_type'] == 'splice'
+    names = [span['name'] for span in timeline['spans']]
+    assert names == ["generate_script", "generate_audio", "tts.request"], names
+
+    script, audio, tts = timeline['spans']
+    assert not any(span['open'] for span in timeline['spans'])
+    assert script['wall'] >= 0.05
+    assert tts['parent'] == "generate_audio"
+    assert audio['offset'] >= script['offset']
+
+    # Stages outside a run are ignored
+    assert Tracer.stage("orphan") is None
+    print("✅ Stages form a run timeline")
+
+
+def test_ffmpeg_span_records_bytes_and_encoder():
+    """FFmpeg runs record output bytes, encoder and failures"""
+    Tracer.reset()
+    work_dir = tempfile.mkdtemp(prefix="tracing_")
+    output_path = os.path.join(work_dir, "clip.mp4")
+
+    Tracer.begin_run("run-2", "avatar")
+    Tracer.stage("encode")
+    result = encode_test_clip(output_path)
+    assert result.returncode == 0, result.stderr
+    failed = FFmpegRunner.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-i', os.path.join(work_dir, "missing.mp4"),
+         os.path.join(work_dir, "out.mp4")],
+        label="broken", capture_output=True
+    )
+    assert failed.returncode != 0
+    Tracer.end_run("run-2", "completed")
+
+    spans = {span['name']: span for span in Tracer.get_timeline("run-2")['spans']}
+    encode = spans["ffmpeg.encode_test_clip"]
+    assert encode['kind'] == 'ffmpeg'
+    assert encode['parent'] == 'encode'
+    assert encode['bytes_out'] == os.path.getsize(output_path)
+    assert encode['attrs']['encoder'] == 'libx264'
+    assert encode['cpu'] is not None and encode['cpu'] > 0
+    assert spans["ffmpeg.broken"]['error'].startswith("exit ")
+    print("✅ FFmpeg spans record bytes, encoder and exit status")
+
+
+def test_cache_lookups_and_prometheus_output():
+    """Cache counters and span aggregates render as Prometheus text"""
+    Tracer.reset()
+    Tracer.begin_run("run-3", "splice")
+    span = Tracer.stage("stitch_clips")
+    Tracer.record_cache("clip", hit=True)
+    Tracer.record_cache("clip", hit=True)
+    Tracer.record_cache("clip", hit=False)
+    Tracer.end_run("run-3", "failed")
+
+    assert span.cache_hits == 2 and span.cache_misses == 1
+
+    text = Tracer.render_prometheus()
+    assert 'massugc_cache_lookups_total{cache="clip",result="hit"} 2' in text
+    assert 'massugc_cache_lookups_total{cache="clip",result="miss"} 1' in text
+    assert 'massugc_span_duration_seconds_count{kind="stage",span="stitch_clips"} 1' in text
+    assert 'massugc_span_duration_seconds_bucket{kind="stage",span="stitch_clips",le="+Inf"} 1' in text
+    assert 'massugc_job_runs_total{campaign_type="splice",status="failed"} 1' in text
+    assert 'massugc_jobs_running 0' in text
+
+    # Every sample line is "name{labels} value" or "name value"
+    sample = re.compile(r'^[a-z_]+(\{[^}]*\})? -?[0-9.e+]+$')
+    for line in text.splitlines():
+        assert line.startswith('#') or sample.match(line), line
+    print("✅ Cache lookups and Prometheus output")
+
+
+def test_concurrent_runs_stay_separate():
+    """Two jobs on different threads keep their own timelines"""
+    Tracer.reset()
+    barrier = threading.Barrier(2)
+
+    def job(run_id: str, stage_name: str):
+        Tracer.begin_run(run_id, "avatar")
+        barrier.wait()
+        Tracer.stage(stage_name)
+        with Tracer.span(f"{stage_name}.inner"):
+            time.sleep(0.01)
+        barrier.wait()
+        Tracer.end_run(run_id, "completed")
+
+    threads = [
+        threading.Thread(target=job, args=("run-a", "alpha")),
+        threading.Thread(target=job, args=("run-b", "beta")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timelines = Tracer.get_timelines()
+    assert set(timelines) == {"run-a", "run-b"}
+    assert [s['name'] for s in timelines["run-a"]['spans']] == ["alpha", "alpha.inner"]
+    assert [s['name'] for s in timelines["run-b"]['spans']] == ["beta", "beta.inner"]
+    print("✅ Concurrent runs stay separate")
+
+
+if __name__ == "__main__":
+    test_stages_form_run_timeline()
+    test_ffmpeg_span_records_bytes_and_encoder()
+    test_cache_lookups_and_prometheus_output()
+    test_concurrent_runs_stay_separate()
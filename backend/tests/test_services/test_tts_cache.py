@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+TTS Cache Tests
+===============
+Validates the content-addressed voiceover cache: key normalization,
+singleflight for concurrent identical requests (and its per-key locks
+being released), and size-bounded cleanup.
+
+Usage:
+    python tests/test_services/test_tts_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.tts_cache import TTSCache
+
+
+@contextmanager
+def temp_cache_dir():
+    """Point the cache at a fresh temp dir for the duration of a test"""
+    previous = TTSCache.CACHE_DIR
+    TTSCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="tts_cache_"))
+    try:
+        yield TTSCache.CACHE_DIR
+    finally:
+        TTSCache.CACHE_DIR = previous
+
+
+def test_cache_key_normalization():
+    """Whitespace/Unicode differences share a key; voice, model and format don't"""
+    base = TTSCache.get_cache_key("Hello  world.\n", "voice_1234567", "eleven_multilingual_v2", "mp3_44100_128")
+    assert TTSCache.get_cache_key(" Hello world. ", "voice_1234567", "eleven_multilingual_v2", "mp3_44100_128") == base
+    assert TTSCache.get_cache_key("Café", "v", "m", "f") == TTSCache.get_cache_key("Café", "v", "m", "f")
+    assert TTSCache.get_cache_key("hello world.", "voice_1234567", "eleven_multilingual_v2", "mp3_44100_128") != base
+    assert TTSCache.get_cache_key("Hello world.", "other_voice_id", "eleven_multilingual_v2", "mp3_44100_128") != base
+    assert TTSCache.get_cache_key("Hello world.", "voice_1234567", "eleven_monolingual_v1", "mp3_44100_128") != base
+    assert TTSCache.get_cache_key("Hello world.", "voice_1234567", "eleven_multilingual_v2", "mp3_22050_32") != base
+    print("✅ Cache keys normalize script text only")
+
+
+def test_repeat_requests_skip_synthesis():
+    """A second request for the same audio is served from disk"""
+    with temp_cache_dir():
+        calls = []
+        
+        def generate(target_path):
+            calls.append(target_path)
+            with open(target_path, 'wb') as f:
+                f.write(b"ID3fake-mp3-bytes")
+        
+        out_dir = Path(tempfile.mkdtemp(prefix="tts_out_"))
+        first = TTSCache.get_or_generate("Same script", "voice", "model", "mp3_44100_128", str(out_dir / "a.mp3"), generate)
+        second = TTSCache.get_or_generate("Same  script", "voice", "model", "mp3_44100_128", str(out_dir / "b.mp3"), generate)
+        
+        assert first == (True, False)
+        assert second == (True, True)
+        assert len(calls) == 1
+        assert (out_dir / "b.mp3").read_bytes() == b"ID3fake-mp3-bytes"
+    print("✅ Repeat voiceovers skip synthesis")
+
+
+def test_concurrent_requests_singleflight():
+    """Concurrent identical requests wait on one synthesis"""
+    with temp_cache_dir():
+        calls = []
+        
+        def slow_generate(target_path):
+            calls.append(1)
+            time.sleep(0.1)
+            with open(target_path, 'wb') as f:
+                f.write(b"audio")
+        
+        out_dir = Path(tempfile.mkdtemp(prefix="tts_out_"))
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(TTSCache.get_or_generate(
+                "Batch script", "voice", "model", "mp3_44100_128", str(out_dir / f"{i}.mp3"), slow_generate
+            )))
+            for i in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(calls) == 1
+        assert sorted(hit for _, hit in results) == [False, True, True, True, True]
+        assert all((out_dir / f"{i}.mp3").exists() for i in range(5))
+        assert TTSCache._inflight == {}, "Per-key locks are dropped once nobody waits on them"
+    print("✅ Concurrent identical requests share one synthesis")
+
+
+def test_failed_synthesis_is_not_cached():
+    """Empty or failed output leaves nothing behind in the cache"""
+    with temp_cache_dir() as cache_dir:
+        def empty_generate(target_path):
+            open(target_path, 'wb').close()
+        
+        out_path = os.path.join(tempfile.mkdtemp(prefix="tts_out_"), "x.mp3")
+        assert TTSCache.get_or_generate("Script", "v", "m", "mp3_44100_128", out_path, empty_generate) == (False, False)
+        assert list(cache_dir.iterdir()) == []
+        
+        def failing_generate(target_path):
+            raise RuntimeError("ElevenLabs unavailable")
+        
+        try:
+            TTSCache.get_or_generate("Script", "v", "m", "mp3_44100_128", out_path, failing_generate)
+            assert False, "Error should propagate"
+        except RuntimeError:
+            pass
+        assert list(cache_dir.iterdir()) == []
+        assert TTSCache._inflight == {}
+    print("✅ Failed synthesis is not cached")
+
+
+def test_lru_cleanup_respects_size_limit():
+    """Oldest voiceovers are evicted once the cache exceeds its limit"""
+    with temp_cache_dir() as cache_dir:
+        previous_limit = TTSCache.MAX_CACHE_SIZE_GB
+        TTSCache.MAX_CACHE_SIZE_GB = 2500 / (1024**3)  # ~2.5KB
+        try:
+            out_dir = Path(tempfile.mkdtemp(prefix="tts_out_"))
+            for i in range(4):
+                TTSCache.get_or_generate(
+                    f"Script {i}", "v", "m", "mp3_44100_128", str(out_dir / f"{i}.mp3"),
+                    lambda p: Path(p).write_bytes(b"x" * 1000)
+                )
+                # Distinct mtimes so LRU order is deterministic
+                for f in cache_dir.iterdir():
+                    if f.stat().st_mtime > time.time() - 1:
+                        os.utime(f, (time.time() - 100 + i, time.time() - 100 + i))
+            
+            stats = TTSCache.get_cache_stats()
+            assert stats['file_count'] == 2
+            newest_key = TTSCache.get_cache_key("Script 3", "v", "m", "mp3_44100_128")
+            assert (cache_dir / f"{newest_key}.mp3").exists()
+        finally:
+            TTSCache.MAX_CACHE_SIZE_GB = previous_limit
+    print("✅ LRU cleanup keeps the cache under its size limit")
+
+
+if __name__ == "__main__":
+    test_cache_key_normalization()
+    test_repeat_requests_skip_synthesis()
+    test_concurrent_requests_singleflight()
+    test_failed_synthesis_is_not_cached()
+    test_lru_cleanup_respects_size_limit()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+TTS Service Tests
+=================
+Validates background voiceover synthesis: duration estimates available
+before the audio exists, and wait() returning the finished file.
+
+Only cached voiceovers are exercised so no ElevenLabs request is made.
+
+Usage:
+    python tests/test_services/test_tts_service.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import imageio_ffmpeg
+
+from backend.services.tts_cache import TTSCache
+from backend.services.tts_service import TTSService
+
+
+def _seed_cache(script: str, voice_id: str, seconds: float):
+    """Place a real MP3 in the TTS cache as if ElevenLabs had produced it"""
+    model = TTSService._select_model("English")
+    key = TTSCache.get_cache_key(script, voice_id, model, TTSService.OUTPUT_FORMAT)
+    TTSCache.initialize()
+    subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-c:a', 'libmp3lame', '-b:a', '128k',
+        str(TTSCache.CACHE_DIR / f"{key}.mp3")
+    ], check=True)
+
+
+def test_estimate_from_script_length():
+    """Uncached scripts are estimated from length, longer scripts estimate longer"""
+    previous = TTSCache.CACHE_DIR
+    TTSCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="tts_cache_"))
+    try:
+        short = TTSService.estimate_duration("Short line.", "voice_1234567")
+        long = TTSService.estimate_duration("A much longer line of voiceover. " * 10, "voice_1234567")
+        assert short >= 1.0
+        assert long > short
+        expected = len(TTSCache.normalize_script("A much longer line of voiceover. " * 10)) / TTSService.ESTIMATE_CHARS_PER_SECOND
+        assert abs(long - expected) < 0.01
+    finally:
+        TTSCache.CACHE_DIR = previous
+    print("✅ Duration estimated from script length")
+
+
+def test_start_audio_cached_voiceover():
+    """Cached voiceovers get an exact estimate and complete without a network call"""
+    previous = TTSCache.CACHE_DIR
+    TTSCache.CACHE_DIR = Path(tempfile.mkdtemp(prefix="tts_cache_"))
+    try:
+        script = "This voiceover was rendered on a previous run."
+        _seed_cache(script, "voice_1234567", 3.0)
+        
+        output_path = os.path.join(tempfile.mkdtemp(prefix="tts_out_"), "voice.mp3")
+        pending = TTSService.start_audio(
+            api_key="test-key",
+            script_text=script,
+            voice_id="voice_1234567",
+            output_path=output_path
+        )
+        
+        assert abs(pending.estimated_duration - 3.0) < 0.2
+        assert pending.wait(timeout=30) == (True, "")
+        assert pending.done
+        assert os.path.getsize(output_path) > 0
+    finally:
+        TTSCache.CACHE_DIR = previous
+    print("✅ Cached voiceover starts with exact duration")
+
+
+def test_start_audio_reports_errors():
+    """Failures surface through wait() like generate_audio()"""
+    pending = TTSService.start_audio(
+        api_key="",
+        script_text="Some script",
+        voice_id="voice_1234567",
+        output_path=os.path.join(tempfile.mkdtemp(prefix="tts_out_"), "voice.mp3")
+    )
+    success, error = pending.wait(timeout=30)
+    assert not success
+    assert "API key" in error
+    print("✅ Background synthesis errors reported on wait()")
+
+
+if __name__ == "__main__":
+    test_estimate_from_script_length()
+    test_start_audio_cached_voiceover()
+    test_start_audio_reports_errors()
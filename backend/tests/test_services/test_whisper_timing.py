@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Whisper Timing Kernel Tests
+===========================
+Runs the numba DTW warm-up in fresh processes against a temp cache dir and
+checks that the second process loads the kernels from disk instead of
+compiling, that results match, and that the warm-up is traced.
+
+Usage:
+    python tests/test_services/test_whisper_timing.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path (we're in tests/test_services/, need to go up 2 levels)
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+WARMUP_SCRIPT = """
+import json, sys
+sys.path.insert(0, %r)
+import numpy as np
+from backend.services.tracing import Tracer
+from backend.whisper_service import warmup_timing_kernels
+from whisper import timing
+
+first = warmup_timing_kernels()
+second = warmup_timing_kernels()
+path = timing.dtw_cpu(np.array([[0.0, 1.0, 2.0], [1.0, 0.0, 1.0], [2.0, 1.0, 0.0]]))
+print(json.dumps({
+    'first': first['dtw_cpu'], 'second': second['dtw_cpu'],
+    'path': path.tolist(),
+    'traced': 'massugc_span_duration_seconds_count{kind="jit",span="whisper.dtw_cpu"} 1' in Tracer.render_prometheus(),
+}))
+""" % str(project_root)
+
+
+def run_warmup(cache_dir: str) -> dict:
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    result = subprocess.run([sys.executable, "-c", WARMUP_SCRIPT], capture_output=True, text=True,
+                            env=env, cwd=str(project_root), timeout=300)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_kernels_load_from_disk_cache():
+    """A fresh process compiles once; the next one loads the cached kernels"""
+    cache_dir = tempfile.mkdtemp(prefix="numba_cache_")
+
+    cold = run_warmup(cache_dir)
+    assert cold['first']['source'] == 'compile'
+    assert cold['second']['source'] == 'memory'
+    assert cold['traced']
+    assert any(Path(cache_dir).rglob("*.nbi"))
+
+    warm = run_warmup(cache_dir)
+    assert warm['first']['source'] == 'cache'
+    assert warm['first']['seconds'] < cold['first']['seconds']
+    assert warm['path'] == cold['path'] == [[0, 1, 2], [0, 1, 2]]
+    print(f"✅ DTW kernels: compile {cold['first']['seconds']:.2f}s, cached load {warm['first']['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    test_kernels_load_from_disk_cache()
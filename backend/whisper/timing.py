@@ -1,5 +1,7 @@
 import itertools
+import os
 import subprocess
+import time
 import warnings
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, List
@@ -15,6 +17,16 @@ from .tokenizer import Tokenizer
 if TYPE_CHECKING:
     from .model import Whisper
 
+# Persist compiled DTW kernels so a fresh process loads them instead of
+# recompiling. NUMBA_CACHE_DIR still wins; the default is user-writable
+# because bundled installs may not allow writing next to this file.
+if not numba.config.CACHE_DIR:
+    numba.config.CACHE_DIR = os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+        "whisper",
+        "numba",
+    )
+
 
 def median_filter(x: torch.Tensor, filter_width: int):
     """Apply a median filter of width `filter_width` along the last dimension of `x`"""
@@ -54,7 +66,7 @@ def median_filter(x: torch.Tensor, filter_width: int):
     return result
 
 
-@numba.jit(nopython=True)
+@numba.jit(nopython=True, cache=True)
 def backtrace(trace: np.ndarray):
     i = trace.shape[0] - 1
     j = trace.shape[1] - 1
@@ -79,7 +91,7 @@ def backtrace(trace: np.ndarray):
     return result[::-1, :].T
 
 
-@numba.jit(nopython=True, parallel=True)
+@numba.jit(nopython=True, parallel=True, cache=True)
 def dtw_cpu(x: np.ndarray):
     N, M = x.shape
     cost = np.ones((N + 1, M + 1), dtype=np.float32) * np.inf
@@ -138,6 +150,29 @@ def dtw_cuda(x, BLOCK_SIZE=1024):
     return backtrace(trace.cpu().numpy())
 
 
+def warmup() -> dict:
+    """
+    Compile the CPU DTW kernels (or load them from the on-disk cache) for the
+    float64 input `dtw` passes, so the first word-timestamp request doesn't.
+
+    Returns {"dtw_cpu": {"seconds": float, "source": "memory" | "cache" | "compile"}}
+    """
+    signatures_before = len(dtw_cpu.signatures)
+    hits_before = sum(dtw_cpu.stats.cache_hits.values())
+
+    start = time.perf_counter()
+    dtw_cpu(np.zeros((2, 2), dtype=np.float64))
+    seconds = time.perf_counter() - start
+
+    if signatures_before:
+        source = "memory"
+    elif sum(dtw_cpu.stats.cache_hits.values()) > hits_before:
+        source = "cache"
+    else:
+        source = "compile"
+    return {"dtw_cpu": {"seconds": seconds, "source": source}}
+
+
 def dtw(x: torch.Tensor) -> np.ndarray:
     if x.is_cuda:
         try:
@@ -181,6 +181,24 @@ class JobProgressService {
         }
       });
       
+      // Handle background Google Drive uploads - these finish after 'done',
+      // so they're matched against the store rather than tracked jobs
+      this.#eventSource.addEventListener('drive_upload', (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          if (data.state !== 'completed' || !data.output_path) {
+            return;
+          }
+          
+          const job = useStore.getState().jobs.find(j => j.runId === data.run_id);
+          if (job) {
+            useStore.getState().setJobOutputPath(job.campaignId, data.run_id, data.output_path);
+          }
+        } catch (error) {
+          console.error('JobProgressService: Error handling Drive upload event', error);
+        }
+      });
+      
       // Handle errors
       this.#eventSource.addEventListener('error', (event) => {
         try {
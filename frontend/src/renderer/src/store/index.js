@@ -303,6 +303,18 @@ export const useStore = create(
         }
       },
       
+      // Update a finished job's output (e.g. local file -> Drive link once uploaded)
+      setJobOutputPath: (campaignId, runId, outputPath) => set(state => ({
+        jobs: state.jobs.map(job =>
+          (job.campaignId === campaignId && job.runId === runId) ?
+          { ...job, outputPath } : job
+        ),
+        exports: state.exports.map(exprt =>
+          (exprt.campaignId === campaignId && exprt.runId === runId) ?
+          { ...exprt, path: outputPath } : exprt
+        )
+      })),
+      
       // Mark job as failed
       failJob: (campaignId, runId, error) => {
         // Convert technical errors to user-friendly messages